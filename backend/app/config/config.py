@@ -10,6 +10,14 @@ class Settings:
     GOOGLE_CLIENT_ID: str = os.getenv("GOOGLE_CLIENT_ID", "")
     GOOGLE_CLIENT_SECRET: str = os.getenv("GOOGLE_CLIENT_SECRET", "")
     GOOGLE_REDIRECT_URI: str = os.getenv("GOOGLE_REDIRECT_URI", "http://localhost:3000/auth/callback")
+    # Point these at a local mock OAuth server for testing
+    GOOGLE_TOKEN_URL: str = os.getenv("GOOGLE_TOKEN_URL", "https://oauth2.googleapis.com/token")
+    GOOGLE_USERINFO_URL: str = os.getenv("GOOGLE_USERINFO_URL", "https://www.googleapis.com/oauth2/v1/userinfo?alt=json")
+    GOOGLE_JWKS_URL: str = os.getenv("GOOGLE_JWKS_URL", "https://www.googleapis.com/oauth2/v3/certs")
+    GOOGLE_ISSUERS: list[str] = os.getenv("GOOGLE_ISSUERS", "accounts.google.com,https://accounts.google.com").split(",")
+    OAUTH_HTTP_TIMEOUT: float = float(os.getenv("OAUTH_HTTP_TIMEOUT", 10))
+    # Access tokens expiring within this many seconds are refreshed in the background
+    TOKEN_REFRESH_MARGIN: int = int(os.getenv("TOKEN_REFRESH_MARGIN", 300))
     
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "")
@@ -20,6 +28,20 @@ class Settings:
     REDIS_PORT: int = int(os.getenv("REDIS_PORT", 6379))
     REDIS_USERNAME: Optional[str] = os.getenv("REDIS_USERNAME", "default") 
     
+    # Response compression; brotli is used only when the package is installed
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))  # bytes
+    GZIP_LEVEL: int = int(os.getenv("GZIP_LEVEL", 6))
+    BROTLI_QUALITY: int = int(os.getenv("BROTLI_QUALITY", 5))
+    
+    # Share identical concurrent reads across workers through a Redis lock, not only within a process
+    SINGLE_FLIGHT_DISTRIBUTED: bool = os.getenv("SINGLE_FLIGHT_DISTRIBUTED", "true").lower() == "true"
+    
+    # Read-through cache of reference rows (subjects, batches, academic years, users)
+    ENTITY_CACHE_ENABLED: bool = os.getenv("ENTITY_CACHE_ENABLED", "true").lower() == "true"
+    
+    # Worker processes for allocation what-if simulations, which are CPU-bound pure Python
+    SIMULATION_WORKERS: int = int(os.getenv("SIMULATION_WORKERS", 2))
+    
     # Frontend
     FRONTEND_BASE_URL: str = os.getenv("FRONTEND_BASE_URL", "http://localhost:3001")
     
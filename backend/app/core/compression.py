@@ -0,0 +1,92 @@
+import zlib
+from typing import Dict, List, Optional, Tuple
+from fastapi.responses import Response
+from app.config.config import settings
+
+try:
+    import brotli  # type: ignore
+except ImportError:  # optional: pip install backend[compression]
+    brotli = None
+
+"""
+Content negotiation and compression shared by the compression middleware and the
+response caches that store bodies already compressed.
+"""
+
+IDENTITY = "identity"
+GZIP = "gzip"
+BROTLI = "br"
+
+# Server preference when the client weights encodings equally
+SUPPORTED_ENCODINGS: List[str] = ([BROTLI] if brotli else []) + [GZIP]
+
+
+def acceptable_encodings(accept_encoding: str) -> List[str]:
+    """Encodings we can serve that the Accept-Encoding header allows, best first"""
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip()] = weight
+
+    wildcard = weights.get("*", 0.0)
+    ranked = [
+        (weights.get(encoding, wildcard), -preference, encoding)
+        for preference, encoding in enumerate(SUPPORTED_ENCODINGS)
+    ]
+    return [encoding for weight, _, encoding in sorted(ranked, reverse=True) if weight > 0]
+
+
+class Compressor:
+    """Incremental compressor for one response body"""
+
+    def __init__(self, encoding: str) -> None:
+        if encoding == BROTLI:
+            self._brotli = brotli.Compressor(quality=settings.BROTLI_QUALITY)
+            self._zlib = None
+        else:
+            self._brotli = None
+            # wbits 31 writes a gzip header and trailer
+            self._zlib = zlib.compressobj(settings.GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._brotli.process(data) if self._brotli else self._zlib.compress(data)
+
+    def finish(self) -> bytes:
+        return self._brotli.finish() if self._brotli else self._zlib.flush()
+
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    compressor = Compressor(encoding)
+    return compressor.compress(body) + compressor.finish()
+
+
+def compress_variants(body: bytes) -> Dict[str, bytes]:
+    """A body under every encoding we can serve; bodies below the threshold are kept as is"""
+    variants = {IDENTITY: body}
+    if len(body) >= settings.COMPRESSION_MIN_SIZE:
+        for encoding in SUPPORTED_ENCODINGS:
+            variants[encoding] = compress_body(body, encoding)
+    return variants
+
+
+def pick_variant(variants: Dict[str, bytes], encodings: List[str]) -> Tuple[str, bytes]:
+    """The best stored variant the client accepts, falling back to the uncompressed body"""
+    encoding: Optional[str] = next((encoding for encoding in encodings if encoding in variants), None)
+    return (encoding, variants[encoding]) if encoding else (IDENTITY, variants[IDENTITY])
+
+
+def precompressed_response(encoding: str, body: bytes, media_type: str = "application/json") -> Response:
+    """Send a body that is already encoded; the compression middleware leaves it untouched"""
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding != IDENTITY:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=media_type, headers=headers)
@@ -0,0 +1,109 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Iterable, List, Optional, Set, TypeVar
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.repository_base import BaseRepository, ModelType
+
+"""
+Request-scoped batched entity lookups.
+
+A DataLoader collects the keys asked for during one event-loop tick and resolves them
+with a single batch query, so lookups started together (asyncio.gather, load_many)
+cost one round-trip per entity type instead of one per id. Results are memoized for
+the lifetime of the loader. entity_loader() keeps one loader per model on the
+request's session, which makes the memo per request.
+
+An AsyncSession runs one statement at a time, so the loaders of a session take its
+lock around their queries. Code that runs other queries concurrently with pending
+loads on the same session must take session_lock() too.
+"""
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+def session_lock(session: AsyncSession) -> asyncio.Lock:
+    """The lock serialising concurrent queries on one session"""
+    return session.info.setdefault("query_lock", asyncio.Lock())
+
+
+class DataLoader(Generic[K, V]):
+    def __init__(self, batch_load: Callable[[List[K]], Awaitable[Dict[K, V]]]) -> None:
+        self._batch_load = batch_load
+        self._results: Dict[K, asyncio.Future] = {}
+        self._queue: List[K] = []
+        self._dispatches: Set[asyncio.Task] = set()
+
+    async def load(self, key: K) -> Optional[V]:
+        """The value for key, or None when the batch query did not return it"""
+        future = self._results.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._results[key] = future
+            if not self._queue:
+                # Runs after every coroutine already scheduled for this tick had its turn
+                loop.call_soon(self._dispatch)
+            self._queue.append(key)
+        # Shielded so a cancelled caller does not cancel the result other callers share
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[K]) -> List[Optional[V]]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: K, value: V) -> None:
+        """Memoize a value the caller already has, e.g. a row it just created"""
+        future = self._results.get(key)
+        if future is None or future.done():
+            future = asyncio.get_running_loop().create_future()
+            self._results[key] = future
+        future.set_result(value)
+
+    def clear(self, key: Optional[K] = None) -> None:
+        """Forget one memoized key, or all of them, after a write"""
+        if key is None:
+            self._results = {k: f for k, f in self._results.items() if not f.done()}
+        elif key in self._results and self._results[key].done():
+            del self._results[key]
+
+    def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        task = asyncio.create_task(self._resolve(keys))
+        self._dispatches.add(task)
+        task.add_done_callback(self._dispatches.discard)
+
+    async def _resolve(self, keys: List[K]) -> None:
+        try:
+            found = await self._batch_load(keys)
+        except asyncio.CancelledError:
+            for key in keys:
+                future = self._results.pop(key, None)
+                if future is not None:
+                    future.cancel()
+            raise
+        except Exception as e:
+            for key in keys:
+                # Dropped from the memo so a later load retries
+                future = self._results.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+                    future.exception()  # retrieved here in case no caller is left
+            return
+        for key in keys:
+            future = self._results.get(key)
+            if future is not None and not future.done():
+                future.set_result(found.get(key))
+
+
+def entity_loader(session: AsyncSession, model_class: type[ModelType]) -> DataLoader[Any, ModelType]:
+    """The request's loader of model_class by primary key, created on first use"""
+    loaders: Dict[type, DataLoader] = session.info.setdefault("data_loaders", {})
+    loader = loaders.get(model_class)
+    if loader is None:
+        repository = BaseRepository(session, model_class)
+
+        async def batch_load(ids: List[Any]) -> Dict[Any, ModelType]:
+            async with session_lock(session):
+                return await repository.get_many_by_ids(ids)
+
+        loader = loaders[model_class] = DataLoader(batch_load)
+    return loader
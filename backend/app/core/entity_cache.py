@@ -0,0 +1,297 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import orjson
+import redis.asyncio as redis
+from sqlalchemy import Date, DateTime, Enum, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config.config import settings
+from app.db.radis_client import get_binary_redis_client
+from app.db.unit_of_work import after_commit
+from app.models.model import AcademicYears, BaseClass, Batches, Subjects, Users
+
+logger = logging.getLogger(__name__)
+
+"""
+Read-through cache of reference rows, keyed by table and primary key.
+
+BaseRepository looks rows of the models listed in ENTITY_CACHE_TTLS up here before
+querying. A bounded in-process LRU answers most lookups; behind it Redis holds the
+column values as JSON for the model's TTL, shared by every worker. Entries in the LRU
+live for ENTITY_CACHE_LOCAL_TTL at most, so a worker that missed an invalidation
+serves a stale row for seconds, not for the whole TTL.
+
+Writes invalidate once the request's transaction has committed: the key is dropped
+from Redis and the LRU, its generation is bumped, and the change is PUBLISHed so the
+other workers drop their copy too. BaseRepository's create, update and delete do this
+themselves; repositories writing with UPDATE or DELETE statements call
+invalidate_after_commit() for the ids they touched.
+
+Rows read from the database after a miss are cached only once the reading transaction
+has committed, so a rollback never leaves its uncommitted values behind. The fill is
+skipped for every row whose generation moved since the miss, so a slow fill cannot
+overwrite a newer invalidation.
+"""
+
+# Seconds a row stays in Redis, per model; models not listed are never cached
+ENTITY_CACHE_TTLS: Dict[type, int] = {
+    AcademicYears: 3600,
+    Subjects: 900,
+    Batches: 900,
+    Users: 300,
+}
+ENTITY_CACHE_LOCAL_TTL = 30  # seconds
+ENTITY_CACHE_MAX_ENTRIES = 10000
+ENTITY_CACHE_CHANNEL = "entity_cache_invalidations"
+
+
+def entity_cache_key(table: str, id: Any) -> str:
+    return f"entity:{table}:{id}"
+
+
+def entity_generation_key(table: str, id: Any) -> str:
+    return f"entity_gen:{table}:{id}"
+
+
+# SET each row only if its generation is still the one seen at the miss.
+# KEYS: value and generation key of each row; ARGV: TTL, then expected generation and payload of each row
+FILL_SCRIPT = """
+for i = 1, #KEYS, 2 do
+    if (redis.call('GET', KEYS[i + 1]) or '') == ARGV[i + 1] then
+        redis.call('SET', KEYS[i], ARGV[i + 2], 'EX', ARGV[1])
+    end
+end
+"""
+
+
+def _to_columns(instance: BaseClass) -> Dict[str, Any]:
+    return {attr.key: getattr(instance, attr.key) for attr in inspect(type(instance)).column_attrs}
+
+
+def _from_json(model_class: type, values: Dict[str, Any]) -> Dict[str, Any]:
+    """Undo what JSON did to enum and datetime columns"""
+    for attr in inspect(model_class).column_attrs:
+        value = values.get(attr.key)
+        if value is None:
+            continue
+        column_type = attr.columns[0].type
+        if isinstance(column_type, Enum) and column_type.enum_class is not None:
+            values[attr.key] = column_type.enum_class(value)
+        elif isinstance(column_type, DateTime):
+            values[attr.key] = datetime.fromisoformat(value)
+        elif isinstance(column_type, Date):
+            values[attr.key] = date.fromisoformat(value)
+    return values
+
+
+class _ModelStats:
+    __slots__ = ("local_hits", "redis_hits", "misses", "invalidations")
+
+    def __init__(self) -> None:
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+
+class CacheFill:
+    """What a lookup missed, with the generations seen at the time; rows read after it are cached against them"""
+    __slots__ = ("model_class", "local_generation", "generations")
+
+    def __init__(self, model_class: type, local_generation: int, generations: Dict[Any, bytes]) -> None:
+        self.model_class = model_class
+        self.local_generation = local_generation
+        self.generations = generations
+
+
+class EntityCache:
+    def __init__(
+        self,
+        ttls: Dict[type, int] = ENTITY_CACHE_TTLS,
+        local_ttl: float = ENTITY_CACHE_LOCAL_TTL,
+        max_entries: int = ENTITY_CACHE_MAX_ENTRIES,
+        enabled: bool = settings.ENTITY_CACHE_ENABLED
+    ) -> None:
+        self.ttls = ttls
+        self.local_ttl = local_ttl
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._entries: "OrderedDict[Tuple[str, Any], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._stats: Dict[str, _ModelStats] = {model.__tablename__: _ModelStats() for model in ttls}
+        # Bumped on every invalidation of a table seen by this process, local or published
+        self._generations: Dict[str, int] = {model.__tablename__: 0 for model in ttls}
+        self._listener: Optional[asyncio.Task] = None
+
+    def caches(self, model_class: type) -> bool:
+        return self.enabled and model_class in self.ttls
+
+    async def get_many(self, model_class: type, ids: Iterable[Any]) -> Tuple[Dict[Any, Dict[str, Any]], CacheFill]:
+        """Cached column values of the given rows, keyed by id, and the fill for the ids not cached"""
+        self.ensure_listener()
+        table = model_class.__tablename__
+        stats = self._stats[table]
+        local_generation = self._generations[table]
+        now = time.monotonic()
+        found: Dict[Any, Dict[str, Any]] = {}
+        remote: List[Any] = []
+        for id in ids:
+            entry = self._entries.get((table, id))
+            if entry is not None and entry[0] >= now:
+                self._entries.move_to_end((table, id))
+                # A copy, so the caller building an instance from it cannot change the entry
+                found[id] = dict(entry[1])
+            else:
+                remote.append(id)
+        stats.local_hits += len(found)
+
+        generations: Dict[Any, bytes] = {}
+        if remote:
+            try:
+                # The generations come with the values, so the fill compares against what this read saw
+                replies = await get_binary_redis_client().mget(
+                    [entity_cache_key(table, id) for id in remote] + [entity_generation_key(table, id) for id in remote]
+                )
+            except Exception as e:
+                logger.warning(f"Entity cache read of {table} failed: {str(e)}")
+                replies = None
+            if replies is None:
+                # Without the generations nothing read now can be cached safely
+                stats.misses += len(remote)
+                return found, CacheFill(model_class, local_generation, {})
+            for id, payload, generation in zip(remote, replies[:len(remote)], replies[len(remote):]):
+                if payload is None:
+                    stats.misses += 1
+                    generations[id] = generation or b""
+                    continue
+                values = _from_json(model_class, orjson.loads(payload))
+                self._remember(table, id, values)
+                found[id] = dict(values)
+                stats.redis_hits += 1
+        return found, CacheFill(model_class, local_generation, generations)
+
+    def fill_after_commit(self, session: AsyncSession, fill: CacheFill, instances: Dict[Any, BaseClass]) -> None:
+        """Cache rows read after a miss once the session's transaction has committed"""
+        # Taken now: the instances may change later in the transaction
+        rows = {id: _to_columns(instance) for id, instance in instances.items() if id in fill.generations}
+        if rows:
+            after_commit(session, lambda: self._fill(fill, rows))
+
+    async def _fill(self, fill: CacheFill, rows: Dict[Any, Dict[str, Any]]) -> None:
+        table = fill.model_class.__tablename__
+        if self._generations[table] == fill.local_generation:
+            for id, values in rows.items():
+                self._remember(table, id, values)
+        keys: List[str] = []
+        args: List[Any] = [self.ttls[fill.model_class]]
+        for id, values in rows.items():
+            keys += [entity_cache_key(table, id), entity_generation_key(table, id)]
+            args += [fill.generations[id], orjson.dumps(values)]
+        try:
+            await get_binary_redis_client().eval(FILL_SCRIPT, len(keys), *keys, *args)
+        except Exception as e:
+            logger.warning(f"Entity cache write of {table} failed: {str(e)}")
+
+    async def invalidate(self, model_class: type, ids: Iterable[Any]) -> None:
+        """Drop rows everywhere after a committed write to them"""
+        if not self.caches(model_class):
+            return
+        table = model_class.__tablename__
+        ids = list(ids)
+        if not ids:
+            return
+        self._forget(table, ids)
+        self._stats[table].invalidations += len(ids)
+        try:
+            async with get_binary_redis_client().pipeline(transaction=True) as pipe:
+                pipe.delete(*(entity_cache_key(table, id) for id in ids))
+                for id in ids:
+                    # Lives far longer than any fill in flight, so one that started before this sees the change
+                    pipe.incr(entity_generation_key(table, id))
+                    pipe.expire(entity_generation_key(table, id), self.ttls[model_class])
+                pipe.publish(ENTITY_CACHE_CHANNEL, orjson.dumps([table, ids]))
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Entity cache invalidation of {table} failed: {str(e)}")
+
+    def invalidate_after_commit(self, session: AsyncSession, model_class: type, ids: Iterable[Any]) -> None:
+        """Drop rows once the session's transaction has committed"""
+        ids = list(ids)
+        if ids and self.caches(model_class):
+            after_commit(session, lambda: self.invalidate(model_class, ids))
+
+    def _remember(self, table: str, id: Any, values: Dict[str, Any]) -> None:
+        key = (table, id)
+        self._entries.pop(key, None)
+        if len(self._entries) >= self.max_entries:
+            self._entries.popitem(last=False)
+        self._entries[key] = (time.monotonic() + self.local_ttl, values)
+
+    def _forget(self, table: str, ids: Iterable[Any]) -> None:
+        if table in self._generations:
+            self._generations[table] += 1
+        for id in ids:
+            self._entries.pop((table, id), None)
+
+    def clear(self) -> None:
+        for table in self._generations:
+            self._generations[table] += 1
+        self._entries.clear()
+
+    def ensure_listener(self) -> None:
+        """Start the invalidation subscription of this process if it is not running"""
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        while True:
+            client = redis.Redis(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                username=settings.REDIS_USERNAME,
+                password=settings.REDIS_PASSWORD,
+                decode_responses=False
+            )
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(ENTITY_CACHE_CHANNEL)
+                    # Anything cached before the subscription may have missed an invalidation
+                    self.clear()
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            table, ids = orjson.loads(message["data"])
+                            self._forget(table, ids)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.warning(f"Entity cache invalidation subscription dropped, reconnecting: {str(e)}")
+                self.clear()
+                await asyncio.sleep(1)
+            finally:
+                await client.aclose()
+
+    def stats(self) -> List[Dict[str, Any]]:
+        local_entries: Dict[str, int] = {}
+        for table, _ in self._entries:
+            local_entries[table] = local_entries.get(table, 0) + 1
+        report = []
+        for model_class, ttl in self.ttls.items():
+            table = model_class.__tablename__
+            stats = self._stats[table]
+            lookups = stats.local_hits + stats.redis_hits + stats.misses
+            report.append({
+                "model": model_class.__name__,
+                "ttl": ttl,
+                "local_entries": local_entries.get(table, 0),
+                "local_hits": stats.local_hits,
+                "redis_hits": stats.redis_hits,
+                "misses": stats.misses,
+                "invalidations": stats.invalidations,
+                "hit_ratio": round((stats.local_hits + stats.redis_hits) / lookups, 4) if lookups else 0.0
+            })
+        return report
+
+
+entity_cache = EntityCache()
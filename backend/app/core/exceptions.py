@@ -28,4 +28,15 @@ class NotFoundException(BaseAPIException):
             details=details,
             status_code=status.HTTP_404_NOT_FOUND,
             error_code="NOT_FOUND"
-        )
\ No newline at end of file
+        )
+
+
+class ConflictException(BaseAPIException):
+    def __init__(self, message: str = "Resource was modified concurrently", details: Optional[Any] = None):
+        super().__init__(
+            message=message,
+            user_message="The resource has been changed by someone else. Reload and try again.",
+            details=details,
+            status_code=status.HTTP_409_CONFLICT,
+            error_code="CONFLICT"
+        )
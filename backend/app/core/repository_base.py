@@ -1,7 +1,10 @@
-from typing import Generic, TypeVar, Sequence, Any
+from typing import Dict, Generic, List, Optional, TypeVar, Sequence, Any
 from app.models.model import BaseClass
+from app.core.entity_cache import entity_cache
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import any_, and_, bindparam, column, delete, insert, inspect, select, update, values
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.orm import make_transient_to_detached
 
 ModelType = TypeVar("ModelType", bound=BaseClass)
 
@@ -11,46 +14,186 @@ class BaseRepository(Generic[ModelType]):
         self.model_class = model_class
 
     async def create(self, **kwargs) -> ModelType | None:
-        instance = self.model_class(**kwargs)
-        self.session.add(instance)
-        await self.session.commit()
-        await self.session.refresh(instance)
+        instance = (await self.bulk_create([kwargs]))[0]
+        self._invalidate(instance)
         return instance
 
-    async def get_by_id(self, id: int) -> ModelType | None:
-        print("------")
-        try:
-            result = await self.session.get(self.model_class, id)
-        except Exception as e:
-            print(f"error- {str(e)}")
-        print(result)
-        print("------")
-        return result
+    async def get_by_id(self, id: int, bypass_cache: bool = False) -> ModelType | None:
+        """Load a row by primary key; bypass_cache reads it from the database even if it is cached"""
+        if bypass_cache or not entity_cache.caches(self.model_class):
+            return await self.session.get(self.model_class, id, populate_existing=bypass_cache)
+        return (await self.get_many_by_ids([id])).get(id)
+
+    async def get_many_by_ids(self, ids: Sequence[Any], bypass_cache: bool = False) -> Dict[Any, ModelType]:
+        """Load rows by primary key with one WHERE pk = ANY(:ids) query, keyed by id; missing ids are left out
+
+        Rows of cached models come from the entity cache where possible and only the rest
+        are queried; the queried rows are cached once the transaction commits. bypass_cache
+        queries them all and leaves the cache alone.
+        """
+        if not ids:
+            return {}
+        cached = not bypass_cache and entity_cache.caches(self.model_class)
+        found: Dict[Any, ModelType] = {}
+        fill = None
+        if cached:
+            ids = self._take_from_session(ids, found)
+            if ids:
+                values_by_id, fill = await entity_cache.get_many(self.model_class, ids)
+                for id, values in values_by_id.items():
+                    found[id] = await self._attach(values)
+                ids = [id for id in ids if id not in found]
+            if not ids:
+                return found
+
+        mapper = inspect(self.model_class)
+        primary_key = mapper.primary_key[0]
+        key = mapper.get_property_by_column(primary_key).key
+        stmt = select(self.model_class).where(
+            primary_key == any_(bindparam("ids", list(ids), type_=ARRAY(primary_key.type)))
+        )
+        result = await self.session.execute(stmt)
+        loaded = {getattr(instance, key): instance for instance in result.scalars()}
+        if fill is not None:
+            entity_cache.fill_after_commit(self.session, fill, loaded)
+        found.update(loaded)
+        return found
+
+    def _take_from_session(self, ids: Sequence[Any], found: Dict[Any, ModelType]) -> list:
+        """Use rows this session already holds, which may carry changes the cache has not seen"""
+        remaining = []
+        for id in ids:
+            instance = self.session.identity_map.get(self.session.identity_key(self.model_class, id))
+            if instance is None:
+                remaining.append(id)
+            else:
+                found[id] = instance
+        return remaining
+
+    async def _attach(self, values: Dict[str, Any]) -> ModelType:
+        """Turn cached column values into a persistent instance of this session without a query"""
+        instance = self.model_class(**values)
+        make_transient_to_detached(instance)
+        return await self.session.merge(instance, load=False)
+
+    def _invalidate(self, instance: ModelType) -> None:
+        entity_cache.invalidate_after_commit(self.session, self.model_class, [inspect(instance).identity[0]])
 
     async def get_all(self) -> Sequence[ModelType]:
         result = await self.session.execute(select(self.model_class))
         return result.scalars().all()
 
     async def update(self, id: int, **kwargs) -> ModelType | None:
-        instance = await self.get_by_id(id)
-        if not instance:
+        if not kwargs:
+            return await self.get_by_id(id, bypass_cache=True)
+        updated = await self.bulk_update([{self._primary_key_attr(): id, **kwargs}])
+        if not updated:
             return None
-
-        for key, value in kwargs.items():
-            setattr(instance, key, value)
-
-        await self.session.commit()
-        await self.session.refresh(instance)
-        return instance
+        self._invalidate(updated[0])
+        return updated[0]
 
     async def delete(self, id: int) -> bool:
-        instance = await self.get_by_id(id)
-        if not instance:
+        deleted = await self.delete_where(inspect(self.model_class).primary_key[0] == id)
+        if not deleted:
             return False
-
-        await self.session.delete(instance)
-        await self.session.commit()
+        entity_cache.invalidate_after_commit(self.session, self.model_class, deleted)
         return True
+
+    # The statements below are one round-trip each; callers invalidate the returned rows
+    # of cached models with entity_cache.invalidate_after_commit().
+
+    async def bulk_create(self, rows: Sequence[Dict[str, Any]]) -> List[ModelType]:
+        """INSERT the rows in one statement and return them as stored, in the given order"""
+        if not rows:
+            return []
+        result = await self.session.scalars(
+            insert(self.model_class).returning(self.model_class, sort_by_parameter_order=True),
+            list(rows)
+        )
+        return list(result.all())
+
+    async def bulk_update(self, rows: Sequence[Dict[str, Any]], match_on: Optional[Sequence[str]] = None) -> List[ModelType]:
+        """UPDATE many rows with their own values in one UPDATE ... FROM (VALUES ...) statement
+
+        Every row carries the attributes named in match_on (the primary key by default),
+        which select the row to change, and the same set of attributes to set. Returns
+        the updated rows; rows that matched nothing are missing from the result.
+        """
+        if not rows:
+            return []
+        mapper = inspect(self.model_class)
+        match_on = list(match_on or [self._primary_key_attr()])
+        assigned = [key for key in rows[0] if key not in match_on]
+        keys = match_on + assigned
+        if any(set(row) != set(keys) for row in rows):
+            raise ValueError("bulk_update rows must all set the same attributes")
+        if not assigned:
+            raise ValueError("bulk_update rows have nothing to set")
+
+        columns = {key: mapper.attrs[key].columns[0] for key in keys}
+        data = values(
+            *(column(columns[key].name, columns[key].type) for key in keys), name="data"
+        ).data([tuple(row[key] for key in keys) for row in rows])
+        stmt = (
+            update(self.model_class)
+            .where(and_(*(columns[key] == data.c[columns[key].name] for key in match_on)))
+            .values({columns[key]: data.c[columns[key].name] for key in assigned})
+            .returning(self.model_class)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.scalars(stmt, execution_options={"populate_existing": True})
+        return list(result.all())
+
+    async def upsert(
+        self,
+        rows: Sequence[Dict[str, Any]],
+        conflict_on: Sequence[str],
+        update_keys: Optional[Sequence[str]] = None
+    ) -> List[ModelType]:
+        """INSERT ... ON CONFLICT DO UPDATE in one statement and return the stored rows
+
+        conflict_on names the attributes of the unique constraint that decides whether a
+        row exists. update_keys are overwritten on conflict (all other attributes of the
+        rows by default); with none, existing rows are left alone and not returned.
+        """
+        if not rows:
+            return []
+        mapper = inspect(self.model_class)
+        if update_keys is None:
+            update_keys = [key for key in rows[0] if key not in conflict_on]
+        stmt = pg_insert(self.model_class).values(list(rows))
+        index_elements = [mapper.attrs[key].columns[0] for key in conflict_on]
+        if update_keys:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=index_elements,
+                set_={key: stmt.excluded[mapper.attrs[key].columns[0].name] for key in update_keys}
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=index_elements)
+        result = await self.session.scalars(
+            stmt.returning(self.model_class), execution_options={"populate_existing": True}
+        )
+        return list(result.all())
+
+    async def delete_where(self, *criteria) -> List[Any]:
+        """DELETE the rows matching all criteria and return their primary keys"""
+        if not criteria:
+            raise ValueError("delete_where needs at least one condition")
+        primary_key = inspect(self.model_class).primary_key[0]
+        result = await self.session.execute(
+            delete(self.model_class).where(*criteria).returning(primary_key)
+            .execution_options(synchronize_session=False)
+        )
+        deleted = list(result.scalars().all())
+        for id in deleted:
+            instance = self.session.identity_map.get(self.session.identity_key(self.model_class, id))
+            if instance is not None:
+                self.session.expunge(instance)
+        return deleted
+
+    def _primary_key_attr(self) -> str:
+        mapper = inspect(self.model_class)
+        return mapper.get_property_by_column(mapper.primary_key[0]).key
     
     async def get_by_existing_field(self, field: str, value: Any) -> ModelType | None:
         if not hasattr(self.model_class, field):
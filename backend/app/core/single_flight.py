@@ -0,0 +1,172 @@
+import asyncio
+import functools
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config.config import settings
+from app.db.postgres_client import SessionLocal
+from app.db.radis_client import get_binary_redis_client
+from app.db.unit_of_work import commit, rollback
+
+logger = logging.getLogger(__name__)
+
+"""
+Single-flight reads.
+
+Identical concurrent calls of a decorated service method, matched by method and
+arguments, share one execution. Within a process the callers await the same task.
+Once a key has drawn concurrent callers in a process it counts as contended for a
+few seconds, and while it is, a Redis lock picks one worker to run the query; the
+others wait on the lock and then read the result it published, which is kept only
+for a couple of seconds. Uncontended calls never touch Redis.
+
+The shared execution runs on its own short-lived session, never on the session of
+the request that happened to start it. Results must be JSON-serialisable and every
+caller gets its own decoded copy, whichever path served it; datetimes come back as
+ISO strings, which the response models parse.
+"""
+
+SINGLE_FLIGHT_LOCK_TTL = 10  # seconds
+SINGLE_FLIGHT_RESULT_TTL = 2  # seconds
+SINGLE_FLIGHT_LOCK_POLL = 0.02  # seconds
+SINGLE_FLIGHT_CONTENTION_WINDOW = 5  # seconds a key stays contended after callers joined it
+
+_flights: Dict[str, "SingleFlight"] = {}
+
+
+class SingleFlight:
+    def __init__(self, name: str, distributed: bool = settings.SINGLE_FLIGHT_DISTRIBUTED) -> None:
+        self.name = name
+        self.distributed = distributed
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._contended: Dict[str, float] = {}
+        self.calls = 0
+        self.executions = 0
+        self.joined_in_process = 0
+        self.joined_across_workers = 0
+        _flights[name] = self
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn, or wait for the identical call already running, and return its result"""
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            # A task rather than inline work, so a cancelled caller never strands the others
+            task = asyncio.create_task(self._lead(key, fn))
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._done, key))
+        else:
+            self.joined_in_process += 1
+            self._contended[key] = time.monotonic()
+        return orjson.loads(await asyncio.shield(task))
+
+    def _done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every caller went away
+            task.exception()
+
+    def _is_contended(self, key: str) -> bool:
+        contended_at = self._contended.get(key)
+        if contended_at is None:
+            return False
+        if time.monotonic() - contended_at > SINGLE_FLIGHT_CONTENTION_WINDOW:
+            del self._contended[key]
+            return False
+        return True
+
+    async def _execute(self, fn: Callable[[], Awaitable[Any]]) -> bytes:
+        self.executions += 1
+        return orjson.dumps(await fn())
+
+    async def _lead(self, key: str, fn: Callable[[], Awaitable[Any]]) -> bytes:
+        if not self.distributed or not self._is_contended(key):
+            return await self._execute(fn)
+
+        client = get_binary_redis_client()
+        lock = client.lock(
+            f"single_flight_lock:{self.name}:{key}",
+            timeout=SINGLE_FLIGHT_LOCK_TTL,
+            sleep=SINGLE_FLIGHT_LOCK_POLL,
+            blocking_timeout=SINGLE_FLIGHT_LOCK_TTL
+        )
+        result_key = f"single_flight_result:{self.name}:{key}"
+        try:
+            acquired = await lock.acquire(blocking=False)
+            if not acquired:
+                # Another worker runs the same read; its result is published before it lets go
+                acquired = await lock.acquire()
+                published = await client.get(result_key)
+                if published is not None:
+                    self.joined_across_workers += 1
+                    if acquired:
+                        await lock.release()
+                    return published
+        except Exception as e:
+            logger.warning(f"Single-flight lock for {self.name} unavailable, running locally: {str(e)}")
+            return await self._execute(fn)
+
+        try:
+            result = await self._execute(fn)
+            try:
+                await client.set(result_key, result, ex=SINGLE_FLIGHT_RESULT_TTL)
+            except Exception as e:
+                logger.warning(f"Publishing single-flight result of {self.name} failed: {str(e)}")
+            return result
+        finally:
+            if acquired:
+                try:
+                    await lock.release()
+                except Exception as e:
+                    logger.warning(f"Releasing single-flight lock of {self.name} failed: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "executions": self.executions,
+            "joined_in_process": self.joined_in_process,
+            "joined_across_workers": self.joined_across_workers,
+            "collapse_ratio": round(1 - self.executions / self.calls, 4) if self.calls else 0.0
+        }
+
+
+async def _run_in_own_session(bind: Callable[[AsyncSession], Any], method: Callable[..., Awaitable[Any]], args: tuple, kwargs: dict) -> Any:
+    db = SessionLocal()
+    try:
+        result = await method(bind(db), *args, **kwargs)
+        await commit(db)
+        return result
+    except:
+        await rollback(db)
+        raise
+    finally:
+        await db.close()
+
+
+def single_flight(bind: Callable[[AsyncSession], Any], distributed: Optional[bool] = None) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """Decorate a read-only service method so identical concurrent calls share one execution.
+
+    - **bind**: Builds the service on a fresh session; the shared execution runs on it rather than on the caller's session
+    - **distributed**: Whether contended keys are also shared across workers; defaults to SINGLE_FLIGHT_DISTRIBUTED
+
+    The arguments after self form the key.
+    """
+    def decorate(method: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        flight = SingleFlight(method.__qualname__, settings.SINGLE_FLIGHT_DISTRIBUTED if distributed is None else distributed)
+
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            key = ":".join([*map(str, args), *(f"{name}={value}" for name, value in sorted(kwargs.items()))])
+            return await flight.do(key, lambda: _run_in_own_session(bind, method, args, kwargs))
+
+        return wrapper
+
+    return decorate
+
+
+def single_flight_stats() -> List[Dict[str, Any]]:
+    return [flight.stats() for flight in _flights.values()]
@@ -1,6 +1,7 @@
 from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from app.config.config import settings
+from app.db.unit_of_work import commit, rollback
 
 async_url = str(settings.DATABASE_URL).replace("postgresql://", "postgresql+asyncpg://", 1)
 engine = create_async_engine(
@@ -17,12 +18,14 @@ SessionLocal = async_sessionmaker(
 )
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    """One session and one transaction per request, committed when the endpoint returns"""
     print("Async URL:", async_url)
     db = SessionLocal()
     try:
         yield db
+        await commit(db)
     except:
-        await db.rollback()
+        await rollback(db)
         raise
     finally:
         await db.close()
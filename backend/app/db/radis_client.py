@@ -19,3 +19,29 @@ async def get_redis():
         yield client
     finally:
         await client.close()
+
+
+_binary_client: redis.Redis | None = None
+
+def get_binary_redis_client() -> redis.Redis:
+    """Process-wide client that returns raw bytes, for caches holding compressed bodies"""
+    global _binary_client
+    if _binary_client is None:
+        _binary_client = redis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            username=settings.REDIS_USERNAME,
+            password=settings.REDIS_PASSWORD,
+            decode_responses=False
+        )
+    return _binary_client
+
+async def get_binary_redis() -> redis.Redis:
+    """FastAPI dependency for the shared binary client; it is closed at shutdown, not per request"""
+    return get_binary_redis_client()
+
+async def close_binary_redis_client() -> None:
+    global _binary_client
+    if _binary_client is not None:
+        await _binary_client.aclose()
+        _binary_client = None
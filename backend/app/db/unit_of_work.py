@@ -0,0 +1,61 @@
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, List
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+"""
+Request-scoped unit of work.
+
+get_db gives every request one session and one transaction. Repositories flush their
+writes and never commit; the request commits once when the endpoint returns and rolls
+back when it raises, so an operation spanning several repositories is atomic.
+
+Work that must only happen once the writes are durable, such as dropping caches or
+publishing events, is registered with after_commit() and runs right after the commit;
+a rollback discards it. savepoint() runs a step that may fail on its own without
+failing the request.
+"""
+
+AFTER_COMMIT_KEY = "after_commit"
+
+AfterCommit = Callable[[], Awaitable[None]]
+
+
+def after_commit(session: AsyncSession, callback: AfterCommit) -> None:
+    """Run callback once the session's transaction has committed"""
+    session.info.setdefault(AFTER_COMMIT_KEY, []).append(callback)
+
+
+async def commit(session: AsyncSession) -> None:
+    """Commit the unit of work, then run what waited for it"""
+    await session.commit()
+    callbacks: List[AfterCommit] = session.info.pop(AFTER_COMMIT_KEY, [])
+    for callback in callbacks:
+        try:
+            await callback()
+        except Exception as e:
+            # The data is committed; a failed follow-up must not turn the request into an error
+            logger.warning(f"After-commit callback {getattr(callback, '__qualname__', callback)} failed: {str(e)}")
+
+
+async def rollback(session: AsyncSession) -> None:
+    session.info.pop(AFTER_COMMIT_KEY, None)
+    await session.rollback()
+
+
+@asynccontextmanager
+async def savepoint(session: AsyncSession) -> AsyncIterator[None]:
+    """Run a block inside a SAVEPOINT.
+
+    If the block raises, only its own writes and after-commit callbacks are undone and
+    the error propagates; the caller may catch it and carry on with the transaction.
+    """
+    mark = len(session.info.get(AFTER_COMMIT_KEY, []))
+    try:
+        async with session.begin_nested():
+            yield
+    except BaseException:
+        del session.info.get(AFTER_COMMIT_KEY, [])[mark:]
+        raise
@@ -2,6 +2,7 @@ from fastapi import Depends, FastAPI, HTTPException, Request
 import redis
 from app.routes.auth_routes import authRoute
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from scalar_fastapi import get_scalar_api_reference  # type: ignore
 from app.routes.user_routes import user_router
 # from app.routes.academic_routes import academic_router
@@ -11,14 +12,38 @@ from app.routes.subject_priority_routes import subject_priority_router
 from app.routes.timetable_format_routes import router as timetable_format_router
 from app.routes.timetable_module_routes import router as timetable_module_router
 from app.routes.workflow_routes import workflow_router
+from app.routes.room_routes import router as room_router
+from app.routes.dashboard_routes import router as dashboard_router
+from app.routes.snapshot_routes import router as snapshot_router
+from app.routes.approval_routes import router as approval_router
+from app.routes.metrics_routes import router as metrics_router
 from app.db.postgres_client import get_db
 from app.db.radis_client import get_redis
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.config.config import settings
+from app.services.auth_services import close_oauth_client, token_refresh_coordinator
+from app.db.radis_client import close_binary_redis_client
+from app.services.lecturer_priority_service import close_simulation_pool
+from app.middlewares.compression_middleware import CompressionMiddleware
+from contextlib import asynccontextmanager
 
 
-app = FastAPI(title="Course Selection and Timetable System")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Close the pooled clients shared across requests
+    await token_refresh_coordinator.close()
+    await close_oauth_client()
+    await close_binary_redis_client()
+    close_simulation_pool()
+
+
+app = FastAPI(
+    title="Course Selection and Timetable System",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
 
 
 @app.exception_handler(Exception)
@@ -35,6 +60,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware)
 
 
 @app.get("/api/sdocs", include_in_schema=False)
@@ -101,6 +127,11 @@ app.include_router(subject_priority_router, prefix="/api/priority", tags=["Facul
 app.include_router(timetable_format_router, prefix="/api", tags=["Timetable Formats"])
 app.include_router(timetable_module_router, prefix="/api", tags=["Timetable Modules"])
 app.include_router(workflow_router, prefix="/api/workflow")
+app.include_router(room_router, prefix="/api", tags=["Rooms"])
+app.include_router(dashboard_router, prefix="/api", tags=["Dashboard"])
+app.include_router(snapshot_router, prefix="/api", tags=["Snapshots"])
+app.include_router(approval_router, prefix="/api", tags=["Approvals"])
+app.include_router(metrics_router, prefix="/api", tags=["Metrics"])
 
 
 @app.get("/")
@@ -1,11 +1,17 @@
-from fastapi import Depends, Request, HTTPException, status
+from fastapi import Depends, Request, HTTPException, WebSocket, status
+from typing import Awaitable, Callable, Optional
 import redis
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.radis_client import get_redis
+from app.db.postgres_client import get_db
+from app.models.model import RoleEnum
+from app.repositories.user_repository import UserRepository
+from app.services.user_access_service import UserAccess, user_access_cache
+from app.services.auth_services import token_refresh_coordinator
 import json
 
 async def auth_dependency(request: Request, redis_client: redis.Redis = Depends(get_redis)):
     session_id = request.cookies.get("session_id")
-    print(f"Session ID from cookie: {session_id}")
     if not session_id:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -29,6 +35,9 @@ async def auth_dependency(request: Request, redis_client: redis.Redis = Depends(
             detail="Session data is corrupted"
         )
 
+    # Refresh the OAuth access token when it has expired; near expiry this happens in the background
+    user_data = await token_refresh_coordinator.ensure_fresh(session_id, user_data)
+
     request.state.user = user_data  # Attach user info to request
 
     # You can optionally return user_data if needed in route handlers
@@ -95,3 +104,61 @@ async def mock_coordinator_auth_dependency(request: Request):
     
     request.state.user = mock_user_data
     return mock_user_data
+
+async def websocket_auth(websocket: WebSocket, redis_client: redis.Redis) -> Optional[dict]:
+    """
+    Resolve the session cookie of a WebSocket handshake.
+    Returns None when the session is missing or invalid so the caller can close the socket.
+    """
+    session_id = websocket.cookies.get("session_id")
+    if not session_id:
+        return None
+
+    user_data = await redis_client.get(f"sessionid:{session_id}")
+    if not user_data:
+        return None
+
+    try:
+        return json.loads(user_data)
+    except json.JSONDecodeError:
+        return None
+
+def require_roles(*roles: str) -> Callable[..., Awaitable[dict]]:
+    """
+    Build a route dependency that lets only active users with one of the given roles through.
+
+    The role comes from the user access cache rather than the session, so role changes made
+    after login apply within one cache TTL (immediately where the invalidation arrives).
+    The database is only read when the user is not cached.
+    """
+    allowed = {role.value if isinstance(role, RoleEnum) else role for role in roles}
+
+    async def guard(
+        request: Request,
+        user: dict = Depends(auth_dependency),
+        db: AsyncSession = Depends(get_db)
+    ) -> dict:
+        user_access_cache.ensure_listener()
+        user_id = int(user["user_id"])
+        access = user_access_cache.get(user_id)
+        if access is None:
+            # Authorization decides on the stored row, not on a cached copy of it
+            db_user = await UserRepository(db).get_by_userid(user_id=user_id, bypass_cache=True)
+            if not db_user:
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized: User no longer exists")
+            access = UserAccess(role=db_user.role.value, is_active=db_user.is_active, joining_year=db_user.joining_year)
+            user_access_cache.set(user_id, access)
+
+        if not access.is_active:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden: User is inactive")
+        if access.role not in allowed:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Forbidden: Requires one of {', '.join(sorted(allowed))}"
+            )
+
+        user = {**user, "role": access.role, "is_active": access.is_active, "joining_year": access.joining_year}
+        request.state.user = user
+        return user
+
+    return guard
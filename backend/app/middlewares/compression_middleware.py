@@ -0,0 +1,99 @@
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config.config import settings
+from app.core.compression import Compressor, acceptable_encodings
+
+"""
+Compresses HTTP responses with brotli or gzip, whichever the client prefers.
+
+Bodies below COMPRESSION_MIN_SIZE, non-text content, event streams and responses that
+already carry a Content-Encoding (precompressed cache hits) are sent unchanged.
+Streaming responses are compressed chunk by chunk.
+"""
+
+
+def _is_compressible(headers: MutableHeaders) -> bool:
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type == "text/event-stream":
+        return False
+    return (
+        content_type.startswith("text/")
+        or content_type in ("application/json", "application/javascript", "application/xml")
+        or content_type.endswith("+json")
+    )
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = settings.COMPRESSION_MIN_SIZE) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encodings = acceptable_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if not encodings:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingSend(send, encodings[0], self.minimum_size)
+        await self.app(scope, receive, responder)
+
+
+class _CompressingSend:
+    def __init__(self, send: Send, encoding: str, minimum_size: int) -> None:
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start: Optional[Message] = None
+        self.compressor: Optional[Compressor] = None
+        self.passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk shows whether compression pays off
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start is not None:
+            start, self.start = self.start, None
+            headers = MutableHeaders(scope=start)
+            if not _is_compressible(headers):
+                self.passthrough = True
+            else:
+                headers.add_vary_header("Accept-Encoding")
+                if not more_body and len(body) < self.minimum_size:
+                    self.passthrough = True
+                else:
+                    headers["Content-Encoding"] = self.encoding
+                    self.compressor = Compressor(self.encoding)
+                    if more_body:
+                        # The compressed length is not known up front
+                        del headers["Content-Length"]
+                    else:
+                        body = self.compressor.compress(body) + self.compressor.finish()
+                        headers["Content-Length"] = str(len(body))
+                        await self.send(start)
+                        await self.send({"type": "http.response.body", "body": body})
+                        return
+            await self.send(start)
+
+        if self.passthrough or self.compressor is None:
+            await self.send(message)
+            return
+
+        chunk = self.compressor.compress(body)
+        if not more_body:
+            chunk += self.compressor.finish()
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
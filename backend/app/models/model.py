@@ -1,4 +1,5 @@
-from sqlalchemy import Integer, String, Boolean, DateTime, Enum, ForeignKey, JSON, func
+from sqlalchemy import Integer, String, Boolean, DateTime, Enum, ForeignKey, JSON, Index, func
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import (
     declarative_base,
     DeclarativeBase,
@@ -6,7 +7,7 @@ from sqlalchemy.orm import (
     mapped_column,
     Mapped,
 )
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import UniqueConstraint, CheckConstraint, text
 import enum
 
 Base = declarative_base()
@@ -30,6 +31,11 @@ class SubjectTypeEnum(enum.Enum):
     LAB = "LAB"
 
 
+class RoomTypeEnum(enum.Enum):
+    LAB = "LAB"
+    LECTURE = "LECTURE"
+
+
 class ApprovalStatusEnum(enum.Enum):
     PENDING = "PENDING"
     APPROVED = "APPROVED"
@@ -265,7 +271,7 @@ class TimetableHourFormats(BaseClass):
     batch_id: Mapped[int] = mapped_column(
         Integer, ForeignKey("batches.batch_id", ondelete="RESTRICT"), nullable=False
     )
-    format_data: Mapped[dict] = mapped_column(JSON, nullable=False)
+    format_data: Mapped[dict] = mapped_column(JSONB, nullable=False)
     created_at: Mapped[DateTime] = mapped_column(DateTime, default=func.now())
 
     batch: Mapped["Batches"] = relationship("Batches", back_populates="formats")
@@ -274,6 +280,15 @@ class TimetableHourFormats(BaseClass):
         "Timetable", back_populates="format", cascade="all, delete"
     )
 
+    __table_args__ = (
+        Index(
+            "ix_timetablehourformats_format_data_gin",
+            "format_data",
+            postgresql_using="gin",
+            postgresql_ops={"format_data": "jsonb_path_ops"},
+        ),
+    )
+
     def __repr__(self):
         return f"<TimetableHourFormat(id={self.format_id}, name='{self.format_name}', year_id={self.year_id}, batch_id={self.batch_id})>"
 
@@ -294,10 +309,11 @@ class Timetable(BaseClass):
         Integer, ForeignKey("batches.batch_id", ondelete="RESTRICT"), nullable=False
     )
     timetable_data: Mapped[dict] = mapped_column(
-        JSON, 
+        JSONB,
         nullable=False,
         comment="JSON structure containing daily subject schedules. Format: {'monday': ['subject1', 'subject2'], 'tuesday': ['subject1', 'subject2'], ...}"
     )
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default="1", nullable=False)  # Bumped on every write, used for compare-and-swap
     created_at: Mapped[DateTime] = mapped_column(DateTime, default=func.now())
 
     batch: Mapped["Batches"] = relationship("Batches", back_populates="timetables")
@@ -306,21 +322,97 @@ class Timetable(BaseClass):
     )
     year: Mapped["AcademicYears"] = relationship("AcademicYears", back_populates="timetables")
     approvals: Mapped[list["Approvals"]] = relationship(
-        "Approvals", back_populates="timetable", cascade="all, delete"
+        "Approvals", back_populates="timetable", passive_deletes=True
+    )
+    slots: Mapped[list["TimetableSlot"]] = relationship(
+        "TimetableSlot", back_populates="timetable", cascade="all, delete", passive_deletes=True
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_timetables_timetable_data_gin",
+            "timetable_data",
+            postgresql_using="gin",
+            postgresql_ops={"timetable_data": "jsonb_path_ops"},
+        ),
     )
 
     def __repr__(self):
         return f"<Timetable(id={self.timetable_id}, batch_id={self.batch_id}, year_id={self.year_id})>"
 
 
+class Rooms(BaseClass):
+    __tablename__ = "rooms"
+
+    room_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    room_name: Mapped[str] = mapped_column(String(50), unique=True, index=True, nullable=False)  # Matches the venue text on allocations
+    room_type: Mapped[RoomTypeEnum] = mapped_column(Enum(RoomTypeEnum), nullable=False)
+    capacity: Mapped[int] = mapped_column(Integer, nullable=False)
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    created_at: Mapped[DateTime] = mapped_column(DateTime, default=func.now())
+
+    def __repr__(self):
+        return f"<Room(id={self.room_id}, name='{self.room_name}', type='{self.room_type.name}', capacity={self.capacity})>"
+
+
+class TimetableSlot(BaseClass):
+    __tablename__ = "timetable_slots"
+
+    slot_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    timetable_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("timetables.timetable_id", ondelete="CASCADE"), nullable=False
+    )
+    year_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("academicyears.year_id", ondelete="RESTRICT"), nullable=False
+    )
+    batch_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("batches.batch_id", ondelete="RESTRICT"), nullable=False
+    )
+    day: Mapped[str] = mapped_column(String(10), nullable=False)
+    period: Mapped[int] = mapped_column(Integer, nullable=False)  # 1-based position of the cell in the day
+    abbreviation: Mapped[str] = mapped_column(String(20), nullable=False)
+    subject_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("subjects.subject_id", ondelete="SET NULL"), nullable=True
+    )
+    faculty_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.user_id", ondelete="SET NULL"), nullable=True
+    )
+    co_faculty_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.user_id", ondelete="SET NULL"), nullable=True
+    )
+    venue: Mapped[str] = mapped_column(String, nullable=True)
+
+    timetable: Mapped["Timetable"] = relationship("Timetable", back_populates="slots")
+
+    __table_args__ = (
+        UniqueConstraint("timetable_id", "day", "period", name="unique_timetable_day_period_slot"),
+        Index("ix_timetable_slots_faculty", "year_id", "faculty_id", "day", "period"),
+        Index("ix_timetable_slots_co_faculty", "year_id", "co_faculty_id", "day", "period"),
+        Index("ix_timetable_slots_venue", "year_id", "venue", "day", "period"),
+        Index("ix_timetable_slots_period", "year_id", "day", "period"),
+    )
+
+    def __repr__(self):
+        return f"<TimetableSlot(id={self.slot_id}, timetable_id={self.timetable_id}, day='{self.day}', period={self.period}, subject_id={self.subject_id}, faculty_id={self.faculty_id})>"
+
+
 class Approvals(BaseClass):
     __tablename__ = "approvals"
 
     approval_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    year_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("academicyears.year_id", ondelete="CASCADE"), nullable=False
+    )
+    # Exactly one of timetable_id and allocation_id is set, unless the row is archived
     timetable_id: Mapped[int] = mapped_column(
         Integer,
         ForeignKey("timetables.timetable_id", ondelete="RESTRICT"),
-        nullable=False,
+        nullable=True,
+    )
+    allocation_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("faculty_subject_allocations.allocation_id", ondelete="RESTRICT"),
+        nullable=True,
     )
     approval_status: Mapped[ApprovalStatusEnum] = mapped_column(
         Enum(ApprovalStatusEnum), nullable=False
@@ -331,14 +423,48 @@ class Approvals(BaseClass):
     approved_by: Mapped[int] = mapped_column(
         Integer, ForeignKey("users.user_id", ondelete="RESTRICT"), nullable=False
     )
+    comment: Mapped[str] = mapped_column(String, nullable=True)
+    decided_at: Mapped[DateTime] = mapped_column(DateTime, nullable=True)
+    # Set when the timetable or allocation was deleted; the decision is kept as history
+    archived: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default="false")
     created_at: Mapped[DateTime] = mapped_column(DateTime, default=func.now())
 
     timetable: Mapped["Timetable"] = relationship(
         "Timetable", back_populates="approvals"
     )
 
+    __table_args__ = (
+        CheckConstraint(
+            "archived OR ((timetable_id IS NULL) <> (allocation_id IS NULL))",
+            name="ck_approvals_single_target",
+        ),
+        # Pending queue per approver; decided rows never enter the index
+        Index(
+            "ix_approvals_pending_by_approver",
+            "approved_by",
+            "approval_id",
+            postgresql_where=text("approval_status = 'PENDING'"),
+        ),
+        # At most one open request per item and stage
+        Index(
+            "uq_approvals_pending_timetable",
+            "timetable_id",
+            "approval_stage",
+            unique=True,
+            postgresql_where=text("approval_status = 'PENDING' AND timetable_id IS NOT NULL"),
+        ),
+        Index(
+            "uq_approvals_pending_allocation",
+            "allocation_id",
+            "approval_stage",
+            unique=True,
+            postgresql_where=text("approval_status = 'PENDING' AND allocation_id IS NOT NULL"),
+        ),
+    )
+
     def __repr__(self):
-        return f"<Approval(id={self.approval_id}, timetable_id={self.timetable_id}, status='{self.approval_status.name}', stage='{self.approval_stage.name}')>"
+        target = f"timetable_id={self.timetable_id}" if self.timetable_id else f"allocation_id={self.allocation_id}"
+        return f"<Approval(id={self.approval_id}, {target}, status='{self.approval_status.name}', stage='{self.approval_stage.name}')>"
 
 
 class FacultySubjectPriority(BaseClass):
@@ -411,3 +537,75 @@ class WorkflowStage(BaseClass):
     
     def __repr__(self):
         return f"<WorkflowStage(id={self.id}, year_id={self.year_id}, current_step={self.current_step}, is_completed={self.is_completed})>"
+
+
+class WorkflowTransition(BaseClass):
+    __tablename__ = "workflow_transitions"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    year_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("academicyears.year_id", ondelete="CASCADE"), nullable=False
+    )
+    from_step: Mapped[int] = mapped_column(Integer, nullable=False)
+    to_step: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[DateTime] = mapped_column(DateTime, default=func.now())
+
+    __table_args__ = (
+        Index("ix_workflow_transitions_year_created", "year_id", "created_at"),
+    )
+
+    def __repr__(self):
+        return f"<WorkflowTransition(id={self.id}, year_id={self.year_id}, from_step={self.from_step}, to_step={self.to_step})>"
+
+
+class SnapshotBlob(BaseClass):
+    __tablename__ = "snapshot_blobs"
+
+    # sha256 of the canonical JSON of data, so identical content is stored once
+    content_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)  # "allocations" or "timetables"
+    data: Mapped[list] = mapped_column(JSONB, nullable=False)
+    created_at: Mapped[DateTime] = mapped_column(DateTime, default=func.now())
+
+    def __repr__(self):
+        return f"<SnapshotBlob(hash={self.content_hash[:12]}, kind='{self.kind}')>"
+
+
+class YearSnapshot(BaseClass):
+    __tablename__ = "year_snapshots"
+
+    snapshot_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    year_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("academicyears.year_id", ondelete="CASCADE"), nullable=False
+    )
+    version_no: Mapped[int] = mapped_column(Integer, nullable=False)
+    label: Mapped[str] = mapped_column(String, nullable=True)
+    allocations_hash: Mapped[str] = mapped_column(
+        String(64), ForeignKey("snapshot_blobs.content_hash", ondelete="RESTRICT"), nullable=False
+    )
+    timetables_hash: Mapped[str] = mapped_column(
+        String(64), ForeignKey("snapshot_blobs.content_hash", ondelete="RESTRICT"), nullable=False
+    )
+    created_at: Mapped[DateTime] = mapped_column(DateTime, default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("year_id", "version_no", name="unique_year_snapshot_version"),
+    )
+
+    def __repr__(self):
+        return f"<YearSnapshot(id={self.snapshot_id}, year_id={self.year_id}, version_no={self.version_no})>"
+
+
+class ActiveYearSnapshot(BaseClass):
+    __tablename__ = "active_year_snapshots"
+
+    year_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("academicyears.year_id", ondelete="CASCADE"), primary_key=True
+    )
+    snapshot_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("year_snapshots.snapshot_id", ondelete="CASCADE"), nullable=False
+    )
+    updated_at: Mapped[DateTime] = mapped_column(DateTime, default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<ActiveYearSnapshot(year_id={self.year_id}, snapshot_id={self.snapshot_id})>"
@@ -0,0 +1,183 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func, or_, and_, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import aliased
+from typing import Any, Dict, List, Optional, Set, Tuple
+from app.models.model import (
+    Approvals, ApprovalStatusEnum, WorkflowStageEnum, Timetable, FacultySubjectAllocation,
+    Batches, Subjects, Users
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Spelled exactly like the partial index predicates so the planner can use them with prepared statements
+PENDING = text("approvals.approval_status = 'PENDING'")
+
+
+class ApprovalRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_user(self, user_id: int) -> Optional[Users]:
+        result = await self.db.execute(select(Users).where(Users.user_id == user_id))
+        return result.scalar_one_or_none()
+
+    async def get_existing_targets(self, year_id: int, timetable_ids: List[int], allocation_ids: List[int]) -> Tuple[Set[int], Set[int]]:
+        """Return which of the given timetables and allocations exist in the year"""
+        timetables: Set[int] = set()
+        allocations: Set[int] = set()
+        if timetable_ids:
+            result = await self.db.execute(
+                select(Timetable.timetable_id).where(Timetable.year_id == year_id, Timetable.timetable_id.in_(timetable_ids))
+            )
+            timetables = set(result.scalars().all())
+        if allocation_ids:
+            result = await self.db.execute(
+                select(FacultySubjectAllocation.allocation_id).where(
+                    FacultySubjectAllocation.year_id == year_id,
+                    FacultySubjectAllocation.allocation_id.in_(allocation_ids)
+                )
+            )
+            allocations = set(result.scalars().all())
+        return timetables, allocations
+
+    async def create_pending(self, rows: List[Dict[str, Any]]) -> List[Approvals]:
+        """Open review requests with one multi-row INSERT.
+
+        Items that already have an open request for the same stage hit the partial unique
+        indexes and are skipped, so only the newly opened requests are returned.
+        """
+        try:
+            result = await self.db.execute(
+                pg_insert(Approvals)
+                .values([{**row, "approval_status": ApprovalStatusEnum.PENDING} for row in rows])
+                .on_conflict_do_nothing()
+                .returning(Approvals)
+            )
+            approvals = list(result.scalars().all())
+            await self.db.flush()
+            return approvals
+
+        except Exception as e:
+            logger.error(f"Error creating approval requests: {str(e)}")
+            raise
+
+    async def archive_where(self, *criteria) -> None:
+        """Keep the approvals matching criteria as history before their timetable or allocation is deleted.
+
+        They lose their target and are marked archived, which the RESTRICT foreign keys require
+        before the target can go.
+        """
+        await self.db.execute(
+            update(Approvals)
+            .where(*criteria)
+            .values(timetable_id=None, allocation_id=None, archived=True)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def get_pending_queue(self, approver_id: int, year_id: Optional[int] = None, after_id: int = 0, limit: int = 50) -> List[Dict[str, Any]]:
+        """Get an approver's open requests after a cursor, oldest first, with what each one is about.
+
+        Served by the partial index on (approved_by, approval_id) over pending rows, so the
+        cost depends on the size of the queue, not on the approval history.
+        """
+        timetable_batch = aliased(Batches)
+        allocation_batch = aliased(Batches)
+        conditions = [PENDING, Approvals.approved_by == approver_id, Approvals.approval_id > after_id, Approvals.archived.is_(False)]
+        if year_id is not None:
+            conditions.append(Approvals.year_id == year_id)
+
+        result = await self.db.execute(
+            select(
+                Approvals,
+                func.coalesce(Timetable.batch_id, FacultySubjectAllocation.batch_id).label("batch_id"),
+                func.coalesce(timetable_batch.section, allocation_batch.section).label("section"),
+                FacultySubjectAllocation.subject_id,
+                Subjects.subject_name,
+                FacultySubjectAllocation.faculty_id,
+                Users.uname.label("faculty_name")
+            )
+            .outerjoin(Timetable, Timetable.timetable_id == Approvals.timetable_id)
+            .outerjoin(timetable_batch, timetable_batch.batch_id == Timetable.batch_id)
+            .outerjoin(FacultySubjectAllocation, FacultySubjectAllocation.allocation_id == Approvals.allocation_id)
+            .outerjoin(allocation_batch, allocation_batch.batch_id == FacultySubjectAllocation.batch_id)
+            .outerjoin(Subjects, Subjects.subject_id == FacultySubjectAllocation.subject_id)
+            .outerjoin(Users, Users.user_id == FacultySubjectAllocation.faculty_id)
+            .where(*conditions)
+            .order_by(Approvals.approval_id)
+            .limit(limit)
+        )
+        return [
+            {"approval": row[0], **{key: value for key, value in row._mapping.items() if key != "Approvals"}}
+            for row in result.all()
+        ]
+
+    async def decide(
+        self,
+        year_id: int,
+        decided_by: int,
+        decision: ApprovalStatusEnum,
+        timetable_ids: List[int],
+        allocation_ids: List[int],
+        timetable_stage: WorkflowStageEnum,
+        allocation_stage: WorkflowStageEnum,
+        comment: Optional[str] = None
+    ) -> Tuple[List[Approvals], List[Approvals]]:
+        """Record one decision for many timetables and allocations in a single transaction.
+
+        decided_by's open requests for the items are closed with one UPDATE; items that were
+        never requested get their decision recorded with one multi-row INSERT. Items with an
+        open request assigned to another approver raise ValueError.
+        Returns the closed requests and the inserted rows.
+        """
+        try:
+            targets = []
+            if timetable_ids:
+                targets.append(and_(Approvals.timetable_id.in_(timetable_ids), Approvals.approval_stage == timetable_stage))
+            if allocation_ids:
+                targets.append(and_(Approvals.allocation_id.in_(allocation_ids), Approvals.approval_stage == allocation_stage))
+
+            assigned_elsewhere = await self.db.execute(
+                select(Approvals.timetable_id, Approvals.allocation_id)
+                .where(PENDING, Approvals.year_id == year_id, Approvals.approved_by != decided_by, or_(*targets))
+                .order_by(Approvals.approval_id)
+            )
+            foreign = [
+                f"timetable {row.timetable_id}" if row.timetable_id else f"allocation {row.allocation_id}"
+                for row in assigned_elsewhere.all()
+            ]
+            if foreign:
+                raise ValueError(f"Awaiting review by another approver: {', '.join(foreign)}")
+
+            result = await self.db.execute(
+                update(Approvals)
+                .where(PENDING, Approvals.year_id == year_id, Approvals.approved_by == decided_by, or_(*targets))
+                .values(approval_status=decision, approved_by=decided_by, comment=comment, decided_at=func.now())
+                .returning(Approvals)
+                .execution_options(synchronize_session=False)
+            )
+            closed = list(result.scalars().all())
+
+            closed_timetables = {approval.timetable_id for approval in closed if approval.timetable_id}
+            closed_allocations = {approval.allocation_id for approval in closed if approval.allocation_id}
+            common = {"year_id": year_id, "approval_status": decision, "approved_by": decided_by, "comment": comment, "decided_at": func.now()}
+            rows = [
+                {**common, "timetable_id": timetable_id, "allocation_id": None, "approval_stage": timetable_stage}
+                for timetable_id in timetable_ids if timetable_id not in closed_timetables
+            ] + [
+                {**common, "timetable_id": None, "allocation_id": allocation_id, "approval_stage": allocation_stage}
+                for allocation_id in allocation_ids if allocation_id not in closed_allocations
+            ]
+
+            inserted: List[Approvals] = []
+            if rows:
+                result = await self.db.execute(pg_insert(Approvals).values(rows).returning(Approvals))
+                inserted = list(result.scalars().all())
+
+            await self.db.flush()
+            return closed, inserted
+
+        except Exception as e:
+            logger.error(f"Error recording approval decision for year {year_id}: {str(e)}")
+            raise
@@ -0,0 +1,101 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, true
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from typing import Optional, Dict, Any
+from app.models.model import (
+    AcademicYears, Batches, Subjects, SubjectTypeEnum, Users, RoleEnum, WorkflowStage,
+    FacultySubjectPriority, FacultySubjectAllocation, Timetable
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+class DashboardRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_year_dashboard(self, year_id: int) -> Optional[Dict[str, Any]]:
+        """Compute every dashboard aggregate of a year in a single statement.
+
+        Counts are scalar subqueries and the batch breakdown is a json_agg over a
+        derived table with one row per batch, its timetables folded in by a lateral
+        subquery, so the whole dashboard is one round-trip. Returns None if
+        the year does not exist.
+        """
+        try:
+            subject_count = select(func.count(Subjects.subject_id)).where(Subjects.year_id == year_id)
+            core_subject_count = subject_count.where(Subjects.subject_type == SubjectTypeEnum.CORE)
+            faculty_count = select(func.count(Users.user_id)).where(
+                Users.role == RoleEnum.FACULTY, Users.is_active.is_(True)
+            )
+            submitted_faculty_count = select(func.count(func.distinct(FacultySubjectPriority.faculty_id))).join(
+                Users, Users.user_id == FacultySubjectPriority.faculty_id
+            ).where(
+                FacultySubjectPriority.year_id == year_id,
+                Users.role == RoleEnum.FACULTY,
+                Users.is_active.is_(True)
+            )
+            allocation_count = select(func.count(FacultySubjectAllocation.allocation_id)).where(
+                FacultySubjectAllocation.year_id == year_id
+            )
+
+            # A batch can have a timetable per format; keep one row per batch with the latest and the count
+            batch_timetables = select(
+                Timetable.timetable_id,
+                Timetable.version,
+                func.count().over().label("timetable_count")
+            ).where(
+                Timetable.batch_id == Batches.batch_id,
+                Timetable.year_id == year_id
+            ).order_by(Timetable.timetable_id.desc()).limit(1).lateral("batch_timetables")
+
+            batch_rows = select(
+                Batches.batch_id,
+                Batches.section,
+                Batches.noOfStudent,
+                select(func.count(FacultySubjectAllocation.allocation_id)).where(
+                    FacultySubjectAllocation.batch_id == Batches.batch_id,
+                    FacultySubjectAllocation.year_id == year_id
+                ).scalar_subquery().label("allocated_subjects"),
+                func.coalesce(batch_timetables.c.timetable_count, 0).label("timetable_count"),
+                batch_timetables.c.timetable_id,
+                batch_timetables.c.version.label("timetable_version")
+            ).outerjoin(batch_timetables, true()).where(Batches.year_id == year_id).subquery("batch_rows")
+
+            batches = select(
+                func.coalesce(
+                    func.json_agg(aggregate_order_by(func.json_build_object(
+                        "batch_id", batch_rows.c.batch_id,
+                        "section", batch_rows.c.section,
+                        "noOfStudent", batch_rows.c.noOfStudent,
+                        "allocated_subjects", batch_rows.c.allocated_subjects,
+                        "timetable_count", batch_rows.c.timetable_count,
+                        "timetable_id", batch_rows.c.timetable_id,
+                        "timetable_version", batch_rows.c.timetable_version
+                    ), batch_rows.c.section)),
+                    func.json_build_array()
+                )
+            ).select_from(batch_rows)
+
+            query = select(
+                AcademicYears.year_id,
+                AcademicYears.academic_year,
+                WorkflowStage.current_step,
+                WorkflowStage.is_completed,
+                subject_count.scalar_subquery().label("subject_count"),
+                core_subject_count.scalar_subquery().label("core_subject_count"),
+                faculty_count.scalar_subquery().label("faculty_count"),
+                submitted_faculty_count.scalar_subquery().label("submitted_faculty_count"),
+                allocation_count.scalar_subquery().label("allocation_count"),
+                batches.scalar_subquery().label("batches")
+            ).outerjoin(
+                WorkflowStage, WorkflowStage.year_id == AcademicYears.year_id
+            ).where(AcademicYears.year_id == year_id)
+
+            result = await self.db.execute(query)
+            row = result.first()
+            return dict(row._mapping) if row else None
+
+        except Exception as e:
+            logger.error(f"Error building dashboard for year {year_id}: {str(e)}")
+            raise
@@ -1,99 +1,139 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, update
+from sqlalchemy import select, delete, update, func, tuple_
 from sqlalchemy.exc import IntegrityError
-from app.models.model import FacultySubjectPriority, Users, Subjects, AcademicYears, Batches, FacultySubjectAllocation
+from app.models.model import FacultySubjectPriority, Users, Subjects, AcademicYears, Batches, FacultySubjectAllocation, TimetableSlot, RoleEnum, Approvals
 from typing import List, Optional
+from app.repositories.timetable_module_repository import TimetableModuleRepository
+from app.repositories.approval_repository import ApprovalRepository
+from app.core.repository_base import BaseRepository
 
 class FacultyPriorityRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.priorities = BaseRepository(db, FacultySubjectPriority)
+        self.allocations = BaseRepository(db, FacultySubjectAllocation)
+        self.approvals = ApprovalRepository(db)
 
-    async def submit_priorities(self, faculty_id: int, year_id: int, priorities: List[dict]):
+    async def submit_priorities(self, faculty_id: int, year_id: int, priorities: List[dict]) -> List[dict]:
+        """Replace a faculty's priorities for a year and return the entries that were replaced"""
         try:
             # Remove existing priorities for this faculty/year
-            await self.db.execute(
+            removed = await self.db.execute(
                 delete(FacultySubjectPriority).where(
                     FacultySubjectPriority.faculty_id == faculty_id,
                     FacultySubjectPriority.year_id == year_id
+                ).returning(
+                    FacultySubjectPriority.subject_id,
+                    FacultySubjectPriority.batch_id,
+                    FacultySubjectPriority.priority
                 )
             )
+            previous_entries = [dict(row._mapping) for row in removed.all()]
             # Add new priorities
-            for entry in priorities:
-                self.db.add(FacultySubjectPriority(
-                    faculty_id=faculty_id,
-                    year_id=year_id,
-                    subject_id=entry['subject_id'],
-                    batch_id=entry['batch_id'],
-                    priority=entry['priority']
-                ))
-            await self.db.commit()
+            await self.priorities.bulk_create([
+                {
+                    'faculty_id': faculty_id,
+                    'year_id': year_id,
+                    'subject_id': entry['subject_id'],
+                    'batch_id': entry['batch_id'],
+                    'priority': entry['priority']
+                } for entry in priorities
+            ])
+            await self.db.flush()
+            return previous_entries
         except Exception as e:
-            await self.db.rollback()
             raise ValueError(f"Error submitting priorities: {str(e)}")
 
     async def update_priority(self, faculty_id: int, year_id: int, subject1_id: int, batch1_id: int, priority1: int, subject2_id: int, batch2_id: int, priority2: int):
         try:
-            # Check if both priorities exist
-            existing1 = await self.db.execute(
-                select(FacultySubjectPriority).where(
-                    FacultySubjectPriority.faculty_id == faculty_id,
-                    FacultySubjectPriority.year_id == year_id,
-                    FacultySubjectPriority.subject_id == subject1_id,
-                    FacultySubjectPriority.batch_id == batch1_id
-                )
-            )
-            existing2 = await self.db.execute(
-                select(FacultySubjectPriority).where(
-                    FacultySubjectPriority.faculty_id == faculty_id,
-                    FacultySubjectPriority.year_id == year_id,
-                    FacultySubjectPriority.subject_id == subject2_id,
-                    FacultySubjectPriority.batch_id == batch2_id
-                )
-            )
-            
-            if not existing1.scalar_one_or_none():
-                raise ValueError(f"Priority not found for faculty {faculty_id}, year {year_id}, subject {subject1_id}, batch {batch1_id}")
-            if not existing2.scalar_one_or_none():
-                raise ValueError(f"Priority not found for faculty {faculty_id}, year {year_id}, subject {subject2_id}, batch {batch2_id}")
-            
-            # Update both priorities
-            await self.db.execute(
-                update(FacultySubjectPriority).where(
-                    FacultySubjectPriority.faculty_id == faculty_id,
-                    FacultySubjectPriority.year_id == year_id,
-                    FacultySubjectPriority.subject_id == subject1_id,
-                    FacultySubjectPriority.batch_id == batch1_id
-                ).values(priority=priority1)
-            )
-            await self.db.execute(
-                update(FacultySubjectPriority).where(
-                    FacultySubjectPriority.faculty_id == faculty_id,
-                    FacultySubjectPriority.year_id == year_id,
-                    FacultySubjectPriority.subject_id == subject2_id,
-                    FacultySubjectPriority.batch_id == batch2_id
-                ).values(priority=priority2)
+            # Both rows in one statement; a row that is missing is simply not returned
+            updated = await self.priorities.bulk_update(
+                [
+                    {'faculty_id': faculty_id, 'year_id': year_id, 'subject_id': subject1_id, 'batch_id': batch1_id, 'priority': priority1},
+                    {'faculty_id': faculty_id, 'year_id': year_id, 'subject_id': subject2_id, 'batch_id': batch2_id, 'priority': priority2}
+                ],
+                match_on=['faculty_id', 'year_id', 'subject_id', 'batch_id']
             )
-            await self.db.commit()
+            found = {(p.subject_id, p.batch_id) for p in updated}
+            for subject_id, batch_id in ((subject1_id, batch1_id), (subject2_id, batch2_id)):
+                if (subject_id, batch_id) not in found:
+                    raise ValueError(f"Priority not found for faculty {faculty_id}, year {year_id}, subject {subject_id}, batch {batch_id}")
+            await self.db.flush()
             return True
         except Exception as e:
-            await self.db.rollback()
             raise ValueError(f"Error updating priorities: {str(e)}")
 
-    async def delete_priority(self, priority_id: int):
+    async def reorder_priorities(self, faculty_id: int, year_id: int, order: List[dict]) -> tuple[List[dict], List[dict]]:
+        """Give a faculty's priorities for a year the levels 1..n of their position in order.
+
+        order must list every (subject_id, batch_id) the faculty has for the year exactly once;
+        the changed rows are written in one UPDATE ... FROM (VALUES ...). Returns the entries
+        before and after, for the submission counters.
+        """
         try:
-            # Check if priority exists
-            existing = await self.db.execute(
-                select(FacultySubjectPriority).where(FacultySubjectPriority.id == priority_id)
+            if len(order) > 5:
+                raise ValueError("A faculty can rank at most 5 subjects, priorities are 1 to 5")
+            keys = [(entry['subject_id'], entry['batch_id']) for entry in order]
+            if len(set(keys)) != len(keys):
+                raise ValueError("Each subject and batch may appear only once in the order")
+
+            result = await self.db.execute(
+                select(
+                    FacultySubjectPriority.subject_id,
+                    FacultySubjectPriority.batch_id,
+                    FacultySubjectPriority.priority
+                ).where(
+                    FacultySubjectPriority.faculty_id == faculty_id,
+                    FacultySubjectPriority.year_id == year_id
+                # Locked until commit, so a concurrent submit or reorder cannot change the set being ranked
+                ).with_for_update()
             )
-            if not existing.scalar_one_or_none():
-                raise ValueError(f"Priority with ID {priority_id} does not exist")
-            
-            await self.db.execute(
-                delete(FacultySubjectPriority).where(FacultySubjectPriority.id == priority_id)
+            previous_entries = [dict(row._mapping) for row in result.all()]
+            current = {(entry['subject_id'], entry['batch_id']): entry['priority'] for entry in previous_entries}
+            if set(keys) != set(current):
+                missing = set(current) - set(keys)
+                unknown = set(keys) - set(current)
+                if unknown:
+                    subject_id, batch_id = next(iter(unknown))
+                    raise ValueError(f"Priority not found for faculty {faculty_id}, year {year_id}, subject {subject_id}, batch {batch_id}")
+                subject_id, batch_id = next(iter(missing))
+                raise ValueError(f"The order must list every priority of the faculty; subject {subject_id}, batch {batch_id} is missing")
+
+            new_entries = [
+                {'subject_id': subject_id, 'batch_id': batch_id, 'priority': level}
+                for level, (subject_id, batch_id) in enumerate(keys, start=1)
+            ]
+            # Rows already at their level are left alone
+            changed = [
+                {'faculty_id': faculty_id, 'year_id': year_id, **entry}
+                for entry in new_entries if current[(entry['subject_id'], entry['batch_id'])] != entry['priority']
+            ]
+            updated = await self.priorities.bulk_update(changed, match_on=['faculty_id', 'year_id', 'subject_id', 'batch_id'])
+            if len(updated) != len(changed):
+                raise ValueError(f"Expected to update {len(changed)} priorities but updated {len(updated)}")
+            await self.db.flush()
+            return previous_entries, new_entries
+        except Exception as e:
+            raise ValueError(f"Error reordering priorities: {str(e)}")
+
+    async def delete_priority(self, priority_id: int) -> dict:
+        """Delete a priority entry and return what was deleted"""
+        try:
+            result = await self.db.execute(
+                delete(FacultySubjectPriority).where(FacultySubjectPriority.id == priority_id).returning(
+                    FacultySubjectPriority.faculty_id,
+                    FacultySubjectPriority.year_id,
+                    FacultySubjectPriority.subject_id,
+                    FacultySubjectPriority.batch_id,
+                    FacultySubjectPriority.priority
+                )
             )
-            await self.db.commit()
+            deleted = result.first()
+            if not deleted:
+                raise ValueError(f"Priority with ID {priority_id} does not exist")
+            await self.db.flush()
+            return dict(deleted._mapping)
         except Exception as e:
-            await self.db.rollback()
             raise ValueError(f"Error deleting priority: {str(e)}")
 
     async def get_priorities_by_faculty_and_year(self, faculty_id: int, year_id: int) -> Optional[dict]:
@@ -190,18 +230,27 @@ class FacultyPriorityRepository:
         return result.scalar_one_or_none()
 
     async def get_all_priorities_by_year_with_details(self, year_id: int) -> List[dict]:
+        """Get a year's priorities grouped by faculty, already in the response shape.
+
+        Only plain columns are selected, so no ORM objects are built for large years.
+        """
         result = await self.db.execute(
             select(
-                FacultySubjectPriority,
-                Users.uname.label('faculty_name'),
-                Users.email.label('faculty_email'),
+                FacultySubjectPriority.faculty_id,
+                Users.uname,
+                Users.email,
+                AcademicYears.academic_year,
+                FacultySubjectPriority.id,
+                FacultySubjectPriority.subject_id,
                 Subjects.subject_name,
                 Subjects.subject_code,
                 Subjects.subject_type,
                 Subjects.abbreviation,
-                Batches.section.label('batch_section'),
-                Batches.noOfStudent.label('batch_noOfStudent'),
-                AcademicYears.academic_year
+                FacultySubjectPriority.batch_id,
+                Batches.section,
+                Batches.noOfStudent,
+                FacultySubjectPriority.priority,
+                FacultySubjectPriority.created_at
             ).join(
                 Users, FacultySubjectPriority.faculty_id == Users.user_id
             ).join(
@@ -217,39 +266,39 @@ class FacultyPriorityRepository:
                 FacultySubjectPriority.priority
             )
         )
-        rows = result.all()
-        
-        # Group by faculty_id
-        faculty_priorities = {}
-        for row in rows:
-            faculty_id = row[0].faculty_id
-            
-            if faculty_id not in faculty_priorities:
-                faculty_priorities[faculty_id] = {
+
+        # Rows arrive ordered by faculty, so each group is complete once the faculty changes
+        faculty_priorities = []
+        current = None
+        for (faculty_id, faculty_name, faculty_email, academic_year, priority_id, subject_id, subject_name,
+             subject_code, subject_type, abbreviation, batch_id, batch_section, batch_no_of_student,
+             priority, created_at) in result.tuples():
+            if current is None or current['faculty_id'] != faculty_id:
+                current = {
                     'faculty_id': faculty_id,
-                    'faculty_name': row[1],
-                    'faculty_email': row[2],
-                    'year_id': row[0].year_id,
-                    'academic_year': row[9],
+                    'faculty_name': faculty_name,
+                    'faculty_email': faculty_email,
+                    'year_id': year_id,
+                    'academic_year': academic_year,
                     'priority_subjects': []
                 }
-            
-            # Add priority subject to the faculty's list
-            faculty_priorities[faculty_id]['priority_subjects'].append({
-                'id': row[0].id,
-                'subject_id': row[0].subject_id,
-                'subject_name': row[3],
-                'subject_code': row[4],
-                'subject_type': row[5].value,
-                'abbreviation': row[6],
-                'batch_id': row[0].batch_id,
-                'batch_section': row[7],
-                'batch_noOfStudent': row[8],
-                'priority': row[0].priority,
-                'created_at': row[0].created_at
+                faculty_priorities.append(current)
+
+            current['priority_subjects'].append({
+                'id': priority_id,
+                'subject_id': subject_id,
+                'subject_name': subject_name,
+                'subject_code': subject_code,
+                'subject_type': subject_type.value,
+                'abbreviation': abbreviation,
+                'batch_id': batch_id,
+                'batch_section': batch_section,
+                'batch_noOfStudent': batch_no_of_student,
+                'priority': priority,
+                'created_at': created_at
             })
-        
-        return list(faculty_priorities.values())
+
+        return faculty_priorities
 
     async def get_faculty_with_priorities_by_year(self, year_id: int) -> List[dict]:
         """Get all faculty who have submitted priorities for a year, ordered by joining_year (senior first)"""
@@ -315,32 +364,38 @@ class FacultyPriorityRepository:
 
     async def create_allocation(self, faculty_id: int, subject_id: int, batch_id: int, year_id: int, allocated_priority: int):
         """Create a new allocation"""
-        allocation = FacultySubjectAllocation(
-            faculty_id=faculty_id,
-            subject_id=subject_id,
-            batch_id=batch_id,
-            year_id=year_id,
-            allocated_priority=allocated_priority
-        )
-        self.db.add(allocation)
-        await self.db.commit()
-        await self.db.refresh(allocation)
+        [allocation] = await self.allocations.bulk_create([{
+            'faculty_id': faculty_id,
+            'subject_id': subject_id,
+            'batch_id': batch_id,
+            'year_id': year_id,
+            'allocated_priority': allocated_priority
+        }])
+        await self.db.flush()
         return allocation
 
     async def get_allocations_by_year_with_details(self, year_id: int) -> List[dict]:
         """Get all allocations for a year with detailed information"""
         result = await self.db.execute(
             select(
-                FacultySubjectAllocation,
+                FacultySubjectAllocation.allocation_id,
+                FacultySubjectAllocation.faculty_id,
                 Users.uname.label('faculty_name'),
                 Users.email.label('faculty_email'),
+                FacultySubjectAllocation.subject_id,
                 Subjects.subject_name,
                 Subjects.subject_code,
                 Subjects.subject_type,
                 Subjects.abbreviation,
+                FacultySubjectAllocation.batch_id,
                 Batches.section.label('batch_section'),
                 Batches.noOfStudent.label('batch_noOfStudent'),
-                AcademicYears.academic_year
+                FacultySubjectAllocation.year_id,
+                AcademicYears.academic_year,
+                FacultySubjectAllocation.allocated_priority,
+                FacultySubjectAllocation.created_at,
+                FacultySubjectAllocation.co_faculty_id,
+                FacultySubjectAllocation.venue
             ).join(
                 Users, FacultySubjectAllocation.faculty_id == Users.user_id
             ).join(
@@ -355,38 +410,52 @@ class FacultyPriorityRepository:
                 FacultySubjectAllocation.faculty_id
             )
         )
-        rows = result.all()
-        
-        return [
-            {
-                'allocation_id': row[0].allocation_id,
-                'faculty_id': row[0].faculty_id,
-                'faculty_name': row[1],
-                'faculty_email': row[2],
-                'subject_id': row[0].subject_id,
-                'subject_name': row[3],
-                'subject_code': row[4],
-                'subject_type': row[5].value,
-                'abbreviation': row[6],
-                'batch_id': row[0].batch_id,
-                'batch_section': row[7],
-                'batch_noOfStudent': row[8],
-                'year_id': row[0].year_id,
-                'academic_year': row[9],
-                'allocated_priority': row[0].allocated_priority,
-                'created_at': row[0].created_at,
-                'co_faculty_id': getattr(row[0], 'co_faculty_id', None),
-                'venue': getattr(row[0], 'venue', None)
-            }
-            for row in rows
-        ]
+
+        allocations = []
+        for row in result.mappings():
+            allocation = dict(row)
+            allocation['subject_type'] = allocation['subject_type'].value
+            allocations.append(allocation)
+        return allocations
+
+    async def sync_slot_allocations(self, year_id: int, subject_id: Optional[int] = None, batch_id: Optional[int] = None):
+        """Copy faculty, co-faculty and venue from allocations onto the matching timetable slots.
+
+        Does not commit; callers run it inside the transaction that changed the allocations.
+        """
+        slot_filters = [TimetableSlot.year_id == year_id]
+        if subject_id is not None:
+            slot_filters.append(TimetableSlot.subject_id == subject_id)
+        if batch_id is not None:
+            slot_filters.append(TimetableSlot.batch_id == batch_id)
+
+        await self.db.execute(
+            update(TimetableSlot)
+            .where(*slot_filters)
+            .values(faculty_id=None, co_faculty_id=None, venue=None)
+        )
+        await self.db.execute(
+            update(TimetableSlot)
+            .where(
+                *slot_filters,
+                FacultySubjectAllocation.year_id == TimetableSlot.year_id,
+                FacultySubjectAllocation.batch_id == TimetableSlot.batch_id,
+                FacultySubjectAllocation.subject_id == TimetableSlot.subject_id
+            )
+            .values(
+                faculty_id=FacultySubjectAllocation.faculty_id,
+                co_faculty_id=FacultySubjectAllocation.co_faculty_id,
+                venue=FacultySubjectAllocation.venue
+            )
+        )
 
     async def clear_allocations_for_year(self, year_id: int):
         """Clear all allocations for a specific year"""
-        await self.db.execute(
-            delete(FacultySubjectAllocation).where(FacultySubjectAllocation.year_id == year_id)
+        await self.approvals.archive_where(
+            Approvals.allocation_id.in_(select(FacultySubjectAllocation.allocation_id).where(FacultySubjectAllocation.year_id == year_id))
         )
-        await self.db.commit()
+        await self.allocations.delete_where(FacultySubjectAllocation.year_id == year_id)
+        await self.db.flush()
 
     async def get_priorities_by_year_ordered(self, year_id: int) -> List[dict]:
         """Get all priorities for a year ordered by faculty seniority and priority level"""
@@ -401,13 +470,16 @@ class FacultyPriorityRepository:
                 FacultySubjectPriority.year_id == year_id
             ).order_by(
                 Users.joining_year.asc(),  # Senior faculty first
-                FacultySubjectPriority.priority.asc()  # Priority 1, 2, 3, 4, 5
+                Users.user_id.asc(),
+                FacultySubjectPriority.priority.asc(),  # Priority 1, 2, 3, 4, 5
+                FacultySubjectPriority.id.asc()
             )
         )
         rows = result.all()
         
         return [
             {
+                'id': row[0].id,
                 'faculty_id': row[0].faculty_id,
                 'faculty_name': row[1],
                 'joining_year': row[2],
@@ -468,23 +540,6 @@ class FacultyPriorityRepository:
             batch_noOfStudent = row[10]
             academic_year = row[11]
 
-            # Fetch co-faculty details if co_faculty_id is present
-            co_faculty_obj = None
-            co_faculty_id = getattr(allocation, 'co_faculty_id', None)
-            if co_faculty_id:
-                co_faculty_result = await self.db.execute(
-                    select(Users).where(Users.user_id == co_faculty_id)
-                )
-                co_faculty = co_faculty_result.scalar_one_or_none()
-                if co_faculty:
-                    co_faculty_obj = {
-                        'faculty_id': co_faculty.user_id,
-                        'uname': co_faculty.uname,
-                        'role': co_faculty.role.value if hasattr(co_faculty.role, 'value') else co_faculty.role,
-                        'email': co_faculty.email,
-                        'joining_year': co_faculty.joining_year
-                    }
-
             # Create year entry if not exists
             if year_id not in allocations_data:
                 allocations_data[year_id] = {
@@ -517,8 +572,9 @@ class FacultyPriorityRepository:
                         'email': faculty_email,
                         'joining_year': faculty_joining_year
                     },
-                    'co_faculty': co_faculty_obj,
-                    'venue': getattr(allocation, 'venue', None)
+                    # Resolved by the service with one batched users lookup
+                    'co_faculty_id': allocation.co_faculty_id,
+                    'venue': allocation.venue
                 }
         
         # Convert to list format but keep batchs and subjects as dictionaries
@@ -563,11 +619,127 @@ class FacultyPriorityRepository:
             update_values["co_faculty_id"] = co_faculty_id
         if venue is not None:
             update_values["venue"] = str(venue) # type: ignore
-        await self.db.execute(
-            update(FacultySubjectAllocation)
-            .where(FacultySubjectAllocation.allocation_id == allocation_id)
-            .values(**update_values)
+        result = await self.allocations.bulk_update([{"allocation_id": allocation_id, **update_values}])
+        updated = result[0] if result else None
+        if updated:
+            await self.sync_slot_allocations(updated.year_id, subject_id=updated.subject_id, batch_id=updated.batch_id)
+            if venue is not None:
+                conflicts = await TimetableModuleRepository(self.db).find_venue_conflicts(
+                    updated.year_id, batch_id=updated.batch_id, subject_id=updated.subject_id
+                )
+                if conflicts:
+                    details = ", ".join(
+                        f"{c['day']} period {c['period']} (batch {c['other_batch_id']})" for c in conflicts[:5]
+                    )
+                    raise ValueError(f"Venue {venue} is already booked: {details}")
+        await self.db.flush()
+        return updated
+
+    async def get_active_faculty(self) -> List[dict]:
+        """Get every active faculty member, most senior first"""
+        result = await self.db.execute(
+            select(Users.user_id, Users.uname, Users.email, Users.joining_year)
+            .where(Users.role == RoleEnum.FACULTY, Users.is_active.is_(True))
+            .order_by(Users.joining_year, Users.user_id)
+        )
+        return [dict(row._mapping) for row in result.all()]
+
+    async def get_priority_counts_by_faculty(self, year_id: int) -> dict[int, int]:
+        """Count the priority entries of each faculty for a year"""
+        result = await self.db.execute(
+            select(FacultySubjectPriority.faculty_id, func.count(FacultySubjectPriority.id))
+            .where(FacultySubjectPriority.year_id == year_id)
+            .group_by(FacultySubjectPriority.faculty_id)
+        )
+        return {faculty_id: count for faculty_id, count in result.all()}
+
+    async def get_priority_demand_counts(self, year_id: int) -> List[dict]:
+        """Count how many faculty picked each (subject, batch) at each priority level"""
+        result = await self.db.execute(
+            select(
+                FacultySubjectPriority.subject_id,
+                FacultySubjectPriority.batch_id,
+                FacultySubjectPriority.priority,
+                func.count(FacultySubjectPriority.id).label('count')
+            )
+            .where(FacultySubjectPriority.year_id == year_id)
+            .group_by(FacultySubjectPriority.subject_id, FacultySubjectPriority.batch_id, FacultySubjectPriority.priority)
+        )
+        return [dict(row._mapping) for row in result.all()]
+
+    async def get_demand_heatmap(self, year_id: int) -> List[dict]:
+        """Count picks per (subject, batch) at each priority level with a seniority-weighted contention score.
+
+        One GROUP BY over every subject x batch of the year, so slots nobody picked are included with zero counts.
+        A pick weighs (6 - priority) / 5 times the picker's years of service plus one.
+        """
+        seniority_weight = func.greatest(func.extract('year', func.now()) - Users.joining_year, 0) + 1
+        priority_weight = (6 - FacultySubjectPriority.priority) / 5.0
+        level_counts = [
+            func.count(FacultySubjectPriority.id).filter(FacultySubjectPriority.priority == level).label(f'priority_{level}')
+            for level in range(1, 6)
+        ]
+        result = await self.db.execute(
+            select(
+                Subjects.subject_id,
+                Subjects.subject_name,
+                Subjects.abbreviation,
+                Batches.batch_id,
+                Batches.section,
+                *level_counts,
+                func.count(FacultySubjectPriority.id).label('total_picks'),
+                func.coalesce(func.sum(priority_weight * seniority_weight), 0).label('contention_score')
+            ).select_from(Subjects).join(
+                Batches, Batches.year_id == Subjects.year_id
+            ).outerjoin(
+                FacultySubjectPriority,
+                (FacultySubjectPriority.subject_id == Subjects.subject_id)
+                & (FacultySubjectPriority.batch_id == Batches.batch_id)
+                & (FacultySubjectPriority.year_id == year_id)
+            ).outerjoin(
+                Users, Users.user_id == FacultySubjectPriority.faculty_id
+            ).where(
+                Subjects.year_id == year_id
+            ).group_by(
+                Subjects.subject_id, Subjects.subject_name, Subjects.abbreviation, Batches.batch_id, Batches.section
+            ).order_by(Subjects.subject_id, Batches.section)
+        )
+        return [dict(row._mapping) for row in result.all()]
+
+    async def get_allocation_slots(self, year_id: int) -> List[dict]:
+        """Get every (subject, batch) of a year with the subject's weekly hours, name and type"""
+        result = await self.db.execute(
+            select(
+                Subjects.subject_id,
+                Batches.batch_id,
+                Subjects.no_of_hours_required,
+                Subjects.subject_name,
+                Subjects.abbreviation,
+                Subjects.subject_type
+            )
+            .join(Batches, Batches.year_id == Subjects.year_id)
+            .where(Subjects.year_id == year_id)
+            .order_by(Subjects.subject_id, Batches.batch_id)
+        )
+        return [dict(row._mapping) for row in result.all()]
+
+    async def replace_allocations(self, year_id: int, allocations: List[dict]) -> None:
+        """Swap the allocations of a year for a new set within the request's transaction.
+
+        Subject-batches allocated again keep their allocation row and its approvals and are
+        overwritten with one upsert; only the ones no longer allocated are deleted.
+        """
+        kept = [(allocation['subject_id'], allocation['batch_id']) for allocation in allocations]
+        dropped = [FacultySubjectAllocation.year_id == year_id]
+        if kept:
+            dropped.append(tuple_(FacultySubjectAllocation.subject_id, FacultySubjectAllocation.batch_id).not_in(kept))
+        await self.approvals.archive_where(
+            Approvals.allocation_id.in_(select(FacultySubjectAllocation.allocation_id).where(*dropped))
+        )
+        await self.allocations.delete_where(*dropped)
+        # A regenerated allocation starts without the co-faculty and venue of the previous one
+        await self.allocations.upsert(
+            [{**allocation, 'year_id': year_id, 'co_faculty_id': None, 'venue': None} for allocation in allocations],
+            conflict_on=['subject_id', 'batch_id', 'year_id']
         )
-        await self.db.commit()
-        # Return the updated allocation
-        return await self.get_allocation_by_id(allocation_id) 
\ No newline at end of file
+        await self.sync_slot_allocations(year_id)
@@ -0,0 +1,64 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from app.models.model import Rooms, Batches, RoomTypeEnum
+from app.core.repository_base import BaseRepository
+from typing import List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class RoomRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.rooms = BaseRepository(db, Rooms)
+
+    async def create_room(self, room_data: dict) -> Rooms:
+        try:
+            [room] = await self.rooms.bulk_create([room_data])
+            await self.db.flush()
+            return room
+        except IntegrityError as e:
+            if "room_name" in str(e):
+                raise ValueError(f"Room '{room_data['room_name']}' already exists")
+            raise e
+
+    async def get_room_by_id(self, room_id: int) -> Optional[Rooms]:
+        result = await self.db.execute(select(Rooms).where(Rooms.room_id == room_id))
+        return result.scalar_one_or_none()
+
+    async def get_room_by_name(self, room_name: str) -> Optional[Rooms]:
+        result = await self.db.execute(select(Rooms).where(Rooms.room_name == room_name))
+        return result.scalar_one_or_none()
+
+    async def get_rooms(self, room_type: Optional[RoomTypeEnum] = None, min_capacity: Optional[int] = None, active_only: bool = False) -> List[Rooms]:
+        query = select(Rooms)
+        if room_type is not None:
+            query = query.where(Rooms.room_type == room_type)
+        if min_capacity is not None:
+            query = query.where(Rooms.capacity >= min_capacity)
+        if active_only:
+            query = query.where(Rooms.is_active.is_(True))
+        result = await self.db.execute(query.order_by(Rooms.room_name))
+        return list(result.scalars().all())
+
+    async def get_batch_strength(self, batch_id: int) -> Optional[int]:
+        result = await self.db.execute(select(Batches.noOfStudent).where(Batches.batch_id == batch_id))
+        return result.scalar_one_or_none()
+
+    async def update_room(self, room_id: int, update_values: dict) -> Optional[Rooms]:
+        if not update_values:
+            return await self.get_room_by_id(room_id)
+        try:
+            updated = await self.rooms.bulk_update([{"room_id": room_id, **update_values}])
+            await self.db.flush()
+        except IntegrityError as e:
+            if "room_name" in str(e):
+                raise ValueError(f"Room '{update_values.get('room_name')}' already exists")
+            raise e
+        return updated[0] if updated else None
+
+    async def delete_room(self, room_id: int) -> bool:
+        deleted = await self.rooms.delete_where(Rooms.room_id == room_id)
+        await self.db.flush()
+        return bool(deleted)
@@ -0,0 +1,385 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, insert, update, func, true, column, literal, tuple_, case, exists
+from sqlalchemy.dialects.postgresql import insert as pg_insert, JSONB
+from sqlalchemy.orm import aliased
+from sqlalchemy.types import Integer, String
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import json
+import logging
+from app.models.model import (
+    SnapshotBlob, YearSnapshot, ActiveYearSnapshot, AcademicYears,
+    FacultySubjectAllocation, Timetable, Approvals, Subjects, Batches
+)
+from app.repositories.approval_repository import ApprovalRepository
+from app.repositories.timetable_module_repository import TimetableModuleRepository
+from app.core.repository_base import BaseRepository
+
+logger = logging.getLogger(__name__)
+
+ALLOCATIONS_KIND = "allocations"
+TIMETABLES_KIND = "timetables"
+
+# First key of the two-key advisory lock that serializes snapshot writes per year
+SNAPSHOT_LOCK_NAMESPACE = 37
+
+ALLOCATION_FIELDS = ("allocation_id", "faculty_id", "co_faculty_id", "venue", "subject_id", "batch_id", "allocated_priority")
+TIMETABLE_FIELDS = ("timetable_id", "format_id", "batch_id", "timetable_data")
+
+
+def content_hash(rows: List[Dict[str, Any]]) -> str:
+    """sha256 of the canonical JSON of the rows"""
+    return hashlib.sha256(
+        json.dumps(rows, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def _allocation_records(data):
+    return func.jsonb_to_recordset(data).table_valued(
+        column("allocation_id", Integer),
+        column("faculty_id", Integer),
+        column("co_faculty_id", Integer),
+        column("venue", String),
+        column("subject_id", Integer),
+        column("batch_id", Integer),
+        column("allocated_priority", Integer),
+    ).render_derived(name="allocation_rows", with_types=True)
+
+
+def _timetable_records(data):
+    return func.jsonb_to_recordset(data).table_valued(
+        column("timetable_id", Integer),
+        column("format_id", Integer),
+        column("batch_id", Integer),
+        column("timetable_data", JSONB),
+    ).render_derived(name="timetable_rows", with_types=True)
+
+
+class SnapshotRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.snapshots = BaseRepository(db, YearSnapshot)
+
+    async def _lock_year(self, year_id: int) -> None:
+        """Serialize snapshot and rollback writes of a year until the transaction ends"""
+        await self.db.execute(select(func.pg_advisory_xact_lock(SNAPSHOT_LOCK_NAMESPACE, year_id)))
+
+    async def year_exists(self, year_id: int) -> bool:
+        result = await self.db.execute(select(exists().where(AcademicYears.year_id == year_id)))
+        return bool(result.scalar())
+
+    async def _current_allocations(self, year_id: int) -> List[Dict[str, Any]]:
+        result = await self.db.execute(
+            select(*(getattr(FacultySubjectAllocation, field) for field in ALLOCATION_FIELDS))
+            .where(FacultySubjectAllocation.year_id == year_id)
+            .order_by(FacultySubjectAllocation.subject_id, FacultySubjectAllocation.batch_id)
+        )
+        return [dict(row._mapping) for row in result.all()]
+
+    async def _current_timetables(self, year_id: int) -> List[Dict[str, Any]]:
+        result = await self.db.execute(
+            select(*(getattr(Timetable, field) for field in TIMETABLE_FIELDS))
+            .where(Timetable.year_id == year_id)
+            .order_by(Timetable.batch_id, Timetable.timetable_id)
+        )
+        return [dict(row._mapping) for row in result.all()]
+
+    async def _store_blob(self, kind: str, rows: List[Dict[str, Any]]) -> str:
+        """Store rows under their content hash; content seen before is not written again"""
+        blob_hash = content_hash(rows)
+        await self.db.execute(
+            pg_insert(SnapshotBlob)
+            .values(content_hash=blob_hash, kind=kind, data=rows)
+            .on_conflict_do_nothing(index_elements=[SnapshotBlob.content_hash])
+        )
+        return blob_hash
+
+    async def _set_active(self, year_id: int, snapshot_id: int) -> None:
+        statement = pg_insert(ActiveYearSnapshot).values(year_id=year_id, snapshot_id=snapshot_id)
+        await self.db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[ActiveYearSnapshot.year_id],
+                set_={"snapshot_id": statement.excluded.snapshot_id, "updated_at": func.now()}
+            )
+        )
+
+    async def get_active_snapshot(self, year_id: int) -> Optional[YearSnapshot]:
+        result = await self.db.execute(
+            select(YearSnapshot)
+            .join(ActiveYearSnapshot, ActiveYearSnapshot.snapshot_id == YearSnapshot.snapshot_id)
+            .where(ActiveYearSnapshot.year_id == year_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_snapshot(self, year_id: int, version_no: int) -> Optional[YearSnapshot]:
+        result = await self.db.execute(
+            select(YearSnapshot).where(YearSnapshot.year_id == year_id, YearSnapshot.version_no == version_no)
+        )
+        return result.scalar_one_or_none()
+
+    async def create_snapshot(self, year_id: int, label: Optional[str] = None) -> Tuple[YearSnapshot, bool]:
+        """Capture the year's allocations and timetables as a new version and make it active.
+
+        Returns the snapshot and whether it was created; when nothing changed since the
+        active version, that version is returned instead of storing a duplicate.
+        """
+        try:
+            await self._lock_year(year_id)
+            allocations_hash = await self._store_blob(ALLOCATIONS_KIND, await self._current_allocations(year_id))
+            timetables_hash = await self._store_blob(TIMETABLES_KIND, await self._current_timetables(year_id))
+
+            active = await self.get_active_snapshot(year_id)
+            if active and active.allocations_hash == allocations_hash and active.timetables_hash == timetables_hash:
+                await self.db.flush()
+                return active, False
+
+            next_version = await self.db.execute(
+                select(func.coalesce(func.max(YearSnapshot.version_no), 0) + 1).where(YearSnapshot.year_id == year_id)
+            )
+            [snapshot] = await self.snapshots.bulk_create([{
+                'year_id': year_id,
+                'version_no': next_version.scalar_one(),
+                'label': label,
+                'allocations_hash': allocations_hash,
+                'timetables_hash': timetables_hash
+            }])
+            await self._set_active(year_id, snapshot.snapshot_id)
+            await self.db.flush()
+
+            logger.info(f"Created snapshot version {snapshot.version_no} for year {year_id}")
+            return snapshot, True
+
+        except Exception as e:
+            logger.error(f"Error creating snapshot for year {year_id}: {str(e)}")
+            raise
+
+    async def list_snapshots(self, year_id: int) -> List[Dict[str, Any]]:
+        """List the versions of a year, newest first, with their row counts and which one is active"""
+        allocation_blob = aliased(SnapshotBlob)
+        timetable_blob = aliased(SnapshotBlob)
+        result = await self.db.execute(
+            select(
+                YearSnapshot.snapshot_id,
+                YearSnapshot.year_id,
+                YearSnapshot.version_no,
+                YearSnapshot.label,
+                YearSnapshot.allocations_hash,
+                YearSnapshot.timetables_hash,
+                YearSnapshot.created_at,
+                func.jsonb_array_length(allocation_blob.data).label("allocation_count"),
+                func.jsonb_array_length(timetable_blob.data).label("timetable_count"),
+                (ActiveYearSnapshot.snapshot_id.is_not(None)).label("is_active")
+            )
+            .join(allocation_blob, allocation_blob.content_hash == YearSnapshot.allocations_hash)
+            .join(timetable_blob, timetable_blob.content_hash == YearSnapshot.timetables_hash)
+            .outerjoin(ActiveYearSnapshot, ActiveYearSnapshot.snapshot_id == YearSnapshot.snapshot_id)
+            .where(YearSnapshot.year_id == year_id)
+            .order_by(YearSnapshot.version_no.desc())
+        )
+        return [dict(row._mapping) for row in result.all()]
+
+    async def rollback_to(self, year_id: int, version_no: int) -> Optional[YearSnapshot]:
+        """Make a stored version active and restore the year's allocations and timetables from it.
+
+        The restore is set-based: each table is rewritten with a few statements that read the
+        snapshot rows straight out of the stored JSONB, then the timetable slots are rebuilt.
+        Allocations and timetables keep their ids, and so their approvals; the approvals of
+        deleted ones are archived. Timetables get a new version, so open editors see the change.
+        """
+        try:
+            await self._lock_year(year_id)
+            snapshot = await self.get_snapshot(year_id, version_no)
+            if not snapshot:
+                return None
+
+            # Allocations are upserted by their original ids, so the approvals of restored
+            # allocations stay attached; only allocations the snapshot lacks are deleted
+            approvals = ApprovalRepository(self.db)
+            allocation_rows = _allocation_records(SnapshotBlob.data)
+            snapshot_allocation_ids = (
+                select(allocation_rows.c.allocation_id)
+                .select_from(SnapshotBlob)
+                .join(allocation_rows, true())
+                .where(SnapshotBlob.content_hash == snapshot.allocations_hash)
+            )
+            removed_allocations = [
+                FacultySubjectAllocation.year_id == year_id,
+                FacultySubjectAllocation.allocation_id.not_in(snapshot_allocation_ids)
+            ]
+            await approvals.archive_where(
+                Approvals.allocation_id.in_(select(FacultySubjectAllocation.allocation_id).where(*removed_allocations))
+            )
+            await self.db.execute(delete(FacultySubjectAllocation).where(*removed_allocations))
+            restored_allocations = pg_insert(FacultySubjectAllocation).from_select(
+                [*ALLOCATION_FIELDS, "year_id"],
+                select(*(allocation_rows.c[field] for field in ALLOCATION_FIELDS), literal(year_id, Integer))
+                .select_from(SnapshotBlob)
+                .join(allocation_rows, true())
+                .where(SnapshotBlob.content_hash == snapshot.allocations_hash)
+            )
+            restored_fields = [field for field in ALLOCATION_FIELDS if field != "allocation_id"]
+            await self.db.execute(
+                restored_allocations.on_conflict_do_update(
+                    index_elements=[FacultySubjectAllocation.allocation_id],
+                    set_={field: restored_allocations.excluded[field] for field in restored_fields},
+                    # Rows that already match the snapshot are not rewritten
+                    where=tuple_(*(getattr(FacultySubjectAllocation, field) for field in restored_fields)).is_distinct_from(
+                        tuple_(*(restored_allocations.excluded[field] for field in restored_fields))
+                    )
+                )
+            )
+
+            # Timetables created after the snapshot go away, the rest are rewritten or re-created
+            timetable_rows = _timetable_records(SnapshotBlob.data)
+            snapshot_timetable_ids = (
+                select(timetable_rows.c.timetable_id)
+                .select_from(SnapshotBlob)
+                .join(timetable_rows, true())
+                .where(SnapshotBlob.content_hash == snapshot.timetables_hash)
+            )
+            removed_ids = select(Timetable.timetable_id).where(
+                Timetable.year_id == year_id, Timetable.timetable_id.not_in(snapshot_timetable_ids)
+            )
+            await approvals.archive_where(Approvals.timetable_id.in_(removed_ids))
+            await self.db.execute(
+                delete(Timetable).where(Timetable.year_id == year_id, Timetable.timetable_id.not_in(snapshot_timetable_ids))
+            )
+
+            restored = (
+                select(*(timetable_rows.c[field] for field in TIMETABLE_FIELDS))
+                .select_from(SnapshotBlob)
+                .join(timetable_rows, true())
+                .where(SnapshotBlob.content_hash == snapshot.timetables_hash)
+                .subquery("restored")
+            )
+            await self.db.execute(
+                update(Timetable)
+                .where(Timetable.timetable_id == restored.c.timetable_id, Timetable.year_id == year_id)
+                .values(
+                    format_id=restored.c.format_id,
+                    batch_id=restored.c.batch_id,
+                    timetable_data=restored.c.timetable_data,
+                    version=Timetable.version + 1
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await self.db.execute(
+                insert(Timetable).from_select(
+                    [*TIMETABLE_FIELDS, "year_id"],
+                    select(*(restored.c[field] for field in TIMETABLE_FIELDS), literal(year_id, Integer))
+                    .where(~exists().where(Timetable.timetable_id == restored.c.timetable_id))
+                )
+            )
+
+            # Slots are derived from timetable_data and allocations, so rebuild them from both
+            await TimetableModuleRepository(self.db).rebuild_year_slots(year_id)
+
+            await self._set_active(year_id, snapshot.snapshot_id)
+            await self.db.flush()
+
+            logger.info(f"Rolled year {year_id} back to snapshot version {version_no}")
+            return snapshot
+
+        except Exception as e:
+            logger.error(f"Error rolling year {year_id} back to snapshot version {version_no}: {str(e)}")
+            raise
+
+    async def diff_allocations(self, from_hash: str, to_hash: str) -> List[Dict[str, Any]]:
+        """Compare two allocation sets by (subject, batch) with a full outer join over the stored rows"""
+        def side(blob_hash: str, name: str):
+            blob = aliased(SnapshotBlob)
+            rows = _allocation_records(blob.data)
+            return (
+                select(*(rows.c[field] for field in ALLOCATION_FIELDS))
+                .select_from(blob)
+                .join(rows, true())
+                .where(blob.content_hash == blob_hash)
+                .subquery(name)
+            )
+
+        old, new = side(from_hash, "old_allocations"), side(to_hash, "new_allocations")
+        subject_id = func.coalesce(old.c.subject_id, new.c.subject_id)
+        batch_id = func.coalesce(old.c.batch_id, new.c.batch_id)
+        result = await self.db.execute(
+            select(
+                case(
+                    (old.c.subject_id.is_(None), "added"),
+                    (new.c.subject_id.is_(None), "removed"),
+                    else_="changed"
+                ).label("change_type"),
+                subject_id.label("subject_id"),
+                Subjects.subject_name,
+                batch_id.label("batch_id"),
+                Batches.section,
+                old.c.faculty_id.label("from_faculty_id"),
+                new.c.faculty_id.label("to_faculty_id"),
+                old.c.co_faculty_id.label("from_co_faculty_id"),
+                new.c.co_faculty_id.label("to_co_faculty_id"),
+                old.c.venue.label("from_venue"),
+                new.c.venue.label("to_venue"),
+                old.c.allocated_priority.label("from_priority"),
+                new.c.allocated_priority.label("to_priority")
+            )
+            .select_from(old)
+            .join(new, (old.c.subject_id == new.c.subject_id) & (old.c.batch_id == new.c.batch_id), full=True)
+            .outerjoin(Subjects, Subjects.subject_id == subject_id)
+            .outerjoin(Batches, Batches.batch_id == batch_id)
+            .where(
+                old.c.subject_id.is_(None)
+                | new.c.subject_id.is_(None)
+                | tuple_(old.c.faculty_id, old.c.co_faculty_id, old.c.venue, old.c.allocated_priority).is_distinct_from(
+                    tuple_(new.c.faculty_id, new.c.co_faculty_id, new.c.venue, new.c.allocated_priority)
+                )
+            )
+            .order_by(subject_id, batch_id)
+        )
+        return [dict(row._mapping) for row in result.all()]
+
+    async def diff_timetables(self, from_hash: str, to_hash: str) -> List[Dict[str, Any]]:
+        """Compare two timetable sets cell by cell, expanding both into (batch, day, period) rows in SQL"""
+        def side(blob_hash: str, name: str):
+            blob = aliased(SnapshotBlob)
+            rows = _timetable_records(blob.data)
+            day_cells = func.jsonb_each(rows.c.timetable_data).table_valued("key", "value").render_derived(name="day_cells")
+            cells = func.jsonb_array_elements_text(day_cells.c.value).table_valued(
+                "value", with_ordinality="ordinality"
+            ).render_derived(name="cells")
+            return (
+                select(
+                    rows.c.batch_id,
+                    day_cells.c.key.label("day"),
+                    cells.c.ordinality.label("period"),
+                    func.nullif(cells.c.value, "").label("abbreviation")
+                )
+                .select_from(blob)
+                .join(rows, true())
+                .join(day_cells, true())
+                .join(cells, true())
+                .where(blob.content_hash == blob_hash)
+                .subquery(name)
+            )
+
+        old, new = side(from_hash, "old_cells"), side(to_hash, "new_cells")
+        batch_id = func.coalesce(old.c.batch_id, new.c.batch_id)
+        day = func.coalesce(old.c.day, new.c.day)
+        period = func.coalesce(old.c.period, new.c.period)
+        result = await self.db.execute(
+            select(
+                batch_id.label("batch_id"),
+                Batches.section,
+                day.label("day"),
+                period.label("period"),
+                old.c.abbreviation.label("from_abbreviation"),
+                new.c.abbreviation.label("to_abbreviation")
+            )
+            .select_from(old)
+            .join(
+                new,
+                (old.c.batch_id == new.c.batch_id) & (old.c.day == new.c.day) & (old.c.period == new.c.period),
+                full=True
+            )
+            .outerjoin(Batches, Batches.batch_id == batch_id)
+            .where(old.c.abbreviation.is_distinct_from(new.c.abbreviation))
+            .order_by(batch_id, day, period)
+        )
+        return [dict(row._mapping) for row in result.all()]
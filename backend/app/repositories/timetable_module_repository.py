@@ -1,8 +1,14 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import and_, or_, select
-from typing import List, Optional, Dict, Any
-from app.models.model import Timetable, TimetableHourFormats, Batches, AcademicYears
-from app.schemas.timetable_module_schema import TimetableModuleCreate, TimetableModuleUpdate
+from sqlalchemy import and_, or_, select, exists, func, true, delete, insert, update, tuple_, cast, column
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.types import Text
+from sqlalchemy.orm import aliased
+from typing import Iterable, List, Optional, Dict, Any
+from app.models.model import Approvals, Timetable, TimetableHourFormats, Batches, AcademicYears, Subjects, FacultySubjectAllocation, TimetableSlot
+from app.schemas.timetable_module_schema import TimetableModuleCreate, TimetableModuleUpdate, TimetableCellChange, TIMETABLE_DAYS
+from app.core.exceptions import ConflictException
+from app.core.repository_base import BaseRepository
+from app.repositories.approval_repository import ApprovalRepository
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,67 +16,48 @@ logger = logging.getLogger(__name__)
 class TimetableModuleRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.timetables = BaseRepository(db, Timetable)
 
     async def create_timetable_module(self, timetable_data: TimetableModuleCreate) -> Timetable:
         """Create a new timetable module"""
         try:
-            # Validate that format, year, and batch exist
-            format_result = await self.db.execute(
-                select(TimetableHourFormats).where(TimetableHourFormats.format_id == timetable_data.format_id)
-            )
-            format_exists = format_result.scalar_one_or_none()
-            
-            if not format_exists:
-                raise ValueError(f"Timetable format with ID {timetable_data.format_id} not found")
-
-            year_result = await self.db.execute(
-                select(AcademicYears).where(AcademicYears.year_id == timetable_data.year_id)
-            )
-            year_exists = year_result.scalar_one_or_none()
-            
-            if not year_exists:
-                raise ValueError(f"Academic year with ID {timetable_data.year_id} not found")
-
-            batch_result = await self.db.execute(
-                select(Batches).where(Batches.batch_id == timetable_data.batch_id)
-            )
-            batch_exists = batch_result.scalar_one_or_none()
-            
-            if not batch_exists:
-                raise ValueError(f"Batch with ID {timetable_data.batch_id} not found")
-
-            # Check if timetable already exists for this format, year, and batch combination
-            existing_result = await self.db.execute(
-                select(Timetable).where(
-                    and_(
+            # Validate that format, year, and batch exist and that the timetable does not, in one query
+            found = (await self.db.execute(
+                select(
+                    exists().where(TimetableHourFormats.format_id == timetable_data.format_id).label("format"),
+                    exists().where(AcademicYears.year_id == timetable_data.year_id).label("year"),
+                    exists().where(Batches.batch_id == timetable_data.batch_id).label("batch"),
+                    exists().where(
                         Timetable.format_id == timetable_data.format_id,
                         Timetable.year_id == timetable_data.year_id,
                         Timetable.batch_id == timetable_data.batch_id
-                    )
+                    ).label("timetable")
                 )
-            )
-            existing_timetable = existing_result.scalar_one_or_none()
+            )).one()
 
-            if existing_timetable:
+            if not found.format:
+                raise ValueError(f"Timetable format with ID {timetable_data.format_id} not found")
+            if not found.year:
+                raise ValueError(f"Academic year with ID {timetable_data.year_id} not found")
+            if not found.batch:
+                raise ValueError(f"Batch with ID {timetable_data.batch_id} not found")
+            if found.timetable:
                 raise ValueError(f"Timetable already exists for format_id={timetable_data.format_id}, year_id={timetable_data.year_id}, batch_id={timetable_data.batch_id}")
 
             # Create new timetable
-            new_timetable = Timetable(
-                format_id=timetable_data.format_id,
-                year_id=timetable_data.year_id,
-                batch_id=timetable_data.batch_id,
-                timetable_data=timetable_data.timetable_data
-            )
-
-            self.db.add(new_timetable)
-            await self.db.commit()
-            await self.db.refresh(new_timetable)
+            [new_timetable] = await self.timetables.bulk_create([{
+                'format_id': timetable_data.format_id,
+                'year_id': timetable_data.year_id,
+                'batch_id': timetable_data.batch_id,
+                'timetable_data': timetable_data.timetable_data
+            }])
+            await self.sync_timetable_slots(new_timetable)
+            await self.db.flush()
 
             logger.info(f"Created timetable module with ID: {new_timetable.timetable_id}")
             return new_timetable
 
         except Exception as e:
-            await self.db.rollback()
             logger.error(f"Error creating timetable module: {str(e)}")
             raise
 
@@ -123,110 +110,495 @@ class TimetableModuleRepository:
             raise
 
     async def update_timetable_module(self, timetable_id: int, update_data: TimetableModuleUpdate) -> Optional[Timetable]:
-        """Update a timetable module"""
+        """Update a timetable module.
+
+        When expected_version is given the write is a compare-and-swap on the version column,
+        so a concurrent edit raises ConflictException instead of being overwritten.
+        """
         try:
+            conditions = [Timetable.timetable_id == timetable_id]
+            if update_data.expected_version is not None:
+                conditions.append(Timetable.version == update_data.expected_version)
+
             result = await self.db.execute(
-                select(Timetable).where(Timetable.timetable_id == timetable_id)
+                update(Timetable)
+                .where(*conditions)
+                .values(timetable_data=update_data.timetable_data, version=Timetable.version + 1)
+                .returning(Timetable)
+                .execution_options(synchronize_session=False, populate_existing=True)
             )
             timetable = result.scalar_one_or_none()
 
             if not timetable:
-                return None
+                current_version = await self.get_timetable_version(timetable_id)
+                if current_version is None:
+                    return None
+                raise ConflictException(
+                    f"Timetable {timetable_id} is at version {current_version}, not {update_data.expected_version}",
+                    details={"current_version": current_version}
+                )
 
-            # Update timetable data
-            timetable.timetable_data = update_data.timetable_data
+            # Rebuild its slot rows in the same transaction
+            await self.sync_timetable_slots(timetable)
 
-            await self.db.commit()
-            await self.db.refresh(timetable)
+            await self.db.flush()
 
-            logger.info(f"Updated timetable module with ID: {timetable_id}")
+            logger.info(f"Updated timetable module with ID: {timetable_id} to version {timetable.version}")
             return timetable
 
         except Exception as e:
-            await self.db.rollback()
             logger.error(f"Error updating timetable module {timetable_id}: {str(e)}")
             raise
 
-    async def delete_timetable_module(self, timetable_id: int) -> bool:
-        """Delete a timetable module"""
+    async def apply_cell_changes(self, timetable_id: int, expected_version: int, changes: List[TimetableCellChange]) -> Optional[Timetable]:
+        """Overwrite individual cells with nested jsonb_set calls in one compare-and-swap UPDATE.
+
+        Only the slot rows of the changed cells are rewritten.
+        """
         try:
+            data = Timetable.timetable_data
+            in_range = []
+            for change in changes:
+                data = func.jsonb_set(
+                    data,
+                    cast([change.day, str(change.period - 1)], ARRAY(Text)),
+                    func.to_jsonb(cast(change.value, Text)),
+                    False
+                )
+                in_range.append(func.jsonb_array_length(Timetable.timetable_data[change.day]) >= change.period)
+
             result = await self.db.execute(
-                select(Timetable).where(Timetable.timetable_id == timetable_id)
+                update(Timetable)
+                .where(Timetable.timetable_id == timetable_id, Timetable.version == expected_version, *in_range)
+                .values(timetable_data=data, version=Timetable.version + 1)
+                .returning(Timetable)
+                .execution_options(synchronize_session=False, populate_existing=True)
             )
             timetable = result.scalar_one_or_none()
 
             if not timetable:
-                return False
+                current_version = await self.get_timetable_version(timetable_id)
+                if current_version is None:
+                    return None
+                if current_version != expected_version:
+                    raise ConflictException(
+                        f"Timetable {timetable_id} is at version {current_version}, not {expected_version}",
+                        details={"current_version": current_version}
+                    )
+                raise ValueError("One or more cells are outside the periods of their day")
+
+            cells = {(change.day, change.period) for change in changes}
+            await self.db.execute(
+                delete(TimetableSlot).where(
+                    TimetableSlot.timetable_id == timetable_id,
+                    tuple_(TimetableSlot.day, TimetableSlot.period).in_(cells)
+                )
+            )
+            slot_rows = await self._build_slot_rows(
+                timetable, [(change.day, change.period, change.value) for change in changes]
+            )
+            if slot_rows:
+                await self.db.execute(insert(TimetableSlot), slot_rows)
+            await self._raise_on_venue_conflicts(timetable)
+
+            await self.db.flush()
 
-            await self.db.delete(timetable)
-            await self.db.commit()
+            logger.info(f"Applied {len(changes)} cell changes to timetable {timetable_id}, now at version {timetable.version}")
+            return timetable
+
+        except Exception as e:
+            logger.error(f"Error applying cell changes to timetable {timetable_id}: {str(e)}")
+            raise
+
+    async def get_timetable_version(self, timetable_id: int) -> Optional[int]:
+        """Get the current version of a timetable, or None if it does not exist"""
+        result = await self.db.execute(
+            select(Timetable.version).where(Timetable.timetable_id == timetable_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def delete_timetable_module(self, timetable_id: int) -> bool:
+        """Delete a timetable module"""
+        try:
+            # Slots go with it through ON DELETE CASCADE; its approvals are kept as history
+            await ApprovalRepository(self.db).archive_where(Approvals.timetable_id == timetable_id)
+            if not await self.timetables.delete_where(Timetable.timetable_id == timetable_id):
+                return False
+            await self.db.flush()
 
             logger.info(f"Deleted timetable module with ID: {timetable_id}")
             return True
 
         except Exception as e:
-            await self.db.rollback()
             logger.error(f"Error deleting timetable module {timetable_id}: {str(e)}")
             raise
 
-    async def get_format_details(self, format_id: int) -> Optional[TimetableHourFormats]:
-        """Get timetable format details"""
+    async def check_timetable_exists(self, format_id: int, year_id: int, batch_id: int) -> bool:
+        """Check if a timetable exists for the given format, year, and batch"""
         try:
             result = await self.db.execute(
-                select(TimetableHourFormats).where(TimetableHourFormats.format_id == format_id)
+                select(Timetable).where(
+                    and_(
+                        Timetable.format_id == format_id,
+                        Timetable.year_id == year_id,
+                        Timetable.batch_id == batch_id
+                    )
+                )
             )
-            format_details = result.scalar_one_or_none()
+            existing = result.scalar_one_or_none()
             
-            return format_details
+            return existing is not None
 
         except Exception as e:
-            logger.error(f"Error getting format details for ID {format_id}: {str(e)}")
+            logger.error(f"Error checking timetable existence: {str(e)}")
             raise
 
-    async def get_batch_details(self, batch_id: int) -> Optional[Batches]:
-        """Get batch details"""
+    def _timetable_cells_query(self, year_id: int):
+        """Build a query that expands every timetable of a year into (day, period, abbreviation) rows"""
+        day_cells = func.jsonb_each(Timetable.timetable_data).table_valued("key", "value").render_derived(name="day_cells")
+        cells = func.jsonb_array_elements_text(day_cells.c.value).table_valued(
+            "value", with_ordinality="ordinality"
+        ).render_derived(name="cells")
+
+        query = (
+            select(
+                Timetable.timetable_id,
+                Timetable.batch_id,
+                Batches.section,
+                day_cells.c.key.label("day"),
+                cells.c.ordinality.label("period"),
+                cells.c.value.label("abbreviation"),
+            )
+            .join(Batches, Timetable.batch_id == Batches.batch_id)
+            .join(day_cells, true())
+            .join(cells, true())
+            .where(Timetable.year_id == year_id)
+        )
+        return query, day_cells, cells
+
+    async def find_subject_slots(self, year_id: int, abbreviation: str, day: Optional[str] = None, period: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Find every timetable cell of a year holding the given subject abbreviation.
+
+        The containment filter on ``timetable_data`` is served by the GIN index, so only
+        timetables that actually contain the subject are expanded into cells.
+        """
         try:
-            result = await self.db.execute(
-                select(Batches).where(Batches.batch_id == batch_id)
+            days = [day] if day else TIMETABLE_DAYS
+            query, day_cells, cells = self._timetable_cells_query(year_id)
+            query = query.where(
+                or_(*[Timetable.timetable_data.contains({d: [abbreviation]}) for d in days]),
+                cells.c.value == abbreviation,
             )
-            batch_details = result.scalar_one_or_none()
-            
-            return batch_details
+            if day:
+                query = query.where(day_cells.c.key == day)
+            if period:
+                query = query.where(cells.c.ordinality == period)
+
+            result = await self.db.execute(query.order_by(Timetable.batch_id, day_cells.c.key, cells.c.ordinality))
+            return [dict(row) for row in result.mappings().all()]
+
+        except Exception as e:
+            logger.error(f"Error finding slots for subject {abbreviation} in year {year_id}: {str(e)}")
+            raise
+
+    async def _build_slot_rows(self, timetable: Timetable, cells: List[tuple]) -> List[Dict[str, Any]]:
+        """Turn (day, period, abbreviation) cells into slot rows, joined to subjects and the batch's allocations"""
+        subjects_result = await self.db.execute(
+            select(Subjects.subject_id, Subjects.abbreviation).where(Subjects.year_id == timetable.year_id)
+        )
+        subject_ids = {row.abbreviation: row.subject_id for row in subjects_result.all()}
+
+        allocations_result = await self.db.execute(
+            select(
+                FacultySubjectAllocation.subject_id,
+                FacultySubjectAllocation.faculty_id,
+                FacultySubjectAllocation.co_faculty_id,
+                FacultySubjectAllocation.venue
+            ).where(
+                FacultySubjectAllocation.year_id == timetable.year_id,
+                FacultySubjectAllocation.batch_id == timetable.batch_id
+            )
+        )
+        allocations = {row.subject_id: row for row in allocations_result.all()}
+
+        slot_rows = []
+        for day, period, abbreviation in cells:
+            if not abbreviation:
+                continue
+            subject_id = subject_ids.get(abbreviation)
+            allocation = allocations.get(subject_id) if subject_id else None
+            slot_rows.append({
+                'timetable_id': timetable.timetable_id,
+                'year_id': timetable.year_id,
+                'batch_id': timetable.batch_id,
+                'day': day,
+                'period': period,
+                'abbreviation': abbreviation,
+                'subject_id': subject_id,
+                'faculty_id': allocation.faculty_id if allocation else None,
+                'co_faculty_id': allocation.co_faculty_id if allocation else None,
+                'venue': allocation.venue if allocation else None
+            })
+        return slot_rows
+
+    async def _raise_on_venue_conflicts(self, timetable: Timetable) -> None:
+        conflicts = await self.find_venue_conflicts(timetable.year_id, timetable_id=timetable.timetable_id)
+        if conflicts:
+            details = ", ".join(
+                f"{c['venue']} on {c['day']} period {c['period']} (batch {c['other_batch_id']})" for c in conflicts[:5]
+            )
+            raise ValueError(f"Venue conflict: {details}")
+
+    async def sync_timetable_slots(self, timetable: Timetable) -> None:
+        """Rebuild the normalized slot rows of a timetable from its timetable_data.
+
+        Does not commit; callers run it inside the transaction that writes timetable_data.
+        """
+        slot_rows = await self._build_slot_rows(timetable, [
+            (day, period, abbreviation)
+            for day, cells in timetable.timetable_data.items()
+            for period, abbreviation in enumerate(cells, start=1)
+        ])
+
+        await self.db.execute(delete(TimetableSlot).where(TimetableSlot.timetable_id == timetable.timetable_id))
+        if slot_rows:
+            await self.db.execute(insert(TimetableSlot), slot_rows)
+        await self._raise_on_venue_conflicts(timetable)
+
+    async def rebuild_year_slots(self, year_id: int) -> None:
+        """Rebuild the slot rows of every timetable of a year with one DELETE and one INSERT ... SELECT.
+
+        Cells are unnested from timetable_data in the database and joined to subjects and the
+        batch's allocations, giving the rows sync_timetable_slots builds one timetable at a time.
+        """
+        days = func.jsonb_each(Timetable.timetable_data).table_valued("key", "value").render_derived(name="days")
+        cells = func.jsonb_array_elements_text(days.c.value).table_valued(
+            column("value", Text), with_ordinality="period"
+        ).render_derived(name="cells")
+        # Abbreviations are not unique within a year; one subject is picked per abbreviation
+        subject_ids = (
+            select(Subjects.abbreviation, func.max(Subjects.subject_id).label("subject_id"))
+            .where(Subjects.year_id == year_id)
+            .group_by(Subjects.abbreviation)
+            .subquery("subject_ids")
+        )
+        cell_rows = (
+            select(
+                Timetable.timetable_id,
+                Timetable.year_id,
+                Timetable.batch_id,
+                days.c.key,
+                cells.c.period,
+                cells.c.value,
+                subject_ids.c.subject_id,
+                FacultySubjectAllocation.faculty_id,
+                FacultySubjectAllocation.co_faculty_id,
+                FacultySubjectAllocation.venue
+            )
+            .select_from(Timetable)
+            .join(days, true())
+            .join(cells, true())
+            .outerjoin(subject_ids, subject_ids.c.abbreviation == cells.c.value)
+            .outerjoin(
+                FacultySubjectAllocation,
+                and_(
+                    FacultySubjectAllocation.year_id == Timetable.year_id,
+                    FacultySubjectAllocation.batch_id == Timetable.batch_id,
+                    FacultySubjectAllocation.subject_id == subject_ids.c.subject_id
+                )
+            )
+            .where(Timetable.year_id == year_id, cells.c.value.is_not(None), cells.c.value != "")
+        )
+        try:
+            await self.db.execute(delete(TimetableSlot).where(TimetableSlot.year_id == year_id))
+            await self.db.execute(
+                insert(TimetableSlot).from_select(
+                    ["timetable_id", "year_id", "batch_id", "day", "period", "abbreviation",
+                     "subject_id", "faculty_id", "co_faculty_id", "venue"],
+                    cell_rows
+                )
+            )
+        except Exception as e:
+            logger.error(f"Error rebuilding timetable slots for year {year_id}: {str(e)}")
+            raise
 
+        conflicts = await self.find_venue_conflicts(year_id)
+        if conflicts:
+            details = ", ".join(
+                f"{c['venue']} on {c['day']} period {c['period']} (batches {c['batch_id']} and {c['other_batch_id']})" for c in conflicts[:5]
+            )
+            raise ValueError(f"Venue conflict: {details}")
+
+    async def find_venue_conflicts(self, year_id: int, timetable_id: Optional[int] = None, batch_id: Optional[int] = None, subject_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Find slots of the given timetable (or batch/subject) whose venue is also booked by another batch at the same time.
+
+        Runs as a self-join on timetable_slots so it sees rows written earlier in the current transaction.
+        """
+        other = aliased(TimetableSlot)
+        query = select(
+            TimetableSlot.venue,
+            TimetableSlot.day,
+            TimetableSlot.period,
+            TimetableSlot.batch_id,
+            other.batch_id.label('other_batch_id')
+        ).join(
+            other,
+            and_(
+                other.year_id == TimetableSlot.year_id,
+                other.venue == TimetableSlot.venue,
+                other.day == TimetableSlot.day,
+                other.period == TimetableSlot.period,
+                other.batch_id != TimetableSlot.batch_id
+            )
+        ).where(
+            TimetableSlot.year_id == year_id,
+            TimetableSlot.venue.is_not(None)
+        )
+        if timetable_id is not None:
+            query = query.where(TimetableSlot.timetable_id == timetable_id)
+        if batch_id is not None:
+            query = query.where(TimetableSlot.batch_id == batch_id)
+        if subject_id is not None:
+            query = query.where(TimetableSlot.subject_id == subject_id)
+
+        result = await self.db.execute(query.order_by(TimetableSlot.day, TimetableSlot.period))
+        return [dict(row._mapping) for row in result.all()]
+
+    async def get_venue_bookings(self, year_id: int, subject_id: Optional[int] = None, batch_id: Optional[int] = None, slots: Optional[Iterable[tuple[str, str, int]]] = None) -> List[Dict[str, Any]]:
+        """Get the distinct (venue, day, period) bookings of a year, optionally of one subject and batch or among given slots"""
+        try:
+            query = select(TimetableSlot.venue, TimetableSlot.day, TimetableSlot.period).where(
+                TimetableSlot.year_id == year_id,
+                TimetableSlot.venue.is_not(None)
+            )
+            if subject_id is not None:
+                query = query.where(TimetableSlot.subject_id == subject_id)
+            if batch_id is not None:
+                query = query.where(TimetableSlot.batch_id == batch_id)
+            if slots is not None:
+                query = query.where(tuple_(TimetableSlot.venue, TimetableSlot.day, TimetableSlot.period).in_(list(slots)))
+            result = await self.db.execute(query.distinct())
+            return [dict(row._mapping) for row in result.all()]
         except Exception as e:
-            logger.error(f"Error getting batch details for ID {batch_id}: {str(e)}")
+            logger.error(f"Error fetching venue bookings for year {year_id}: {str(e)}")
             raise
 
-    async def get_academic_year_details(self, year_id: int) -> Optional[AcademicYears]:
-        """Get academic year details"""
+    async def lock_venue_slots(self, year_id: int, slots: Iterable[tuple[str, str, int]]) -> None:
+        """Lock the slot rows of a year holding any of the given (venue, day, period) until the transaction ends"""
+        slots = list(slots)
+        if not slots:
+            return
+        try:
+            await self.db.execute(
+                select(TimetableSlot.slot_id)
+                .where(
+                    TimetableSlot.year_id == year_id,
+                    tuple_(TimetableSlot.venue, TimetableSlot.day, TimetableSlot.period).in_(slots)
+                )
+                .order_by(TimetableSlot.slot_id)
+                .with_for_update()
+            )
+        except Exception as e:
+            logger.error(f"Error locking venue slots for year {year_id}: {str(e)}")
+            raise
+
+    async def get_timetable_venue_bookings(self, timetable_id: int) -> set[tuple[str, str, int]]:
+        """Get the (venue, day, period) bookings of one timetable"""
         try:
             result = await self.db.execute(
-                select(AcademicYears).where(AcademicYears.year_id == year_id)
+                select(TimetableSlot.venue, TimetableSlot.day, TimetableSlot.period).where(
+                    TimetableSlot.timetable_id == timetable_id,
+                    TimetableSlot.venue.is_not(None)
+                )
             )
-            year_details = result.scalar_one_or_none()
-            
-            return year_details
+            return {tuple(row) for row in result.all()}  # type: ignore[misc]
+        except Exception as e:
+            logger.error(f"Error fetching venue bookings for timetable {timetable_id}: {str(e)}")
+            raise
+
+    async def get_slots(self, year_id: int, faculty_id: Optional[int] = None, venue: Optional[str] = None, day: Optional[str] = None, period: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get the slot rows of a year, filtered by faculty (or co-faculty), venue, day and period"""
+        try:
+            query = select(
+                TimetableSlot.timetable_id,
+                TimetableSlot.batch_id,
+                Batches.section,
+                TimetableSlot.day,
+                TimetableSlot.period,
+                TimetableSlot.abbreviation,
+                TimetableSlot.subject_id,
+                TimetableSlot.faculty_id,
+                TimetableSlot.co_faculty_id,
+                TimetableSlot.venue
+            ).join(
+                Batches, TimetableSlot.batch_id == Batches.batch_id
+            ).where(
+                TimetableSlot.year_id == year_id
+            )
+            if faculty_id is not None:
+                query = query.where(
+                    or_(
+                        TimetableSlot.faculty_id == faculty_id,
+                        TimetableSlot.co_faculty_id == faculty_id
+                    )
+                )
+            if venue is not None:
+                query = query.where(TimetableSlot.venue == venue)
+            if day is not None:
+                query = query.where(TimetableSlot.day == day)
+            if period is not None:
+                query = query.where(TimetableSlot.period == period)
+
+            result = await self.db.execute(
+                query.order_by(TimetableSlot.day, TimetableSlot.period, TimetableSlot.batch_id)
+            )
+            return [dict(row) for row in result.mappings().all()]
 
         except Exception as e:
-            logger.error(f"Error getting academic year details for ID {year_id}: {str(e)}")
+            logger.error(f"Error getting timetable slots for year {year_id}: {str(e)}")
             raise
 
-    async def check_timetable_exists(self, format_id: int, year_id: int, batch_id: int) -> bool:
-        """Check if a timetable exists for the given format, year, and batch"""
+    async def get_slots_for_faculties(self, year_id: int, faculty_ids: List[int]) -> List[Dict[str, Any]]:
+        """Get the slot rows of a year taught by any of the given faculty (as faculty or co-faculty)"""
         try:
             result = await self.db.execute(
-                select(Timetable).where(
-                    and_(
-                        Timetable.format_id == format_id,
-                        Timetable.year_id == year_id,
-                        Timetable.batch_id == batch_id
+                select(
+                    TimetableSlot.timetable_id,
+                    TimetableSlot.batch_id,
+                    Batches.section,
+                    TimetableSlot.day,
+                    TimetableSlot.period,
+                    TimetableSlot.abbreviation,
+                    TimetableSlot.subject_id,
+                    TimetableSlot.faculty_id,
+                    TimetableSlot.co_faculty_id,
+                    TimetableSlot.venue
+                ).join(
+                    Batches, TimetableSlot.batch_id == Batches.batch_id
+                ).where(
+                    TimetableSlot.year_id == year_id,
+                    or_(
+                        TimetableSlot.faculty_id.in_(faculty_ids),
+                        TimetableSlot.co_faculty_id.in_(faculty_ids)
                     )
                 )
             )
-            existing = result.scalar_one_or_none()
-            
-            return existing is not None
+            return [dict(row) for row in result.mappings().all()]
 
         except Exception as e:
-            logger.error(f"Error checking timetable existence: {str(e)}")
-            raise 
\ No newline at end of file
+            logger.error(f"Error getting timetable slots for faculty {faculty_ids} in year {year_id}: {str(e)}")
+            raise
+
+    async def get_timetable_faculty_ids(self, timetable_id: int) -> set[int]:
+        """Get the faculty and co-faculty ids that teach at least one slot of a timetable"""
+        try:
+            result = await self.db.execute(
+                select(TimetableSlot.faculty_id, TimetableSlot.co_faculty_id)
+                .where(TimetableSlot.timetable_id == timetable_id)
+                .distinct()
+            )
+            return {faculty_id for row in result.all() for faculty_id in row if faculty_id is not None}
+
+        except Exception as e:
+            logger.error(f"Error getting faculty ids for timetable {timetable_id}: {str(e)}")
+            raise
@@ -1,28 +1,29 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, update
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from app.models.model import TimetableHourFormats, Batches, AcademicYears
+from app.core.repository_base import BaseRepository
 from typing import List, Optional, Dict, Any
 
 class TimetableRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.formats = BaseRepository(db, TimetableHourFormats)
+        self.years = BaseRepository(db, AcademicYears)
+        self.batches = BaseRepository(db, Batches)
 
     async def create_timetable_format(self, year_id: int, batch_id: int, format_name: str, format_data: Dict) -> TimetableHourFormats:
         """Create a new timetable format"""
         try:
-            timetable_format = TimetableHourFormats(
-                year_id=year_id,
-                batch_id=batch_id,
-                format_name=format_name,
-                format_data=format_data
-            )
-            self.db.add(timetable_format)
-            await self.db.commit()
-            await self.db.refresh(timetable_format)
+            [timetable_format] = await self.formats.bulk_create([{
+                'year_id': year_id,
+                'batch_id': batch_id,
+                'format_name': format_name,
+                'format_data': format_data
+            }])
+            await self.db.flush()
             return timetable_format
         except IntegrityError as e:
-            await self.db.rollback()
             raise ValueError(f"Error creating timetable format: {str(e)}")
 
     async def get_timetable_formats_by_year(self, year_id: int) -> List[Dict]:
@@ -122,21 +123,25 @@ class TimetableRepository:
         if not row:
             return None
         
+        return self._format_details(row[0], row[1], row[2])
+
+    @staticmethod
+    def _format_details(timetable_format: TimetableHourFormats, batch: Batches, year: AcademicYears) -> Dict:
         return {
-            'format_id': row[0].format_id,
-            'format_name': row[0].format_name,
-            'format_data': row[0].format_data,
-            'created_at': row[0].created_at,
+            'format_id': timetable_format.format_id,
+            'format_name': timetable_format.format_name,
+            'format_data': timetable_format.format_data,
+            'created_at': timetable_format.created_at,
             'year_details': {
-                'year_id': row[2].year_id,
-                'academic_year': row[2].academic_year,
-                'created_at': row[2].created_at
+                'year_id': year.year_id,
+                'academic_year': year.academic_year,
+                'created_at': year.created_at
             },
             'batch_details': {
-                'batch_id': row[1].batch_id,
-                'section': row[1].section,
-                'noOfStudent': row[1].noOfStudent,
-                'created_at': row[1].created_at
+                'batch_id': batch.batch_id,
+                'section': batch.section,
+                'noOfStudent': batch.noOfStudent,
+                'created_at': batch.created_at
             }
         }
 
@@ -183,13 +188,10 @@ class TimetableRepository:
     async def delete_timetable_format(self, format_id: int) -> bool:
         """Delete a timetable format by ID"""
         try:
-            result = await self.db.execute(
-                delete(TimetableHourFormats).where(TimetableHourFormats.format_id == format_id)
-            )
-            await self.db.commit()
-            return result.rowcount > 0
+            deleted = await self.formats.delete_where(TimetableHourFormats.format_id == format_id)
+            await self.db.flush()
+            return bool(deleted)
         except IntegrityError as e:
-            await self.db.rollback()
             raise ValueError(f"Error deleting timetable format: {str(e)}")
 
     async def update_timetable_format(self, format_id: int, format_name: Optional[str] = None, format_data: Optional[Dict] = None) -> Optional[Dict]:
@@ -204,15 +206,17 @@ class TimetableRepository:
             if not update_data:
                 raise ValueError("No fields to update")
             
-            await self.db.execute(
-                update(TimetableHourFormats)
-                .where(TimetableHourFormats.format_id == format_id)
-                .values(**update_data)
+            updated = await self.formats.bulk_update([{'format_id': format_id, **update_data}])
+            await self.db.flush()
+            if not updated:
+                return None
+
+            # Year and batch come from the entity cache, so this rarely costs a query
+            timetable_format = updated[0]
+            return self._format_details(
+                timetable_format,
+                await self.batches.get_by_id(timetable_format.batch_id),
+                await self.years.get_by_id(timetable_format.year_id)
             )
-            await self.db.commit()
-            
-            # Return the updated format
-            return await self.get_timetable_format_by_id(format_id)
         except IntegrityError as e:
-            await self.db.rollback()
             raise ValueError(f"Error updating timetable format: {str(e)}") 
\ No newline at end of file
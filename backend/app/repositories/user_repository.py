@@ -18,11 +18,8 @@ class UserRepository(BaseRepository[Users]):
         return result.scalar_one_or_none() 
      
 
-    async def get_by_userid(self, user_id: int) -> Users | None:
-        result = await self.session.execute(
-            select(Users).where(Users.user_id == user_id)
-        )
-        return result.scalars().first()
+    async def get_by_userid(self, user_id: int, bypass_cache: bool = False) -> Users | None:
+        return await self.get_by_id(user_id, bypass_cache=bypass_cache)
 
     async def get_all_users(self) -> List[Users]:
         """Get all users from the database"""
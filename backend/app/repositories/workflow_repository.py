@@ -1,53 +1,61 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
-from typing import Optional
-from app.models.model import WorkflowStage
+from sqlalchemy import select, update, insert, func
+from typing import Optional, List, Dict
+from app.models.model import (
+    WorkflowStage, WorkflowTransition, Batches, Subjects, Users, RoleEnum,
+    FacultySubjectPriority, FacultySubjectAllocation, TimetableHourFormats, Timetable
+)
 from app.schemas.workflow_schema import WorkflowStageCreate
+from app.core.repository_base import BaseRepository
+
+TOTAL_STEPS = 12
 
 
 class WorkflowRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
-    
+        self.stages = BaseRepository(db, WorkflowStage)
+
     async def create_workflow_stage(self, workflow_data: WorkflowStageCreate) -> WorkflowStage:
         """Create a new workflow stage for an academic year"""
-        workflow_stage = WorkflowStage(**workflow_data.model_dump())
-        self.db.add(workflow_stage)
-        await self.db.commit()
-        await self.db.refresh(workflow_stage)
+        [workflow_stage] = await self.stages.bulk_create([workflow_data.model_dump()])
+        await self.db.flush()
         return workflow_stage
-    
+
     async def get_workflow_stage_by_year(self, year_id: int) -> Optional[WorkflowStage]:
         """Get workflow stage for a specific academic year"""
         query = select(WorkflowStage).where(WorkflowStage.year_id == year_id)
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
-    
-    async def increment_step(self, year_id: int) -> Optional[WorkflowStage]:
-        """Increment the current step by 1"""
-        current_workflow = await self.get_workflow_stage_by_year(year_id)
-        if not current_workflow:
-            return None
-        
-        # Check if we can increment (max step is 12)
-        if current_workflow.current_step < 12:
-            new_step = current_workflow.current_step + 1
-            # Mark as completed if we reach step 12
-            is_completed = new_step == 12
-            
-            query = (
-                update(WorkflowStage)
-                .where(WorkflowStage.year_id == year_id)
-                .values(current_step=new_step, is_completed=is_completed)
-                .returning(WorkflowStage)
+
+    async def advance_step(self, year_id: int, expected_step: int) -> Optional[WorkflowStage]:
+        """Move the workflow one step forward if it is still at expected_step.
+
+        The step check and the update are a single statement, so of two concurrent
+        advances from the same step exactly one succeeds; the other gets None.
+        The transition is recorded in the same transaction.
+        """
+        new_step = expected_step + 1
+        result = await self.db.execute(
+            update(WorkflowStage)
+            .where(
+                WorkflowStage.year_id == year_id,
+                WorkflowStage.current_step == expected_step,
+                WorkflowStage.current_step < TOTAL_STEPS
             )
-            
-            result = await self.db.execute(query)
-            await self.db.commit()
-            return result.scalar_one_or_none()
-        
-        return current_workflow
-    
+            .values(current_step=new_step, is_completed=new_step == TOTAL_STEPS)
+            .returning(WorkflowStage)
+        )
+        workflow_stage = result.scalar_one_or_none()
+        if not workflow_stage:
+            return None
+
+        await self.db.execute(
+            insert(WorkflowTransition).values(year_id=year_id, from_step=expected_step, to_step=new_step)
+        )
+        await self.db.flush()
+        return workflow_stage
+
     async def complete_workflow(self, year_id: int) -> Optional[WorkflowStage]:
         """Mark workflow as completed"""
         query = (
@@ -56,7 +64,55 @@ class WorkflowRepository:
             .values(is_completed=True)
             .returning(WorkflowStage)
         )
-        
+
         result = await self.db.execute(query)
-        await self.db.commit()
-        return result.scalar_one_or_none() 
\ No newline at end of file
+        await self.db.flush()
+        return result.scalar_one_or_none()
+
+    async def get_transitions(self, year_id: int) -> List[WorkflowTransition]:
+        """Get the transition history of a year, oldest first"""
+        result = await self.db.execute(
+            select(WorkflowTransition)
+            .where(WorkflowTransition.year_id == year_id)
+            .order_by(WorkflowTransition.created_at, WorkflowTransition.id)
+        )
+        return list(result.scalars().all())
+
+    async def get_guard_counts(self, year_id: int) -> Dict[str, int]:
+        """Count everything the transition guards check in one aggregate query"""
+        batch_count = select(func.count(Batches.batch_id)).where(Batches.year_id == year_id).scalar_subquery()
+        subject_count = select(func.count(Subjects.subject_id)).where(Subjects.year_id == year_id).scalar_subquery()
+        faculty_count = select(func.count(Users.user_id)).where(
+            Users.role == RoleEnum.FACULTY, Users.is_active.is_(True)
+        ).scalar_subquery()
+        submitted_faculty_count = select(func.count(func.distinct(FacultySubjectPriority.faculty_id))).join(
+            Users, Users.user_id == FacultySubjectPriority.faculty_id
+        ).where(
+            FacultySubjectPriority.year_id == year_id,
+            Users.role == RoleEnum.FACULTY,
+            Users.is_active.is_(True)
+        ).scalar_subquery()
+        expected_allocation_count = select(func.count()).select_from(Subjects).join(
+            Batches, Batches.year_id == Subjects.year_id
+        ).where(Subjects.year_id == year_id).scalar_subquery()
+        allocation_count = select(func.count(FacultySubjectAllocation.allocation_id)).where(
+            FacultySubjectAllocation.year_id == year_id
+        ).scalar_subquery()
+        formatted_batch_count = select(func.count(func.distinct(TimetableHourFormats.batch_id))).where(
+            TimetableHourFormats.year_id == year_id
+        ).scalar_subquery()
+        timetabled_batch_count = select(func.count(func.distinct(Timetable.batch_id))).where(
+            Timetable.year_id == year_id
+        ).scalar_subquery()
+
+        result = await self.db.execute(select(
+            batch_count.label("batch_count"),
+            subject_count.label("subject_count"),
+            faculty_count.label("faculty_count"),
+            submitted_faculty_count.label("submitted_faculty_count"),
+            expected_allocation_count.label("expected_allocation_count"),
+            allocation_count.label("allocation_count"),
+            formatted_batch_count.label("formatted_batch_count"),
+            timetabled_batch_count.label("timetabled_batch_count")
+        ))
+        return dict(result.one()._mapping)
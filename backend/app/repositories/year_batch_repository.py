@@ -1,25 +1,30 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from app.models.model import AcademicYears, Batches, Subjects
+from app.core.entity_cache import entity_cache
+from app.core.repository_base import BaseRepository
 from typing import List, Optional
 from datetime import datetime
 
 class YearBatchRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.years = BaseRepository(db, AcademicYears)
+        self.batches = BaseRepository(db, Batches)
+        self.subjects = BaseRepository(db, Subjects)
 
     async def create_year_with_batch(self, year: int, batch_data: dict) -> int:
         try:
-            academic_year = AcademicYears(academic_year=str(year))
-            self.db.add(academic_year)
+            [academic_year] = await self.years.bulk_create([{'academic_year': str(year)}])
+            await self.batches.bulk_create([{
+                'section': batch_data['section'],
+                'noOfStudent': batch_data['noOfStudent'],
+                'year_id': academic_year.year_id
+            }])
             await self.db.flush()
-            batch = Batches(section=batch_data['section'], noOfStudent=batch_data['noOfStudent'], year_id=academic_year.year_id)
-            self.db.add(batch)
-            await self.db.commit()
             return academic_year.year_id
         except IntegrityError as e:
-            await self.db.rollback()
             if "uq_year_section" in str(e):
                 raise ValueError(f"Batch section '{batch_data['section']}' already exists for this academic year")
             raise e
@@ -46,91 +51,74 @@ class YearBatchRepository:
         try:
             # Only update academic_year if provided
             if academic_year is not None:
-                await self.db.execute(update(AcademicYears).where(AcademicYears.year_id == year_id).values(academic_year=academic_year))
-            
-            for batch in batch_updates:
-                # Check for both 'id' and 'batch_id' fields
-                batch_id = batch.get('id') or batch.get('batch_id')
-                
-                if batch_id:
-                    # Check if batch exists before updating
-                    existing_batch = await self.db.execute(select(Batches).where(Batches.batch_id == batch_id, Batches.year_id == year_id))
-                    if not existing_batch.scalar_one_or_none():
-                        raise ValueError(f"Batch with ID {batch_id} does not exist for year {year_id}")
-                    
-                    # Update existing batch
-                    await self.db.execute(
-                        update(Batches)
-                        .where(Batches.batch_id == batch_id)
-                        .values(section=batch['section'], noOfStudent=batch['noOfStudent'])
-                    )
-                else:
-                    # Create new batch
-                    new_batch = Batches(section=batch['section'], noOfStudent=batch['noOfStudent'], year_id=year_id)
-                    self.db.add(new_batch)
-            
-            await self.db.commit()
+                await self.years.bulk_update([{'year_id': year_id, 'academic_year': academic_year}])
+
+            # Check for both 'id' and 'batch_id' fields; batches without one are created
+            changed = [
+                {'batch_id': batch.get('id') or batch.get('batch_id'), 'year_id': year_id, 'section': batch['section'], 'noOfStudent': batch['noOfStudent']}
+                for batch in batch_updates if batch.get('id') or batch.get('batch_id')
+            ]
+            created = [
+                {'year_id': year_id, 'section': batch['section'], 'noOfStudent': batch['noOfStudent']}
+                for batch in batch_updates if not (batch.get('id') or batch.get('batch_id'))
+            ]
+
+            # Matching on the year too, so a batch of another year counts as missing
+            updated = await self.batches.bulk_update(changed, match_on=['batch_id', 'year_id'])
+            updated_batch_ids = {batch.batch_id for batch in updated}
+            missing = [row['batch_id'] for row in changed if row['batch_id'] not in updated_batch_ids]
+            if missing:
+                raise ValueError(f"Batch with ID {missing[0]} does not exist for year {year_id}")
+            await self.batches.bulk_create(created)
+
+            await self.db.flush()
+            if academic_year is not None:
+                entity_cache.invalidate_after_commit(self.db, AcademicYears, [year_id])
+            entity_cache.invalidate_after_commit(self.db, Batches, updated_batch_ids)
         except IntegrityError as e:
-            await self.db.rollback()
             if "uq_year_section" in str(e):
-                raise ValueError(f"Batch section '{batch.get('section', 'unknown')}' already exists for this academic year")
+                raise ValueError("Batch section already exists for this academic year")
             raise e
 
     async def delete_year(self, year_id: int) -> None:
-        # Check if year exists before deleting
-        existing_year = await self.db.execute(select(AcademicYears).where(AcademicYears.year_id == year_id))
-        if not existing_year.scalar_one_or_none():
+        if not await self.years.delete_where(AcademicYears.year_id == year_id):
             raise ValueError(f"Academic year with ID {year_id} does not exist")
-        
-        await self.db.execute(delete(AcademicYears).where(AcademicYears.year_id == year_id))
-        await self.db.commit()
+        await self.db.flush()
+        entity_cache.invalidate_after_commit(self.db, AcademicYears, [year_id])
 
     async def create_batch_for_year(self, year_id: int, section: str, noOfStudent: int) -> int:
         try:
-            batch = Batches(section=section, noOfStudent=noOfStudent, year_id=year_id)
-            self.db.add(batch)
-            await self.db.commit()
-            await self.db.refresh(batch)
+            [batch] = await self.batches.bulk_create([{'section': section, 'noOfStudent': noOfStudent, 'year_id': year_id}])
+            await self.db.flush()
             return batch.batch_id
         except IntegrityError as e:
-            await self.db.rollback()
             if "uq_year_section" in str(e):
                 raise ValueError(f"Batch section '{section}' already exists for this academic year")
             raise e
 
     async def create_subject(self, subject_data: dict) -> int:
-        subject = Subjects(**subject_data)
-        self.db.add(subject)
-        await self.db.commit()
-        await self.db.refresh(subject)
+        [subject] = await self.subjects.bulk_create([subject_data])
+        await self.db.flush()
         return subject.subject_id
 
     async def get_subjects_by_year(self, year_id: int) -> List[Subjects]:
         result = await self.db.execute(select(Subjects).where(Subjects.year_id == year_id))
         return list(result.scalars().all())
 
-    async def get_subject_by_id(self, subject_id: int) -> Optional[Subjects]:
-        result = await self.db.execute(select(Subjects).where(Subjects.subject_id == subject_id))
-        return result.scalar_one_or_none()
-
     async def update_subject(self, subject_id: int, update_data: dict) -> None:
-        await self.db.execute(update(Subjects).where(Subjects.subject_id == subject_id).values(**update_data))
-        await self.db.commit()
+        if not await self.subjects.bulk_update([{'subject_id': subject_id, **update_data}]):
+            raise ValueError(f"Subject with ID {subject_id} does not exist")
+        await self.db.flush()
+        entity_cache.invalidate_after_commit(self.db, Subjects, [subject_id])
 
     async def delete_subject(self, subject_id: int) -> None:
-        # Check if subject exists before deleting
-        existing_subject = await self.db.execute(select(Subjects).where(Subjects.subject_id == subject_id))
-        if not existing_subject.scalar_one_or_none():
+        if not await self.subjects.delete_where(Subjects.subject_id == subject_id):
             raise ValueError(f"Subject with ID {subject_id} does not exist")
-        
-        await self.db.execute(delete(Subjects).where(Subjects.subject_id == subject_id))
-        await self.db.commit()
+        await self.db.flush()
+        entity_cache.invalidate_after_commit(self.db, Subjects, [subject_id])
 
     async def delete_batch(self, batch_id: int) -> None:
-        # Check if batch exists before deleting
-        existing_batch = await self.db.execute(select(Batches).where(Batches.batch_id == batch_id))
-        if not existing_batch.scalar_one_or_none():
+        if not await self.batches.delete_where(Batches.batch_id == batch_id):
             raise ValueError(f"Batch with ID {batch_id} does not exist")
-        
-        await self.db.execute(delete(Batches).where(Batches.batch_id == batch_id))
-        await self.db.commit() 
\ No newline at end of file
+        await self.db.flush()
+        entity_cache.invalidate_after_commit(self.db, Batches, [batch_id])
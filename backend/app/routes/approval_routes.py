@@ -0,0 +1,97 @@
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.db.postgres_client import get_db
+from app.middlewares.auth_middleware import require_roles
+from app.services.approval_service import ApprovalService
+from app.schemas.approval_schema import (
+    ApprovalRequestCreate, ApprovalDecisionRequest, ApprovalQueueResponse,
+    ApprovalRequestResponse, ApprovalDecisionResponse
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/approvals")
+
+def get_service(db: AsyncSession = Depends(get_db)) -> ApprovalService:
+    return ApprovalService(db)
+
+@router.post(
+    "/request",
+    response_model=ApprovalRequestResponse,
+    status_code=status.HTTP_201_CREATED,
+    operation_id="request_approvals",
+    dependencies=[Depends(require_roles("HOD", "TIMETABLE_COORDINATOR"))],
+    responses={
+        201: {"description": "Review requests opened"},
+        400: {"description": "Invalid approver or items"},
+    }
+)
+async def request_approvals(
+    data: ApprovalRequestCreate,
+    service: ApprovalService = Depends(get_service)
+):
+    """
+    Send timetables (step 11) and allocations (step 6) to a HOD for review.
+
+    All requests are opened with one multi-row insert. Items that already have an open
+    request for the same step are skipped.
+    """
+    try:
+        return await service.request_reviews(data)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in request_approvals route: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error occurred while requesting approvals"
+        )
+
+@router.get(
+    "/pending/{approver_id}",
+    response_model=ApprovalQueueResponse,
+    operation_id="get_pending_approvals"
+)
+async def get_pending_approvals(
+    approver_id: int = Path(..., description="ID of the approver", examples=[1]),
+    year_id: Optional[int] = Query(None, description="Only requests of this academic year"),
+    after_id: int = Query(0, ge=0, description="Return requests after this approval ID"),
+    limit: int = Query(50, ge=1, le=200, description="Page size"),
+    service: ApprovalService = Depends(get_service)
+):
+    """Get the open review requests assigned to an approver, oldest first, with keyset pagination"""
+    return await service.get_pending_queue(approver_id, year_id, after_id, limit)
+
+@router.post(
+    "/decide",
+    response_model=ApprovalDecisionResponse,
+    operation_id="decide_approvals",
+    responses={
+        200: {"description": "Decision recorded for every item"},
+        400: {"description": "Invalid approver or items"},
+    }
+)
+async def decide_approvals(
+    data: ApprovalDecisionRequest,
+    user: dict = Depends(require_roles("HOD")),
+    service: ApprovalService = Depends(get_service)
+):
+    """
+    Approve or reject many timetables and allocations in one transaction, as the signed-in HOD.
+
+    The HOD's open requests for the items are closed with one update; items that were never sent
+    for review get the decision recorded with one multi-row insert. Items awaiting another HOD's
+    review are refused.
+    """
+    try:
+        return await service.decide(data, int(user["user_id"]))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in decide_approvals route: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error occurred while recording the decision"
+        )
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Request, Depends
 from fastapi.responses import JSONResponse, RedirectResponse
 from datetime import datetime, timedelta, timezone
+import asyncio
 import httpx
 import json
+import logging
 import redis.asyncio as redis
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.config.config import settings
@@ -14,15 +16,21 @@ from app.services.auth_services import (
     generate_session_id,
     store_session_in_redis,
     get_session_data,
+    exchange_authorization_code,
 )
+from app.services.id_token_service import JwksUnavailable, split_token, verify_google_id_token
 from app.services.user_service import UserService
 from app.repositories.user_repository import UserRepository
 
+logger = logging.getLogger(__name__)
+
 authRoute = APIRouter()
 
 """
 1. Google redirects to your `/auth/callback` with `code` as a query param.
-2. Use this `code` to request tokens (access, refresh, expires_in).
+2. Use this `code` to request tokens (access, refresh, expires_in, id_token).
+   The id_token is verified locally against Google's cached signing keys, which
+   gives the user's identity without calling the userinfo endpoint.
 3. Create a session_id.
 4. Store the session_id as key in Redis with value:
    (access, refresh, expires_in, signed_in=true/false, email,role)
@@ -54,6 +62,12 @@ async def get_user_service(db: AsyncSession = Depends(get_db)) -> UserService:
     return UserService(repository)
 
 
+async def _discard(task) -> None:
+    # The task shares the request's db session, so it must finish before the session is used again
+    if task is not None:
+        await asyncio.gather(task, return_exceptions=True)
+
+
 @authRoute.get(
     "/callback", response_class=RedirectResponse, operation_id="signin_redirect"
 )
@@ -66,24 +80,12 @@ async def signin_redirect(
         return RedirectResponse(url=f"{settings.FRONTEND_BASE_URL}/?error=code_missing")
 
     # Make request to Google's token endpoint
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                "https://oauth2.googleapis.com/token",
-                headers={"Content-Type": "application/x-www-form-urlencoded"},
-                data={
-                    "client_id": settings.GOOGLE_CLIENT_ID,
-                    "client_secret": settings.GOOGLE_CLIENT_SECRET,
-                    "redirect_uri": settings.GOOGLE_REDIRECT_URI,
-                    "code": code,
-                    "grant_type": "authorization_code",
-                },
-            )
-            response.raise_for_status()
-        except httpx.RequestError:
-            return RedirectResponse(
-                url=f"{settings.FRONTEND_BASE_URL}/?error=token_exchange_failed"
-            )
+    try:
+        response = await exchange_authorization_code(code)
+    except httpx.HTTPError:
+        return RedirectResponse(
+            url=f"{settings.FRONTEND_BASE_URL}/?error=token_exchange_failed"
+        )
 
     token_data = response.json()
 
@@ -93,17 +95,46 @@ async def signin_redirect(
         )
 
     access_token = token_data.get("access_token")
+    id_token = token_data.get("id_token")
 
-    userData = await get_userDetails_from_google(access_token)
+    userData = None
+    lookup = None
+    lookup_email = None
 
-    if "error" in userData or "email" not in userData:
-        return RedirectResponse(
-            url=f"{settings.FRONTEND_BASE_URL}/?error=user_info_fetch_failed"
-        )
+    if id_token:
+        try:
+            # The user lookup only needs the email, so it runs while the token is being verified
+            _, claims, _, _ = split_token(id_token)
+            lookup_email = claims.get("email")
+            if lookup_email:
+                lookup = asyncio.create_task(service.get_userby_email(email=lookup_email))
+            userData = await verify_google_id_token(id_token)
+        except ValueError as e:
+            await _discard(lookup)
+            logger.warning(f"Rejected ID token: {str(e)}")
+            return RedirectResponse(
+                url=f"{settings.FRONTEND_BASE_URL}/?error=invalid_id_token"
+            )
+        except JwksUnavailable as e:
+            # Google's signing keys could not be loaded; ask the userinfo endpoint instead
+            logger.warning(f"ID token verification unavailable, using userinfo: {str(e)}")
+
+    if userData is None:
+        userData = await get_userDetails_from_google(access_token)
+
+        if "error" in userData or "email" not in userData:
+            await _discard(lookup)
+            return RedirectResponse(
+                url=f"{settings.FRONTEND_BASE_URL}/?error=user_info_fetch_failed"
+            )
 
     email = userData["email"]
 
-    user_exists = await service.get_userby_email(email=email)
+    if lookup is not None and lookup_email == email:
+        user_exists = await lookup
+    else:
+        await _discard(lookup)
+        user_exists = await service.get_userby_email(email=email)
 
     if user_exists and user_exists.email == email:
         # User exists, create session ID
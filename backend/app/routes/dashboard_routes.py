@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, status
+import redis.asyncio as redis
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.postgres_client import get_db
+from app.db.radis_client import get_binary_redis
+from app.services.dashboard_service import DashboardService
+from app.schemas.dashboard_schema import YearDashboardResponse
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/dashboard")
+
+@router.get(
+    "/year/{year_id}",
+    response_model=YearDashboardResponse,
+    operation_id="get_year_dashboard",
+    responses={
+        200: {"description": "Year dashboard retrieved successfully"},
+    }
+)
+async def get_year_dashboard(
+    request: Request,
+    year_id: int = Path(..., description="ID of the academic year", examples=[1]),
+    db: AsyncSession = Depends(get_db),
+    binary_redis_client: redis.Redis = Depends(get_binary_redis)
+):
+    """
+    Get everything the coordinator dashboard shows for an academic year in one call.
+    
+    - **year_id**: ID of the academic year
+    
+    Returns the workflow stage, batches with their allocation and timetable status, subject counts,
+    priority-submission progress, allocation coverage and timetable status. Computed in a single
+    query and cached for 30 seconds together with its gzip/brotli forms.
+    """
+    try:
+        service = DashboardService(db, binary_redis_client)
+        return await service.get_year_dashboard(year_id, request.headers.get("accept-encoding", ""))
+        
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in get_year_dashboard route: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error occurred while building the dashboard"
+        )
@@ -0,0 +1,33 @@
+from fastapi import APIRouter
+from app.core.single_flight import single_flight_stats
+from app.core.entity_cache import entity_cache
+from app.schemas.metrics_schema import EntityCacheMetricsResponse, SingleFlightMetricsResponse
+
+router = APIRouter(prefix="/metrics")
+
+@router.get(
+    "/single-flight",
+    response_model=SingleFlightMetricsResponse,
+    operation_id="get_single_flight_metrics"
+)
+async def get_single_flight_metrics():
+    """
+    Get how many identical concurrent reads were collapsed into one execution.
+
+    Counters are per worker process and reset when it restarts.
+    """
+    return {"reads": single_flight_stats()}
+
+
+@router.get(
+    "/entity-cache",
+    response_model=EntityCacheMetricsResponse,
+    operation_id="get_entity_cache_metrics"
+)
+async def get_entity_cache_metrics():
+    """
+    Get the hit ratio of the reference-data cache per model.
+
+    Counters are per worker process and reset when it restarts.
+    """
+    return {"enabled": entity_cache.enabled, "models": entity_cache.stats()}
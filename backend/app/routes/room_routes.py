@@ -0,0 +1,196 @@
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from typing import Optional
+import redis.asyncio as redis
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.postgres_client import get_db
+from app.db.radis_client import get_redis
+from app.models.model import RoomTypeEnum
+from app.schemas.lecturer_priority_schema import SuccessResponse
+from app.services.room_service import RoomService
+from app.schemas.room_schema import (
+    RoomCreate,
+    RoomUpdate,
+    RoomResponse,
+    RoomListResponse,
+    FreeRoomsResponse,
+    RoomAvailabilityResponse,
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/rooms")
+
+def get_service(db: AsyncSession = Depends(get_db), redis_client: redis.Redis = Depends(get_redis)) -> RoomService:
+    return RoomService(db, redis_client)
+
+@router.post(
+    "/",
+    response_model=SuccessResponse,
+    status_code=status.HTTP_201_CREATED,
+    operation_id="create_room",
+    responses={
+        201: {"description": "Room created successfully"},
+    }
+)
+async def create_room(
+    room_data: RoomCreate,
+    service: RoomService = Depends(get_service)
+):
+    """
+    Register a room that can be used as an allocation venue.
+    
+    - **room_name**: Room name, matching the venue text used on allocations
+    - **room_type**: LAB or LECTURE
+    - **capacity**: Number of students the room can seat
+    """
+    try:
+        room_id = await service.create_room(room_data)
+        return SuccessResponse(message="Room created successfully", data=room_id)
+        
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in create_room route: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error occurred while creating room"
+        )
+
+@router.get(
+    "/",
+    response_model=RoomListResponse,
+    operation_id="get_rooms",
+)
+async def get_rooms(
+    room_type: Optional[RoomTypeEnum] = Query(None, description="Only rooms of this type"),
+    min_capacity: Optional[int] = Query(None, gt=0, description="Only rooms seating at least this many students", examples=[60]),
+    service: RoomService = Depends(get_service)
+):
+    """
+    List rooms, optionally filtered by type and minimum capacity.
+    """
+    try:
+        return await service.get_rooms(room_type=room_type, min_capacity=min_capacity)
+        
+    except Exception as e:
+        logger.error(f"Error in get_rooms route: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error occurred while retrieving rooms"
+        )
+
+@router.get(
+    "/free/year/{year_id}",
+    response_model=FreeRoomsResponse,
+    operation_id="find_free_rooms",
+    responses={
+        200: {"description": "Free rooms retrieved successfully"},
+    }
+)
+async def find_free_rooms(
+    year_id: int = Path(..., description="ID of the academic year", examples=[1]),
+    day: str = Query(..., description="Day of the week", examples=["monday"]),
+    period: int = Query(..., ge=1, description="1-based period index within the day", examples=[3]),
+    batch_id: Optional[int] = Query(None, description="Only rooms that can seat this batch", examples=[1]),
+    room_type: Optional[RoomTypeEnum] = Query(None, description="Only rooms of this type"),
+    service: RoomService = Depends(get_service)
+):
+    """
+    Find the rooms with no booking in a slot of an academic year.
+    
+    - **year_id**: ID of the academic year
+    - **day** / **period**: The slot to check
+    - **batch_id**: Optional batch whose strength the room must seat
+    - **room_type**: Optional LAB or LECTURE filter
+    
+    Availability is read from per-room occupancy bitmaps, one bit per slot.
+    """
+    try:
+        return await service.find_free_rooms(year_id, day, period, batch_id=batch_id, room_type=room_type)
+        
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in find_free_rooms route: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error occurred while finding free rooms"
+        )
+
+@router.get(
+    "/{room_id}/availability/year/{year_id}",
+    response_model=RoomAvailabilityResponse,
+    operation_id="get_room_availability",
+)
+async def get_room_availability(
+    room_id: int = Path(..., description="ID of the room", examples=[1]),
+    year_id: int = Path(..., description="ID of the academic year", examples=[1]),
+    day: str = Query(..., description="Day of the week", examples=["monday"]),
+    period: int = Query(..., ge=1, description="1-based period index within the day", examples=[3]),
+    service: RoomService = Depends(get_service)
+):
+    """
+    Check whether a room is free in a slot of an academic year.
+    """
+    try:
+        return await service.is_room_free(year_id, room_id, day, period)
+        
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in get_room_availability route: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error occurred while checking room availability"
+        )
+
+@router.put(
+    "/{room_id}",
+    response_model=RoomResponse,
+    operation_id="update_room",
+)
+async def update_room(
+    room_data: RoomUpdate,
+    room_id: int = Path(..., description="ID of the room", examples=[1]),
+    service: RoomService = Depends(get_service)
+):
+    """
+    Update a room's name, type, capacity or active flag.
+    """
+    try:
+        return await service.update_room(room_id, room_data)
+        
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in update_room route: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error occurred while updating room"
+        )
+
+@router.delete(
+    "/{room_id}",
+    response_model=SuccessResponse,
+    operation_id="delete_room",
+)
+async def delete_room(
+    room_id: int = Path(..., description="ID of the room", examples=[1]),
+    service: RoomService = Depends(get_service)
+):
+    """
+    Delete a room. Allocations keep their venue text.
+    """
+    try:
+        await service.delete_room(room_id)
+        return SuccessResponse(message="Room deleted successfully", data=room_id)
+        
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in delete_room route: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error occurred while deleting room"
+        )
@@ -0,0 +1,116 @@
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+import redis.asyncio as redis
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.postgres_client import get_db
+from app.db.radis_client import get_redis
+from app.middlewares.auth_middleware import require_roles
+from app.services.snapshot_service import SnapshotService
+from app.schemas.snapshot_schema import (
+    SnapshotCreateRequest, SnapshotCreateResponse, SnapshotListResponse,
+    SnapshotRollbackResponse, SnapshotDiffResponse
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/snapshots")
+
+def get_service(db: AsyncSession = Depends(get_db), redis_client: redis.Redis = Depends(get_redis)) -> SnapshotService:
+    return SnapshotService(db, redis_client)
+
+@router.post(
+    "/year/{year_id}",
+    response_model=SnapshotCreateResponse,
+    status_code=status.HTTP_201_CREATED,
+    operation_id="create_year_snapshot",
+    dependencies=[Depends(require_roles("HOD", "TIMETABLE_COORDINATOR"))],
+    responses={
+        201: {"description": "Snapshot captured, or the unchanged active version returned"},
+        400: {"description": "Academic year not found"},
+    }
+)
+async def create_year_snapshot(
+    data: SnapshotCreateRequest,
+    year_id: int = Path(..., description="ID of the academic year", examples=[1]),
+    service: SnapshotService = Depends(get_service)
+):
+    """
+    Capture the current allocations and timetables of a year as a new version.
+
+    - **year_id**: ID of the academic year
+    - **label**: Optional note about the version
+
+    Content is stored once per sha256 hash, so versions that share allocations or timetables
+    share storage. When nothing changed since the active version no new version is created.
+    """
+    try:
+        return await service.create_snapshot(year_id, data.label)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in create_year_snapshot route: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error occurred while capturing the snapshot"
+        )
+
+@router.get(
+    "/year/{year_id}",
+    response_model=SnapshotListResponse,
+    operation_id="list_year_snapshots"
+)
+async def list_year_snapshots(
+    year_id: int = Path(..., description="ID of the academic year", examples=[1]),
+    service: SnapshotService = Depends(get_service)
+):
+    """Get the versions of a year, newest first, with the active one marked"""
+    return await service.list_snapshots(year_id)
+
+@router.post(
+    "/year/{year_id}/rollback/{version_no}",
+    response_model=SnapshotRollbackResponse,
+    operation_id="rollback_year_snapshot",
+    dependencies=[Depends(require_roles("HOD", "TIMETABLE_COORDINATOR"))],
+    responses={
+        200: {"description": "Year restored to the version"},
+        400: {"description": "Version not found or the restored timetables have venue conflicts"},
+    }
+)
+async def rollback_year_snapshot(
+    year_id: int = Path(..., description="ID of the academic year", examples=[1]),
+    version_no: int = Path(..., description="Version number to restore", examples=[2]),
+    service: SnapshotService = Depends(get_service)
+):
+    """
+    Make a version active again and restore the year's allocations and timetables from it.
+
+    Timetables keep their IDs and get a new version number; timetables created after the
+    version are deleted. Timetable slots, schedule caches and room occupancy are rebuilt.
+    """
+    try:
+        return await service.rollback(year_id, version_no)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in rollback_year_snapshot route: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error occurred while restoring the snapshot"
+        )
+
+@router.get(
+    "/year/{year_id}/diff",
+    response_model=SnapshotDiffResponse,
+    operation_id="diff_year_snapshots"
+)
+async def diff_year_snapshots(
+    year_id: int = Path(..., description="ID of the academic year", examples=[1]),
+    from_version: int = Query(..., description="Older version number", examples=[2]),
+    to_version: int = Query(..., description="Newer version number", examples=[3]),
+    service: SnapshotService = Depends(get_service)
+):
+    """Get the allocations and timetable cells that differ between two versions, computed in SQL"""
+    try:
+        return await service.diff(year_id, from_version, to_version)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
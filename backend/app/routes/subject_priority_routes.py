@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, Path, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+import redis.asyncio as redis
 from app.db.postgres_client import get_db
+from app.db.radis_client import get_binary_redis, get_redis
+from app.middlewares.auth_middleware import require_roles
 from app.repositories.lecturer_priority_repository import FacultyPriorityRepository
 from app.services.lecturer_priority_service import FacultyPriorityService
 from app.schemas.lecturer_priority_schema import (
     FacultyPrioritySubmitRequest,
     FacultyPriorityUpdateRequest,
+    FacultyPriorityReorderRequest,
     FacultyPriorityResponse,
     FacultyPriorityWithDetailsListResponse,
     SuccessResponse,
@@ -13,14 +18,22 @@ from app.schemas.lecturer_priority_schema import (
     AllocationResultResponse,
     AllocationResponse,
     AllocationUpdateRequest,
-    FacultyPriorityDetailResponse
+    FacultyPriorityDetailResponse,
+    PrioritySubmissionStatusResponse,
+    PriorityHeatmapResponse,
+    AllocationSimulationRequest,
+    AllocationSimulationResponse
 )
 
 subject_priority_router = APIRouter()
 
-def get_service(db: AsyncSession = Depends(get_db)) -> FacultyPriorityService:
+def get_service(
+    db: AsyncSession = Depends(get_db),
+    redis_client: redis.Redis = Depends(get_redis),
+    binary_redis_client: redis.Redis = Depends(get_binary_redis)
+) -> FacultyPriorityService:
     repository = FacultyPriorityRepository(db)
-    return FacultyPriorityService(repository)
+    return FacultyPriorityService(repository, redis_client, binary_redis_client)
 
 @subject_priority_router.post("/submit", response_model=SuccessResponse, operation_id="submit_faculty_priorities")
 async def submit_priorities(
@@ -46,6 +59,20 @@ async def update_priorities(
     await service.update_priority(faculty_id, year_id, data.subject1_id, data.batch1_id, data.priority1, data.subject2_id, data.batch2_id, data.priority2)
     return SuccessResponse(message="Priorities updated successfully",data=faculty_id)
 
+@subject_priority_router.put("/reorder/{faculty_id}/{year_id}", response_model=SuccessResponse, operation_id="reorder_faculty_priorities")
+async def reorder_priorities(
+    data: FacultyPriorityReorderRequest,
+    faculty_id: int = Path(..., description="ID of the faculty"),
+    year_id: int = Path(..., description="ID of the year"),
+    service: FacultyPriorityService = Depends(get_service)
+):
+    """Reorder all of a faculty's priorities for a year in one update"""
+    try:
+        await service.reorder_priorities(faculty_id, year_id, [entry.dict() for entry in data.order])
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return SuccessResponse(message="Priorities reordered successfully",data=faculty_id)
+
 @subject_priority_router.delete("/delete/{priority_id}", response_model=SuccessResponse, operation_id="delete_faculty_priority")
 async def delete_priority(
     priority_id: int = Path(..., description="ID of the priority"),
@@ -84,9 +111,27 @@ async def get_all_priorities_by_year(
     service: FacultyPriorityService = Depends(get_service)
 ):
     """Get all priorities for a year with detailed information"""
-    return await service.get_all_priorities_by_year_with_details(year_id)
+    # Built by the repository in the response shape; returning the response skips re-validating every row
+    return ORJSONResponse(await service.get_all_priorities_by_year_with_details(year_id))
+
+@subject_priority_router.get("/submission-status/{year_id}", response_model=PrioritySubmissionStatusResponse, operation_id="get_priority_submission_status")
+async def get_priority_submission_status(
+    year_id: int = Path(..., description="ID of the year"),
+    service: FacultyPriorityService = Depends(get_service)
+):
+    """Get which faculty have and have not submitted priorities for a year, with demand per subject and batch"""
+    return await service.get_submission_status(year_id)
 
-@subject_priority_router.post("/allocate-subjects/{year_id}", response_model=AllocationResultResponse, operation_id="auto_allocate_subjects_for_year")
+@subject_priority_router.get("/heatmap/{year_id}", response_model=PriorityHeatmapResponse, operation_id="get_priority_heatmap")
+async def get_priority_heatmap(
+    request: Request,
+    year_id: int = Path(..., description="ID of the year"),
+    service: FacultyPriorityService = Depends(get_service)
+):
+    """Get the subject x batch demand matrix per priority level, contention scores and the slots allocation would leave unfilled"""
+    return await service.get_priority_heatmap(year_id, request.headers.get("accept-encoding", ""))
+
+@subject_priority_router.post("/allocate-subjects/{year_id}", response_model=AllocationResultResponse, operation_id="auto_allocate_subjects_for_year", dependencies=[Depends(require_roles("HOD", "TIMETABLE_COORDINATOR"))])
 async def auto_allocate_subjects_for_year(
     year_id: int = Path(..., description="ID of the year"),
     service: FacultyPriorityService = Depends(get_service)
@@ -94,6 +139,18 @@ async def auto_allocate_subjects_for_year(
     """Automatically allocate subjects to faculty based on priorities and seniority"""
     return await service.allocate_subjects_for_year(year_id)
 
+@subject_priority_router.post("/simulate-allocation/{year_id}", response_model=AllocationSimulationResponse, operation_id="simulate_subject_allocation")
+async def simulate_subject_allocation(
+    data: AllocationSimulationRequest,
+    year_id: int = Path(..., description="ID of the year"),
+    service: FacultyPriorityService = Depends(get_service)
+):
+    """Compare allocation scenarios on the year's current priorities without saving any allocation"""
+    try:
+        return await service.simulate_allocations(year_id, data.scenarios)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
 @subject_priority_router.get("/allocated-ordered/{year_id}", response_model=AllocationResponse, operation_id="get_allocated_ordered_by_seniority")
 async def get_allocated_ordered_by_seniority(
     year_id: int = Path(..., description="ID of the year"),
@@ -108,19 +165,23 @@ async def get_allocations_by_year(
     service: FacultyPriorityService = Depends(get_service)
 ):
     """Get all allocations for a specific year with details"""
-    return await service.get_allocations_by_year_with_details(year_id)
+    # Built by the repository in the response shape; returning the response skips re-validating every row
+    return ORJSONResponse(await service.get_allocations_by_year_with_details(year_id))
 
-@subject_priority_router.put("/allocations", response_model=SuccessResponse, operation_id="update_allocations")
+@subject_priority_router.put("/allocations", response_model=SuccessResponse, operation_id="update_allocations", dependencies=[Depends(require_roles("HOD", "TIMETABLE_COORDINATOR"))])
 async def update_allocations_by_year_and_batch(
     allocation_data: AllocationUpdateRequest,
     service: FacultyPriorityService = Depends(get_service)
 ):
     """Update allocation by year_id and batch_id"""
-    await service.update_allocation_faculty(
-        allocation_data.allocation_id,
-        allocation_data.faculty_id,
-        co_faculty_id=allocation_data.co_faculty_id,
-        venue=allocation_data.venue
-    )
+    try:
+        await service.update_allocation_faculty(
+            allocation_data.allocation_id,
+            allocation_data.faculty_id,
+            co_faculty_id=allocation_data.co_faculty_id,
+            venue=allocation_data.venue
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     return SuccessResponse(message="Allocation updated successfully",data=allocation_data.allocation_id)
 
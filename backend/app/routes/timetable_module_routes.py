@@ -1,14 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, Path, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, WebSocket, WebSocketDisconnect, status
+from typing import Optional
+import json
+import redis.asyncio as redis
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.postgres_client import get_db
+from app.db.radis_client import get_redis
+from app.middlewares.auth_middleware import auth_dependency, websocket_auth
 from app.schemas.lecturer_priority_schema import SuccessResponse
 from app.services.timetable_module_service import TimetableModuleService
+from app.services.timetable_event_service import TimetableEventPublisher, timetable_event_hub
 from app.schemas.timetable_module_schema import (
     TimetableModuleCreate,
     TimetableModuleUpdate,
     TimetableModuleResponse,
     TimetableModuleListResponse,
+    TimetableSlotLookupResponse,
+    TimetableCellPatchRequest,
+    TimetableCellPatchResponse,
 )
+from app.core.exceptions import ConflictException
 import logging
 
 logger = logging.getLogger(__name__)
@@ -26,7 +36,8 @@ router = APIRouter(prefix="/timetable-modules")
 )
 async def create_timetable_module(
     timetable_data: TimetableModuleCreate,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    redis_client: redis.Redis = Depends(get_redis)
 ):
     """
     Create a new timetable module.
@@ -39,7 +50,7 @@ async def create_timetable_module(
     Returns the created timetable module with all related details.
     """
     try:
-        service = TimetableModuleService(db)
+        service = TimetableModuleService(db, redis_client)
         
         # Validate timetable data structure
         if not service.validate_timetable_data(timetable_data.timetable_data):
@@ -147,6 +158,195 @@ async def get_timetable_by_year_and_batch(
             detail="Internal server error occurred while retrieving timetable"
         )
 
+@router.get(
+    "/lookup/year/{year_id}",
+    response_model=TimetableSlotLookupResponse,
+    operation_id="lookup_timetable_slots",
+    responses={
+        200: {"description": "Matching timetable slots retrieved successfully"},
+    }
+)
+async def lookup_timetable_slots(
+    year_id: int = Path(..., description="ID of the academic year", examples=[1]),
+    subject_id: Optional[int] = Query(None, description="Find the slots of this subject", examples=[1]),
+    faculty_id: Optional[int] = Query(None, description="Find the slots taught by this faculty", examples=[3]),
+    day: Optional[str] = Query(None, description="Restrict the lookup to one day", examples=["monday"]),
+    period: Optional[int] = Query(None, ge=1, description="Restrict the lookup to one period (starting from 1)", examples=[3]),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Find which batches have a subject or a faculty scheduled, without loading every timetable.
+    
+    - **year_id**: ID of the academic year
+    - **subject_id**: ID of the subject to look up (either this or faculty_id)
+    - **faculty_id**: ID of the faculty to look up (either this or subject_id)
+    - **day**: Optional day filter
+    - **period**: Optional period filter
+    
+    Returns the matching cells with their batch, day and period.
+    """
+    try:
+        service = TimetableModuleService(db)
+        return await service.lookup_slots(year_id, subject_id=subject_id, faculty_id=faculty_id, day=day, period=period)
+        
+    except ValueError as e:
+        logger.error(f"Validation error in lookup_timetable_slots: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error in lookup_timetable_slots route: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error occurred while looking up timetable slots"
+        )
+
+@router.get(
+    "/faculty/{faculty_id}/year/{year_id}/schedule",
+    response_model=TimetableSlotLookupResponse,
+    operation_id="get_faculty_schedule",
+    responses={
+        200: {"description": "Faculty schedule retrieved successfully"},
+    }
+)
+async def get_faculty_schedule(
+    faculty_id: int = Path(..., description="ID of the faculty", examples=[3]),
+    year_id: int = Path(..., description="ID of the academic year", examples=[1]),
+    db: AsyncSession = Depends(get_db),
+    redis_client: redis.Redis = Depends(get_redis)
+):
+    """
+    Get the weekly schedule of a faculty across all batches of an academic year.
+    
+    - **faculty_id**: ID of the faculty (matched as faculty or co-faculty)
+    - **year_id**: ID of the academic year
+    
+    Returns the faculty's slots ordered by day and period.
+    """
+    try:
+        service = TimetableModuleService(db, redis_client)
+        return await service.get_faculty_schedule(year_id, faculty_id)
+        
+    except Exception as e:
+        logger.error(f"Error in get_faculty_schedule route: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error occurred while retrieving faculty schedule"
+        )
+
+@router.get(
+    "/me/year/{year_id}/schedule",
+    response_model=TimetableSlotLookupResponse,
+    operation_id="get_my_schedule",
+    responses={
+        200: {"description": "Schedule of the signed-in faculty retrieved successfully"},
+    }
+)
+async def get_my_schedule(
+    year_id: int = Path(..., description="ID of the academic year", examples=[1]),
+    user: dict = Depends(auth_dependency),
+    db: AsyncSession = Depends(get_db),
+    redis_client: redis.Redis = Depends(get_redis)
+):
+    """
+    Get the weekly schedule of the signed-in faculty across all batches of an academic year.
+    
+    - **year_id**: ID of the academic year
+    
+    Served from the precomputed per-faculty schedule, so a dashboard load is a single cache lookup.
+    """
+    try:
+        service = TimetableModuleService(db, redis_client)
+        return await service.get_faculty_schedule(year_id, user["user_id"])
+        
+    except Exception as e:
+        logger.error(f"Error in get_my_schedule route: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error occurred while retrieving faculty schedule"
+        )
+
+@router.get(
+    "/venue/year/{year_id}/schedule",
+    response_model=TimetableSlotLookupResponse,
+    operation_id="get_venue_schedule",
+    responses={
+        200: {"description": "Venue schedule retrieved successfully"},
+    }
+)
+async def get_venue_schedule(
+    year_id: int = Path(..., description="ID of the academic year", examples=[1]),
+    venue: str = Query(..., min_length=1, description="Venue to look up", examples=["Room 101"]),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get the weekly schedule of a venue across all batches of an academic year.
+    
+    - **year_id**: ID of the academic year
+    - **venue**: Venue name as stored on the allocations
+    
+    Returns the venue's slots ordered by day and period.
+    """
+    try:
+        service = TimetableModuleService(db)
+        return await service.get_venue_schedule(year_id, venue)
+        
+    except Exception as e:
+        logger.error(f"Error in get_venue_schedule route: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error occurred while retrieving venue schedule"
+        )
+
+@router.websocket("/ws/year/{year_id}")
+async def timetable_events(
+    websocket: WebSocket,
+    year_id: int = Path(..., description="ID of the academic year"),
+    last_seq: Optional[int] = Query(None, ge=0, description="Sequence number of the last event the client saw"),
+    redis_client: redis.Redis = Depends(get_redis)
+):
+    """
+    Stream timetable and allocation change events of an academic year.
+    
+    - **year_id**: ID of the academic year
+    - **last_seq**: On reconnect, the last sequence number received; missed events are replayed first
+    
+    Every message is JSON with seq, year_id, type and data. Clients should ignore events whose seq they
+    have already applied. A "resync_required" message means the missed events are no longer kept and the
+    timetables of the year must be reloaded once.
+    """
+    user = await websocket_auth(websocket, redis_client)
+    if not user:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    try:
+        # The subscription is confirmed before the backlog is read, so nothing published in
+        # between is lost; live events wait until the replay has been sent
+        await timetable_event_hub.connect(year_id, websocket, replaying=last_seq is not None)
+        if last_seq is not None:
+            events = await TimetableEventPublisher(redis_client).replay(year_id, last_seq)
+            if events is None:
+                await websocket.send_json({"type": "resync_required", "year_id": year_id})
+                await timetable_event_hub.release(websocket, 0)
+            else:
+                for event in events:
+                    await websocket.send_text(event)
+                await timetable_event_hub.release(websocket, json.loads(events[-1])["seq"] if events else last_seq)
+
+        while True:
+            # The channel is server-to-client; incoming frames only keep the connection alive
+            await websocket.receive_text()
+
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Error in timetable_events websocket for year {year_id}: {str(e)}")
+    finally:
+        await timetable_event_hub.disconnect(year_id, websocket)
+
 @router.get(
     "/{timetable_id}",
     response_model=TimetableModuleResponse,
@@ -198,18 +398,20 @@ async def get_timetable_by_id(
 async def update_timetable_module(
     update_data: TimetableModuleUpdate,
     timetable_id: int = Path(..., description="ID of the timetable",examples=[1]),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    redis_client: redis.Redis = Depends(get_redis)
 ):
     """
     Update a timetable module.
     
     - **timetable_id**: ID of the timetable to update
     - **timetable_data**: Updated JSON structure containing daily subject schedules
+    - **expected_version**: Optional version the edit was based on; a stale version is rejected with 409
     
     Returns the updated timetable module with all related details.
     """
     try:
-        service = TimetableModuleService(db)
+        service = TimetableModuleService(db, redis_client)
         
         # Validate timetable data structure
         if not service.validate_timetable_data(update_data.timetable_data):
@@ -230,6 +432,11 @@ async def update_timetable_module(
         
     except HTTPException:
         raise
+    except ConflictException as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": e.user_message, "current_version": e.details["current_version"]}
+        )
     except ValueError as e:
         logger.error(f"Validation error in update_timetable_module: {str(e)}")
         raise HTTPException(
@@ -243,6 +450,63 @@ async def update_timetable_module(
             detail="Internal server error occurred while updating timetable module"
         )
 
+@router.patch(
+    "/{timetable_id}/cells",
+    response_model=TimetableCellPatchResponse,
+    operation_id="patch_timetable_cells",
+    responses={
+        200: {"description": "Timetable cells updated successfully"},
+        409: {"description": "Timetable was changed since expected_version; the body carries current_version"},
+    }
+)
+async def patch_timetable_cells(
+    patch: TimetableCellPatchRequest,
+    timetable_id: int = Path(..., description="ID of the timetable", examples=[1]),
+    db: AsyncSession = Depends(get_db),
+    redis_client: redis.Redis = Depends(get_redis)
+):
+    """
+    Overwrite individual cells of a timetable.
+    
+    - **timetable_id**: ID of the timetable to edit
+    - **expected_version**: Version the edits were based on
+    - **changes**: List of cells (day, period, value) to overwrite
+    
+    The cells are written server-side in one compare-and-swap update, so concurrent editors
+    never overwrite each other silently. Returns the new version.
+    """
+    try:
+        service = TimetableModuleService(db, redis_client)
+        result = await service.patch_timetable_cells(timetable_id, patch)
+        
+        if not result:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Timetable not found with ID: {timetable_id}"
+            )
+        
+        return result
+        
+    except HTTPException:
+        raise
+    except ConflictException as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": e.user_message, "current_version": e.details["current_version"]}
+        )
+    except ValueError as e:
+        logger.error(f"Validation error in patch_timetable_cells: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error in patch_timetable_cells route: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error occurred while updating timetable cells"
+        )
+
 @router.delete(
     "/{timetable_id}",
     response_model=SuccessResponse,
@@ -253,7 +517,8 @@ async def update_timetable_module(
 )
 async def delete_timetable_module(
     timetable_id: int = Path(..., description="ID of the timetable",examples=[1]),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    redis_client: redis.Redis = Depends(get_redis)
 ):
     """
     Delete a timetable module.
@@ -263,7 +528,7 @@ async def delete_timetable_module(
     Returns confirmation of deletion.
     """
     try:
-        service = TimetableModuleService(db)
+        service = TimetableModuleService(db, redis_client)
         result = await service.delete_timetable_module(timetable_id)
         
         if not result:
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Path, Request, Depends
 from app.core.response_formatter import ResponseFormatter
-from app.middlewares.auth_middleware import auth_dependency, mock_coordinator_auth_dependency
+from app.middlewares.auth_middleware import auth_dependency, mock_coordinator_auth_dependency, require_roles
+from app.db.radis_client import get_redis
+import redis.asyncio as redis
 from app.services.user_service import UserService
 from app.repositories.user_repository import UserRepository
 from app.db.postgres_client import get_db
@@ -21,10 +23,10 @@ query the db for details
 """
 
 
-async def get_user_service(db: AsyncSession = Depends(get_db)) -> UserService:
+async def get_user_service(db: AsyncSession = Depends(get_db), redis_client: redis.Redis = Depends(get_redis)) -> UserService:
     """Dependency to get UserService instance."""
     repository = UserRepository(db)
-    return UserService(repository)
+    return UserService(repository, redis_client)
     
 
 @user_router.get("/me", operation_id="get_current_user")
@@ -92,7 +94,7 @@ async def get_user_by_id(
     user_response = UserResponse.model_validate(result)
     return user_response
 
-@user_router.put("/update/{user_id}", response_model=SuccessResponse, operation_id="update_user_details")
+@user_router.put("/update/{user_id}", response_model=SuccessResponse, operation_id="update_user_details", dependencies=[Depends(require_roles("HOD"))])
 async def update_user_details(
     user_data: UpdateUserData,
     user_id: int = Path(..., description="ID of the user",examples=[1]),
@@ -104,7 +106,7 @@ async def update_user_details(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@user_router.delete("/delete/{user_id}", response_model=SuccessResponse, operation_id="delete_user")
+@user_router.delete("/delete/{user_id}", response_model=SuccessResponse, operation_id="delete_user", dependencies=[Depends(require_roles("HOD"))])
 async def delete_user(
     user_id: int = Path(..., description="ID of the user",examples=[1]),
     service: UserService = Depends(get_user_service)
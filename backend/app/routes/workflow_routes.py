@@ -1,20 +1,32 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
+from typing import List, Optional
+import redis.asyncio as redis
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.postgres_client import get_db
-from app.schemas.workflow_schema import WorkflowStageCreate
+from app.db.radis_client import get_redis
+from app.middlewares.auth_middleware import require_roles
+from app.schemas.workflow_schema import WorkflowStageCreate, WorkflowGuardResponse, WorkflowTransitionResponse, FeasibilityResponse
 from app.services.workflow_service import WorkflowService
+from app.services.feasibility_service import FeasibilityService
 from app.schemas.lecturer_priority_schema import SuccessResponse
 
 workflow_router = APIRouter(prefix="/workflow", tags=["Workflow Management"])
 
 
+def get_service(db: AsyncSession = Depends(get_db), redis_client: redis.Redis = Depends(get_redis)) -> WorkflowService:
+    return WorkflowService(db, redis_client)
+
+
+def get_feasibility_service(db: AsyncSession = Depends(get_db)) -> FeasibilityService:
+    return FeasibilityService(db)
+
+
 @workflow_router.post("/create", response_model=SuccessResponse, operation_id="create_workflow_stage")
 async def create_workflow_stage(
     workflow_data: WorkflowStageCreate,
-    db: AsyncSession = Depends(get_db),
+    service: WorkflowService = Depends(get_service),
 ):
     """Create a new workflow stage for an academic year"""
-    service = WorkflowService(db)
     result = await service.create_workflow_stage(workflow_data)
     return SuccessResponse(message="Workflow stage created successfully",data=result)
 
@@ -22,29 +34,55 @@ async def create_workflow_stage(
 @workflow_router.get("/year/{year_id}", operation_id="get_workflow_stage_by_year")
 async def get_workflow_stage_by_year(
     year_id: int,
-    db: AsyncSession = Depends(get_db),
+    service: WorkflowService = Depends(get_service),
 ):
     """Get workflow stage for a specific academic year"""
-    service = WorkflowService(db)
     return await service.get_workflow_stage_by_year(year_id)
 
 
-@workflow_router.put("/increment/{year_id}", operation_id="increment_workflow_step")
+@workflow_router.get("/year/{year_id}/guards", response_model=WorkflowGuardResponse, operation_id="get_workflow_next_step_guards")
+async def get_workflow_next_step_guards(
+    year_id: int,
+    service: WorkflowService = Depends(get_service),
+):
+    """Check whether the workflow can move to its next step and list what is blocking it"""
+    return await service.get_next_step_guards(year_id)
+
+
+@workflow_router.get("/year/{year_id}/feasibility", response_model=FeasibilityResponse, operation_id="get_workflow_feasibility")
+async def get_workflow_feasibility(
+    year_id: int,
+    max_hours_per_faculty: Optional[int] = Query(None, gt=0, description="Weekly hour cap per faculty; without it each faculty takes one subject-batch, as in the allocation run"),
+    service: FeasibilityService = Depends(get_feasibility_service),
+):
+    """Check whether faculty picks can cover every subject-batch and whether each batch's format has the periods its subjects need"""
+    return await service.analyze(year_id, max_hours_per_faculty=max_hours_per_faculty)
+
+
+@workflow_router.get("/year/{year_id}/transitions", response_model=List[WorkflowTransitionResponse], operation_id="get_workflow_transitions")
+async def get_workflow_transitions(
+    year_id: int,
+    service: WorkflowService = Depends(get_service),
+):
+    """Get the step transition history of an academic year"""
+    return await service.get_transitions(year_id)
+
+
+@workflow_router.put("/increment/{year_id}", operation_id="increment_workflow_step", dependencies=[Depends(require_roles("HOD", "TIMETABLE_COORDINATOR"))])
 async def increment_workflow_step(
     year_id: int,
-    db: AsyncSession = Depends(get_db),
+    expected_step: Optional[int] = Query(None, ge=1, description="Step the caller believes the workflow is at; a mismatch returns 409"),
+    service: WorkflowService = Depends(get_service),
 ):
-    """Increment the current workflow step by 1"""
-    service = WorkflowService(db)
-    return await service.increment_step(year_id)
+    """Increment the current workflow step by 1 if the next step's preconditions hold"""
+    return await service.increment_step(year_id, expected_step=expected_step)
 
 
-@workflow_router.put("/complete/{year_id}", response_model=SuccessResponse, operation_id="complete_workflow")
+@workflow_router.put("/complete/{year_id}", response_model=SuccessResponse, operation_id="complete_workflow", dependencies=[Depends(require_roles("HOD"))])
 async def complete_workflow(
     year_id: int,
-    db: AsyncSession = Depends(get_db),
+    service: WorkflowService = Depends(get_service),
 ):
     """Mark workflow as completed"""
-    service = WorkflowService(db)
     await service.complete_workflow(year_id) 
-    return SuccessResponse(message="Workflow completed successfully",data=year_id)
\ No newline at end of file
+    return SuccessResponse(message="Workflow completed successfully",data=year_id)
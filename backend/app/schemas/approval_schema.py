@@ -0,0 +1,71 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Literal, Optional
+from datetime import datetime
+
+MAX_APPROVAL_ITEMS = 500
+
+class ApprovalTargets(BaseModel):
+    """Timetables and allocations a review request or decision applies to"""
+    timetable_ids: List[int] = Field(default_factory=list, description="Timetables to review at step 11", examples=[[1, 2]])
+    allocation_ids: List[int] = Field(default_factory=list, description="Allocations to review at step 6", examples=[[10, 11, 12]])
+
+    @model_validator(mode="after")
+    def check_targets(self):
+        total = len(set(self.timetable_ids)) + len(set(self.allocation_ids))
+        if total == 0:
+            raise ValueError("At least one timetable or allocation is required")
+        if total > MAX_APPROVAL_ITEMS:
+            raise ValueError(f"At most {MAX_APPROVAL_ITEMS} items can be sent in one request")
+        return self
+
+class ApprovalRequestCreate(ApprovalTargets):
+    """Schema for sending items to an approver"""
+    year_id: int = Field(..., description="ID of the academic year", examples=[1])
+    approver_id: int = Field(..., description="ID of the HOD who should review the items", examples=[1])
+
+class ApprovalDecisionRequest(ApprovalTargets):
+    """Schema for approving or rejecting many items at once"""
+    year_id: int = Field(..., description="ID of the academic year", examples=[1])
+    decision: Literal["APPROVED", "REJECTED"] = Field(..., description="Decision for every item", examples=["APPROVED"])
+    comment: Optional[str] = Field(None, max_length=1000, description="Remark stored with the decision", examples=["Looks good"])
+
+class ApprovalResponse(BaseModel):
+    """Schema for an approval record"""
+    approval_id: int = Field(..., description="ID of the approval", examples=[1])
+    year_id: int = Field(..., description="ID of the academic year", examples=[1])
+    timetable_id: Optional[int] = Field(None, description="Timetable under review", examples=[1])
+    allocation_id: Optional[int] = Field(None, description="Allocation under review", examples=[None])
+    approval_status: str = Field(..., description="PENDING, APPROVED or REJECTED", examples=["PENDING"])
+    approval_stage: str = Field(..., description="Workflow step of the review", examples=["STEP_11_HOD_EDIT_AND_UPDATE_TIMETABLE"])
+    approved_by: int = Field(..., description="Assigned approver, or the user who decided", examples=[1])
+    comment: Optional[str] = Field(None, description="Remark stored with the decision")
+    decided_at: Optional[datetime] = Field(None, description="When the decision was made")
+    created_at: datetime = Field(..., description="When the record was created")
+
+class PendingApprovalItem(ApprovalResponse):
+    """Schema for an open request in an approver's queue"""
+    batch_id: Optional[int] = Field(None, description="Batch the item belongs to", examples=[1])
+    section: Optional[str] = Field(None, description="Section of the batch", examples=["A"])
+    subject_id: Optional[int] = Field(None, description="Subject of an allocation", examples=[3])
+    subject_name: Optional[str] = Field(None, description="Name of the subject of an allocation", examples=["Computer Networks"])
+    faculty_id: Optional[int] = Field(None, description="Faculty of an allocation", examples=[5])
+    faculty_name: Optional[str] = Field(None, description="Name of the faculty of an allocation", examples=["Prof. Faculty 1"])
+
+class ApprovalQueueResponse(BaseModel):
+    """Schema for a page of an approver's pending queue"""
+    approver_id: int = Field(..., description="ID of the approver", examples=[1])
+    items: List[PendingApprovalItem] = Field(..., description="Open requests, oldest first")
+    next_after_id: Optional[int] = Field(None, description="Cursor for the next page, None on the last page", examples=[42])
+
+class ApprovalRequestResponse(BaseModel):
+    """Schema for the result of sending items for review"""
+    requested_count: int = Field(..., description="Requests opened", examples=[3])
+    skipped_count: int = Field(..., description="Items that already had an open request", examples=[0])
+    approvals: List[ApprovalResponse] = Field(..., description="Requests opened")
+
+class ApprovalDecisionResponse(BaseModel):
+    """Schema for the result of a batched decision"""
+    decision: str = Field(..., description="Decision recorded", examples=["APPROVED"])
+    decided_count: int = Field(..., description="Items decided", examples=[3])
+    closed_pending_count: int = Field(..., description="Open requests closed by the decision", examples=[2])
+    approvals: List[ApprovalResponse] = Field(..., description="Approval records written")
@@ -0,0 +1,37 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+class DashboardBatch(BaseModel):
+    """Schema for a batch row on the year dashboard"""
+    batch_id: int = Field(..., description="ID of the batch", examples=[1])
+    section: str = Field(..., description="Section name of the batch", examples=["A"])
+    noOfStudent: int = Field(..., description="Number of students in the batch", examples=[60])
+    allocated_subjects: int = Field(..., description="Subjects with a faculty allocated for this batch", examples=[6])
+    timetable_count: int = Field(0, description="Timetables created for the batch, one per format", examples=[1])
+    timetable_id: Optional[int] = Field(None, description="ID of the batch's latest timetable, if created", examples=[1])
+    timetable_version: Optional[int] = Field(None, description="Current version of the batch's latest timetable", examples=[3])
+
+class DashboardWorkflow(BaseModel):
+    """Schema for the workflow section of the year dashboard"""
+    current_step: Optional[int] = Field(None, description="Current workflow step, if a workflow exists", examples=[4])
+    step_name: Optional[str] = Field(None, description="Name of the current step", examples=["STEP_4_PRIORITY_SELECTION"])
+    is_completed: bool = Field(..., description="Whether the workflow is completed", examples=[False])
+
+class DashboardProgress(BaseModel):
+    """Schema for a done/total progress counter"""
+    done: int = Field(..., description="Items completed", examples=[8])
+    total: int = Field(..., description="Items expected", examples=[10])
+    percent: float = Field(..., description="Completion percentage", examples=[80.0])
+
+class YearDashboardResponse(BaseModel):
+    """Schema for the aggregated coordinator dashboard of an academic year"""
+    year_id: int = Field(..., description="ID of the academic year", examples=[1])
+    academic_year: str = Field(..., description="Academic year name", examples=["2024-2025"])
+    workflow: DashboardWorkflow = Field(..., description="Workflow stage of the year")
+    batches: List[DashboardBatch] = Field(..., description="Batches of the year with their allocation and timetable status")
+    subject_count: int = Field(..., description="Number of subjects in the year", examples=[12])
+    core_subject_count: int = Field(..., description="Number of core subjects", examples=[9])
+    elective_subject_count: int = Field(..., description="Number of elective subjects", examples=[3])
+    priority_submissions: DashboardProgress = Field(..., description="Active faculty who submitted priorities")
+    allocation_coverage: DashboardProgress = Field(..., description="Subject-batch combinations with a faculty allocated")
+    timetable_status: DashboardProgress = Field(..., description="Batches with a timetable")
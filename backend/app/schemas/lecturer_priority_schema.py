@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Any, List, Optional
+from typing import Any, List, Literal, Optional
 from datetime import datetime
 
 class SubjectPriorityEntry(BaseModel):
@@ -20,6 +20,13 @@ class FacultyPriorityUpdateRequest(BaseModel):
     batch2_id: int = Field(..., description="ID of the second batch to update",examples=[2])
     priority2: int = Field(..., ge=1, le=5, description="New priority level for second subject-batch (1-5)",examples=[2])
 
+class PriorityOrderEntry(BaseModel):
+    subject_id: int = Field(..., description="ID of the subject",examples=[1])
+    batch_id: int = Field(..., description="ID of the batch",examples=[1])
+
+class FacultyPriorityReorderRequest(BaseModel):
+    order: List[PriorityOrderEntry] = Field(..., min_length=1, max_length=5, description="Every subject-batch of the faculty for the year, highest priority first; position 1 gets priority 1",examples=[[PriorityOrderEntry(subject_id=2,batch_id=1),PriorityOrderEntry(subject_id=1,batch_id=1)]])
+
 class FacultyPriorityResponse(BaseModel):
     id: int = Field(..., description="Unique identifier for the priority entry")
     faculty_id: int = Field(..., description="ID of the faculty",examples=[1])
@@ -268,4 +275,85 @@ class AllocationUpdateRequest(BaseModel):
     allocation_id: int = Field(..., description="ID of the allocation to update")
     faculty_id: int = Field(..., description="ID of the new faculty to assign to this allocation")
     co_faculty_id: Optional[int] = Field(None, description="ID of the co-faculty to assign to this allocation")
-    venue: Optional[str] = Field(None, description="Venue for the allocation") 
\ No newline at end of file
+    venue: Optional[str] = Field(None, description="Venue for the allocation") 
+class PrioritySubmissionFaculty(BaseModel):
+    faculty_id: int = Field(..., description="ID of the faculty", examples=[3])
+    faculty_name: str = Field(..., description="Name of the faculty", examples=["Prof. Faculty 1"])
+    email: str = Field(..., description="Email of the faculty", examples=["faculty1@college.edu"])
+    joining_year: int = Field(..., description="Joining year of the faculty", examples=[2018])
+    priority_count: int = Field(..., description="Number of priority entries submitted", examples=[5])
+
+class PriorityDemandEntry(BaseModel):
+    subject_id: int = Field(..., description="ID of the subject", examples=[1])
+    batch_id: int = Field(..., description="ID of the batch", examples=[1])
+    priority_counts: dict[int, int] = Field(..., description="Number of faculty per priority level", examples=[{1: 2, 2: 1}])
+    total: int = Field(..., description="Number of faculty who picked the subject for the batch at any level", examples=[3])
+
+class PrioritySubmissionStatusResponse(BaseModel):
+    year_id: int = Field(..., description="Academic year ID", examples=[1])
+    total_faculty: int = Field(..., description="Number of active faculty", examples=[10])
+    submitted_count: int = Field(..., description="Number of faculty who submitted priorities", examples=[8])
+    submitted: List[PrioritySubmissionFaculty] = Field(..., description="Faculty who submitted priorities")
+    missing: List[PrioritySubmissionFaculty] = Field(..., description="Faculty who have not submitted priorities")
+    demand: List[PriorityDemandEntry] = Field(..., description="Demand per subject and batch")
+
+class PriorityHeatmapCell(BaseModel):
+    subject_id: int = Field(..., description="ID of the subject", examples=[1])
+    subject_name: str = Field(..., description="Name of the subject", examples=["Computer Networks"])
+    abbreviation: Optional[str] = Field(None, description="Abbreviation of the subject", examples=["CN"])
+    batch_id: int = Field(..., description="ID of the batch", examples=[1])
+    section: str = Field(..., description="Section of the batch", examples=["A"])
+    priority_counts: dict[int, int] = Field(..., description="Number of faculty who picked the slot at each priority level 1-5", examples=[{1: 2, 2: 0, 3: 1, 4: 0, 5: 0}])
+    total_picks: int = Field(..., description="Number of faculty who picked the slot at any level", examples=[3])
+    contention_score: float = Field(..., description="Picks weighted by priority and picker seniority", examples=[14.2])
+    oversubscribed_levels: List[int] = Field(..., description="Priority levels at which more than one faculty picked the slot", examples=[[1]])
+    predicted_unfilled: bool = Field(..., description="Whether the allocation engine would leave the slot without faculty", examples=[False])
+
+class PriorityHeatmapResponse(BaseModel):
+    year_id: int = Field(..., description="Academic year ID", examples=[1])
+    cells: List[PriorityHeatmapCell] = Field(..., description="One cell per subject and batch of the year")
+    oversubscribed_count: int = Field(..., description="Slots picked as priority 1 by more than one faculty", examples=[2])
+    no_taker_count: int = Field(..., description="Slots nobody picked", examples=[1])
+    predicted_unfilled_count: int = Field(..., description="Slots the allocation engine would leave unfilled", examples=[3])
+
+class AllocationScenario(BaseModel):
+    name: str = Field(..., min_length=1, description="Label of the scenario", examples=["Seniority with 16h cap"])
+    strategy: Literal["default", "strict_seniority", "priority_first"] = Field("default", description="Allocation strategy to run", examples=["default"])
+    max_hours_per_faculty: Optional[int] = Field(None, gt=0, description="Weekly hour cap per faculty; without it each faculty gets one allocation", examples=[16])
+
+class AllocationSimulationRequest(BaseModel):
+    scenarios: List[AllocationScenario] = Field(..., min_length=1, max_length=10, description="Scenarios to compare")
+
+class ProposedAllocation(BaseModel):
+    faculty_id: int = Field(..., description="ID of the faculty", examples=[3])
+    faculty_name: str = Field(..., description="Name of the faculty", examples=["Prof. Faculty 1"])
+    subject_id: int = Field(..., description="ID of the subject", examples=[1])
+    batch_id: int = Field(..., description="ID of the batch", examples=[1])
+    allocated_priority: int = Field(..., description="Priority level the allocation satisfied", examples=[1])
+
+class UnfilledSlot(BaseModel):
+    subject_id: int = Field(..., description="ID of the subject", examples=[1])
+    batch_id: int = Field(..., description="ID of the batch", examples=[1])
+
+class AllocationSimulationMetrics(BaseModel):
+    total_allocations: int = Field(..., description="Number of proposed allocations", examples=[12])
+    allocations_by_priority: dict[int, int] = Field(..., description="Allocations per satisfied priority level", examples=[{1: 8, 2: 3, 3: 1, 4: 0, 5: 0}])
+    faculty_with_allocation: int = Field(..., description="Faculty who received at least one allocation", examples=[10])
+    faculty_without_allocation: int = Field(..., description="Faculty with priorities who received nothing", examples=[2])
+    average_allocated_priority: Optional[float] = Field(None, description="Mean satisfied priority level, lower is better", examples=[1.42])
+    unfilled_slots: List[UnfilledSlot] = Field(..., description="Subject and batch combinations left without faculty")
+    load_variance: float = Field(..., description="Population variance of weekly hours across faculty", examples=[4.5])
+    max_faculty_hours: int = Field(..., description="Highest weekly hours given to one faculty", examples=[16])
+
+class AllocationSimulationResult(BaseModel):
+    name: str = Field(..., description="Label of the scenario", examples=["Seniority with 16h cap"])
+    strategy: str = Field(..., description="Strategy the scenario ran", examples=["default"])
+    max_hours_per_faculty: Optional[int] = Field(None, description="Hour cap the scenario ran with", examples=[16])
+    allocations: List[ProposedAllocation] = Field(..., description="Allocations the scenario would make")
+    metrics: AllocationSimulationMetrics = Field(..., description="Scores of the scenario")
+
+class AllocationSimulationResponse(BaseModel):
+    year_id: int = Field(..., description="Academic year ID", examples=[1])
+    faculty_count: int = Field(..., description="Faculty with priorities in the snapshot", examples=[12])
+    slot_count: int = Field(..., description="Subject and batch combinations in the snapshot", examples=[14])
+    results: List[AllocationSimulationResult] = Field(..., description="One result per scenario, in request order")
@@ -0,0 +1,31 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+class SingleFlightStats(BaseModel):
+    """Schema for the counters of one single-flight read"""
+    name: str = Field(..., description="Service method the counters belong to", examples=["YearBatchService.get_subjects_by_year"])
+    calls: int = Field(..., description="Calls made in this process", examples=[120])
+    executions: int = Field(..., description="Calls that ran the read themselves", examples=[3])
+    joined_in_process: int = Field(..., description="Calls that awaited an identical call in this process", examples=[110])
+    joined_across_workers: int = Field(..., description="Calls that used the result another worker published", examples=[7])
+    collapse_ratio: float = Field(..., description="Share of calls that did not run the read", examples=[0.975])
+
+class SingleFlightMetricsResponse(BaseModel):
+    """Schema for the single-flight counters of this process"""
+    reads: List[SingleFlightStats] = Field(..., description="Counters per decorated service method")
+
+class EntityCacheStats(BaseModel):
+    """Schema for the counters of one cached model"""
+    model: str = Field(..., description="Cached model", examples=["Subjects"])
+    ttl: int = Field(..., description="Seconds a row stays in Redis", examples=[900])
+    local_entries: int = Field(..., description="Rows held in this process", examples=[240])
+    local_hits: int = Field(..., description="Lookups answered from this process", examples=[5400])
+    redis_hits: int = Field(..., description="Lookups answered from Redis", examples=[310])
+    misses: int = Field(..., description="Lookups that queried the database", examples=[52])
+    invalidations: int = Field(..., description="Rows dropped after a write", examples=[4])
+    hit_ratio: float = Field(..., description="Share of lookups that did not query the database", examples=[0.991])
+
+class EntityCacheMetricsResponse(BaseModel):
+    """Schema for the entity cache counters of this process"""
+    enabled: bool = Field(..., description="Whether lookups use the cache")
+    models: List[EntityCacheStats] = Field(..., description="Counters per cached model")
@@ -0,0 +1,51 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from datetime import datetime
+from app.models.model import RoomTypeEnum
+
+class RoomBase(BaseModel):
+    room_name: str = Field(..., description="Room name, matching the venue used on allocations", examples=["LAB-1"])
+    room_type: RoomTypeEnum = Field(..., description="Type of the room", examples=[RoomTypeEnum.LAB])
+    capacity: int = Field(..., description="Number of students the room can seat", gt=0, examples=[60])
+
+class RoomCreate(RoomBase):
+    """Schema for creating a room"""
+    pass
+
+class RoomUpdate(BaseModel):
+    """Schema for updating a room"""
+    room_name: Optional[str] = Field(None, description="Room name", examples=["LAB-1"])
+    room_type: Optional[RoomTypeEnum] = Field(None, description="Type of the room", examples=[RoomTypeEnum.LAB])
+    capacity: Optional[int] = Field(None, description="Number of students the room can seat", gt=0, examples=[60])
+    is_active: Optional[bool] = Field(None, description="Whether the room can be booked", examples=[True])
+
+class RoomResponse(RoomBase):
+    """Schema for room response"""
+    room_id: int = Field(..., description="Unique identifier for the room", examples=[1])
+    is_active: bool = Field(..., description="Whether the room can be booked", examples=[True])
+    created_at: datetime = Field(..., description="Timestamp when the room was created")
+
+    class Config:
+        from_attributes = True
+
+class RoomListResponse(BaseModel):
+    """Schema for list of rooms"""
+    rooms: List[RoomResponse] = Field(..., description="List of rooms")
+    total_count: int = Field(..., description="Total number of rooms", examples=[4])
+
+class FreeRoomsResponse(BaseModel):
+    """Schema for the rooms free in a given slot"""
+    year_id: int = Field(..., description="Academic year ID", examples=[1])
+    day: str = Field(..., description="Day of the week", examples=["monday"])
+    period: int = Field(..., description="1-based period index within the day", examples=[3])
+    batch_id: Optional[int] = Field(None, description="Batch whose strength the rooms must seat", examples=[1])
+    rooms: List[RoomResponse] = Field(..., description="Rooms with no booking in the slot")
+    total_count: int = Field(..., description="Total number of free rooms", examples=[2])
+
+class RoomAvailabilityResponse(BaseModel):
+    """Schema for a single room availability check"""
+    room_id: int = Field(..., description="Room ID", examples=[1])
+    year_id: int = Field(..., description="Academic year ID", examples=[1])
+    day: str = Field(..., description="Day of the week", examples=["monday"])
+    period: int = Field(..., description="1-based period index within the day", examples=[3])
+    is_free: bool = Field(..., description="Whether the room has no booking in the slot", examples=[True])
@@ -0,0 +1,70 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+
+class SnapshotCreateRequest(BaseModel):
+    """Schema for capturing a new snapshot of a year"""
+    label: Optional[str] = Field(None, max_length=200, description="Short note about the version", examples=["Before HOD review"])
+
+class SnapshotResponse(BaseModel):
+    """Schema for one stored version of a year's allocations and timetables"""
+    snapshot_id: int = Field(..., description="ID of the snapshot", examples=[4])
+    year_id: int = Field(..., description="ID of the academic year", examples=[1])
+    version_no: int = Field(..., description="Version number within the year", examples=[3])
+    label: Optional[str] = Field(None, description="Short note about the version", examples=["Before HOD review"])
+    allocations_hash: str = Field(..., description="sha256 of the stored allocations")
+    timetables_hash: str = Field(..., description="sha256 of the stored timetables")
+    allocation_count: int = Field(..., description="Number of allocations in the version", examples=[14])
+    timetable_count: int = Field(..., description="Number of timetables in the version", examples=[2])
+    is_active: bool = Field(..., description="Whether this version is the active one", examples=[True])
+    created_at: datetime = Field(..., description="When the version was captured")
+
+class SnapshotCreateResponse(BaseModel):
+    """Schema for the result of capturing a snapshot"""
+    created: bool = Field(..., description="False when nothing changed since the active version, which is returned instead", examples=[True])
+    snapshot: SnapshotResponse = Field(..., description="The captured or unchanged active version")
+
+class SnapshotListResponse(BaseModel):
+    """Schema for the versions of a year"""
+    year_id: int = Field(..., description="ID of the academic year", examples=[1])
+    active_version: Optional[int] = Field(None, description="Version number currently active", examples=[3])
+    snapshots: List[SnapshotResponse] = Field(..., description="Versions of the year, newest first")
+
+class SnapshotRollbackResponse(BaseModel):
+    """Schema for the result of rolling a year back to a version"""
+    year_id: int = Field(..., description="ID of the academic year", examples=[1])
+    active_version: int = Field(..., description="Version number now active", examples=[2])
+    message: str = Field(..., description="Result message", examples=["Year restored to version 2"])
+
+class AllocationDiffEntry(BaseModel):
+    """Schema for an allocation that differs between two versions"""
+    change_type: str = Field(..., description="added, removed or changed", examples=["changed"])
+    subject_id: int = Field(..., description="ID of the subject", examples=[1])
+    subject_name: Optional[str] = Field(None, description="Name of the subject, if it still exists", examples=["Computer Networks"])
+    batch_id: int = Field(..., description="ID of the batch", examples=[1])
+    section: Optional[str] = Field(None, description="Section of the batch, if it still exists", examples=["A"])
+    from_faculty_id: Optional[int] = Field(None, description="Faculty in the older version", examples=[3])
+    to_faculty_id: Optional[int] = Field(None, description="Faculty in the newer version", examples=[5])
+    from_co_faculty_id: Optional[int] = Field(None, description="Co-faculty in the older version")
+    to_co_faculty_id: Optional[int] = Field(None, description="Co-faculty in the newer version")
+    from_venue: Optional[str] = Field(None, description="Venue in the older version", examples=["Lab 1"])
+    to_venue: Optional[str] = Field(None, description="Venue in the newer version", examples=["Lab 2"])
+    from_priority: Optional[int] = Field(None, description="Allocated priority in the older version", examples=[1])
+    to_priority: Optional[int] = Field(None, description="Allocated priority in the newer version", examples=[2])
+
+class TimetableCellDiffEntry(BaseModel):
+    """Schema for a timetable cell that differs between two versions"""
+    batch_id: int = Field(..., description="ID of the batch", examples=[1])
+    section: Optional[str] = Field(None, description="Section of the batch, if it still exists", examples=["A"])
+    day: str = Field(..., description="Day of the week", examples=["monday"])
+    period: int = Field(..., description="Period number, starting at 1", examples=[2])
+    from_abbreviation: Optional[str] = Field(None, description="Subject in the older version, None when empty", examples=["CN"])
+    to_abbreviation: Optional[str] = Field(None, description="Subject in the newer version, None when empty", examples=["DBMS"])
+
+class SnapshotDiffResponse(BaseModel):
+    """Schema for the differences between two versions of a year"""
+    year_id: int = Field(..., description="ID of the academic year", examples=[1])
+    from_version: int = Field(..., description="Older version number", examples=[2])
+    to_version: int = Field(..., description="Newer version number", examples=[3])
+    allocation_changes: List[AllocationDiffEntry] = Field(..., description="Allocations added, removed or changed")
+    timetable_changes: List[TimetableCellDiffEntry] = Field(..., description="Timetable cells that changed")
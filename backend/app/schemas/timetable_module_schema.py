@@ -2,6 +2,8 @@ from pydantic import BaseModel, Field
 from typing import Dict, List, Optional
 from datetime import datetime
 
+TIMETABLE_DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday"]
+
 class TimetableModuleCreate(BaseModel):
     """Schema for creating a new timetable module"""
     format_id: int = Field(..., description="ID of the timetable format to use", examples=[1])
@@ -34,6 +36,11 @@ class TimetableModuleUpdate(BaseModel):
             "saturday": ["", "", "", "", "", "", ""]
         }]
     )
+    expected_version: Optional[int] = Field(
+        None,
+        description="Version the edit was based on; the update is rejected with 409 if the timetable has changed since",
+        examples=[3]
+    )
 
 class TimetableFormatDetails(BaseModel):
     """Schema for timetable format details in responses"""
@@ -62,6 +69,7 @@ class TimetableModuleResponse(BaseModel):
     year_id: int = Field(..., description="ID of the academic year", examples=[1])
     batch_id: int = Field(..., description="ID of the batch", examples=[1])
     timetable_data: Dict[str, List[str]] = Field(..., description="JSON structure containing daily subject schedules")
+    version: int = Field(..., description="Current version of the timetable, sent back as expected_version on edits", examples=[3])
     created_at: datetime = Field(..., description="Timestamp when the timetable was created")
     format_details: TimetableFormatDetails = Field(..., description="Details of the timetable format")
     batch_details: BatchDetails = Field(..., description="Details of the batch")
@@ -82,3 +90,40 @@ class TimetableModuleUpdateResponse(BaseModel):
     message: str = Field(..., description="Success message", examples=["Timetable module updated successfully"])
     timetable_id: int = Field(..., description="ID of the updated timetable", examples=[1])
     updated_data: TimetableModuleResponse = Field(..., description="Updated timetable data")
+
+class TimetableCellChange(BaseModel):
+    """Schema for a single cell edit"""
+    day: str = Field(..., description="Day of the week", examples=["monday"])
+    period: int = Field(..., ge=1, description="Period number within the day, starting from 1", examples=[3])
+    value: str = Field(..., description="New subject abbreviation for the cell, empty to clear it", examples=["CN"])
+
+class TimetableCellPatchRequest(BaseModel):
+    """Schema for applying cell-level edits to a timetable"""
+    expected_version: int = Field(..., description="Version the edits were based on", examples=[3])
+    changes: List[TimetableCellChange] = Field(..., min_length=1, description="Cells to overwrite")
+
+class TimetableCellPatchResponse(BaseModel):
+    """Schema for cell-level edit response"""
+    message: str = Field(..., description="Success message", examples=["Timetable cells updated successfully"])
+    timetable_id: int = Field(..., description="ID of the updated timetable", examples=[1])
+    version: int = Field(..., description="New version of the timetable", examples=[4])
+    changes: List[TimetableCellChange] = Field(..., description="Cells that were written")
+
+class TimetableSlotMatch(BaseModel):
+    """Schema for a single timetable cell matched by a slot lookup"""
+    timetable_id: int = Field(..., description="ID of the timetable containing the cell", examples=[1])
+    batch_id: int = Field(..., description="ID of the batch", examples=[1])
+    section: str = Field(..., description="Section name of the batch", examples=["A"])
+    day: str = Field(..., description="Day of the week", examples=["monday"])
+    period: int = Field(..., description="Period number within the day, starting from 1", examples=[3])
+    abbreviation: str = Field(..., description="Subject abbreviation stored in the cell", examples=["CN"])
+    subject_id: Optional[int] = Field(None, description="ID of the subject taught in the cell", examples=[1])
+    faculty_id: Optional[int] = Field(None, description="ID of the faculty allocated to the subject for this batch", examples=[3])
+    co_faculty_id: Optional[int] = Field(None, description="ID of the co-faculty allocated to the subject for this batch", examples=[4])
+    venue: Optional[str] = Field(None, description="Venue of the allocation", examples=["Room 101"])
+
+class TimetableSlotLookupResponse(BaseModel):
+    """Schema for timetable slot lookup response"""
+    year_id: int = Field(..., description="ID of the academic year", examples=[1])
+    slots: List[TimetableSlotMatch] = Field(..., description="Timetable cells matching the lookup")
+    total_count: int = Field(..., description="Total number of matching cells", examples=[4])
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 
 
@@ -29,4 +29,63 @@ class WorkflowStepResponse(BaseModel):
     total_steps: int = Field(..., description="Total number of steps (12)")
     
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+
+class WorkflowGuardResponse(BaseModel):
+    year_id: int = Field(..., description="Academic year ID")
+    current_step: int = Field(..., description="Current workflow step")
+    next_step: Optional[int] = Field(None, description="Step the workflow would move to, if any")
+    can_advance: bool = Field(..., description="Whether every precondition of the next step holds")
+    blocked_by: List[str] = Field(default_factory=list, description="Preconditions of the next step that do not hold yet")
+    warnings: List[str] = Field(default_factory=list, description="Feasibility problems the next step will run into; they do not block advancing")
+
+
+class WorkflowTransitionResponse(BaseModel):
+    from_step: int = Field(..., description="Step the workflow moved from")
+    from_step_name: str = Field(..., description="Name of the step moved from")
+    to_step: int = Field(..., description="Step the workflow moved to")
+    to_step_name: str = Field(..., description="Name of the step moved to")
+    created_at: datetime = Field(..., description="When the transition happened")
+
+
+class SubjectFeasibility(BaseModel):
+    subject_id: int = Field(..., description="Subject ID")
+    subject_name: str = Field(..., description="Name of the subject")
+    abbreviation: Optional[str] = Field(None, description="Abbreviation of the subject")
+    no_of_hours_required: int = Field(..., description="Weekly hours the subject needs per batch")
+    slot_count: int = Field(..., description="Batches the subject is taught to")
+    willing_faculty: int = Field(..., description="Faculty who picked the subject for any batch")
+    batches_without_willing_faculty: List[int] = Field(..., description="Batches no faculty picked the subject for")
+    batches_short_of_faculty: List[int] = Field(..., description="Batches left uncovered because their pickers are needed elsewhere; how many is exact, which ones depends on the allocation")
+
+
+class AllocationFeasibility(BaseModel):
+    feasible: bool = Field(..., description="Whether the picks can cover every subject-batch slot")
+    unit: str = Field(..., description="'slots' without an hour cap, 'hours' with one")
+    required: int = Field(..., description="Demand of all slots in the unit")
+    max_coverable: int = Field(..., description="Most of the demand any allocation can cover, from a max-flow over faculty and slots")
+    faculty_count: int = Field(..., description="Faculty who submitted priorities")
+    slot_count: int = Field(..., description="Subject-batch slots of the year")
+    subjects: List[SubjectFeasibility] = Field(..., description="Subjects that cannot be fully covered")
+    bottlenecks: List[str] = Field(..., description="Why allocation would leave slots unfilled")
+
+
+class BatchPeriodFeasibility(BaseModel):
+    batch_id: int = Field(..., description="Batch ID")
+    section: str = Field(..., description="Section of the batch")
+    format_id: Optional[int] = Field(None, description="Timetable format checked, the batch's latest")
+    required_hours: int = Field(..., description="Weekly hours the batch's subjects need")
+    supplied_hours: int = Field(..., description="Weekly hours the format's periods offer")
+    lab_hours_required: int = Field(..., description="Weekly hours the batch's lab subjects need")
+    lab_hours_supplied: int = Field(..., description="Weekly hours in periods longer than one hour")
+    feasible: bool = Field(..., description="Whether the format can hold the batch's subjects")
+    problems: List[str] = Field(..., description="Why generation would not fit the batch's subjects")
+
+
+class FeasibilityResponse(BaseModel):
+    year_id: int = Field(..., description="Academic year ID")
+    max_hours_per_faculty: Optional[int] = Field(None, description="Weekly hour cap the allocation check assumed")
+    feasible: bool = Field(..., description="Whether both allocation and timetable generation can meet the demand")
+    allocation: AllocationFeasibility = Field(..., description="Faculty supply against subject-batch slots, checked before step 5")
+    batches: List[BatchPeriodFeasibility] = Field(..., description="Format periods against subject hours per batch, checked before step 10")
@@ -0,0 +1,200 @@
+"""
+Pure subject allocation engine.
+
+Runs the allocation rules on in-memory priority data and returns the proposed
+allocations without touching the database, so the same rules serve the real
+allocation run, read-only predictions and what-if simulations.
+"""
+
+from statistics import pvariance
+from typing import Dict, List, Optional, Set, Tuple
+
+DEFAULT_STRATEGY = "default"
+STRICT_SENIORITY_STRATEGY = "strict_seniority"
+PRIORITY_FIRST_STRATEGY = "priority_first"
+STRATEGIES = (DEFAULT_STRATEGY, STRICT_SENIORITY_STRATEGY, PRIORITY_FIRST_STRATEGY)
+PRIORITY_LEVELS = range(1, 6)
+
+
+def group_priorities_by_faculty(priority_rows: List[dict]) -> Tuple[List[dict], Dict[int, List[dict]]]:
+    """Split priority rows ordered by seniority then priority into the faculty list and each faculty's priorities"""
+    faculty: List[dict] = []
+    priorities_by_faculty: Dict[int, List[dict]] = {}
+    for row in priority_rows:
+        faculty_id = row['faculty_id']
+        if faculty_id not in priorities_by_faculty:
+            faculty.append({'user_id': faculty_id, 'joining_year': row['joining_year']})
+            priorities_by_faculty[faculty_id] = []
+        priorities_by_faculty[faculty_id].append(row)
+    return faculty, priorities_by_faculty
+
+
+class _AllocationState:
+    """Allocations made so far plus the per-faculty counts and hours the rules check"""
+
+    def __init__(self, subject_hours: Dict[int, int], max_hours_per_faculty: Optional[int]):
+        self.allocations: List[dict] = []
+        self.taken: Set[Tuple[int, int]] = set()
+        self.counts: Dict[int, int] = {}
+        self.hours: Dict[int, int] = {}
+        self.subject_hours = subject_hours
+        self.max_hours = max_hours_per_faculty
+
+    def can_take(self, faculty_id: int, subject_id: int) -> bool:
+        """Without an hour cap a faculty gets one allocation; with a cap, as many as fit under it"""
+        if self.max_hours is None:
+            return self.counts.get(faculty_id, 0) == 0
+        return self.hours.get(faculty_id, 0) + self.subject_hours.get(subject_id, 0) <= self.max_hours
+
+    def take(self, faculty_id: int, subject_id: int, batch_id: int, priority: int) -> None:
+        self.allocations.append({
+            'faculty_id': faculty_id,
+            'subject_id': subject_id,
+            'batch_id': batch_id,
+            'allocated_priority': priority
+        })
+        self.taken.add((subject_id, batch_id))
+        self.counts[faculty_id] = self.counts.get(faculty_id, 0) + 1
+        self.hours[faculty_id] = self.hours.get(faculty_id, 0) + self.subject_hours.get(subject_id, 0)
+
+
+def _senior_first(members: List[dict]) -> List[dict]:
+    # Stable, so equal joining years keep the seniority order of the faculty list
+    return sorted(members, key=lambda member: member['joining_year'])
+
+
+def _priority_one_pass(state: _AllocationState, faculty: List[dict], priorities_by_faculty: Dict[int, List[dict]]) -> None:
+    """Grant priority-1 picks, the most senior faculty winning a contested (subject, batch)"""
+    selections: Dict[Tuple[int, int], List[dict]] = {}
+    for faculty_member in faculty:
+        for priority in priorities_by_faculty.get(faculty_member['user_id'], []):
+            if priority['priority'] == 1:
+                selections.setdefault((priority['subject_id'], priority['batch_id']), []).append(faculty_member)
+
+    for (subject_id, batch_id), members in selections.items():
+        for member in _senior_first(members):
+            # Uncapped, the original rules let one faculty win several priority-1 picks
+            if state.max_hours is None or state.can_take(member['user_id'], subject_id):
+                state.take(member['user_id'], subject_id, batch_id, 1)
+                break
+
+
+def _fallback_rounds(state: _AllocationState, faculty: List[dict], priorities_by_faculty: Dict[int, List[dict]]) -> None:
+    """In seniority order, give each eligible faculty their best free choice; repeat while a cap leaves room"""
+    while True:
+        allocated_this_round = False
+        for faculty_member in faculty:
+            faculty_id = faculty_member['user_id']
+            for priority in priorities_by_faculty.get(faculty_id, []):
+                key = (priority['subject_id'], priority['batch_id'])
+                if key not in state.taken and state.can_take(faculty_id, priority['subject_id']):
+                    state.take(faculty_id, priority['subject_id'], priority['batch_id'], priority['priority'])
+                    allocated_this_round = True
+                    break
+        if state.max_hours is None or not allocated_this_round:
+            return
+
+
+def _priority_first_rounds(state: _AllocationState, faculty: List[dict], priorities_by_faculty: Dict[int, List[dict]]) -> None:
+    """Resolve every level-1 pick before any level-2 pick, and so on, seniority breaking ties within a level"""
+    while True:
+        allocated_this_round = False
+        for level in PRIORITY_LEVELS:
+            selections: Dict[Tuple[int, int], List[dict]] = {}
+            for faculty_member in faculty:
+                for priority in priorities_by_faculty.get(faculty_member['user_id'], []):
+                    if priority['priority'] == level:
+                        selections.setdefault((priority['subject_id'], priority['batch_id']), []).append(faculty_member)
+
+            for (subject_id, batch_id), members in selections.items():
+                if (subject_id, batch_id) in state.taken:
+                    continue
+                for member in _senior_first(members):
+                    if state.can_take(member['user_id'], subject_id):
+                        state.take(member['user_id'], subject_id, batch_id, level)
+                        allocated_this_round = True
+                        break
+        if state.max_hours is None or not allocated_this_round:
+            return
+
+
+def allocate(
+    faculty: List[dict],
+    priorities_by_faculty: Dict[int, List[dict]],
+    strategy: str = DEFAULT_STRATEGY,
+    subject_hours: Optional[Dict[int, int]] = None,
+    max_hours_per_faculty: Optional[int] = None
+) -> List[dict]:
+    """Allocate each (subject, batch) to at most one faculty.
+
+    - **faculty**: Faculty ordered by seniority, each with user_id and joining_year
+    - **priorities_by_faculty**: Each faculty's priorities (subject_id, batch_id, priority) ordered by priority
+    - **strategy**: "default" grants priority-1 picks first, senior faculty winning contested ones, then
+      gives every faculty still without an allocation their best free choice in seniority order.
+      "strict_seniority" skips the priority-1 pass and lets each faculty choose purely in seniority order.
+      "priority_first" settles each priority level across all faculty before moving to the next.
+    - **max_hours_per_faculty**: Optional weekly hour cap; faculty keep receiving allocations while their
+      subjects' hours fit under it. Without it each faculty gets a single allocation.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown allocation strategy '{strategy}'. Must be one of: {', '.join(STRATEGIES)}")
+
+    state = _AllocationState(subject_hours or {}, max_hours_per_faculty)
+    if strategy == PRIORITY_FIRST_STRATEGY:
+        _priority_first_rounds(state, faculty, priorities_by_faculty)
+    else:
+        if strategy == DEFAULT_STRATEGY:
+            _priority_one_pass(state, faculty, priorities_by_faculty)
+        _fallback_rounds(state, faculty, priorities_by_faculty)
+    return state.allocations
+
+
+def evaluate(
+    allocations: List[dict],
+    faculty: List[dict],
+    slots: List[Tuple[int, int]],
+    subject_hours: Dict[int, int]
+) -> dict:
+    """Score a set of allocations: satisfaction per priority level, unfilled slots and faculty load spread"""
+    by_level = {level: 0 for level in PRIORITY_LEVELS}
+    hours = {member['user_id']: 0 for member in faculty}
+    for allocation in allocations:
+        by_level[allocation['allocated_priority']] = by_level.get(allocation['allocated_priority'], 0) + 1
+        hours[allocation['faculty_id']] = hours.get(allocation['faculty_id'], 0) + subject_hours.get(allocation['subject_id'], 0)
+
+    allocated_slots = {(allocation['subject_id'], allocation['batch_id']) for allocation in allocations}
+    faculty_with_allocation = {allocation['faculty_id'] for allocation in allocations}
+    return {
+        'total_allocations': len(allocations),
+        'allocations_by_priority': by_level,
+        'faculty_with_allocation': len(faculty_with_allocation),
+        'faculty_without_allocation': len(faculty) - len(faculty_with_allocation),
+        'average_allocated_priority': (
+            round(sum(a['allocated_priority'] for a in allocations) / len(allocations), 2) if allocations else None
+        ),
+        'unfilled_slots': [
+            {'subject_id': subject_id, 'batch_id': batch_id}
+            for subject_id, batch_id in slots if (subject_id, batch_id) not in allocated_slots
+        ],
+        'load_variance': round(pvariance(hours.values()), 2) if hours else 0.0,
+        'max_faculty_hours': max(hours.values(), default=0)
+    }
+
+
+def run_scenario(
+    faculty: List[dict],
+    priorities_by_faculty: Dict[int, List[dict]],
+    slots: List[Tuple[int, int]],
+    subject_hours: Dict[int, int],
+    strategy: str,
+    max_hours_per_faculty: Optional[int]
+) -> Tuple[List[dict], dict]:
+    """Allocate and score one what-if scenario; module-level and on plain data so a process pool can run it"""
+    allocations = allocate(
+        faculty,
+        priorities_by_faculty,
+        strategy=strategy,
+        subject_hours=subject_hours,
+        max_hours_per_faculty=max_hours_per_faculty
+    )
+    return allocations, evaluate(allocations, faculty, slots, subject_hours)
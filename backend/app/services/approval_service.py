@@ -0,0 +1,110 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.repositories.approval_repository import ApprovalRepository
+from app.models.model import Approvals, ApprovalStatusEnum, RoleEnum, WorkflowStageEnum
+from app.schemas.approval_schema import (
+    ApprovalRequestCreate, ApprovalDecisionRequest, ApprovalResponse, PendingApprovalItem,
+    ApprovalQueueResponse, ApprovalRequestResponse, ApprovalDecisionResponse
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+# The HOD reviews allocations at step 6 and timetables at step 11
+ALLOCATION_REVIEW_STAGE = WorkflowStageEnum.STEP_6_HOD_REVIEW_AND_APPROVAL
+TIMETABLE_REVIEW_STAGE = WorkflowStageEnum.STEP_11_HOD_EDIT_AND_UPDATE_TIMETABLE
+
+def _unique(ids: List[int]) -> List[int]:
+    return list(dict.fromkeys(ids))
+
+def _approval_data(approval: Approvals) -> dict:
+    return {
+        "approval_id": approval.approval_id,
+        "year_id": approval.year_id,
+        "timetable_id": approval.timetable_id,
+        "allocation_id": approval.allocation_id,
+        "approval_status": approval.approval_status.value,
+        "approval_stage": approval.approval_stage.name,
+        "approved_by": approval.approved_by,
+        "comment": approval.comment,
+        "decided_at": approval.decided_at,
+        "created_at": approval.created_at
+    }
+
+class ApprovalService:
+    def __init__(self, db: AsyncSession) -> None:
+        self.repository: ApprovalRepository = ApprovalRepository(db)
+
+    async def _check_approver(self, user_id: int) -> None:
+        user = await self.repository.get_user(user_id)
+        if not user or not user.is_active:
+            raise ValueError(f"User with ID {user_id} not found")
+        if user.role != RoleEnum.HOD:
+            raise ValueError(f"User with ID {user_id} is not a HOD")
+
+    async def _check_targets(self, year_id: int, timetable_ids: List[int], allocation_ids: List[int]) -> None:
+        timetables, allocations = await self.repository.get_existing_targets(year_id, timetable_ids, allocation_ids)
+        missing = [f"timetable {i}" for i in timetable_ids if i not in timetables]
+        missing += [f"allocation {i}" for i in allocation_ids if i not in allocations]
+        if missing:
+            raise ValueError(f"Not found in academic year {year_id}: {', '.join(missing)}")
+
+    async def request_reviews(self, data: ApprovalRequestCreate) -> ApprovalRequestResponse:
+        """Send timetables and allocations to a HOD for review"""
+        timetable_ids, allocation_ids = _unique(data.timetable_ids), _unique(data.allocation_ids)
+        await self._check_approver(data.approver_id)
+        await self._check_targets(data.year_id, timetable_ids, allocation_ids)
+
+        rows = [
+            {"year_id": data.year_id, "timetable_id": timetable_id, "allocation_id": None,
+             "approval_stage": TIMETABLE_REVIEW_STAGE, "approved_by": data.approver_id}
+            for timetable_id in timetable_ids
+        ] + [
+            {"year_id": data.year_id, "timetable_id": None, "allocation_id": allocation_id,
+             "approval_stage": ALLOCATION_REVIEW_STAGE, "approved_by": data.approver_id}
+            for allocation_id in allocation_ids
+        ]
+        approvals = await self.repository.create_pending(rows)
+        return ApprovalRequestResponse(
+            requested_count=len(approvals),
+            skipped_count=len(rows) - len(approvals),
+            approvals=[ApprovalResponse(**_approval_data(approval)) for approval in approvals]
+        )
+
+    async def get_pending_queue(self, approver_id: int, year_id: Optional[int] = None, after_id: int = 0, limit: int = 50) -> ApprovalQueueResponse:
+        """Get a page of the open requests assigned to an approver"""
+        rows = await self.repository.get_pending_queue(approver_id, year_id, after_id, limit)
+        items = [
+            PendingApprovalItem(**_approval_data(row.pop("approval")), **row)
+            for row in rows
+        ]
+        return ApprovalQueueResponse(
+            approver_id=approver_id,
+            items=items,
+            next_after_id=items[-1].approval_id if len(items) == limit else None
+        )
+
+    async def decide(self, data: ApprovalDecisionRequest, decided_by: int) -> ApprovalDecisionResponse:
+        """Approve or reject many timetables and allocations in one transaction.
+
+        decided_by is the signed-in HOD; the route's role guard has already checked them.
+        """
+        timetable_ids, allocation_ids = _unique(data.timetable_ids), _unique(data.allocation_ids)
+        await self._check_targets(data.year_id, timetable_ids, allocation_ids)
+
+        closed, inserted = await self.repository.decide(
+            data.year_id,
+            decided_by,
+            ApprovalStatusEnum(data.decision),
+            timetable_ids,
+            allocation_ids,
+            TIMETABLE_REVIEW_STAGE,
+            ALLOCATION_REVIEW_STAGE,
+            data.comment
+        )
+        return ApprovalDecisionResponse(
+            decision=data.decision,
+            decided_count=len(closed) + len(inserted),
+            closed_pending_count=len(closed),
+            approvals=[ApprovalResponse(**_approval_data(approval)) for approval in closed + inserted]
+        )
@@ -1,25 +1,70 @@
 from fastapi import Request, Response
-from typing import Optional
-from datetime import datetime, timedelta
+from typing import Dict, Optional, Set
+from datetime import datetime, timedelta, timezone
+import asyncio
 import json
+import logging
 import secrets
 import httpx
 import redis.asyncio as redis
+from app.config.config import settings
+
+logger = logging.getLogger(__name__)
 
 # Remove this line - it causes the async_generator error
 # redis_client = get_redis()
 
+"""
+Shared HTTP client for every outbound OAuth call.
+Created on first use so its connection pool is reused across requests; closed on shutdown.
+"""
+
+_oauth_client: Optional[httpx.AsyncClient] = None
+
+def get_oauth_client() -> httpx.AsyncClient:
+    global _oauth_client
+    if _oauth_client is None or _oauth_client.is_closed:
+        _oauth_client = httpx.AsyncClient(
+            timeout=settings.OAUTH_HTTP_TIMEOUT,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=10),
+        )
+    return _oauth_client
+
+async def close_oauth_client() -> None:
+    global _oauth_client
+    if _oauth_client is not None:
+        await _oauth_client.aclose()
+        _oauth_client = None
+
+"""
+Exchange an authorization code for tokens
+"""
+
+async def exchange_authorization_code(code: str) -> httpx.Response:
+    response = await get_oauth_client().post(
+        settings.GOOGLE_TOKEN_URL,
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+        data={
+            "client_id": settings.GOOGLE_CLIENT_ID,
+            "client_secret": settings.GOOGLE_CLIENT_SECRET,
+            "redirect_uri": settings.GOOGLE_REDIRECT_URI,
+            "code": code,
+            "grant_type": "authorization_code",
+        },
+    )
+    response.raise_for_status()
+    return response
+
 """
 Get user details from google with provided access token
 """
 
 async def get_userDetails_from_google(token: str) -> dict:
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://www.googleapis.com/oauth2/v1/userinfo?alt=json",
-                headers={"Authorization": f"Bearer {token}"},
-            )
+        response = await get_oauth_client().get(
+            settings.GOOGLE_USERINFO_URL,
+            headers={"Authorization": f"Bearer {token}"},
+        )
 
         # If the response status is not 200, return a detailed error
         if response.status_code != 200:
@@ -145,54 +190,177 @@ async def refresh_access_token(
     refresh_token = session_data["refresh_token"]
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://oauth2.googleapis.com/token",
-                headers={"Content-Type": "application/x-www-form-urlencoded"},
-                data={
-                    "client_id": client_id,
-                    "client_secret": client_secret,
-                    "refresh_token": refresh_token,
-                    "grant_type": "refresh_token",
-                },
-            )
-            
-            if response.status_code != 200:
-                return {"error": f"Token refresh failed: {response.text}"}
-            
-            token_data = response.json()
-            
-            # Update session with new access token
-            session_data["access_token"] = token_data.get("access_token")
-            session_data["expires_at"] = (
-                datetime.now() + timedelta(seconds=token_data.get("expires_in", 3600))
-            ).isoformat()
-            
-            # Store updated session
-            await redis_client.set(
-                f"sessionid:{session_id}",
-                json.dumps(session_data),
-                ex=parse_ttl("7d")  # Keep original TTL
-            )
-            
-            return {"access_token": token_data.get("access_token")}
+        response = await get_oauth_client().post(
+            settings.GOOGLE_TOKEN_URL,
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            data={
+                "client_id": client_id,
+                "client_secret": client_secret,
+                "refresh_token": refresh_token,
+                "grant_type": "refresh_token",
+            },
+        )
+        
+        if response.status_code != 200:
+            return {"error": f"Token refresh failed: {response.text}"}
+        
+        token_data = response.json()
+        
+        # Update session with new access token; providers may also rotate the refresh token
+        session_data["access_token"] = token_data.get("access_token")
+        if token_data.get("refresh_token"):
+            session_data["refresh_token"] = token_data["refresh_token"]
+        session_data["expires_at"] = (
+            datetime.now(timezone.utc) + timedelta(seconds=token_data.get("expires_in", 3600))
+        ).isoformat()
+        
+        # Store updated session, keeping the session's remaining lifetime
+        await redis_client.set(
+            f"sessionid:{session_id}",
+            json.dumps(session_data),
+            keepttl=True
+        )
+        
+        return {"access_token": session_data["access_token"], "expires_at": session_data["expires_at"]}
             
     except Exception as e:
         return {"error": f"Token refresh error: {str(e)}"}
 
 """
-Check if the access token is expired based on stored expiry time
+Seconds until the access token expires, or None if the expiry is unknown
 """
 
-def is_token_expired(session_data: dict) -> bool:
-    if "expires_at" not in session_data:
-        return True
-    
+def token_expires_in(session_data: dict) -> Optional[float]:
     try:
         expires_at = datetime.fromisoformat(session_data["expires_at"].replace('Z', '+00:00'))
-        return datetime.now() < expires_at
-    except (ValueError, TypeError):
-        return True  # Assume expired if we can't parse the date
+    except (KeyError, AttributeError, ValueError, TypeError):
+        return None
+    if expires_at.tzinfo is None:
+        # Older sessions stored naive UTC timestamps
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return (expires_at - datetime.now(timezone.utc)).total_seconds()
+
+"""
+Check if the access token is expired based on stored expiry time
+"""
+
+def is_token_expired(session_data: dict) -> bool:
+    remaining = token_expires_in(session_data)
+    return remaining is None or remaining <= 0  # Assume expired if we can't parse the date
+
+"""
+Single-flight access token refresh.
+
+Concurrent requests of one session share a single refresh: within a process they
+await the same future, and across processes a per-session Redis lock lets one
+process call the token endpoint while the others wait and then read the session
+it wrote. Tokens close to expiry are refreshed in the background so requests
+rarely wait for the token endpoint at all. The coordinator keeps its own Redis
+client because background refreshes outlive the request that started them.
+"""
+
+TOKEN_REFRESH_LOCK_TTL = 30  # seconds
+TOKEN_REFRESH_LOCK_WAIT = 15  # seconds
+
+def token_refresh_lock_key(session_id: str) -> str:
+    return f"token_refresh_lock:{session_id}"
+
+class TokenRefreshCoordinator:
+    def __init__(self, margin: int = settings.TOKEN_REFRESH_MARGIN) -> None:
+        self.margin = margin
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._background: Set[asyncio.Task] = set()
+        self._redis: Optional[redis.Redis] = None
+
+    def _client(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = redis.Redis(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                username=settings.REDIS_USERNAME,
+                password=settings.REDIS_PASSWORD,
+                decode_responses=True
+            )
+        return self._redis
+
+    async def close(self) -> None:
+        for task in list(self._background):
+            task.cancel()
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    def needs_refresh(self, session_data: dict) -> bool:
+        if not session_data.get("refresh_token"):
+            return False
+        remaining = token_expires_in(session_data)
+        return remaining is None or remaining <= self.margin
+
+    async def refresh(self, session_id: str) -> dict:
+        """Refresh the session's access token, sharing one refresh between all concurrent callers"""
+        task = self._inflight.get(session_id)
+        if task is None:
+            # A task rather than inline work, so a cancelled caller never strands the others
+            task = asyncio.create_task(self._refresh_with_lock(session_id))
+            self._inflight[session_id] = task
+            task.add_done_callback(lambda _: self._inflight.pop(session_id, None))
+        try:
+            return await asyncio.shield(task)
+        except Exception as e:
+            return {"error": f"Token refresh error: {str(e)}"}
+
+    async def _refresh_with_lock(self, session_id: str) -> dict:
+        client = self._client()
+        lock = client.lock(
+            token_refresh_lock_key(session_id),
+            timeout=TOKEN_REFRESH_LOCK_TTL,
+            blocking_timeout=TOKEN_REFRESH_LOCK_WAIT
+        )
+        acquired = await lock.acquire()
+        try:
+            # Another process may have refreshed while we waited for the lock
+            session_data = await get_session_data(client, session_id)
+            if session_data and not self.needs_refresh(session_data):
+                return {"access_token": session_data.get("access_token"), "expires_at": session_data.get("expires_at")}
+            if not acquired:
+                return {"error": "Token refresh is taking too long"}
+            return await refresh_access_token(
+                client, session_id, settings.GOOGLE_CLIENT_ID, settings.GOOGLE_CLIENT_SECRET
+            )
+        finally:
+            if acquired:
+                try:
+                    await lock.release()
+                except Exception as e:
+                    logger.warning(f"Releasing token refresh lock failed: {str(e)}")
+
+    def refresh_in_background(self, session_id: str) -> None:
+        """Start a refresh without waiting for it, unless one is already running"""
+        if session_id in self._inflight:
+            return
+        task = asyncio.create_task(self.refresh(session_id))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def ensure_fresh(self, session_id: str, session_data: dict) -> dict:
+        """Return session_data with a usable access token.
+
+        An expired token is refreshed before returning; one that is only close to
+        expiry is refreshed in the background and the current token is used.
+        """
+        if not self.needs_refresh(session_data):
+            return session_data
+        if not is_token_expired(session_data):
+            self.refresh_in_background(session_id)
+            return session_data
+
+        result = await self.refresh(session_id)
+        if "error" in result:
+            logger.warning(f"Access token refresh failed: {result['error']}")
+            return session_data
+        return {**session_data, "access_token": result["access_token"], "expires_at": result["expires_at"]}
+
+token_refresh_coordinator = TokenRefreshCoordinator()
 
 """
 Clear the session from Redis (logout or invalidation)
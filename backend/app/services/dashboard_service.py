@@ -0,0 +1,72 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+import redis.asyncio as redis
+from app.repositories.dashboard_repository import DashboardRepository
+from fastapi.responses import Response
+from app.services.radis_services import YearDashboardCache
+from app.core.compression import acceptable_encodings, compress_variants, pick_variant, precompressed_response
+from app.models.model import WorkflowStageEnum
+from app.schemas.dashboard_schema import (
+    YearDashboardResponse, DashboardBatch, DashboardWorkflow, DashboardProgress
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _progress(done: int, total: int) -> DashboardProgress:
+    return DashboardProgress(done=done, total=total, percent=round(100 * done / total, 1) if total else 0.0)
+
+class DashboardService:
+    def __init__(self, db: AsyncSession, binary_redis_client: Optional[redis.Redis] = None) -> None:
+        self.repository: DashboardRepository = DashboardRepository(db)
+        # Stores compressed bytes, so it needs a client that does not decode responses
+        self.cache: Optional[YearDashboardCache] = YearDashboardCache(binary_redis_client) if binary_redis_client else None
+
+    async def get_year_dashboard(self, year_id: int, accept_encoding: str = "") -> Response:
+        """Get the dashboard of a year as a JSON response, cached for a few seconds with its compressed forms"""
+        encodings = acceptable_encodings(accept_encoding)
+        if self.cache:
+            try:
+                cached = await self.cache.get(year_id, encodings)
+                if cached:
+                    return precompressed_response(*cached)
+            except Exception as e:
+                logger.warning(f"Dashboard cache read failed for year {year_id}: {str(e)}")
+
+        dashboard = await self.build_year_dashboard(year_id)
+        variants = compress_variants(dashboard.model_dump_json().encode())
+
+        if self.cache:
+            try:
+                await self.cache.set(year_id, variants)
+            except Exception as e:
+                logger.warning(f"Dashboard cache write failed for year {year_id}: {str(e)}")
+
+        return precompressed_response(*pick_variant(variants, encodings))
+
+    async def build_year_dashboard(self, year_id: int) -> YearDashboardResponse:
+        """Get the coordinator dashboard of a year"""
+        row = await self.repository.get_year_dashboard(year_id)
+        if not row:
+            raise ValueError(f"Academic year with ID {year_id} not found")
+
+        batches = [DashboardBatch(**batch) for batch in row["batches"]]
+        current_step = row["current_step"]
+        dashboard = YearDashboardResponse(
+            year_id=row["year_id"],
+            academic_year=row["academic_year"],
+            workflow=DashboardWorkflow(
+                current_step=current_step,
+                step_name=WorkflowStageEnum(current_step).name if current_step in WorkflowStageEnum._value2member_map_ else None,
+                is_completed=bool(row["is_completed"])
+            ),
+            batches=batches,
+            subject_count=row["subject_count"],
+            core_subject_count=row["core_subject_count"],
+            elective_subject_count=row["subject_count"] - row["core_subject_count"],
+            priority_submissions=_progress(row["submitted_faculty_count"], row["faculty_count"]),
+            allocation_coverage=_progress(row["allocation_count"], row["subject_count"] * len(batches)),
+            timetable_status=_progress(sum(1 for batch in batches if batch.timetable_id), len(batches))
+        )
+
+        return dashboard
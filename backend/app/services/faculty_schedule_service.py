@@ -0,0 +1,79 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Iterable, List, Optional, Any
+import redis.asyncio as redis
+from app.repositories.timetable_module_repository import TimetableModuleRepository
+from app.services.radis_services import FacultyScheduleCache, slot_sort_key
+from app.schemas.timetable_module_schema import TimetableSlotMatch, TimetableSlotLookupResponse
+from app.db.unit_of_work import after_commit
+import logging
+
+logger = logging.getLogger(__name__)
+
+class FacultyScheduleService:
+    """Serves per-faculty schedules from Redis and rebuilds them when timetables or allocations change"""
+
+    def __init__(self, db: AsyncSession, redis_client: Optional[redis.Redis] = None) -> None:
+        self.db = db
+        self.repository: TimetableModuleRepository = TimetableModuleRepository(db)
+        self.cache: Optional[FacultyScheduleCache] = FacultyScheduleCache(redis_client) if redis_client else None
+
+    async def _build_schedules(self, year_id: int, faculty_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+        """Group the slot rows of the given faculty into one schedule per faculty"""
+        schedules: Dict[int, List[Dict[str, Any]]] = {faculty_id: [] for faculty_id in faculty_ids}
+        rows = await self.repository.get_slots_for_faculties(year_id, faculty_ids)
+        for row in rows:
+            for faculty_id in {row['faculty_id'], row['co_faculty_id']}:
+                if faculty_id in schedules:
+                    schedules[faculty_id].append(row)
+        return schedules
+
+    async def get_schedule(self, year_id: int, faculty_id: int) -> TimetableSlotLookupResponse:
+        """Get a faculty's weekly schedule, reading through the Redis cache"""
+        slots: Optional[List[Dict[str, Any]]] = None
+        if self.cache:
+            try:
+                slots = await self.cache.get(year_id, faculty_id)
+            except Exception as e:
+                logger.warning(f"Faculty schedule cache read failed for faculty {faculty_id}, year {year_id}: {str(e)}")
+
+        if slots is None:
+            schedules = await self._build_schedules(year_id, [faculty_id])
+            slots = sorted(schedules[faculty_id], key=slot_sort_key)
+            if self.cache:
+                try:
+                    # Only fill a miss: a refresh may have stored a newer schedule since the read
+                    await self.cache.store_if_absent(year_id, faculty_id, slots)
+                except Exception as e:
+                    logger.warning(f"Faculty schedule cache write failed for faculty {faculty_id}, year {year_id}: {str(e)}")
+
+        return TimetableSlotLookupResponse(
+            year_id=year_id,
+            slots=[TimetableSlotMatch(**slot) for slot in slots],
+            total_count=len(slots)
+        )
+
+    async def refresh_faculties(self, year_id: int, faculty_ids: Iterable[Optional[int]]) -> None:
+        """Rebuild the cached schedules of the faculty affected by a change once it has committed"""
+        if not self.cache:
+            return
+        ids = sorted({faculty_id for faculty_id in faculty_ids if faculty_id is not None})
+        if ids:
+            after_commit(self.db, lambda: self._refresh_faculties(year_id, ids))
+
+    async def _refresh_faculties(self, year_id: int, ids: List[int]) -> None:
+        try:
+            schedules = await self._build_schedules(year_id, ids)
+            await self.cache.store_many(year_id, schedules)
+        except Exception as e:
+            logger.warning(f"Faculty schedule refresh failed for year {year_id}, faculty {ids}: {str(e)}")
+
+    async def invalidate_year(self, year_id: int) -> None:
+        """Drop every cached schedule of a year once a year-wide change has committed"""
+        if self.cache:
+            after_commit(self.db, lambda: self._invalidate_year(year_id))
+
+    async def _invalidate_year(self, year_id: int) -> None:
+        try:
+            await self.cache.invalidate_year(year_id)
+        except Exception as e:
+            logger.warning(f"Faculty schedule invalidation failed for year {year_id}: {str(e)}")
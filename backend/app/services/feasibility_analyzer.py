@@ -0,0 +1,210 @@
+"""
+Feasibility pre-check of subject allocation and timetable generation.
+
+Works on in-memory rows like the allocation engine and tells within milliseconds whether
+the year's demand can be met at all, before steps 5 and 10 spend a full run finding out.
+
+- Allocation: a max-flow from the faculty, through the (subject, batch) slots they picked,
+  to the slots. Without an hour cap every faculty takes one slot and every slot needs one
+  faculty, so the flow is an exact matching. With a cap, faculty supply hours and slots
+  demand their subject's hours; the flow may split a slot's hours between faculty, so it
+  is an upper bound and a shortfall proves no allocation fills every slot.
+- Periods: a batch's timetable format must offer the weekly hours its subjects require,
+  and lab subjects need periods longer than one hour.
+"""
+
+from collections import deque
+from typing import Dict, List, Optional, Set
+
+
+class _FlowNetwork:
+    """Dinic's max-flow over integer capacities"""
+
+    def __init__(self, size: int):
+        self.edges: List[List[int]] = [[] for _ in range(size)]
+        self.to: List[int] = []
+        self.capacity: List[int] = []
+
+    def add_edge(self, u: int, v: int, capacity: int) -> int:
+        """Add u -> v with its residual edge and return the index of the forward edge"""
+        for a, b, c in ((u, v, capacity), (v, u, 0)):
+            self.edges[a].append(len(self.to))
+            self.to.append(b)
+            self.capacity.append(c)
+        return len(self.to) - 2
+
+    def flow(self, edge: int) -> int:
+        # The residual edge holds what was pushed through the forward one
+        return self.capacity[edge ^ 1]
+
+    def max_flow(self, source: int, sink: int) -> int:
+        total = 0
+        limit = sum(self.capacity[edge] for edge in self.edges[source])
+        while True:
+            level = self._levels(source)
+            if level[sink] < 0:
+                return total
+            next_edge = [0] * len(self.edges)
+            while True:
+                pushed = self._push(source, sink, limit, level, next_edge)
+                if not pushed:
+                    break
+                total += pushed
+
+    def _levels(self, source: int) -> List[int]:
+        level = [-1] * len(self.edges)
+        level[source] = 0
+        queue = deque([source])
+        while queue:
+            u = queue.popleft()
+            for edge in self.edges[u]:
+                if self.capacity[edge] > 0 and level[self.to[edge]] < 0:
+                    level[self.to[edge]] = level[u] + 1
+                    queue.append(self.to[edge])
+        return level
+
+    def _push(self, u: int, sink: int, limit: int, level: List[int], next_edge: List[int]) -> int:
+        # Paths are source -> faculty -> slot -> sink, so the recursion stays shallow
+        if u == sink:
+            return limit
+        while next_edge[u] < len(self.edges[u]):
+            edge = self.edges[u][next_edge[u]]
+            v = self.to[edge]
+            if self.capacity[edge] > 0 and level[v] == level[u] + 1:
+                pushed = self._push(v, sink, min(limit, self.capacity[edge]), level, next_edge)
+                if pushed:
+                    self.capacity[edge] -= pushed
+                    self.capacity[edge ^ 1] += pushed
+                    return pushed
+            next_edge[u] += 1
+        return 0
+
+
+def analyze_allocation(slots: List[dict], priority_rows: List[dict], max_hours_per_faculty: Optional[int] = None) -> dict:
+    """Check whether the faculty's picks can cover every (subject, batch) slot of the year.
+
+    - **slots**: Every (subject, batch) with subject_id, batch_id, subject_name, abbreviation and no_of_hours_required
+    - **priority_rows**: The year's priorities with faculty_id, subject_id and batch_id
+    - **max_hours_per_faculty**: Optional weekly hour cap; without it each faculty takes one slot, as in the allocation engine
+    """
+    capped = max_hours_per_faculty is not None
+    faculty_ids = list(dict.fromkeys(row['faculty_id'] for row in priority_rows))
+    faculty_node = {faculty_id: 2 + index for index, faculty_id in enumerate(faculty_ids)}
+    slot_node = {(slot['subject_id'], slot['batch_id']): 2 + len(faculty_ids) + index for index, slot in enumerate(slots)}
+    source, sink = 0, 1
+    network = _FlowNetwork(2 + len(faculty_ids) + len(slots))
+
+    def demand(slot: dict) -> int:
+        return slot['no_of_hours_required'] if capped else 1
+
+    hours_by_slot = {(slot['subject_id'], slot['batch_id']): slot['no_of_hours_required'] for slot in slots}
+    willing: Dict[tuple, Set[int]] = {key: set() for key in slot_node}
+    for faculty_id, node in faculty_node.items():
+        network.add_edge(source, node, max_hours_per_faculty if capped else 1)
+    for row in priority_rows:
+        key = (row['subject_id'], row['batch_id'])
+        if key not in slot_node:
+            continue
+        willing[key].add(row['faculty_id'])
+        # The engine never gives a faculty a subject whose hours alone exceed the cap
+        if capped and hours_by_slot[key] > max_hours_per_faculty:
+            continue
+        network.add_edge(faculty_node[row['faculty_id']], slot_node[key], hours_by_slot[key] if capped else 1)
+    demand_edges = [network.add_edge(slot_node[(slot['subject_id'], slot['batch_id'])], sink, demand(slot)) for slot in slots]
+
+    covered = network.max_flow(source, sink)
+    required = sum(demand(slot) for slot in slots)
+
+    subjects: Dict[int, dict] = {}
+    for slot, edge in zip(slots, demand_edges):
+        key = (slot['subject_id'], slot['batch_id'])
+        entry = subjects.setdefault(slot['subject_id'], {
+            'subject_id': slot['subject_id'],
+            'subject_name': slot['subject_name'],
+            'abbreviation': slot['abbreviation'],
+            'no_of_hours_required': slot['no_of_hours_required'],
+            'slot_count': 0,
+            'willing_faculty': set(),
+            'batches_without_willing_faculty': [],
+            'batches_short_of_faculty': []
+        })
+        entry['slot_count'] += 1
+        entry['willing_faculty'] |= willing[key]
+        if not willing[key]:
+            entry['batches_without_willing_faculty'].append(slot['batch_id'])
+        elif network.flow(edge) < demand(slot):
+            entry['batches_short_of_faculty'].append(slot['batch_id'])
+
+    bottlenecks: List[str] = []
+    if not capped and len(faculty_ids) < len(slots):
+        bottlenecks.append(f"{len(faculty_ids)} faculty submitted priorities for {len(slots)} subject-batch slots; without an hour cap each faculty takes one slot")
+    reported = []
+    for entry in subjects.values():
+        if not entry['batches_without_willing_faculty'] and not entry['batches_short_of_faculty']:
+            continue
+        name = entry['abbreviation'] or entry['subject_name']
+        if entry['batches_without_willing_faculty']:
+            bottlenecks.append(f"{name}: no faculty picked {len(entry['batches_without_willing_faculty'])} of its {entry['slot_count']} batches")
+        if capped and entry['no_of_hours_required'] > max_hours_per_faculty:
+            bottlenecks.append(f"{name}: needs {entry['no_of_hours_required']} hours a week, more than the cap of {max_hours_per_faculty}")
+        elif entry['batches_short_of_faculty']:
+            bottlenecks.append(f"{name}: {len(entry['batches_short_of_faculty'])} of its batches cannot be covered, the faculty who picked them are needed for other slots")
+        reported.append({**entry, 'willing_faculty': len(entry['willing_faculty'])})
+
+    return {
+        'feasible': covered == required,
+        'unit': 'hours' if capped else 'slots',
+        'required': required,
+        'max_coverable': covered,
+        'faculty_count': len(faculty_ids),
+        'slot_count': len(slots),
+        'subjects': reported,
+        'bottlenecks': bottlenecks
+    }
+
+
+def analyze_periods(batches: List[dict], slots: List[dict], formats: List[dict]) -> List[dict]:
+    """Compare the weekly hours each batch's format offers with what its subjects require.
+
+    - **batches**: The year's batches with batch_id and section
+    - **slots**: Every (subject, batch) with batch_id, no_of_hours_required and is_lab
+    - **formats**: Timetable formats with format_id, format_name, batch_id and format_data, the
+      day lists of period lengths in hours; a batch with several formats is checked against its latest
+    """
+    latest: Dict[int, dict] = {}
+    for timetable_format in formats:
+        current = latest.get(timetable_format['batch_id'])
+        if current is None or timetable_format['format_id'] > current['format_id']:
+            latest[timetable_format['batch_id']] = timetable_format
+
+    report = []
+    for batch in batches:
+        batch_slots = [slot for slot in slots if slot['batch_id'] == batch['batch_id']]
+        required = sum(slot['no_of_hours_required'] for slot in batch_slots)
+        lab_required = sum(slot['no_of_hours_required'] for slot in batch_slots if slot['is_lab'])
+        timetable_format = latest.get(batch['batch_id'])
+        periods = [length for day in timetable_format['format_data'].values() for length in day] if timetable_format else []
+        supplied = sum(periods)
+        # Periods longer than one hour are the blocks a lab can use
+        lab_supplied = sum(length for length in periods if length > 1)
+
+        problems = []
+        if timetable_format is None:
+            problems.append(f"Batch {batch['section']} has no timetable format")
+        else:
+            if supplied < required:
+                problems.append(f"Batch {batch['section']}: format '{timetable_format['format_name']}' offers {supplied} hours a week, its subjects need {required}")
+            if lab_supplied < lab_required:
+                problems.append(f"Batch {batch['section']}: format '{timetable_format['format_name']}' has {lab_supplied} hours in multi-hour periods, its labs need {lab_required}")
+        report.append({
+            'batch_id': batch['batch_id'],
+            'section': batch['section'],
+            'format_id': timetable_format['format_id'] if timetable_format else None,
+            'required_hours': required,
+            'supplied_hours': supplied,
+            'lab_hours_required': lab_required,
+            'lab_hours_supplied': lab_supplied,
+            'feasible': not problems,
+            'problems': problems
+        })
+    return report
@@ -0,0 +1,50 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.models.model import SubjectTypeEnum, WorkflowStageEnum
+from app.repositories.lecturer_priority_repository import FacultyPriorityRepository
+from app.repositories.timetable_repository import TimetableRepository
+from app.repositories.year_batch_repository import YearBatchRepository
+from app.schemas.workflow_schema import AllocationFeasibility, BatchPeriodFeasibility, FeasibilityResponse
+from app.services.feasibility_analyzer import analyze_allocation, analyze_periods
+
+
+class FeasibilityService:
+    """Checks a year's demand against faculty and timetable formats before allocation and generation run"""
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.priority_repository = FacultyPriorityRepository(db)
+        self.timetable_repository = TimetableRepository(db)
+        self.year_batch_repository = YearBatchRepository(db)
+
+    async def analyze(self, year_id: int, max_hours_per_faculty: Optional[int] = None) -> FeasibilityResponse:
+        """Read the year's slots, priorities, batches and formats once and run both checks on them"""
+        slot_rows = await self.priority_repository.get_allocation_slots(year_id)
+        priority_rows = await self.priority_repository.get_priorities_by_year_ordered(year_id)
+        batches = await self.year_batch_repository.get_batches_by_year(year_id)
+        formats = await self.timetable_repository.get_timetable_formats_by_year(year_id)
+
+        slots = [{**row, 'is_lab': row['subject_type'] == SubjectTypeEnum.LAB} for row in slot_rows]
+        allocation = AllocationFeasibility(**analyze_allocation(slots, priority_rows, max_hours_per_faculty))
+        periods = [
+            BatchPeriodFeasibility(**entry)
+            for entry in analyze_periods(
+                [{'batch_id': batch.batch_id, 'section': batch.section} for batch in batches],
+                slots,
+                [{**timetable_format, 'batch_id': timetable_format['batch_details']['batch_id']} for timetable_format in formats]
+            )
+        ]
+        return FeasibilityResponse(
+            year_id=year_id,
+            max_hours_per_faculty=max_hours_per_faculty,
+            feasible=allocation.feasible and all(entry.feasible for entry in periods),
+            allocation=allocation,
+            batches=periods
+        )
+
+    async def warnings_for_step(self, year_id: int, step: int) -> List[str]:
+        """Bottlenecks the run started by entering step would hit"""
+        if step == WorkflowStageEnum.STEP_5_AUTO_SUBJECT_ASSIGNMENT_AND_SEND_TO_HOD.value:
+            return (await self.analyze(year_id)).allocation.bottlenecks
+        if step == WorkflowStageEnum.STEP_10_AUTOGENERATE_TIMETABLE_AND_SEND_TO_HOD.value:
+            return [problem for entry in (await self.analyze(year_id)).batches for problem in entry.problems]
+        return []
@@ -0,0 +1,167 @@
+import asyncio
+import base64
+import json
+import logging
+import re
+import time
+from typing import Dict, Optional, Set, Tuple
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey, RSAPublicNumbers
+from app.config.config import settings
+from app.services.auth_services import get_oauth_client
+
+logger = logging.getLogger(__name__)
+
+"""
+Local verification of Google ID tokens.
+
+The OAuth callback receives an RS256-signed id_token next to the access token. Checking
+its signature against Google's published keys (JWKS) and its claims gives the user's
+identity without a userinfo round-trip. The key set is cached in process for as long as
+Google's Cache-Control allows, refreshed in the background shortly before it expires,
+and refetched early when a token names a key we have not seen (key rotation).
+"""
+
+JWKS_DEFAULT_MAX_AGE = 60 * 60  # seconds, when the response has no max-age
+JWKS_REFRESH_AHEAD = 5 * 60  # seconds before expiry to refresh in the background
+JWKS_MIN_REFETCH_INTERVAL = 60  # seconds between refetches triggered by unknown key ids
+CLOCK_SKEW_LEEWAY = 60  # seconds
+
+
+class JwksUnavailable(Exception):
+    """The signing keys could not be loaded, so no token can be verified either way"""
+
+
+def _b64url_decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def _b64url_int(segment: str) -> int:
+    return int.from_bytes(_b64url_decode(segment), "big")
+
+
+def rs256_verify(message: bytes, signature: bytes, key: RSAPublicKey) -> bool:
+    """RSASSA-PKCS1-v1_5 verification with SHA-256"""
+    try:
+        key.verify(signature, message, padding.PKCS1v15(), hashes.SHA256())
+    except InvalidSignature:
+        return False
+    return True
+
+
+def split_token(id_token: str) -> Tuple[dict, dict, bytes, bytes]:
+    """Split a JWT into header, claims, signing input and signature; nothing is verified"""
+    try:
+        header_segment, claims_segment, signature_segment = id_token.split(".")
+        header = json.loads(_b64url_decode(header_segment))
+        claims = json.loads(_b64url_decode(claims_segment))
+        signature = _b64url_decode(signature_segment)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Malformed ID token: {str(e)}")
+    if not isinstance(header, dict) or not isinstance(claims, dict):
+        raise ValueError("Malformed ID token")
+    return header, claims, f"{header_segment}.{claims_segment}".encode("ascii"), signature
+
+
+class JwksCache:
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self._keys: Dict[str, RSAPublicKey] = {}
+        self._expires_at = 0.0
+        self._last_fetch = 0.0
+        self._lock = asyncio.Lock()
+        self._background: Set[asyncio.Task] = set()
+
+    async def _fetch(self) -> None:
+        response = await get_oauth_client().get(self.url)
+        response.raise_for_status()
+        keys = {
+            key["kid"]: RSAPublicNumbers(_b64url_int(key["e"]), _b64url_int(key["n"])).public_key()
+            for key in response.json().get("keys", [])
+            if key.get("kty") == "RSA" and key.get("alg", "RS256") == "RS256" and key.get("use", "sig") == "sig" and "kid" in key
+        }
+        match = re.search(r"max-age=(\d+)", response.headers.get("cache-control", ""))
+        now = time.monotonic()
+        self._keys = keys
+        self._expires_at = now + (int(match.group(1)) if match else JWKS_DEFAULT_MAX_AGE)
+        self._last_fetch = now
+        logger.info(f"Loaded {len(keys)} signing keys from {self.url}")
+
+    async def _refresh(self, force: bool = False) -> None:
+        async with self._lock:
+            # Whoever held the lock before us may already have refreshed
+            now = time.monotonic()
+            if not (now >= self._expires_at or (force and now - self._last_fetch >= JWKS_MIN_REFETCH_INTERVAL)):
+                return
+            try:
+                await self._fetch()
+            except Exception as e:
+                if not self._keys:
+                    # A broken key set is not a bad token; callers fall back instead of rejecting
+                    raise JwksUnavailable(f"Loading signing keys from {self.url} failed: {str(e)}") from e
+                # Keep verifying with the keys we have and try again shortly
+                logger.warning(f"Refreshing signing keys from {self.url} failed, keeping the cached set: {str(e)}")
+                self._expires_at = now + JWKS_MIN_REFETCH_INTERVAL
+                self._last_fetch = now
+
+    def _refresh_in_background(self) -> None:
+        if self._lock.locked() or self._background:
+            return
+        task = asyncio.create_task(self._refresh(force=True))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def get_key(self, kid: str) -> Optional[RSAPublicKey]:
+        now = time.monotonic()
+        if now >= self._expires_at:
+            await self._refresh()
+        elif self._expires_at - now <= JWKS_REFRESH_AHEAD:
+            self._refresh_in_background()
+
+        if kid not in self._keys:
+            # Keys rotate; a token signed with a new key triggers an early, rate-limited refetch
+            await self._refresh(force=True)
+        return self._keys.get(kid)
+
+
+google_jwks = JwksCache(settings.GOOGLE_JWKS_URL)
+
+
+async def verify_google_id_token(id_token: str, audience: str = settings.GOOGLE_CLIENT_ID) -> dict:
+    """Verify an ID token's signature and claims and return the user it identifies.
+
+    Raises ValueError when the token is malformed, badly signed, expired or not meant for us,
+    and JwksUnavailable when the signing keys cannot be loaded.
+    The result has the keys the userinfo endpoint returns (id, email, name, picture).
+    """
+    header, claims, signing_input, signature = split_token(id_token)
+    if header.get("alg") != "RS256" or not header.get("kid"):
+        raise ValueError("ID token must be RS256-signed with a key id")
+
+    key = await google_jwks.get_key(header["kid"])
+    if key is None:
+        raise ValueError(f"Unknown ID token signing key {header['kid']}")
+    if not rs256_verify(signing_input, signature, key):
+        raise ValueError("Invalid ID token signature")
+
+    now = time.time()
+    audiences = claims.get("aud") if isinstance(claims.get("aud"), list) else [claims.get("aud")]
+    if claims.get("iss") not in settings.GOOGLE_ISSUERS:
+        raise ValueError("ID token issuer is not trusted")
+    if audience not in audiences:
+        raise ValueError("ID token was issued for another client")
+    if not isinstance(claims.get("exp"), (int, float)) or claims["exp"] < now - CLOCK_SKEW_LEEWAY:
+        raise ValueError("ID token has expired")
+    if isinstance(claims.get("iat"), (int, float)) and claims["iat"] > now + CLOCK_SKEW_LEEWAY:
+        raise ValueError("ID token was issued in the future")
+    if not claims.get("email") or claims.get("email_verified") is not True:
+        raise ValueError("ID token has no verified email")
+
+    return {
+        "id": claims.get("sub"),
+        "email": claims["email"],
+        "name": claims.get("name"),
+        "picture": claims.get("picture"),
+    }
@@ -4,22 +4,106 @@ from app.schemas.lecturer_priority_schema import (
     FacultyPriorityUpdateRequest,
     FacultyPriorityResponse,
     FacultySubjectAllocationResponse,
-    AllocationResultResponse
+    AllocationResultResponse,
+    PrioritySubmissionFaculty,
+    PriorityDemandEntry,
+    PrioritySubmissionStatusResponse,
+    PriorityHeatmapCell,
+    PriorityHeatmapResponse,
+    AllocationScenario,
+    ProposedAllocation,
+    AllocationSimulationMetrics,
+    AllocationSimulationResult,
+    AllocationSimulationResponse
 )
+from app.services.radis_services import PriorityProgressCache, PriorityHeatmapCache
+from app.core.compression import acceptable_encodings, compress_variants, pick_variant, precompressed_response
+from fastapi.responses import Response
+from app.core.data_loader import entity_loader
+from app.models.model import Users
+from app.services.allocation_engine import allocate, group_priorities_by_faculty, run_scenario
+from app.services.faculty_schedule_service import FacultyScheduleService
+from app.services.room_service import RoomService
+from app.services.timetable_event_service import TimetableEventPublisher
+from app.db.unit_of_work import after_commit
+from app.config.config import settings
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any
+import redis.asyncio as redis
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
 import logging
+import multiprocessing
 
 logger = logging.getLogger(__name__)
 
+_simulation_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_simulation_pool() -> ProcessPoolExecutor:
+    """Process pool shared by allocation simulations, created on first use"""
+    global _simulation_pool
+    if _simulation_pool is None:
+        # Spawned, not forked, so the workers do not inherit the event loop and its threads
+        _simulation_pool = ProcessPoolExecutor(
+            max_workers=settings.SIMULATION_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _simulation_pool
+
+
+def close_simulation_pool() -> None:
+    global _simulation_pool
+    if _simulation_pool is not None:
+        _simulation_pool.shutdown(cancel_futures=True)
+        _simulation_pool = None
+
 class FacultyPriorityService:
-    def __init__(self, repository: FacultyPriorityRepository):
+    def __init__(
+        self,
+        repository: FacultyPriorityRepository,
+        redis_client: Optional[redis.Redis] = None,
+        binary_redis_client: Optional[redis.Redis] = None
+    ):
         self.repository = repository
+        self.schedule_service = FacultyScheduleService(repository.db, redis_client)
+        self.room_service = RoomService(repository.db, redis_client)
+        self.events = TimetableEventPublisher(redis_client) if redis_client else None
+        self.progress_cache = PriorityProgressCache(redis_client) if redis_client else None
+        self.users = entity_loader(repository.db, Users)
+        # Stores compressed bytes, so it needs a client that does not decode responses
+        self.heatmap_cache = PriorityHeatmapCache(binary_redis_client) if binary_redis_client else None
+
+    async def _invalidate_heatmap(self, year_id: int) -> None:
+        if self.heatmap_cache:
+            after_commit(self.repository.db, lambda: self._drop_heatmap(year_id))
+
+    async def _drop_heatmap(self, year_id: int) -> None:
+        try:
+            await self.heatmap_cache.invalidate(year_id)
+        except Exception as e:
+            logger.warning(f"Priority heatmap invalidation failed for year {year_id}: {str(e)}")
+
+    async def _track_progress(self, year_id: int, faculty_id: int, removed: List[dict], added: List[dict]) -> None:
+        """Keep the submission counters and the heatmap in step with a priority write once it has committed"""
+        await self._invalidate_heatmap(year_id)
+        if self.progress_cache:
+            after_commit(self.repository.db, lambda: self._apply_progress(year_id, faculty_id, removed, added))
+
+    async def _apply_progress(self, year_id: int, faculty_id: int, removed: List[dict], added: List[dict]) -> None:
+        try:
+            await self.progress_cache.apply(year_id, faculty_id, removed, added)
+        except Exception as e:
+            logger.warning(f"Priority progress update failed for year {year_id}, dropping the cache: {str(e)}")
+            try:
+                await self.progress_cache.invalidate(year_id)
+            except Exception:
+                pass
 
     async def submit_priorities(self, faculty_id: int, year_id: int, priorities: List[dict]):
         """Submit priorities for a faculty"""
         try:
-            await self.repository.submit_priorities(faculty_id, year_id, priorities)
+            previous_entries = await self.repository.submit_priorities(faculty_id, year_id, priorities)
+            await self._track_progress(year_id, faculty_id, previous_entries, priorities)
             return {"message": "Priorities submitted successfully"}
         except Exception as e:
             logger.error(f"Error submitting priorities: {str(e)}")
@@ -29,20 +113,158 @@ class FacultyPriorityService:
         """Update priorities for a faculty"""
         try:
             await self.repository.update_priority(faculty_id, year_id, subject1_id, batch1_id, priority1, subject2_id, batch2_id, priority2)
+            await self._invalidate_heatmap(year_id)
+            if self.progress_cache:
+                # A swap moves demand between levels; recount on the next read
+                after_commit(self.repository.db, lambda: self.progress_cache.invalidate(year_id))
             return {"message": "Priorities updated successfully"}
         except Exception as e:
             logger.error(f"Error updating priorities: {str(e)}")
             raise
 
+    async def reorder_priorities(self, faculty_id: int, year_id: int, order: List[dict]):
+        """Rank all of a faculty's priorities for a year in the given order"""
+        try:
+            previous_entries, new_entries = await self.repository.reorder_priorities(faculty_id, year_id, order)
+            await self._track_progress(year_id, faculty_id, previous_entries, new_entries)
+            return {"message": "Priorities reordered successfully"}
+        except Exception as e:
+            logger.error(f"Error reordering priorities: {str(e)}")
+            raise
+
     async def delete_priority(self, priority_id: int):
         """Delete a priority"""
         try:
-            await self.repository.delete_priority(priority_id)
+            deleted = await self.repository.delete_priority(priority_id)
+            await self._track_progress(deleted['year_id'], deleted['faculty_id'], [deleted], [])
             return {"message": "Priority deleted successfully"}
         except Exception as e:
             logger.error(f"Error deleting priority: {str(e)}")
             raise
 
+    async def get_submission_status(self, year_id: int) -> PrioritySubmissionStatusResponse:
+        """Split active faculty into submitted and missing and report demand per subject and batch.
+
+        Counts come from Redis counters maintained on every priority write; on a cold cache they are
+        rebuilt with two grouped queries, never by loading priority rows.
+        """
+        cached = None
+        if self.progress_cache:
+            try:
+                cached = await self.progress_cache.get(year_id)
+            except Exception as e:
+                logger.warning(f"Priority progress read failed for year {year_id}: {str(e)}")
+
+        if cached is None:
+            token = None
+            if self.progress_cache:
+                try:
+                    # Mark the rebuild before counting, so a write committing meanwhile cancels it
+                    token = await self.progress_cache.begin_rebuild(year_id)
+                except Exception as e:
+                    logger.warning(f"Priority progress rebuild failed for year {year_id}: {str(e)}")
+            faculty_counts = await self.repository.get_priority_counts_by_faculty(year_id)
+            demand_rows = await self.repository.get_priority_demand_counts(year_id)
+            demand_counts = {(row['subject_id'], row['batch_id'], row['priority']): row['count'] for row in demand_rows}
+            if token is not None:
+                try:
+                    await self.progress_cache.rebuild(year_id, token, faculty_counts, demand_rows)
+                except Exception as e:
+                    logger.warning(f"Priority progress rebuild failed for year {year_id}: {str(e)}")
+        else:
+            faculty_counts, demand_counts = cached
+
+        submitted, missing = [], []
+        for member in await self.repository.get_active_faculty():
+            entry = PrioritySubmissionFaculty(
+                faculty_id=member['user_id'],
+                faculty_name=member['uname'],
+                email=member['email'],
+                joining_year=member['joining_year'],
+                priority_count=faculty_counts.get(member['user_id'], 0)
+            )
+            (submitted if entry.priority_count > 0 else missing).append(entry)
+
+        demand: Dict[tuple, Dict[int, int]] = {}
+        for (subject_id, batch_id, priority), count in demand_counts.items():
+            if count > 0:
+                demand.setdefault((subject_id, batch_id), {})[priority] = count
+
+        return PrioritySubmissionStatusResponse(
+            year_id=year_id,
+            total_faculty=len(submitted) + len(missing),
+            submitted_count=len(submitted),
+            submitted=submitted,
+            missing=missing,
+            demand=[
+                PriorityDemandEntry(
+                    subject_id=subject_id,
+                    batch_id=batch_id,
+                    priority_counts=dict(sorted(levels.items())),
+                    total=sum(levels.values())
+                )
+                for (subject_id, batch_id), levels in sorted(demand.items())
+            ]
+        )
+
+    async def get_priority_heatmap(self, year_id: int, accept_encoding: str = "") -> Response:
+        """Get the heatmap of a year as a JSON response, served precompressed from the cache when possible"""
+        encodings = acceptable_encodings(accept_encoding)
+        if self.heatmap_cache:
+            try:
+                cached = await self.heatmap_cache.get(year_id, encodings)
+                if cached:
+                    return precompressed_response(*cached)
+            except Exception as e:
+                logger.warning(f"Priority heatmap cache read failed for year {year_id}: {str(e)}")
+
+        heatmap = await self.build_priority_heatmap(year_id)
+        variants = compress_variants(heatmap.model_dump_json().encode())
+
+        if self.heatmap_cache:
+            try:
+                await self.heatmap_cache.set(year_id, variants)
+            except Exception as e:
+                logger.warning(f"Priority heatmap cache write failed for year {year_id}: {str(e)}")
+
+        return precompressed_response(*pick_variant(variants, encodings))
+
+    async def build_priority_heatmap(self, year_id: int) -> PriorityHeatmapResponse:
+        """Build the subject x batch demand matrix of a year and predict the slots allocation would leave unfilled"""
+        rows = await self.repository.get_demand_heatmap(year_id)
+        faculty, priorities_by_faculty = group_priorities_by_faculty(
+            await self.repository.get_priorities_by_year_ordered(year_id)
+        )
+        allocated = {
+            (allocation['subject_id'], allocation['batch_id'])
+            for allocation in allocate(faculty, priorities_by_faculty)
+        }
+
+        cells = []
+        for row in rows:
+            priority_counts = {level: row[f'priority_{level}'] for level in range(1, 6)}
+            cells.append(PriorityHeatmapCell(
+                subject_id=row['subject_id'],
+                subject_name=row['subject_name'],
+                abbreviation=row['abbreviation'],
+                batch_id=row['batch_id'],
+                section=row['section'],
+                priority_counts=priority_counts,
+                total_picks=row['total_picks'],
+                contention_score=round(float(row['contention_score']), 2),
+                oversubscribed_levels=[level for level, count in priority_counts.items() if count > 1],
+                predicted_unfilled=(row['subject_id'], row['batch_id']) not in allocated
+            ))
+
+        heatmap = PriorityHeatmapResponse(
+            year_id=year_id,
+            cells=cells,
+            oversubscribed_count=sum(1 for cell in cells if cell.priority_counts[1] > 1),
+            no_taker_count=sum(1 for cell in cells if cell.total_picks == 0),
+            predicted_unfilled_count=sum(1 for cell in cells if cell.predicted_unfilled)
+        )
+        return heatmap
+
     async def get_priorities_by_faculty_and_year(self, faculty_id: int, year_id: int):
         priorities = await self.repository.get_priorities_by_faculty_and_year(faculty_id, year_id)
         if not priorities:
@@ -66,147 +288,25 @@ class FacultyPriorityService:
 
     async def get_all_priorities_by_year_with_details(self, year_id: int):
         """Get all priorities for a year with detailed information"""
+        # The repository already returns the response shape; no per-field copy is needed
         priorities = await self.repository.get_all_priorities_by_year_with_details(year_id)
-        
-        # Transform the data to match the expected response format
-        transformed_priorities = []
-        for faculty_data in priorities:
-            transformed_faculty = {
-                'faculty_id': faculty_data['faculty_id'],
-                'faculty_name': faculty_data['faculty_name'],
-                'faculty_email': faculty_data['faculty_email'],
-                'year_id': faculty_data['year_id'],
-                'academic_year': faculty_data['academic_year'],
-                'priority_subjects': []
-            }
-            
-            for priority_subject in faculty_data['priority_subjects']:
-                transformed_faculty['priority_subjects'].append({
-                    'id': priority_subject['id'],
-                    'subject_id': priority_subject['subject_id'],
-                    'subject_name': priority_subject['subject_name'],
-                    'subject_code': priority_subject['subject_code'],
-                    'subject_type': priority_subject['subject_type'],
-                    'abbreviation': priority_subject['abbreviation'],
-                    'batch_id': priority_subject['batch_id'],
-                    'batch_section': priority_subject['batch_section'],
-                    'batch_noOfStudent': priority_subject['batch_noOfStudent'],
-                    'priority': priority_subject['priority'],
-                    'created_at': priority_subject['created_at']
-                })
-            
-            transformed_priorities.append(transformed_faculty)
-        
-        return {'priorities': transformed_priorities}
+        return {'priorities': priorities}
 
     async def allocate_subjects_for_year(self, year_id: int) -> AllocationResultResponse:
         """Automatically allocate subjects to faculty based on priorities and seniority"""
         try:
-            # Clear existing allocations for this year
-            await self.repository.clear_allocations_for_year(year_id)
-            
-            # Get all faculty with priorities, ordered by seniority (joining_year ascending)
-            faculty = await self.repository.get_faculty_with_priorities_by_year(year_id)
-            
-            if not faculty:
-                return AllocationResultResponse(
-                    total_allocations=0,
-                    allocations=[]
-                )
-            
-            allocations = []
-            allocated_subject_batches = set()  # Track allocated (subject_id, batch_id) combinations
-            
-            # First pass: Handle priority 1 conflicts
-            # Group all priority 1 selections by subject-batch
-            priority_1_selections: dict[tuple[int, int], list[dict]] = {}
-            
-            for faculty_member in faculty:
-                faculty_id = faculty_member['user_id']
-                priorities = await self.repository.get_priorities_by_faculty_year(faculty_id, year_id)
-                
-                for priority in priorities:
-                    if priority['priority'] == 1:
-                        subject_id = priority['subject_id']
-                        batch_id = priority['batch_id']
-                        key = (subject_id, batch_id)
-                        
-                        if key not in priority_1_selections:
-                            priority_1_selections[key] = []
-                        
-                        priority_1_selections[key].append({
-                            'faculty_id': faculty_id,
-                            'joining_year': faculty_member['joining_year'],
-                            'priority_id': priority['id']
-                        })
-            
-            # Resolve priority 1 conflicts - senior faculty wins
-            for (subject_id, batch_id), selections in priority_1_selections.items():
-                if len(selections) > 1:
-                    # Multiple faculty want this as priority 1 - senior wins
-                    selections.sort(key=lambda x: x['joining_year'])  # Sort by joining_year (ascending = senior first)
-                    winner = selections[0]
-                    
-                    # Allocate to the senior faculty
-                    allocation = await self.repository.create_allocation(
-                        faculty_id=winner['faculty_id'],
-                        subject_id=subject_id,
-                        batch_id=batch_id,
-                        year_id=year_id,
-                        allocated_priority=1
-                    )
-                    
-                    allocated_subject_batches.add((subject_id, batch_id))
-                    allocations.append(allocation)
-                    print(f"Priority 1 conflict resolved: Subject {subject_id}, Batch {batch_id} allocated to senior faculty {winner['faculty_id']} (joining_year: {winner['joining_year']})")
-                else:
-                    # Only one faculty wants this as priority 1
-                    selection = selections[0]
-                    allocation = await self.repository.create_allocation(
-                        faculty_id=selection['faculty_id'],
-                        subject_id=subject_id,
-                        batch_id=batch_id,
-                        year_id=year_id,
-                        allocated_priority=1
-                    )
-                    
-                    allocated_subject_batches.add((subject_id, batch_id))
-                    allocations.append(allocation)
-                    print(f"Priority 1 allocation: Subject {subject_id}, Batch {batch_id} allocated to faculty {selection['faculty_id']}")
-            
-            # Second pass: Process remaining faculty for their next available priorities
-            for faculty_member in faculty:
-                faculty_id = faculty_member['user_id']
-                
-                # Get all priorities for this faculty, ordered by priority (1, 2, 3, 4, 5)
-                priorities = await self.repository.get_priorities_by_faculty_year(faculty_id, year_id)
-                
-                # Check if this faculty already got an allocation
-                faculty_allocated = any(allocation.faculty_id == faculty_id for allocation in allocations)
-                
-                if not faculty_allocated:
-                    # Try to allocate the highest priority subject that's available
-                    for priority in priorities:
-                        subject_id = priority['subject_id']
-                        batch_id = priority['batch_id']
-                        priority_level = priority['priority']
-                        
-                        # Check if this subject-batch combination is already allocated
-                        if (subject_id, batch_id) not in allocated_subject_batches:
-                            # This subject-batch is available, allocate it to this faculty
-                            allocation = await self.repository.create_allocation(
-                                faculty_id=faculty_id,
-                                subject_id=subject_id,
-                                batch_id=batch_id,
-                                year_id=year_id,
-                                allocated_priority=priority_level
-                            )
-                            
-                            allocated_subject_batches.add((subject_id, batch_id))
-                            allocations.append(allocation)
-                            print(f"Fallback allocation: Subject {subject_id}, Batch {batch_id} allocated to faculty {faculty_id} (Priority {priority_level})")
-                            break
-            
+            faculty, priorities_by_faculty = group_priorities_by_faculty(
+                await self.repository.get_priorities_by_year_ordered(year_id)
+            )
+            allocations = allocate(faculty, priorities_by_faculty)
+
+            # Replace the year's allocations and re-point its timetable slots in one transaction
+            await self.repository.replace_allocations(year_id, allocations)
+            await self.schedule_service.invalidate_year(year_id)
+            await self.room_service.refresh_occupancy(year_id)
+            if self.events:
+                after_commit(self.repository.db, lambda: self.events.publish(year_id, "allocations_regenerated", {}))
+
             # Get detailed allocation information
             allocation_details = await self.repository.get_allocations_by_year_with_details(year_id)
             
@@ -221,6 +321,45 @@ class FacultyPriorityService:
         except Exception as e:
             raise ValueError(f"Error during subject allocation: {str(e)}")
 
+    async def simulate_allocations(self, year_id: int, scenarios: List[AllocationScenario]) -> AllocationSimulationResponse:
+        """Run allocation scenarios on one snapshot of the year's priorities without writing anything.
+
+        The snapshot is read once; each scenario then runs the pure engine in the simulation
+        process pool, so the scenarios are evaluated in parallel.
+        """
+        priority_rows = await self.repository.get_priorities_by_year_ordered(year_id)
+        slot_rows = await self.repository.get_allocation_slots(year_id)
+
+        faculty, priorities_by_faculty = group_priorities_by_faculty(priority_rows)
+        faculty_names = {row['faculty_id']: row['faculty_name'] for row in priority_rows}
+        subject_hours = {row['subject_id']: row['no_of_hours_required'] for row in slot_rows}
+        slots = [(row['subject_id'], row['batch_id']) for row in slot_rows]
+
+        # The engine is CPU-bound pure Python, so threads would take turns on the GIL
+        loop = asyncio.get_running_loop()
+        pool = get_simulation_pool()
+        outcomes = await asyncio.gather(*(
+            loop.run_in_executor(
+                pool, run_scenario, faculty, priorities_by_faculty, slots, subject_hours,
+                scenario.strategy, scenario.max_hours_per_faculty
+            )
+            for scenario in scenarios
+        ))
+        results = [
+            AllocationSimulationResult(
+                name=scenario.name,
+                strategy=scenario.strategy,
+                max_hours_per_faculty=scenario.max_hours_per_faculty,
+                allocations=[
+                    ProposedAllocation(**allocation, faculty_name=faculty_names.get(allocation['faculty_id'], ''))
+                    for allocation in allocations
+                ],
+                metrics=AllocationSimulationMetrics(**metrics)
+            )
+            for scenario, (allocations, metrics) in zip(scenarios, outcomes)
+        ]
+        return AllocationSimulationResponse(year_id=year_id, faculty_count=len(faculty), slot_count=len(slots), results=results)
+
     async def get_priorities_by_faculty_year(self, faculty_id: int, year_id: int):
         """Get all priorities for a faculty in a year"""
         priorities = await self.repository.get_priorities_by_faculty_year(faculty_id, year_id)
@@ -234,15 +373,72 @@ class FacultyPriorityService:
     async def get_allocations_grouped_by_year_batch_subject(self, year_id: int):
         """Get allocations grouped by year, batches, and subjects with allocated faculty"""
         allocations = await self.repository.get_allocations_grouped_by_year_batch_subject(year_id)
+        subjects = [
+            subject
+            for year in allocations
+            for batch in year['batchs'].values()
+            for subject in batch['subjects'].values()
+        ]
+
+        # One query for every co-faculty of the year
+        co_faculty = await self.users.load_many(
+            {subject['co_faculty_id'] for subject in subjects if subject['co_faculty_id']}
+        )
+        co_faculty_by_id = {user.user_id: user for user in co_faculty if user}
+        for subject in subjects:
+            user = co_faculty_by_id.get(subject.pop('co_faculty_id'))
+            subject['co_faculty'] = {
+                'faculty_id': user.user_id,
+                'uname': user.uname,
+                'role': user.role.value,
+                'email': user.email,
+                'joining_year': user.joining_year
+            } if user else None
+
         return {'allocations': allocations}
 
     async def update_allocation_faculty(self, allocation_id: int, faculty_id: int, co_faculty_id: Optional[int] = None, venue: Optional[str] = None):
         """Update the faculty for a specific allocation, and optionally co_faculty_id and venue"""
         try:
+            previous_allocation = await self.repository.get_allocation_by_id(allocation_id)
+            previous_faculty_ids = (
+                [previous_allocation.faculty_id, previous_allocation.co_faculty_id] if previous_allocation else []
+            )
+            previous_bookings = set()
+            if previous_allocation and venue is not None:
+                await self.room_service.validate_venue_capacity(str(venue), previous_allocation.batch_id)
+                previous_bookings = await self.room_service.allocation_bookings(
+                    previous_allocation.year_id, previous_allocation.subject_id, previous_allocation.batch_id
+                )
             updated_allocation = await self.repository.update_allocation_faculty(
                 allocation_id, faculty_id, co_faculty_id=co_faculty_id, venue=venue
             )
             if updated_allocation:
+                await self.schedule_service.refresh_faculties(
+                    updated_allocation.year_id,
+                    [*previous_faculty_ids, updated_allocation.faculty_id, updated_allocation.co_faculty_id]
+                )
+                if venue is not None:
+                    await self.room_service.update_occupancy(
+                        updated_allocation.year_id,
+                        previous_bookings,
+                        await self.room_service.allocation_bookings(
+                            updated_allocation.year_id, updated_allocation.subject_id, updated_allocation.batch_id
+                        )
+                    )
+                if self.events:
+                    event = {
+                        "allocation_id": updated_allocation.allocation_id,
+                        "subject_id": updated_allocation.subject_id,
+                        "batch_id": updated_allocation.batch_id,
+                        "faculty_id": updated_allocation.faculty_id,
+                        "co_faculty_id": updated_allocation.co_faculty_id,
+                        "venue": updated_allocation.venue
+                    }
+                    after_commit(
+                        self.repository.db,
+                        lambda: self.events.publish(updated_allocation.year_id, "allocation_updated", event)
+                    )
                 return {
                     "message": "Allocation updated successfully",
                     "allocation_id": updated_allocation.allocation_id,
@@ -0,0 +1,417 @@
+import json
+import logging
+import uuid
+from typing import Any, Dict, Iterable, List, Optional
+import redis.asyncio as redis
+from app.schemas.timetable_module_schema import TIMETABLE_DAYS
+from app.core.compression import IDENTITY
+
+logger = logging.getLogger(__name__)
+
+"""
+Precomputed per-faculty weekly schedules.
+
+Each faculty's schedule for a year is a Redis hash keyed by "day:period:batch_id"
+so a dashboard load is a single HGETALL. A marker field is always written so an
+empty schedule is distinguishable from a cache miss.
+"""
+
+FACULTY_SCHEDULE_TTL = 7 * 24 * 60 * 60  # 7 days
+_BUILT_MARKER = "__built__"
+
+# KEYS: schedule, index; ARGV: TTL, faculty_id, then field/value pairs of the schedule
+STORE_SCHEDULE_IF_ABSENT_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+for i = 3, #ARGV, 2 do
+    redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+redis.call('SADD', KEYS[2], ARGV[2])
+redis.call('EXPIRE', KEYS[2], ARGV[1])
+return 1
+"""
+
+
+def slot_sort_key(slot: Dict[str, Any]) -> tuple:
+    """Order slots by weekday, period and batch"""
+    day_index = TIMETABLE_DAYS.index(slot["day"]) if slot["day"] in TIMETABLE_DAYS else len(TIMETABLE_DAYS)
+    return (day_index, slot["period"], slot["batch_id"])
+
+
+def faculty_schedule_key(year_id: int, faculty_id: int) -> str:
+    return f"faculty_schedule:{year_id}:{faculty_id}"
+
+
+def faculty_schedule_index_key(year_id: int) -> str:
+    return f"faculty_schedule_index:{year_id}"
+
+
+class FacultyScheduleCache:
+    def __init__(self, redis_client: redis.Redis):
+        self.redis = redis_client
+
+    async def get(self, year_id: int, faculty_id: int) -> Optional[List[Dict[str, Any]]]:
+        """Return the cached slots of a faculty, or None on a cache miss"""
+        entries = await self.redis.hgetall(faculty_schedule_key(year_id, faculty_id))
+        if not entries:
+            return None
+
+        slots = [json.loads(value) for field, value in entries.items() if field != _BUILT_MARKER]
+        slots.sort(key=slot_sort_key)
+        return slots
+
+    def _mapping(self, slots: List[Dict[str, Any]]) -> Dict[str, str]:
+        mapping = {
+            f"{slot['day']}:{slot['period']}:{slot['batch_id']}": json.dumps(slot)
+            for slot in slots
+        }
+        mapping[_BUILT_MARKER] = "1"
+        return mapping
+
+    async def store_many(self, year_id: int, schedules: Dict[int, List[Dict[str, Any]]]) -> None:
+        """Replace the cached schedules of the given faculty in one round-trip"""
+        if not schedules:
+            return
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for faculty_id, slots in schedules.items():
+                key = faculty_schedule_key(year_id, faculty_id)
+                mapping = self._mapping(slots)
+                pipe.delete(key)
+                pipe.hset(key, mapping=mapping)
+                pipe.expire(key, FACULTY_SCHEDULE_TTL)
+            pipe.sadd(faculty_schedule_index_key(year_id), *schedules.keys())
+            pipe.expire(faculty_schedule_index_key(year_id), FACULTY_SCHEDULE_TTL)
+            await pipe.execute()
+
+    async def store_if_absent(self, year_id: int, faculty_id: int, slots: List[Dict[str, Any]]) -> bool:
+        """Cache a schedule read on a miss unless a refresh stored a newer one meanwhile"""
+        args = [field_or_value for item in self._mapping(slots).items() for field_or_value in item]
+        return bool(await self.redis.eval(
+            STORE_SCHEDULE_IF_ABSENT_SCRIPT, 2,
+            faculty_schedule_key(year_id, faculty_id), faculty_schedule_index_key(year_id),
+            FACULTY_SCHEDULE_TTL, faculty_id, *args
+        ))
+
+    async def invalidate_year(self, year_id: int) -> None:
+        """Drop every cached schedule of a year; they are rebuilt on the next read"""
+        index_key = faculty_schedule_index_key(year_id)
+        faculty_ids: Iterable[str] = await self.redis.smembers(index_key)
+        keys = [faculty_schedule_key(year_id, int(faculty_id)) for faculty_id in faculty_ids]
+        await self.redis.delete(index_key, *keys)
+
+
+"""
+Room occupancy bitmaps.
+
+One bitmap per (year, room); bit day_index * MAX_PERIODS_PER_DAY + (period - 1)
+is set when the room is booked in that slot, so availability is a single GETBIT.
+Writes set and clear only the bits of the slots they changed; a bulk change
+rebuilds the year.
+"""
+
+MAX_PERIODS_PER_DAY = 16
+ROOM_OCCUPANCY_TTL = 7 * 24 * 60 * 60  # 7 days
+
+# KEYS: built marker, then the bitmap of each change; ARGV: TTL, then offset and bit of each change
+APPLY_OCCUPANCY_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+for i = 2, #KEYS do
+    redis.call('SETBIT', KEYS[i], ARGV[2 * i - 2], ARGV[2 * i - 1])
+    redis.call('EXPIRE', KEYS[i], ARGV[1])
+end
+return 1
+"""
+
+
+def room_occupancy_key(year_id: int, room_id: int) -> str:
+    return f"room_occupancy:{year_id}:{room_id}"
+
+
+def room_occupancy_built_key(year_id: int) -> str:
+    return f"room_occupancy_built:{year_id}"
+
+
+def slot_offset(day: str, period: int) -> int:
+    if day not in TIMETABLE_DAYS:
+        raise ValueError(f"Invalid day '{day}'. Must be one of: {', '.join(TIMETABLE_DAYS)}")
+    if not 1 <= period <= MAX_PERIODS_PER_DAY:
+        raise ValueError(f"Invalid period {period}. Must be between 1 and {MAX_PERIODS_PER_DAY}")
+    return TIMETABLE_DAYS.index(day) * MAX_PERIODS_PER_DAY + (period - 1)
+
+
+class RoomOccupancyCache:
+    def __init__(self, redis_client: redis.Redis):
+        self.redis = redis_client
+
+    async def is_built(self, year_id: int) -> bool:
+        return bool(await self.redis.exists(room_occupancy_built_key(year_id)))
+
+    async def rebuild(self, year_id: int, room_ids: Iterable[int], booked: Iterable[tuple[int, int]]) -> None:
+        """Replace the bitmaps of a year from (room_id, offset) bookings in one round-trip"""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for room_id in room_ids:
+                pipe.delete(room_occupancy_key(year_id, room_id))
+            for room_id, offset in booked:
+                pipe.setbit(room_occupancy_key(year_id, room_id), offset, 1)
+            for room_id in room_ids:
+                pipe.expire(room_occupancy_key(year_id, room_id), ROOM_OCCUPANCY_TTL)
+            pipe.set(room_occupancy_built_key(year_id), "1", ex=ROOM_OCCUPANCY_TTL)
+            await pipe.execute()
+
+    async def apply(self, year_id: int, changes: List[tuple[int, int, int]]) -> None:
+        """Set each (room_id, offset, bit) change in one atomic step; skipped while the year is not built"""
+        if not changes:
+            return
+        keys = [room_occupancy_key(year_id, room_id) for room_id, _, _ in changes]
+        args = [value for _, offset, bit in changes for value in (offset, bit)]
+        await self.redis.eval(APPLY_OCCUPANCY_SCRIPT, 1 + len(keys), room_occupancy_built_key(year_id), *keys, ROOM_OCCUPANCY_TTL, *args)
+
+    async def free_rooms(self, year_id: int, room_ids: List[int], day: str, period: int) -> List[int]:
+        """Return the rooms whose bit for the slot is unset, checking all of them in one round-trip"""
+        if not room_ids:
+            return []
+        offset = slot_offset(day, period)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for room_id in room_ids:
+                pipe.getbit(room_occupancy_key(year_id, room_id), offset)
+            bits = await pipe.execute()
+        return [room_id for room_id, bit in zip(room_ids, bits) if not bit]
+
+    async def invalidate_year(self, year_id: int) -> None:
+        await self.redis.delete(room_occupancy_built_key(year_id))
+
+
+"""
+Cached workflow stage per academic year, written through on every transition.
+"""
+
+WORKFLOW_STAGE_TTL = 24 * 60 * 60  # 1 day
+
+
+def workflow_stage_key(year_id: int) -> str:
+    return f"workflow_stage:{year_id}"
+
+
+class WorkflowStageCache:
+    def __init__(self, redis_client: redis.Redis):
+        self.redis = redis_client
+
+    async def get(self, year_id: int) -> Optional[Dict[str, Any]]:
+        value = await self.redis.get(workflow_stage_key(year_id))
+        return json.loads(value) if value else None
+
+    async def set(self, year_id: int, stage: Dict[str, Any], only_if_absent: bool = False) -> None:
+        """Store the stage; only_if_absent leaves a stage someone else stored in the meantime alone"""
+        await self.redis.set(workflow_stage_key(year_id), json.dumps(stage), ex=WORKFLOW_STAGE_TTL, nx=only_if_absent)
+
+    async def invalidate(self, year_id: int) -> None:
+        await self.redis.delete(workflow_stage_key(year_id))
+
+
+"""
+Response bodies stored next to their compressed forms.
+
+Each key is a hash of encoding -> body ("identity", "gzip", "br"). The variants are
+compressed once when the body is built, so a hit skips both the query and the
+compression. Values are bytes, so these caches need a client without decode_responses.
+"""
+
+
+class CompressedBodyCache:
+    def __init__(self, redis_client: redis.Redis, ttl: int):
+        self.redis = redis_client
+        self.ttl = ttl
+
+    async def get_body(self, key: str, encodings: List[str]) -> Optional[tuple[str, bytes]]:
+        """Return (encoding, body) for the best stored variant the client accepts, or None on a miss"""
+        fields = list(dict.fromkeys([*encodings, IDENTITY]))
+        values = await self.redis.hmget(key, fields)
+        for field, value in zip(fields, values):
+            if value is not None:
+                return field, value
+        return None
+
+    async def set_body(self, key: str, variants: Dict[str, bytes]) -> None:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            pipe.hset(key, mapping=variants)
+            pipe.expire(key, self.ttl)
+            await pipe.execute()
+
+
+"""
+Short-lived cache of the aggregated year dashboard.
+"""
+
+YEAR_DASHBOARD_TTL = 30  # seconds
+
+
+def year_dashboard_key(year_id: int) -> str:
+    return f"year_dashboard:{year_id}"
+
+
+class YearDashboardCache(CompressedBodyCache):
+    def __init__(self, redis_client: redis.Redis):
+        super().__init__(redis_client, YEAR_DASHBOARD_TTL)
+
+    async def get(self, year_id: int, encodings: List[str]) -> Optional[tuple[str, bytes]]:
+        return await self.get_body(year_dashboard_key(year_id), encodings)
+
+    async def set(self, year_id: int, variants: Dict[str, bytes]) -> None:
+        await self.set_body(year_dashboard_key(year_id), variants)
+
+
+"""
+Priority submission progress per academic year.
+
+priority_counts:{year} maps faculty_id -> number of priority entries and
+priority_demand:{year} maps "subject_id:batch_id:priority" -> number of faculty,
+both adjusted with HINCRBY as priorities are submitted and deleted. A built marker
+tells a cold cache apart from a year nobody has submitted for yet.
+
+A rebuild sets the marker to "building:<nonce>" before it reads the database. A
+write that lands meanwhile sees the marker and drops it, and the rebuild only
+stores its counts if its own marker is still there, so no write is lost to a
+rebuild that read the database before it.
+"""
+
+PRIORITY_PROGRESS_TTL = 24 * 60 * 60  # 1 day
+PRIORITY_PROGRESS_BUILD_TTL = 60  # seconds a rebuild may take before its marker lapses
+_PROGRESS_BUILT = "1"
+_PROGRESS_BUILDING = "building:"
+
+# KEYS: built marker, faculty counts, demand; ARGV: faculty_id, faculty delta, then field/delta pairs of demand
+APPLY_PROGRESS_SCRIPT = """
+local built = redis.call('GET', KEYS[1])
+if not built then
+    return 0
+end
+if built ~= '1' then
+    redis.call('DEL', KEYS[1])
+    return 0
+end
+if tonumber(ARGV[2]) ~= 0 then
+    redis.call('HINCRBY', KEYS[2], ARGV[1], ARGV[2])
+end
+for i = 3, #ARGV, 2 do
+    redis.call('HINCRBY', KEYS[3], ARGV[i], ARGV[i + 1])
+end
+return 1
+"""
+
+# KEYS: built marker, faculty counts, demand; ARGV: expected marker, TTL, number of faculty pairs, then faculty and demand field/count pairs
+REBUILD_PROGRESS_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+redis.call('DEL', KEYS[2], KEYS[3])
+local faculty_end = 3 + 2 * tonumber(ARGV[3])
+for i = 4, faculty_end, 2 do
+    redis.call('HSET', KEYS[2], ARGV[i], ARGV[i + 1])
+end
+for i = faculty_end + 1, #ARGV, 2 do
+    redis.call('HSET', KEYS[3], ARGV[i], ARGV[i + 1])
+end
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+redis.call('EXPIRE', KEYS[3], ARGV[2])
+redis.call('SET', KEYS[1], '1', 'EX', ARGV[2])
+return 1
+"""
+
+
+def priority_counts_key(year_id: int) -> str:
+    return f"priority_counts:{year_id}"
+
+
+def priority_demand_key(year_id: int) -> str:
+    return f"priority_demand:{year_id}"
+
+
+def priority_progress_built_key(year_id: int) -> str:
+    return f"priority_progress_built:{year_id}"
+
+
+def demand_field(subject_id: int, batch_id: int, priority: int) -> str:
+    return f"{subject_id}:{batch_id}:{priority}"
+
+
+class PriorityProgressCache:
+    def __init__(self, redis_client: redis.Redis):
+        self.redis = redis_client
+
+    def _keys(self, year_id: int) -> List[str]:
+        return [priority_progress_built_key(year_id), priority_counts_key(year_id), priority_demand_key(year_id)]
+
+    async def begin_rebuild(self, year_id: int) -> str:
+        """Mark the year as being rebuilt and return the token rebuild() needs; call before reading the database"""
+        token = f"{_PROGRESS_BUILDING}{uuid.uuid4().hex}"
+        await self.redis.set(priority_progress_built_key(year_id), token, ex=PRIORITY_PROGRESS_BUILD_TTL)
+        return token
+
+    async def rebuild(self, year_id: int, token: str, faculty_counts: Dict[int, int], demand: List[Dict[str, int]]) -> bool:
+        """Replace the counters of a year from grouped database counts, unless a write or another rebuild intervened"""
+        args: List[Any] = [token, PRIORITY_PROGRESS_TTL, len(faculty_counts)]
+        for faculty_id, count in faculty_counts.items():
+            args += [faculty_id, count]
+        for row in demand:
+            args += [demand_field(row["subject_id"], row["batch_id"], row["priority"]), row["count"]]
+        return bool(await self.redis.eval(REBUILD_PROGRESS_SCRIPT, 3, *self._keys(year_id), *args))
+
+    async def apply(self, year_id: int, faculty_id: int, removed: Iterable[Dict[str, int]], added: Iterable[Dict[str, int]]) -> None:
+        """Shift the counters by the entries a write removed and added.
+
+        Skipped while the cache is cold; a rebuild in progress is cancelled, since it may have read the database too early.
+        """
+        removed, added = list(removed), list(added)
+        args: List[Any] = [faculty_id, len(added) - len(removed)]
+        for entry, delta in [*((entry, -1) for entry in removed), *((entry, 1) for entry in added)]:
+            args += [demand_field(entry["subject_id"], entry["batch_id"], entry["priority"]), delta]
+        await self.redis.eval(APPLY_PROGRESS_SCRIPT, 3, *self._keys(year_id), *args)
+
+    async def get(self, year_id: int) -> Optional[tuple[Dict[int, int], Dict[tuple[int, int, int], int]]]:
+        """Return (faculty counts, demand counts) of a year, or None on a cache miss or while it is being rebuilt"""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.get(priority_progress_built_key(year_id))
+            pipe.hgetall(priority_counts_key(year_id))
+            pipe.hgetall(priority_demand_key(year_id))
+            built, counts, demand = await pipe.execute()
+        if built != _PROGRESS_BUILT:
+            return None
+        faculty_counts = {int(faculty_id): int(count) for faculty_id, count in counts.items()}
+        demand_counts = {
+            tuple(int(part) for part in field.split(":")): int(count) for field, count in demand.items()
+        }
+        return faculty_counts, demand_counts  # type: ignore[return-value]
+
+    async def invalidate(self, year_id: int) -> None:
+        await self.redis.delete(priority_progress_built_key(year_id))
+
+
+"""
+Cached priority demand heatmap per academic year, dropped on every priority write.
+"""
+
+PRIORITY_HEATMAP_TTL = 10 * 60  # 10 minutes
+
+
+def priority_heatmap_key(year_id: int) -> str:
+    return f"priority_heatmap:{year_id}"
+
+
+class PriorityHeatmapCache(CompressedBodyCache):
+    def __init__(self, redis_client: redis.Redis):
+        super().__init__(redis_client, PRIORITY_HEATMAP_TTL)
+
+    async def get(self, year_id: int, encodings: List[str]) -> Optional[tuple[str, bytes]]:
+        return await self.get_body(priority_heatmap_key(year_id), encodings)
+
+    async def set(self, year_id: int, variants: Dict[str, bytes]) -> None:
+        await self.set_body(priority_heatmap_key(year_id), variants)
+
+    async def invalidate(self, year_id: int) -> None:
+        await self.redis.delete(priority_heatmap_key(year_id))
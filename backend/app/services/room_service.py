@@ -0,0 +1,216 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Iterable, List, Optional, Set
+import redis.asyncio as redis
+from app.models.model import Rooms, RoomTypeEnum
+from app.repositories.room_repository import RoomRepository
+from app.repositories.timetable_module_repository import TimetableModuleRepository
+from app.services.radis_services import RoomOccupancyCache, slot_offset
+from app.db.unit_of_work import after_commit
+from app.schemas.room_schema import (
+    RoomCreate, RoomUpdate, RoomResponse, RoomListResponse, FreeRoomsResponse, RoomAvailabilityResponse
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+# (venue, day, period) of a timetable slot
+Booking = tuple[str, str, int]
+
+class RoomService:
+    """Manages rooms and answers availability from per-room occupancy bitmaps"""
+
+    def __init__(self, db: AsyncSession, redis_client: Optional[redis.Redis] = None) -> None:
+        self.db = db
+        self.repository: RoomRepository = RoomRepository(db)
+        self.timetable_repository: TimetableModuleRepository = TimetableModuleRepository(db)
+        self.cache: Optional[RoomOccupancyCache] = RoomOccupancyCache(redis_client) if redis_client else None
+
+    async def create_room(self, room_data: RoomCreate) -> int:
+        room = await self.repository.create_room(room_data.model_dump())
+        return room.room_id
+
+    async def get_rooms(self, room_type: Optional[RoomTypeEnum] = None, min_capacity: Optional[int] = None) -> RoomListResponse:
+        rooms = await self.repository.get_rooms(room_type=room_type, min_capacity=min_capacity)
+        return RoomListResponse(
+            rooms=[RoomResponse.model_validate(room) for room in rooms],
+            total_count=len(rooms)
+        )
+
+    async def update_room(self, room_id: int, room_data: RoomUpdate) -> RoomResponse:
+        update_values = room_data.model_dump(exclude_unset=True)
+        if not update_values:
+            raise ValueError("No fields provided for update")
+        room = await self.repository.update_room(room_id, update_values)
+        if not room:
+            raise ValueError(f"Room with ID {room_id} not found")
+        await self.invalidate_occupancy_all()
+        return RoomResponse.model_validate(room)
+
+    async def delete_room(self, room_id: int) -> None:
+        if not await self.repository.delete_room(room_id):
+            raise ValueError(f"Room with ID {room_id} not found")
+        await self.invalidate_occupancy_all()
+
+    async def validate_venue_capacity(self, venue: str, batch_id: int) -> None:
+        """Reject a registered room that cannot seat the batch; free-text venues are not checked"""
+        room = await self.repository.get_room_by_name(venue)
+        if not room:
+            return
+        if not room.is_active:
+            raise ValueError(f"Room {venue} is not active")
+        strength = await self.repository.get_batch_strength(batch_id)
+        if strength is not None and room.capacity < strength:
+            raise ValueError(f"Room {venue} seats {room.capacity} but batch {batch_id} has {strength} students")
+
+    async def refresh_occupancy(self, year_id: int) -> None:
+        """Rebuild the occupancy bitmaps of a year from timetable_slots once a bulk change has committed"""
+        if self.cache:
+            after_commit(self.db, lambda: self._refresh_occupancy(year_id))
+
+    async def _refresh_occupancy(self, year_id: int) -> None:
+        try:
+            await self._rebuild_occupancy(year_id)
+        except Exception as e:
+            logger.warning(f"Room occupancy refresh failed for year {year_id}: {str(e)}")
+
+    async def timetable_bookings(self, timetable_id: int) -> Set[Booking]:
+        """The venue bookings of a timetable, read before and after a write for update_occupancy"""
+        if not self.cache:
+            return set()
+        return await self.timetable_repository.get_timetable_venue_bookings(timetable_id)
+
+    async def allocation_bookings(self, year_id: int, subject_id: int, batch_id: int) -> Set[Booking]:
+        """The venue bookings of an allocation's slots, read before and after a write for update_occupancy"""
+        if not self.cache:
+            return set()
+        rows = await self.timetable_repository.get_venue_bookings(year_id, subject_id=subject_id, batch_id=batch_id)
+        return {(row['venue'], row['day'], row['period']) for row in rows}
+
+    async def update_occupancy(self, year_id: int, before: Set[Booking], after: Set[Booking]) -> None:
+        """Set and clear only the bits of the slots a write booked and freed, once it has committed"""
+        if not self.cache:
+            return
+        added, removed = after - before, before - after
+        if not added and not removed:
+            return
+        # Concurrent writes to the same venue slots wait for this one to commit
+        await self.timetable_repository.lock_venue_slots(year_id, added | removed)
+        room_ids_by_name = await self._room_ids_by_name()
+        booked = self._booked_offsets(year_id, room_ids_by_name, added)
+        freed = self._booked_offsets(year_id, room_ids_by_name, removed)
+        after_commit(self.db, lambda: self._apply_occupancy(year_id, booked, freed, removed, room_ids_by_name))
+
+    async def _apply_occupancy(
+        self,
+        year_id: int,
+        booked: List[tuple[int, int]],
+        freed: List[tuple[int, int]],
+        removed: Set[Booking],
+        room_ids_by_name: Dict[str, int]
+    ) -> None:
+        """Apply a committed write's changes, then set again the freed slots another batch still holds.
+
+        Clearing first and reading the committed slots afterwards means a concurrent write that
+        books one of them either is seen by the read or sets its own bit after it.
+        """
+        try:
+            changes = [
+                *((room_id, offset, 1) for room_id, offset in booked),
+                *((room_id, offset, 0) for room_id, offset in freed)
+            ]
+            await self.cache.apply(year_id, changes)  # type: ignore[union-attr]
+            if freed:
+                held = await self.timetable_repository.get_venue_bookings(year_id, slots=removed)
+                still_booked = self._booked_offsets(
+                    year_id, room_ids_by_name, {(row['venue'], row['day'], row['period']) for row in held}
+                )
+                await self.cache.apply(year_id, [(room_id, offset, 1) for room_id, offset in still_booked])  # type: ignore[union-attr]
+        except Exception as e:
+            logger.warning(f"Room occupancy update failed for year {year_id}, dropping the cache: {str(e)}")
+            try:
+                await self.cache.invalidate_year(year_id)  # type: ignore[union-attr]
+            except Exception:
+                pass
+
+    async def invalidate_occupancy_all(self) -> None:
+        """Room renames change the venue-to-room mapping, so every built year is rebuilt on its next read"""
+        if self.cache:
+            after_commit(self.db, self._invalidate_occupancy_all)
+
+    async def _invalidate_occupancy_all(self) -> None:
+        try:
+            async for key in self.cache.redis.scan_iter(match="room_occupancy_built:*"):
+                await self.cache.redis.delete(key)
+        except Exception as e:
+            logger.warning(f"Room occupancy invalidation failed: {str(e)}")
+
+    async def _room_ids_by_name(self) -> Dict[str, int]:
+        return {room.room_name: room.room_id for room in await self.repository.get_rooms()}
+
+    def _booked_offsets(self, year_id: int, room_ids_by_name: Dict[str, int], bookings: Iterable[Booking]) -> List[tuple[int, int]]:
+        """Map bookings to (room_id, offset); free-text venues and slots the bitmap cannot hold are skipped"""
+        booked = []
+        for venue, day, period in bookings:
+            room_id = room_ids_by_name.get(venue)
+            if room_id is None:
+                continue
+            try:
+                booked.append((room_id, slot_offset(day, period)))
+            except ValueError as e:
+                logger.warning(f"Skipping booking of {venue} in year {year_id} outside the occupancy bitmap: {str(e)}")
+        return booked
+
+    async def _rebuild_occupancy(self, year_id: int) -> None:
+        room_ids_by_name = await self._room_ids_by_name()
+        bookings = await self.timetable_repository.get_venue_bookings(year_id)
+        booked = self._booked_offsets(year_id, room_ids_by_name, ((booking['venue'], booking['day'], booking['period']) for booking in bookings))
+        await self.cache.rebuild(year_id, room_ids_by_name.values(), booked)  # type: ignore[union-attr]
+
+    async def _free_room_ids(self, year_id: int, rooms: List[Rooms], day: str, period: int) -> Set[int]:
+        room_ids = [room.room_id for room in rooms]
+        if self.cache:
+            try:
+                if not await self.cache.is_built(year_id):
+                    await self._rebuild_occupancy(year_id)
+                return set(await self.cache.free_rooms(year_id, room_ids, day, period))
+            except Exception as e:
+                logger.warning(f"Room occupancy lookup failed for year {year_id}, falling back to the database: {str(e)}")
+
+        slots = await self.timetable_repository.get_slots(year_id, day=day, period=period)
+        booked_venues = {slot['venue'] for slot in slots if slot['venue']}
+        return {room.room_id for room in rooms if room.room_name not in booked_venues}
+
+    async def find_free_rooms(self, year_id: int, day: str, period: int, batch_id: Optional[int] = None, room_type: Optional[RoomTypeEnum] = None) -> FreeRoomsResponse:
+        """List active rooms with no booking in the slot that can seat the batch"""
+        slot_offset(day, period)
+        min_capacity = None
+        if batch_id is not None:
+            min_capacity = await self.repository.get_batch_strength(batch_id)
+            if min_capacity is None:
+                raise ValueError(f"Batch with ID {batch_id} not found")
+
+        rooms = await self.repository.get_rooms(room_type=room_type, min_capacity=min_capacity, active_only=True)
+        free_ids = await self._free_room_ids(year_id, rooms, day, period)
+        free_rooms = [RoomResponse.model_validate(room) for room in rooms if room.room_id in free_ids]
+        return FreeRoomsResponse(
+            year_id=year_id,
+            day=day,
+            period=period,
+            batch_id=batch_id,
+            rooms=free_rooms,
+            total_count=len(free_rooms)
+        )
+
+    async def is_room_free(self, year_id: int, room_id: int, day: str, period: int) -> RoomAvailabilityResponse:
+        slot_offset(day, period)
+        room = await self.repository.get_room_by_id(room_id)
+        if not room:
+            raise ValueError(f"Room with ID {room_id} not found")
+        free_ids = await self._free_room_ids(year_id, [room], day, period)
+        return RoomAvailabilityResponse(
+            room_id=room_id,
+            year_id=year_id,
+            day=day,
+            period=period,
+            is_free=room_id in free_ids
+        )
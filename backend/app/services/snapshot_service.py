@@ -0,0 +1,86 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+import redis.asyncio as redis
+from app.repositories.snapshot_repository import SnapshotRepository
+from app.services.faculty_schedule_service import FacultyScheduleService
+from app.services.room_service import RoomService
+from app.services.timetable_event_service import TimetableEventPublisher
+from app.db.unit_of_work import after_commit
+from app.schemas.snapshot_schema import (
+    SnapshotResponse, SnapshotCreateResponse, SnapshotListResponse,
+    SnapshotRollbackResponse, SnapshotDiffResponse, AllocationDiffEntry, TimetableCellDiffEntry
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+class SnapshotService:
+    def __init__(self, db: AsyncSession, redis_client: Optional[redis.Redis] = None) -> None:
+        self.repository: SnapshotRepository = SnapshotRepository(db)
+        self.schedule_service: FacultyScheduleService = FacultyScheduleService(db, redis_client)
+        self.room_service: RoomService = RoomService(db, redis_client)
+        self.events: Optional[TimetableEventPublisher] = TimetableEventPublisher(redis_client) if redis_client else None
+
+    async def _find_snapshot(self, year_id: int, version_no: int) -> SnapshotResponse:
+        for snapshot in await self.repository.list_snapshots(year_id):
+            if snapshot["version_no"] == version_no:
+                return SnapshotResponse(**snapshot)
+        raise ValueError(f"Version {version_no} not found for academic year {year_id}")
+
+    async def create_snapshot(self, year_id: int, label: Optional[str] = None) -> SnapshotCreateResponse:
+        """Capture the current allocations and timetables of a year as a new active version"""
+        if not await self.repository.year_exists(year_id):
+            raise ValueError(f"Academic year with ID {year_id} not found")
+
+        snapshot, created = await self.repository.create_snapshot(year_id, label)
+        return SnapshotCreateResponse(created=created, snapshot=await self._find_snapshot(year_id, snapshot.version_no))
+
+    async def list_snapshots(self, year_id: int) -> SnapshotListResponse:
+        """List the versions of a year"""
+        snapshots = [SnapshotResponse(**snapshot) for snapshot in await self.repository.list_snapshots(year_id)]
+        return SnapshotListResponse(
+            year_id=year_id,
+            active_version=next((snapshot.version_no for snapshot in snapshots if snapshot.is_active), None),
+            snapshots=snapshots
+        )
+
+    async def rollback(self, year_id: int, version_no: int) -> SnapshotRollbackResponse:
+        """Make a version active again and restore the year's allocations and timetables from it"""
+        snapshot = await self.repository.rollback_to(year_id, version_no)
+        if not snapshot:
+            raise ValueError(f"Version {version_no} not found for academic year {year_id}")
+
+        await self.schedule_service.invalidate_year(year_id)
+        await self.room_service.refresh_occupancy(year_id)
+        if self.events:
+            after_commit(self.repository.db, lambda: self.events.publish(year_id, "snapshot_restored", {"version_no": version_no}))
+
+        return SnapshotRollbackResponse(
+            year_id=year_id,
+            active_version=version_no,
+            message=f"Year restored to version {version_no}"
+        )
+
+    async def diff(self, year_id: int, from_version: int, to_version: int) -> SnapshotDiffResponse:
+        """Compare two versions of a year; identical content is detected from the hashes alone"""
+        old = await self.repository.get_snapshot(year_id, from_version)
+        new = await self.repository.get_snapshot(year_id, to_version)
+        if not old or not new:
+            missing = from_version if not old else to_version
+            raise ValueError(f"Version {missing} not found for academic year {year_id}")
+
+        allocation_changes = []
+        if old.allocations_hash != new.allocations_hash:
+            allocation_changes = await self.repository.diff_allocations(old.allocations_hash, new.allocations_hash)
+
+        timetable_changes = []
+        if old.timetables_hash != new.timetables_hash:
+            timetable_changes = await self.repository.diff_timetables(old.timetables_hash, new.timetables_hash)
+
+        return SnapshotDiffResponse(
+            year_id=year_id,
+            from_version=from_version,
+            to_version=to_version,
+            allocation_changes=[AllocationDiffEntry(**change) for change in allocation_changes],
+            timetable_changes=[TimetableCellDiffEntry(**change) for change in timetable_changes]
+        )
@@ -0,0 +1,215 @@
+import asyncio
+import json
+import logging
+from typing import Any, Dict, List, Optional, Set
+import redis.asyncio as redis
+from fastapi import WebSocket, status
+from app.config.config import settings
+
+logger = logging.getLogger(__name__)
+
+"""
+Real-time timetable and allocation change events.
+
+Every event of a year gets a sequence number from INCR, is appended to a capped
+sorted-set backlog scored by that number and is PUBLISHed on the year's channel,
+all in one Lua script, so the channel carries events in sequence order.
+Each backend process keeps one pattern subscription and fans events out to its
+own WebSocket connections, so edits on any node reach every client. A client
+that reconnects with last_seq is replayed the backlog it missed; if the backlog
+no longer reaches back that far it is told to reload instead. Its socket joins
+the subscription before the backlog is read and holds live events back until the
+replay is sent, so it receives every event once and in order.
+Every socket has a bounded queue drained by its own sender task, so the listener
+never waits on a client; one that falls too far behind or stalls on a send is
+closed and has to reconnect with last_seq.
+"""
+
+EVENT_BACKLOG_SIZE = 500
+EVENT_BACKLOG_TTL = 24 * 60 * 60  # 1 day
+EVENT_CHANNEL_PATTERN = "timetable_events:*"
+EVENT_SUBSCRIBE_TIMEOUT = 5  # seconds
+EVENT_QUEUE_SIZE = 256  # events waiting for one socket before it is dropped
+EVENT_SEND_TIMEOUT = 10  # seconds
+
+# KEYS: sequence counter, backlog; ARGV: channel, the event as a JSON object without seq, backlog size, TTL
+PUBLISH_SCRIPT = """
+local seq = redis.call('INCR', KEYS[1])
+local message = '{"seq": ' .. seq .. ', ' .. string.sub(ARGV[2], 2)
+redis.call('ZADD', KEYS[2], seq, message)
+redis.call('ZREMRANGEBYRANK', KEYS[2], 0, -tonumber(ARGV[3]) - 1)
+redis.call('EXPIRE', KEYS[2], ARGV[4])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+redis.call('PUBLISH', ARGV[1], message)
+return seq
+"""
+
+
+def event_channel(year_id: int) -> str:
+    return f"timetable_events:{year_id}"
+
+
+def event_backlog_key(year_id: int) -> str:
+    return f"timetable_events_backlog:{year_id}"
+
+
+def event_seq_key(year_id: int) -> str:
+    return f"timetable_events_seq:{year_id}"
+
+
+class TimetableEventPublisher:
+    def __init__(self, redis_client: redis.Redis):
+        self.redis = redis_client
+
+    async def publish(self, year_id: int, event_type: str, payload: Dict[str, Any]) -> None:
+        """Number, store and broadcast an event; failures are logged and never fail the write that caused them"""
+        try:
+            event = json.dumps({"year_id": year_id, "type": event_type, "data": payload}, default=str)
+            await self.redis.eval(
+                PUBLISH_SCRIPT, 2, event_seq_key(year_id), event_backlog_key(year_id),
+                event_channel(year_id), event, EVENT_BACKLOG_SIZE, EVENT_BACKLOG_TTL
+            )
+        except Exception as e:
+            logger.warning(f"Publishing {event_type} event for year {year_id} failed: {str(e)}")
+
+    async def replay(self, year_id: int, last_seq: int) -> Optional[List[str]]:
+        """Return the events after last_seq, or None when some of them have already been trimmed"""
+        current_seq = int(await self.redis.get(event_seq_key(year_id)) or 0)
+        if last_seq > current_seq:
+            # The counter expired and started over; the client's numbers mean nothing now
+            return None
+        if last_seq == current_seq:
+            return []
+        events = await self.redis.zrangebyscore(event_backlog_key(year_id), f"({last_seq}", "+inf")
+        if not events or json.loads(events[0])["seq"] != last_seq + 1:
+            return None
+        return events
+
+
+class TimetableEventHub:
+    """Per-process fan-out of year channels to the WebSocket connections of this process"""
+
+    def __init__(self) -> None:
+        self.connections: Dict[int, Set[WebSocket]] = {}
+        # Events waiting to be sent to each socket, and the task sending them
+        self._queues: Dict[WebSocket, asyncio.Queue[str]] = {}
+        self._senders: Dict[WebSocket, asyncio.Task] = {}
+        self._closing: Set[asyncio.Task] = set()
+        self._subscribed = asyncio.Event()
+        self._listener: Optional[asyncio.Task] = None
+        self._redis: Optional[redis.Redis] = None
+
+    async def connect(self, year_id: int, websocket: WebSocket, replaying: bool = False) -> None:
+        """Add a socket and return once the subscription is live.
+
+        A replaying socket queues live events without sending them until release(), so they cannot overtake the replay.
+        """
+        self._queues[websocket] = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+        if not replaying:
+            self._start_sender(websocket, 0)
+        self.connections.setdefault(year_id, set()).add(websocket)
+        if self._listener is None or self._listener.done():
+            self._subscribed.clear()
+            self._listener = asyncio.create_task(self._listen())
+        await asyncio.wait_for(self._subscribed.wait(), EVENT_SUBSCRIBE_TIMEOUT)
+
+    async def release(self, websocket: WebSocket, after_seq: int) -> None:
+        """Go live once the replay is sent, skipping the queued events it already covered"""
+        if websocket in self._queues and websocket not in self._senders:
+            self._start_sender(websocket, after_seq)
+
+    async def disconnect(self, year_id: int, websocket: WebSocket) -> None:
+        self._queues.pop(websocket, None)
+        sender = self._senders.pop(websocket, None)
+        if sender is not None:
+            sender.cancel()
+        sockets = self.connections.get(year_id)
+        if sockets is not None:
+            sockets.discard(websocket)
+            if not sockets:
+                del self.connections[year_id]
+        if not self.connections and self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+
+    def _start_sender(self, websocket: WebSocket, after_seq: int) -> None:
+        self._senders[websocket] = asyncio.create_task(self._send(websocket, self._queues[websocket], after_seq))
+
+    async def _send(self, websocket: WebSocket, queue: asyncio.Queue[str], after_seq: int) -> None:
+        """Send a socket its queued events in order; a failed or stalled send closes it"""
+        try:
+            while True:
+                message = await queue.get()
+                if after_seq:
+                    if json.loads(message)["seq"] <= after_seq:
+                        continue
+                    # The channel is in sequence order, so every later event is new as well
+                    after_seq = 0
+                await asyncio.wait_for(websocket.send_text(message), EVENT_SEND_TIMEOUT)
+        except Exception as e:
+            logger.info(f"Dropping timetable event socket after a failed send: {str(e)}")
+            self._queues.pop(websocket, None)
+            self._senders.pop(websocket, None)
+            await self._close(websocket)
+
+    def _broadcast(self, year_id: int, message: str) -> None:
+        """Queue a message for every socket of the year without waiting on any of them"""
+        for websocket in self.connections.get(year_id, ()):
+            queue = self._queues.get(websocket)
+            if queue is None:
+                continue
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # The client has fallen too far behind to catch up from the queue
+                logger.info(f"Dropping timetable event socket of year {year_id} with {queue.qsize()} events unsent")
+                self._queues.pop(websocket, None)
+                sender = self._senders.pop(websocket, None)
+                if sender is not None:
+                    sender.cancel()
+                task = asyncio.create_task(self._close(websocket))
+                self._closing.add(task)
+                task.add_done_callback(self._closing.discard)
+
+    async def _close(self, websocket: WebSocket) -> None:
+        """Close a dropped socket; its route then disconnects it from the hub"""
+        try:
+            await asyncio.wait_for(websocket.close(code=status.WS_1013_TRY_AGAIN_LATER), EVENT_SEND_TIMEOUT)
+        except Exception:
+            pass
+
+    async def _listen(self) -> None:
+        """Hold one pattern subscription for all years and hand each message to the local sockets"""
+        while True:
+            try:
+                self._redis = redis.Redis(
+                    host=settings.REDIS_HOST,
+                    port=settings.REDIS_PORT,
+                    username=settings.REDIS_USERNAME,
+                    password=settings.REDIS_PASSWORD,
+                    decode_responses=True
+                )
+                async with self._redis.pubsub() as pubsub:
+                    await pubsub.psubscribe(EVENT_CHANNEL_PATTERN)
+                    async for message in pubsub.listen():
+                        if message["type"] == "psubscribe":
+                            # Redis confirmed the subscription; from here on no event is missed
+                            self._subscribed.set()
+                            continue
+                        if message["type"] != "pmessage":
+                            continue
+                        year_id = int(message["channel"].rsplit(":", 1)[1])
+                        self._broadcast(year_id, message["data"])
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.warning(f"Timetable event subscription dropped, reconnecting: {str(e)}")
+                await asyncio.sleep(1)
+            finally:
+                self._subscribed.clear()
+                if self._redis is not None:
+                    await self._redis.aclose()
+                    self._redis = None
+
+
+timetable_event_hub = TimetableEventHub()
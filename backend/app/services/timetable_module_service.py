@@ -1,6 +1,11 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any, Awaitable
+import redis.asyncio as redis
 from app.repositories.timetable_module_repository import TimetableModuleRepository
+from app.services.faculty_schedule_service import FacultyScheduleService
+from app.services.room_service import RoomService
+from app.services.timetable_event_service import TimetableEventPublisher
+from app.db.unit_of_work import after_commit
 from app.schemas.timetable_module_schema import (
     TimetableModuleCreate,
     TimetableModuleUpdate,
@@ -10,67 +15,101 @@ from app.schemas.timetable_module_schema import (
     TimetableModuleUpdateResponse,
     TimetableFormatDetails,
     BatchDetails,
-    AcademicYearDetails
+    AcademicYearDetails,
+    TimetableSlotMatch,
+    TimetableSlotLookupResponse,
+    TimetableCellChange,
+    TimetableCellPatchRequest,
+    TimetableCellPatchResponse,
+    TIMETABLE_DAYS
 )
+from app.core.data_loader import entity_loader
+from app.models.model import AcademicYears, Batches, Subjects, TimetableHourFormats
+import asyncio
 import logging
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
 class TimetableModuleService:
-    def __init__(self, db: AsyncSession) -> None:
+    def __init__(self, db: AsyncSession, redis_client: Optional[redis.Redis] = None) -> None:
         self.db: AsyncSession = db
         self.repository: TimetableModuleRepository = TimetableModuleRepository(db)
+        self.schedule_service: FacultyScheduleService = FacultyScheduleService(db, redis_client)
+        self.room_service: RoomService = RoomService(db, redis_client)
+        self.events: Optional[TimetableEventPublisher] = TimetableEventPublisher(redis_client) if redis_client else None
+        self.formats = entity_loader(db, TimetableHourFormats)
+        self.batches = entity_loader(db, Batches)
+        self.years = entity_loader(db, AcademicYears)
+
+    async def _publish(self, year_id: int, event_type: str, payload: Dict[str, Any]) -> None:
+        """Broadcast a change to the year's live editors once it has committed"""
+        if self.events:
+            after_commit(self.db, lambda: self.events.publish(year_id, event_type, payload))
 
     def _convert_datetime(self, dt) -> datetime:
-        """Convert SQLAlchemy DateTime to Python datetime"""
-        if dt is None:
-            return datetime.now()
-        if hasattr(dt, 'isoformat'):
-            return datetime.fromisoformat(dt.isoformat().replace('Z', '+00:00'))
-        return dt
+        """DateTime columns already load as datetime; only a missing value needs a default"""
+        return datetime.now() if dt is None else dt
+
+    async def _to_response(self, timetable) -> Optional[TimetableModuleResponse]:
+        """Attach format, batch and year details to a timetable; None if one of them is missing"""
+        format_details, batch_details, year_details = await asyncio.gather(
+            self.formats.load(timetable.format_id),
+            self.batches.load(timetable.batch_id),
+            self.years.load(timetable.year_id)
+        )
+        if not format_details or not batch_details or not year_details:
+            return None
+
+        return TimetableModuleResponse(
+            timetable_id=timetable.timetable_id,
+            format_id=timetable.format_id,
+            year_id=timetable.year_id,
+            batch_id=timetable.batch_id,
+            timetable_data=timetable.timetable_data,
+            version=timetable.version,
+            created_at=self._convert_datetime(timetable.created_at),
+            format_details=TimetableFormatDetails(
+                format_id=format_details.format_id,
+                format_name=format_details.format_name,
+                format_data=format_details.format_data,
+                created_at=self._convert_datetime(format_details.created_at)
+            ),
+            batch_details=BatchDetails(
+                batch_id=batch_details.batch_id,
+                section=batch_details.section,
+                noOfStudent=batch_details.noOfStudent,
+                created_at=self._convert_datetime(batch_details.created_at)
+            ),
+            academic_year_details=AcademicYearDetails(
+                year_id=year_details.year_id,
+                academic_year=year_details.academic_year,
+                created_at=self._convert_datetime(year_details.created_at)
+            )
+        )
 
     async def create_timetable_module(self, timetable_data: TimetableModuleCreate) -> int:
         """Create a new timetable module"""
         try:
             # Create the timetable module
             timetable = await self.repository.create_timetable_module(timetable_data)
+            await self.schedule_service.refresh_faculties(
+                timetable.year_id, await self.repository.get_timetable_faculty_ids(timetable.timetable_id)
+            )
+            await self.room_service.update_occupancy(
+                timetable.year_id, set(), await self.room_service.timetable_bookings(timetable.timetable_id)
+            )
+            await self._publish(timetable.year_id, "timetable_created", {
+                "timetable_id": timetable.timetable_id,
+                "batch_id": timetable.batch_id,
+                "version": timetable.version,
+                "timetable_data": timetable.timetable_data
+            })
             
-            # Get related details
-            format_details = await self.repository.get_format_details(timetable.format_id)
-            batch_details = await self.repository.get_batch_details(timetable.batch_id)
-            year_details = await self.repository.get_academic_year_details(timetable.year_id)
-
-            if not format_details or not batch_details or not year_details:
+            response = await self._to_response(timetable)
+            if response is None:
                 raise ValueError("Related data not found")
 
-            # Build response
-            response = TimetableModuleResponse(
-                timetable_id=timetable.timetable_id,
-                format_id=timetable.format_id,
-                year_id=timetable.year_id,
-                batch_id=timetable.batch_id,
-                timetable_data=timetable.timetable_data,
-                created_at=self._convert_datetime(timetable.created_at),
-                format_details=TimetableFormatDetails(
-                    format_id=format_details.format_id,
-                    format_name=format_details.format_name,
-                    format_data=format_details.format_data,
-                    created_at=self._convert_datetime(format_details.created_at)
-                ),
-                batch_details=BatchDetails(
-                    batch_id=batch_details.batch_id,
-                    section=batch_details.section,
-                    noOfStudent=batch_details.noOfStudent,
-                    created_at=self._convert_datetime(batch_details.created_at)
-                ),
-                academic_year_details=AcademicYearDetails(
-                    year_id=year_details.year_id,
-                    academic_year=year_details.academic_year,
-                    created_at=self._convert_datetime(year_details.created_at)
-                )
-            )
-
             logger.info(f"Successfully created timetable module with ID: {timetable.timetable_id}")
             return response.format_id
 
@@ -86,41 +125,10 @@ class TimetableModuleService:
             if not timetable:
                 return None
 
-            # Get related details
-            format_details = await self.repository.get_format_details(timetable.format_id)
-            batch_details = await self.repository.get_batch_details(timetable.batch_id)
-            year_details = await self.repository.get_academic_year_details(timetable.year_id)
-
-            if not format_details or not batch_details or not year_details:
+            response = await self._to_response(timetable)
+            if response is None:
                 raise ValueError("Related data not found")
 
-            # Build response
-            response = TimetableModuleResponse(
-                timetable_id=timetable.timetable_id,
-                format_id=timetable.format_id,
-                year_id=timetable.year_id,
-                batch_id=timetable.batch_id,
-                timetable_data=timetable.timetable_data,
-                created_at=self._convert_datetime(timetable.created_at),
-                format_details=TimetableFormatDetails(
-                    format_id=format_details.format_id,
-                    format_name=format_details.format_name,
-                    format_data=format_details.format_data,
-                    created_at=self._convert_datetime(format_details.created_at)
-                ),
-                batch_details=BatchDetails(
-                    batch_id=batch_details.batch_id,
-                    section=batch_details.section,
-                    noOfStudent=batch_details.noOfStudent,
-                    created_at=self._convert_datetime(batch_details.created_at)
-                ),
-                academic_year_details=AcademicYearDetails(
-                    year_id=year_details.year_id,
-                    academic_year=year_details.academic_year,
-                    created_at=self._convert_datetime(year_details.created_at)
-                )
-            )
-
             return response
 
         except Exception as e:
@@ -132,40 +140,9 @@ class TimetableModuleService:
         try:
             timetables = await self.repository.get_timetables_by_year(year_id)
             
-            timetable_responses = []
-            for timetable in timetables:
-                # Get related details
-                format_details = await self.repository.get_format_details(timetable.format_id)
-                batch_details = await self.repository.get_batch_details(timetable.batch_id)
-                year_details = await self.repository.get_academic_year_details(timetable.year_id)
-
-                if format_details and batch_details and year_details:
-                    response = TimetableModuleResponse(
-                        timetable_id=timetable.timetable_id,
-                        format_id=timetable.format_id,
-                        year_id=timetable.year_id,
-                        batch_id=timetable.batch_id,
-                        timetable_data=timetable.timetable_data,
-                        created_at=self._convert_datetime(timetable.created_at),
-                        format_details=TimetableFormatDetails(
-                            format_id=format_details.format_id,
-                            format_name=format_details.format_name,
-                            format_data=format_details.format_data,
-                            created_at=self._convert_datetime(format_details.created_at)
-                        ),
-                        batch_details=BatchDetails(
-                            batch_id=batch_details.batch_id,
-                            section=batch_details.section,
-                            noOfStudent=batch_details.noOfStudent,
-                            created_at=self._convert_datetime(batch_details.created_at)
-                        ),
-                        academic_year_details=AcademicYearDetails(
-                            year_id=year_details.year_id,
-                            academic_year=year_details.academic_year,
-                            created_at=self._convert_datetime(year_details.created_at)
-                        )
-                    )
-                    timetable_responses.append(response)
+            # Concurrent lookups are batched: one query each for formats, batches and years
+            responses = await asyncio.gather(*(self._to_response(timetable) for timetable in timetables))
+            timetable_responses = [response for response in responses if response is not None]
 
             return TimetableModuleListResponse(
                 timetables=timetable_responses,
@@ -184,41 +161,10 @@ class TimetableModuleService:
             if not timetable:
                 return None
 
-            # Get related details
-            format_details = await self.repository.get_format_details(timetable.format_id)
-            batch_details = await self.repository.get_batch_details(timetable.batch_id)
-            year_details = await self.repository.get_academic_year_details(timetable.year_id)
-
-            if not format_details or not batch_details or not year_details:
+            response = await self._to_response(timetable)
+            if response is None:
                 raise ValueError("Related data not found")
 
-            # Build response
-            response = TimetableModuleResponse(
-                timetable_id=timetable.timetable_id,
-                format_id=timetable.format_id,
-                year_id=timetable.year_id,
-                batch_id=timetable.batch_id,
-                timetable_data=timetable.timetable_data,
-                created_at=self._convert_datetime(timetable.created_at),
-                format_details=TimetableFormatDetails(
-                    format_id=format_details.format_id,
-                    format_name=format_details.format_name,
-                    format_data=format_details.format_data,
-                    created_at=self._convert_datetime(format_details.created_at)
-                ),
-                batch_details=BatchDetails(
-                    batch_id=batch_details.batch_id,
-                    section=batch_details.section,
-                    noOfStudent=batch_details.noOfStudent,
-                    created_at=self._convert_datetime(batch_details.created_at)
-                ),
-                academic_year_details=AcademicYearDetails(
-                    year_id=year_details.year_id,
-                    academic_year=year_details.academic_year,
-                    created_at=self._convert_datetime(year_details.created_at)
-                )
-            )
-
             return response
 
         except Exception as e:
@@ -228,11 +174,27 @@ class TimetableModuleService:
     async def update_timetable_module(self, timetable_id: int, update_data: TimetableModuleUpdate) -> Optional[TimetableModuleUpdateResponse]:
         """Update a timetable module"""
         try:
+            previous_faculty_ids = await self.repository.get_timetable_faculty_ids(timetable_id)
+            previous_bookings = await self.room_service.timetable_bookings(timetable_id)
             updated_timetable = await self.repository.update_timetable_module(timetable_id, update_data)
             
             if not updated_timetable:
                 return None
 
+            current_faculty_ids = await self.repository.get_timetable_faculty_ids(timetable_id)
+            await self.schedule_service.refresh_faculties(
+                updated_timetable.year_id, previous_faculty_ids | current_faculty_ids
+            )
+            await self.room_service.update_occupancy(
+                updated_timetable.year_id, previous_bookings, await self.room_service.timetable_bookings(timetable_id)
+            )
+            await self._publish(updated_timetable.year_id, "timetable_updated", {
+                "timetable_id": timetable_id,
+                "batch_id": updated_timetable.batch_id,
+                "version": updated_timetable.version,
+                "timetable_data": updated_timetable.timetable_data
+            })
+
             # Get the updated timetable with all details
             timetable_response = await self.get_timetable_by_id(timetable_id)
             
@@ -252,14 +214,64 @@ class TimetableModuleService:
             logger.error(f"Error in update_timetable_module service: {str(e)}")
             raise
 
+    async def patch_timetable_cells(self, timetable_id: int, patch: TimetableCellPatchRequest) -> Optional[TimetableCellPatchResponse]:
+        """Apply cell-level edits to a timetable if it is still at the expected version"""
+        try:
+            changes: Dict[tuple, TimetableCellChange] = {}
+            for change in patch.changes:
+                if change.day not in TIMETABLE_DAYS:
+                    raise ValueError(f"Invalid day '{change.day}'. Must be one of: {', '.join(TIMETABLE_DAYS)}")
+                # A later edit of the same cell wins
+                changes[(change.day, change.period)] = change
+
+            previous_faculty_ids = await self.repository.get_timetable_faculty_ids(timetable_id)
+            previous_bookings = await self.room_service.timetable_bookings(timetable_id)
+            timetable = await self.repository.apply_cell_changes(timetable_id, patch.expected_version, list(changes.values()))
+
+            if not timetable:
+                return None
+
+            current_faculty_ids = await self.repository.get_timetable_faculty_ids(timetable_id)
+            await self.schedule_service.refresh_faculties(timetable.year_id, previous_faculty_ids | current_faculty_ids)
+            await self.room_service.update_occupancy(
+                timetable.year_id, previous_bookings, await self.room_service.timetable_bookings(timetable_id)
+            )
+            await self._publish(timetable.year_id, "cells_updated", {
+                "timetable_id": timetable_id,
+                "batch_id": timetable.batch_id,
+                "version": timetable.version,
+                "changes": [change.model_dump() for change in changes.values()]
+            })
+
+            return TimetableCellPatchResponse(
+                message="Timetable cells updated successfully",
+                timetable_id=timetable_id,
+                version=timetable.version,
+                changes=list(changes.values())
+            )
+
+        except Exception as e:
+            logger.error(f"Error in patch_timetable_cells service: {str(e)}")
+            raise
+
     async def delete_timetable_module(self, timetable_id: int) -> Optional[TimetableModuleDeleteResponse]:
         """Delete a timetable module"""
         try:
+            timetable = await self.repository.get_timetable_by_id(timetable_id)
+            previous_faculty_ids = await self.repository.get_timetable_faculty_ids(timetable_id) if timetable else set()
+            previous_bookings = await self.room_service.timetable_bookings(timetable_id) if timetable else set()
             success = await self.repository.delete_timetable_module(timetable_id)
             
-            if not success:
+            if not success or not timetable:
                 return None
 
+            await self.schedule_service.refresh_faculties(timetable.year_id, previous_faculty_ids)
+            await self.room_service.update_occupancy(timetable.year_id, previous_bookings, set())
+            await self._publish(timetable.year_id, "timetable_deleted", {
+                "timetable_id": timetable_id,
+                "batch_id": timetable.batch_id
+            })
+
             response = TimetableModuleDeleteResponse(
                 message="Timetable module deleted successfully",
                 timetable_id=timetable_id
@@ -272,13 +284,60 @@ class TimetableModuleService:
             logger.error(f"Error in delete_timetable_module service: {str(e)}")
             raise
 
+    async def lookup_slots(self, year_id: int, subject_id: Optional[int] = None, faculty_id: Optional[int] = None, day: Optional[str] = None, period: Optional[int] = None) -> TimetableSlotLookupResponse:
+        """Find the timetable cells of a year taught for a subject or by a faculty"""
+        try:
+            if (subject_id is None) == (faculty_id is None):
+                raise ValueError("Provide exactly one of subject_id or faculty_id")
+            if day is not None and day not in TIMETABLE_DAYS:
+                raise ValueError(f"Invalid day '{day}'. Must be one of: {', '.join(TIMETABLE_DAYS)}")
+
+            if subject_id is not None:
+                subject = await entity_loader(self.db, Subjects).load(subject_id)
+                if not subject or subject.year_id != year_id:
+                    raise ValueError(f"Subject with ID {subject_id} not found for academic year {year_id}")
+
+                rows = await self.repository.find_subject_slots(year_id, subject.abbreviation, day=day, period=period)
+                slots = [TimetableSlotMatch(**row, subject_id=subject_id) for row in rows]
+            else:
+                rows = await self.repository.get_slots(year_id, faculty_id=faculty_id, day=day, period=period)
+                slots = [TimetableSlotMatch(**row) for row in rows]
+
+            return TimetableSlotLookupResponse(
+                year_id=year_id,
+                slots=slots,
+                total_count=len(slots)
+            )
+
+        except Exception as e:
+            logger.error(f"Error in lookup_slots service: {str(e)}")
+            raise
+
+    async def get_faculty_schedule(self, year_id: int, faculty_id: int) -> TimetableSlotLookupResponse:
+        """Get the weekly schedule of a faculty across all batches of a year from the precomputed cache"""
+        try:
+            return await self.schedule_service.get_schedule(year_id, faculty_id)
+
+        except Exception as e:
+            logger.error(f"Error in get_faculty_schedule service: {str(e)}")
+            raise
+
+    async def get_venue_schedule(self, year_id: int, venue: str) -> TimetableSlotLookupResponse:
+        """Get the weekly schedule of a venue across all batches of a year"""
+        try:
+            rows = await self.repository.get_slots(year_id, venue=venue)
+            slots = [TimetableSlotMatch(**row) for row in rows]
+            return TimetableSlotLookupResponse(year_id=year_id, slots=slots, total_count=len(slots))
+
+        except Exception as e:
+            logger.error(f"Error in get_venue_schedule service: {str(e)}")
+            raise
+
     def validate_timetable_data(self, timetable_data: Dict[str, List[str]]) -> bool:
         """Validate timetable data structure"""
         try:
-            required_days = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday"]
-            
             # Check if all required days are present
-            for day in required_days:
+            for day in TIMETABLE_DAYS:
                 if day not in timetable_data:
                     return False
                 
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+import redis.asyncio as redis
+from app.config.config import settings
+
+logger = logging.getLogger(__name__)
+
+"""
+Per-process cache of what authorization needs to know about a user.
+
+Role guards read user_id -> (role, is_active, joining_year) from memory, so checking
+a role costs no database round-trip. Entries expire after a short TTL. When a user is
+updated or deleted the change is PUBLISHed, and every process drops its entry; after
+a dropped subscription the whole cache is cleared, since invalidations may have been
+missed.
+"""
+
+USER_ACCESS_TTL = 60  # seconds
+USER_ACCESS_MAX_ENTRIES = 5000
+USER_ACCESS_CHANNEL = "user_access_invalidations"
+
+
+class UserAccess(NamedTuple):
+    role: str
+    is_active: bool
+    joining_year: int
+
+
+class UserAccessCache:
+    def __init__(self, ttl: float = USER_ACCESS_TTL, max_entries: int = USER_ACCESS_MAX_ENTRIES) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[int, Tuple[float, UserAccess]] = {}
+        self._listener: Optional[asyncio.Task] = None
+
+    def get(self, user_id: int) -> Optional[UserAccess]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, access = entry
+        if expires_at < time.monotonic():
+            self._entries.pop(user_id, None)
+            return None
+        return access
+
+    def set(self, user_id: int, access: UserAccess) -> None:
+        # Re-inserting keeps the dict in expiry order, so the first entry is always the oldest
+        self._entries.pop(user_id, None)
+        if len(self._entries) >= self.max_entries:
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[user_id] = (time.monotonic() + self.ttl, access)
+
+    def invalidate(self, user_id: int) -> None:
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def ensure_listener(self) -> None:
+        """Start the invalidation subscription of this process if it is not running"""
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        while True:
+            client = redis.Redis(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                username=settings.REDIS_USERNAME,
+                password=settings.REDIS_PASSWORD,
+                decode_responses=True
+            )
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(USER_ACCESS_CHANNEL)
+                    # Anything cached before the subscription may have missed an invalidation
+                    self.clear()
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.invalidate(int(message["data"]))
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.warning(f"User access invalidation subscription dropped, reconnecting: {str(e)}")
+                self.clear()
+                await asyncio.sleep(1)
+            finally:
+                await client.aclose()
+
+
+user_access_cache = UserAccessCache()
+
+
+async def publish_user_access_change(redis_client: Optional[redis.Redis], user_id: int) -> None:
+    """Drop a user's cached access here and tell the other processes to do the same"""
+    user_access_cache.invalidate(user_id)
+    if not redis_client:
+        return
+    try:
+        await redis_client.publish(USER_ACCESS_CHANNEL, str(user_id))
+    except Exception as e:
+        logger.warning(f"Publishing access change of user {user_id} failed: {str(e)}")
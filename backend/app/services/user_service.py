@@ -1,4 +1,5 @@
-from typing import Any, List
+from typing import Any, List, Optional
+import redis.asyncio as redis
 
 from fastapi import HTTPException,status
 from app.db.postgres_client import get_db
@@ -9,11 +10,14 @@ from app.core.service_base import BaseService
 from app.repositories.user_repository import UserRepository
 from app.core.exceptions import NotFoundException
 from app.core.response_formatter import ResponseFormatter
+from app.services.user_access_service import publish_user_access_change
+from app.db.unit_of_work import after_commit
 
 class UserService(BaseService):
     
-    def __init__(self,repository:UserRepository):
+    def __init__(self,repository:UserRepository, redis_client: Optional[redis.Redis] = None):
         self._repository = repository
+        self._redis = redis_client
         
     async def get_userby_email(self,email:str):
         result =  await self._repository.get_user_by_email(email=email)
@@ -49,6 +53,9 @@ class UserService(BaseService):
         except Exception as e:
             raise RuntimeError(f"Error updating user: {str(e)}")
 
+        # Role guards cache the user's role and active flag; drop them everywhere once committed
+        after_commit(self._repository.session, lambda: publish_user_access_change(self._redis, id))
+
         res = UserResponse.model_validate(updated_user)
 
         data = {
@@ -60,6 +67,8 @@ class UserService(BaseService):
     
     async def delete_user(self,id:int):
         try:
-            return await self._repository.delete(id=id)
+            deleted = await self._repository.delete(id=id)
         except Exception as e:
-            raise RuntimeError(f"Error deleting user: {str(e)}")
\ No newline at end of file
+            raise RuntimeError(f"Error deleting user: {str(e)}")
+        after_commit(self._repository.session, lambda: publish_user_access_change(self._redis, id))
+        return deleted
\ No newline at end of file
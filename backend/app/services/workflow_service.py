@@ -1,96 +1,241 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional
 from fastapi.responses import JSONResponse
-from app.repositories.workflow_repository import WorkflowRepository
-from app.schemas.workflow_schema import WorkflowStageCreate
-from app.models.model import WorkflowStageEnum
+import redis.asyncio as redis
+import logging
+from app.repositories.workflow_repository import WorkflowRepository, TOTAL_STEPS
+from app.schemas.workflow_schema import WorkflowStageCreate, WorkflowGuardResponse, WorkflowTransitionResponse
+from app.models.model import WorkflowStage, WorkflowStageEnum
 from app.core.response_formatter import ResponseFormatter
+from app.services.radis_services import WorkflowStageCache
+from app.repositories.snapshot_repository import SnapshotRepository
+from app.services.feasibility_service import FeasibilityService
+from app.db.unit_of_work import after_commit, savepoint
 from fastapi import HTTPException
 
+logger = logging.getLogger(__name__)
+
+# Guards keyed by the step being entered. Each returns the reasons the transition is blocked.
+WorkflowGuard = Callable[[Dict[str, int]], List[str]]
+
+def _require_batches(counts: Dict[str, int]) -> List[str]:
+    return [] if counts["batch_count"] > 0 else ["The academic year has no batches"]
+
+def _require_subjects(counts: Dict[str, int]) -> List[str]:
+    return [] if counts["subject_count"] > 0 else ["The academic year has no subjects"]
+
+def _require_all_priorities(counts: Dict[str, int]) -> List[str]:
+    missing = counts["faculty_count"] - counts["submitted_faculty_count"]
+    if counts["faculty_count"] == 0:
+        return ["There are no active faculty"]
+    return [] if missing <= 0 else [f"{missing} of {counts['faculty_count']} faculty have not submitted priorities"]
+
+def _require_allocations(counts: Dict[str, int]) -> List[str]:
+    return [] if counts["allocation_count"] > 0 else ["Subjects have not been allocated yet"]
+
+def _require_full_allocation(counts: Dict[str, int]) -> List[str]:
+    missing = counts["expected_allocation_count"] - counts["allocation_count"]
+    return [] if missing <= 0 else [f"{missing} subject-batch combinations have no faculty allocated"]
+
+def _require_formats(counts: Dict[str, int]) -> List[str]:
+    missing = counts["batch_count"] - counts["formatted_batch_count"]
+    return [] if missing <= 0 else [f"{missing} batches have no timetable format"]
+
+def _require_timetables(counts: Dict[str, int]) -> List[str]:
+    missing = counts["batch_count"] - counts["timetabled_batch_count"]
+    return [] if missing <= 0 else [f"{missing} batches have no timetable"]
+
+TRANSITION_GUARDS: Dict[int, List[WorkflowGuard]] = {
+    2: [_require_batches],
+    3: [_require_subjects],
+    4: [_require_all_priorities],
+    6: [_require_allocations],
+    8: [_require_full_allocation],
+    10: [_require_formats],
+    11: [_require_timetables],
+    12: [_require_timetables],
+}
+
+# Entering these steps captures a snapshot, so review and finalization can be rolled back
+SNAPSHOT_STEPS = {
+    WorkflowStageEnum.STEP_6_HOD_REVIEW_AND_APPROVAL.value,
+    WorkflowStageEnum.STEP_7_FINALIZE_SUBJECT_ALLOCATION.value,
+    WorkflowStageEnum.STEP_11_HOD_EDIT_AND_UPDATE_TIMETABLE.value,
+    WorkflowStageEnum.STEP_12_TIMETABLE_FINALIZATION.value,
+}
+
+
 class WorkflowService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, redis_client: Optional[redis.Redis] = None):
         self.db = db
         self.repository = WorkflowRepository(db)
-    
+        self.cache: Optional[WorkflowStageCache] = WorkflowStageCache(redis_client) if redis_client else None
+
     def get_step_name(self, step_number: int) -> str:
         """Get the name of a step by its number"""
         try:
             return WorkflowStageEnum(step_number).name
         except ValueError:
             return f"Step {step_number}"
-    
+
+    def _stage_data(self, workflow_stage: WorkflowStage) -> Dict[str, Any]:
+        return {
+            "year_id": workflow_stage.year_id,
+            "current_step": workflow_stage.current_step,
+            "step_name": self.get_step_name(workflow_stage.current_step),
+            "is_completed": workflow_stage.is_completed,
+            "total_steps": TOTAL_STEPS
+        }
+
+    async def _write_through(self, workflow_stage: WorkflowStage, only_if_absent: bool = False) -> Dict[str, Any]:
+        """Store the new stage in the cache as soon as it has committed, so readers do not keep seeing the previous step.
+
+        A read miss passes only_if_absent: the stage it read may already be older than one an advance stored.
+        """
+        data = self._stage_data(workflow_stage)
+        if self.cache:
+            after_commit(self.db, lambda: self._store(workflow_stage.year_id, data, only_if_absent))
+        return data
+
+    async def _store(self, year_id: int, data: Dict[str, Any], only_if_absent: bool) -> None:
+        try:
+            await self.cache.set(year_id, data, only_if_absent=only_if_absent)
+        except Exception as e:
+            logger.warning(f"Workflow stage cache write failed for year {year_id}: {str(e)}")
+            try:
+                await self.cache.invalidate(year_id)
+            except Exception:
+                pass
+
     async def create_workflow_stage(self, workflow_data: WorkflowStageCreate) -> int:
         """Create a new workflow stage"""
         # Check if workflow already exists for this year
         existing = await self.repository.get_workflow_stage_by_year(workflow_data.year_id)
         if existing:
             raise HTTPException(status_code=400, detail="Workflow stage already exists for this academic year")
-        
+
         workflow_stage = await self.repository.create_workflow_stage(workflow_data)
+        await self._write_through(workflow_stage)
         return workflow_stage.id
-            
-  
-    
+
     async def get_workflow_stage_by_year(self, year_id: int) -> JSONResponse:
-        """Get workflow stage for a specific academic year"""
-        workflow_stage = await self.repository.get_workflow_stage_by_year(year_id)
-        
-        if not workflow_stage:
-            return ResponseFormatter.failure(
-                error="Workflow stage not found for this academic year",
-                message="Workflow stage not found for this academic year",
-                status_code=404
-            )
-        
-        # Create response with step name
-        response_data = {
-            "year_id": workflow_stage.year_id,
-            "current_step": workflow_stage.current_step,
-            "step_name": self.get_step_name(workflow_stage.current_step),
-            "is_completed": workflow_stage.is_completed,
-            "total_steps": 12
-        }
-        
+        """Get workflow stage for a specific academic year, served from the cache when present"""
+        response_data: Optional[Dict[str, Any]] = None
+        if self.cache:
+            try:
+                response_data = await self.cache.get(year_id)
+            except Exception as e:
+                logger.warning(f"Workflow stage cache read failed for year {year_id}: {str(e)}")
+
+        if response_data is None:
+            workflow_stage = await self.repository.get_workflow_stage_by_year(year_id)
+
+            if not workflow_stage:
+                return ResponseFormatter.failure(
+                    error="Workflow stage not found for this academic year",
+                    message="Workflow stage not found for this academic year",
+                    status_code=404
+                )
+
+            response_data = await self._write_through(workflow_stage, only_if_absent=True)
+
         return ResponseFormatter.success(
             data=response_data,
             message="Workflow stage retrieved successfully"
         )
-    
-    async def increment_step(self, year_id: int) -> dict:
-        """Increment the current step by 1"""
-        workflow_stage = await self.repository.increment_step(year_id)
-        
+
+    async def check_guards(self, year_id: int, to_step: int) -> List[str]:
+        """Evaluate the guards of entering to_step against one aggregate query"""
+        guards = TRANSITION_GUARDS.get(to_step, [])
+        if not guards:
+            return []
+        counts = await self.repository.get_guard_counts(year_id)
+        return [reason for guard in guards for reason in guard(counts)]
+
+    async def get_next_step_guards(self, year_id: int) -> WorkflowGuardResponse:
+        """Report whether the workflow of a year can move to its next step"""
+        workflow_stage = await self.repository.get_workflow_stage_by_year(year_id)
+        if not workflow_stage:
+            raise HTTPException(status_code=404, detail="Workflow stage not found")
+
+        next_step = workflow_stage.current_step + 1
+        if next_step > TOTAL_STEPS:
+            return WorkflowGuardResponse(
+                year_id=year_id, current_step=workflow_stage.current_step, next_step=None,
+                can_advance=False, blocked_by=["The workflow is already at its last step"]
+            )
+
+        blocked_by = await self.check_guards(year_id, next_step)
+        # Steps 5 and 10 start allocation and generation; warn about demand they cannot meet
+        warnings = await FeasibilityService(self.db).warnings_for_step(year_id, next_step)
+        return WorkflowGuardResponse(
+            year_id=year_id, current_step=workflow_stage.current_step, next_step=next_step,
+            can_advance=not blocked_by, blocked_by=blocked_by, warnings=warnings
+        )
+
+    async def increment_step(self, year_id: int, expected_step: Optional[int] = None) -> dict:
+        """Advance the workflow by one step.
+
+        expected_step defaults to the step read now; either way the advance is a compare-and-swap,
+        so a concurrent increment yields 409 instead of skipping a step.
+        """
+        workflow_stage = await self.repository.get_workflow_stage_by_year(year_id)
         if not workflow_stage:
             raise HTTPException(status_code=404, detail="Workflow stage not found or cannot increment further")
-        
-        # Create response with step name
-        response_data = {
-            "year_id": workflow_stage.year_id,
-            "current_step": workflow_stage.current_step,
-            "step_name": self.get_step_name(workflow_stage.current_step),
-            "is_completed": workflow_stage.is_completed,
-            "total_steps": 12
-        }
-        
-        message = "Step incremented successfully"
-        if workflow_stage.is_completed:
-            message = "Workflow completed successfully!"
-        
-        return response_data
-    
+
+        from_step = expected_step if expected_step is not None else workflow_stage.current_step
+        if from_step != workflow_stage.current_step:
+            raise HTTPException(
+                status_code=409,
+                detail={"message": "Workflow step has changed", "current_step": workflow_stage.current_step}
+            )
+        if from_step >= TOTAL_STEPS:
+            return self._stage_data(workflow_stage)
+
+        blocked_by = await self.check_guards(year_id, from_step + 1)
+        if blocked_by:
+            raise HTTPException(
+                status_code=400,
+                detail={"message": f"Cannot move to {self.get_step_name(from_step + 1)}", "blocked_by": blocked_by}
+            )
+
+        advanced = await self.repository.advance_step(year_id, from_step)
+        if not advanced:
+            current = await self.repository.get_workflow_stage_by_year(year_id)
+            raise HTTPException(
+                status_code=409,
+                detail={"message": "Workflow step has changed", "current_step": current.current_step if current else None}
+            )
+
+        data = await self._write_through(advanced)
+        if advanced.current_step in SNAPSHOT_STEPS:
+            try:
+                # Best effort: a failed snapshot only undoes its own savepoint, not the advance
+                async with savepoint(self.db):
+                    await SnapshotRepository(self.db).create_snapshot(year_id, label=f"Entered {self.get_step_name(advanced.current_step)}")
+            except Exception as e:
+                logger.warning(f"Snapshot on entering step {advanced.current_step} failed for year {year_id}: {str(e)}")
+        return data
+
     async def complete_workflow(self, year_id: int) -> dict:
         """Mark workflow as completed"""
         workflow_stage = await self.repository.complete_workflow(year_id)
-        
+
         if not workflow_stage:
             raise HTTPException(status_code=404, detail="Workflow stage not found")
-        
-        response_data = {
-            "year_id": workflow_stage.year_id,
-            "current_step": workflow_stage.current_step,
-            "step_name": self.get_step_name(workflow_stage.current_step),
-            "is_completed": workflow_stage.is_completed,
-            "total_steps": 12
-        }
-        
-        return response_data
\ No newline at end of file
+
+        return await self._write_through(workflow_stage)
+
+    async def get_transitions(self, year_id: int) -> List[WorkflowTransitionResponse]:
+        """Get the transition history of a year"""
+        transitions = await self.repository.get_transitions(year_id)
+        return [
+            WorkflowTransitionResponse(
+                from_step=transition.from_step,
+                from_step_name=self.get_step_name(transition.from_step),
+                to_step=transition.to_step,
+                to_step_name=self.get_step_name(transition.to_step),
+                created_at=transition.created_at
+            )
+            for transition in transitions
+        ]
@@ -1,4 +1,7 @@
 from app.repositories.year_batch_repository import YearBatchRepository
+from app.core.single_flight import single_flight
+from app.core.data_loader import entity_loader
+from app.models.model import Subjects
 from app.schemas.academic_schema import (
     AcademicYearBatchCreate, AcademicYearBatchUpdate, BatchCreate, BatchUpdate,
     SubjectCreate, SubjectUpdate
@@ -28,6 +31,8 @@ class YearBatchService:
             ]
         return {"items": items}
 
+    # Opening the priority form sends many identical reads at once
+    @single_flight(lambda db: YearBatchService(YearBatchRepository(db)))
     async def get_batches_by_year(self, year_id: int):
         batches = await self.repository.get_batches_by_year(year_id)
         return {"batches": [
@@ -65,6 +70,7 @@ class YearBatchService:
         subject_id = await self.repository.create_subject(data.dict())
         return subject_id
 
+    @single_flight(lambda db: YearBatchService(YearBatchRepository(db)))
     async def get_subjects_by_year(self, year_id: int):
         subjects = await self.repository.get_subjects_by_year(year_id)
         return {"subjects": [
@@ -81,7 +87,7 @@ class YearBatchService:
         ]}
 
     async def get_subject_by_id(self, subject_id: int):
-        s = await self.repository.get_subject_by_id(subject_id)
+        s = await entity_loader(self.repository.db, Subjects).load(subject_id)
         if not s:
             return None
         return {
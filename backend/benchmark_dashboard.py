@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Dashboard Benchmark Script
+Compares loading a coordinator dashboard through the individual endpoints the
+frontend calls today against the single aggregated dashboard endpoint.
+
+Usage:
+    python benchmark_dashboard.py --year-id 1 [--base-url http://localhost:8000] [--runs 50]
+
+Run it against a server with real data. The first dashboard call usually misses
+the 30-second cache, so it is reported separately from the warm calls.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, List
+
+import httpx
+
+FAN_OUT_PATHS = [
+    "/api/workflow/workflow/year/{year_id}",
+    "/api/academic/batches/{year_id}",
+    "/api/academic/subjects/{year_id}",
+    "/api/priority/year/{year_id}",
+    "/api/priority/allocations/{year_id}",
+    "/api/timetable-modules/year/{year_id}",
+]
+DASHBOARD_PATH = "/api/dashboard/year/{year_id}"
+
+
+async def time_call(call: Callable[[], Awaitable[None]]) -> float:
+    start = time.perf_counter()
+    await call()
+    return (time.perf_counter() - start) * 1000
+
+
+def report(label: str, samples: List[float]) -> None:
+    ordered = sorted(samples)
+    p95 = ordered[max(0, int(len(ordered) * 0.95) - 1)]
+    print(f"{label:<28} mean {statistics.mean(samples):8.2f} ms   median {statistics.median(samples):8.2f} ms   p95 {p95:8.2f} ms")
+
+
+async def main(base_url: str, year_id: int, runs: int) -> None:
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        async def fan_out() -> None:
+            responses = await asyncio.gather(*(client.get(path.format(year_id=year_id)) for path in FAN_OUT_PATHS))
+            for response in responses:
+                response.raise_for_status()
+
+        async def dashboard() -> None:
+            response = await client.get(DASHBOARD_PATH.format(year_id=year_id))
+            response.raise_for_status()
+
+        first_dashboard = await time_call(dashboard)
+        fan_out_samples = [await time_call(fan_out) for _ in range(runs)]
+        dashboard_samples = [await time_call(dashboard) for _ in range(runs)]
+
+    print(f"Year {year_id}, {runs} runs each against {base_url}")
+    report(f"Fan-out ({len(FAN_OUT_PATHS)} parallel calls)", fan_out_samples)
+    report("Dashboard (first call)", [first_dashboard])
+    report("Dashboard", dashboard_samples)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the aggregated year dashboard")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--year-id", type=int, required=True)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.year_id, args.runs))
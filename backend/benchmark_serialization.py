@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Serialization Benchmark Script
+Compares how long the priorities-by-year response takes to serialize through the
+previous path (per-field copy in the service, response_model validation, FastAPI's
+JSON encoder) against the current one (repository rows handed straight to orjson).
+
+Usage:
+    python benchmark_serialization.py [--priorities 10000] [--runs 20]
+
+No database or server is needed; the rows are generated in the shape the
+repository returns them.
+"""
+
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+from app.schemas.lecturer_priority_schema import FacultyPriorityWithDetailsListResponse
+
+PRIORITIES_PER_FACULTY = 5
+
+
+def build_rows(priority_count: int) -> List[dict]:
+    created_at = datetime(2025, 6, 1, 9, 30)
+    faculty = []
+    for faculty_id in range(1, priority_count // PRIORITIES_PER_FACULTY + 1):
+        faculty.append({
+            "faculty_id": faculty_id,
+            "faculty_name": f"Faculty {faculty_id}",
+            "faculty_email": f"faculty{faculty_id}@example.com",
+            "year_id": 1,
+            "academic_year": "2025-2026",
+            "priority_subjects": [
+                {
+                    "id": faculty_id * PRIORITIES_PER_FACULTY + priority,
+                    "subject_id": priority,
+                    "subject_name": f"Subject {priority}",
+                    "subject_code": f"SUB{priority}",
+                    "subject_type": "CORE",
+                    "abbreviation": f"S{priority}",
+                    "batch_id": faculty_id % 8 + 1,
+                    "batch_section": "A",
+                    "batch_noOfStudent": 60,
+                    "priority": priority,
+                    "created_at": created_at + timedelta(seconds=faculty_id)
+                }
+                for priority in range(1, PRIORITIES_PER_FACULTY + 1)
+            ]
+        })
+    return faculty
+
+
+def previous_path(rows: List[dict]) -> bytes:
+    copied = {"priorities": [
+        {**faculty, "priority_subjects": [dict(subject) for subject in faculty["priority_subjects"]]}
+        for faculty in rows
+    ]}
+    validated = FacultyPriorityWithDetailsListResponse.model_validate(copied)
+    content = jsonable_encoder(validated)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def current_path(rows: List[dict]) -> bytes:
+    return orjson.dumps({"priorities": rows}, option=orjson.OPT_NON_STR_KEYS)
+
+
+def measure(call: Callable[[List[dict]], bytes], rows: List[dict], runs: int) -> List[float]:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        call(rows)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label: str, samples: List[float]) -> None:
+    ordered = sorted(samples)
+    p95 = ordered[max(0, int(len(ordered) * 0.95) - 1)]
+    print(f"{label:<28} mean {statistics.mean(samples):8.2f} ms   median {statistics.median(samples):8.2f} ms   p95 {p95:8.2f} ms")
+
+
+def main(priority_count: int, runs: int) -> None:
+    rows = build_rows(priority_count)
+    if json.loads(previous_path(rows)) != json.loads(current_path(rows)):
+        raise SystemExit("The two paths produce different JSON")
+
+    previous = measure(previous_path, rows, runs)
+    current = measure(current_path, rows, runs)
+
+    print(f"{priority_count} priorities, {runs} runs each")
+    report("Copy + validate + encode", previous)
+    report("orjson", current)
+    print(f"Speed-up (median) {statistics.median(previous) / statistics.median(current):.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark serialization of the priorities-by-year response")
+    parser.add_argument("--priorities", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    main(args.priorities, args.runs)
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Standalone script to rebuild the timetable_slots table from timetables.timetable_data.
+Run it once after creating the timetable_slots table so existing timetables get their slot rows.
+"""
+
+import asyncio
+import sys
+import os
+
+# Add the parent directory to the path so we can import from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.model import Timetable
+from app.db.postgres_client import get_db
+from app.repositories.timetable_module_repository import TimetableModuleRepository
+from sqlalchemy import select
+
+async def sync_timetable_slots():
+    """Rebuild slot rows for every stored timetable"""
+    async for db in get_db():
+        try:
+            repository = TimetableModuleRepository(db)
+            result = await db.execute(select(Timetable))
+            timetables = result.scalars().all()
+
+            for timetable in timetables:
+                await repository.sync_timetable_slots(timetable)
+                print(f"Synced slots for timetable {timetable.timetable_id} (year {timetable.year_id}, batch {timetable.batch_id})")
+
+            await db.commit()
+            print(f"✅ Timetable slots synced for {len(timetables)} timetables")
+
+        except Exception as e:
+            await db.rollback()
+            print(f"❌ Error syncing timetable slots: {e}")
+            raise
+        finally:
+            await db.close()
+        break
+
+if __name__ == "__main__":
+    asyncio.run(sync_timetable_slots())
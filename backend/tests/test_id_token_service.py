@@ -0,0 +1,176 @@
+import base64
+import json
+import time
+import fakeredis
+import httpx
+import pytest
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+from fastapi import FastAPI, Response
+from app.config.config import settings
+from app.db.radis_client import get_redis
+from app.routes.auth_routes import authRoute, get_user_service
+from app.services import auth_services, id_token_service
+from app.services.id_token_service import JWKS_MIN_REFETCH_INTERVAL, JwksCache, JwksUnavailable, verify_google_id_token
+
+AUDIENCE = "test-client"
+ISSUER = "https://accounts.google.com"
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _jwk(kid: str, key: rsa.RSAPrivateKey) -> dict:
+    numbers = key.public_key().public_numbers()
+    return {
+        "kid": kid, "kty": "RSA", "alg": "RS256", "use": "sig",
+        "n": _b64url(numbers.n.to_bytes((numbers.n.bit_length() + 7) // 8, "big")),
+        "e": _b64url(numbers.e.to_bytes(3, "big"))
+    }
+
+
+def _sign(key: rsa.RSAPrivateKey, kid: str, **overrides) -> str:
+    """Sign a token with the default claims; an override of None leaves that claim out"""
+    now = int(time.time())
+    claims = {
+        "iss": ISSUER, "aud": AUDIENCE, "sub": "google-123", "email": "faculty@college.edu",
+        "email_verified": True, "name": "Faculty", "iat": now, "exp": now + 3600, **overrides
+    }
+    claims = {name: value for name, value in claims.items() if value is not None}
+    signing_input = f"{_b64url(json.dumps({'alg': 'RS256', 'kid': kid}).encode())}.{_b64url(json.dumps(claims).encode())}"
+    signature = key.sign(signing_input.encode("ascii"), padding.PKCS1v15(), hashes.SHA256())
+    return f"{signing_input}.{_b64url(signature)}"
+
+
+class MockGoogle:
+    """Local JWKS, token and userinfo endpoints"""
+
+    def __init__(self) -> None:
+        self.key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.jwks = {"keys": [_jwk("key-1", self.key)]}
+        self.jwks_body: bytes | None = None
+        self.jwks_status = 200
+        self.id_token = _sign(self.key, "key-1")
+        self.jwks_requests = 0
+        self.userinfo_requests = 0
+        self.app = FastAPI()
+        self.app.get("/certs")(self.certs)
+        self.app.post("/token")(self.token)
+        self.app.get("/userinfo")(self.userinfo)
+
+    async def certs(self):
+        self.jwks_requests += 1
+        body = self.jwks_body if self.jwks_body is not None else json.dumps(self.jwks).encode()
+        return Response(body, status_code=self.jwks_status, media_type="application/json", headers={"Cache-Control": "public, max-age=3600"})
+
+    async def token(self):
+        return {"access_token": "access-0", "refresh_token": "refresh-0", "expires_in": 3600, "id_token": self.id_token}
+
+    async def userinfo(self):
+        self.userinfo_requests += 1
+        return {"id": "google-123", "email": "faculty@college.edu", "name": "Faculty"}
+
+
+@pytest.fixture
+async def google(monkeypatch):
+    google = MockGoogle()
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=google.app))
+    monkeypatch.setattr(auth_services, "_oauth_client", client)
+    monkeypatch.setattr(settings, "GOOGLE_TOKEN_URL", "http://google.test/token")
+    monkeypatch.setattr(settings, "GOOGLE_USERINFO_URL", "http://google.test/userinfo")
+    monkeypatch.setattr(id_token_service, "google_jwks", JwksCache("http://google.test/certs"))
+    yield google
+    await client.aclose()
+
+
+async def test_valid_token_is_accepted(google):
+    user = await verify_google_id_token(google.id_token, audience=AUDIENCE)
+
+    assert user == {"id": "google-123", "email": "faculty@college.edu", "name": "Faculty", "picture": None}
+
+
+async def test_signature_by_another_key_is_rejected(google):
+    forged = _sign(rsa.generate_private_key(public_exponent=65537, key_size=2048), "key-1")
+
+    with pytest.raises(ValueError, match="signature"):
+        await verify_google_id_token(forged, audience=AUDIENCE)
+
+
+@pytest.mark.parametrize("claims, message", [
+    ({"aud": "another-client"}, "another client"),
+    ({"iss": "https://evil.example.com"}, "issuer"),
+    ({"exp": int(time.time()) - 3600}, "expired"),
+    ({"email_verified": False}, "verified email"),
+    ({"email_verified": None}, "verified email"),
+])
+async def test_claims_are_checked(google, claims, message):
+    with pytest.raises(ValueError, match=message):
+        await verify_google_id_token(_sign(google.key, "key-1", **claims), audience=AUDIENCE)
+
+
+async def test_unknown_key_refetches_at_most_once_per_interval(google):
+    await verify_google_id_token(google.id_token, audience=AUDIENCE)
+    rotated_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    rotated = _sign(rotated_key, "key-2")
+    google.jwks["keys"].append(_jwk("key-2", rotated_key))
+
+    # The keys were fetched just now, so the unknown key does not trigger another fetch yet
+    for _ in range(3):
+        with pytest.raises(ValueError, match="Unknown ID token signing key"):
+            await verify_google_id_token(rotated, audience=AUDIENCE)
+    assert google.jwks_requests == 1
+
+    id_token_service.google_jwks._last_fetch -= JWKS_MIN_REFETCH_INTERVAL
+    assert (await verify_google_id_token(rotated, audience=AUDIENCE))["email"] == "faculty@college.edu"
+    assert google.jwks_requests == 2
+
+
+@pytest.mark.parametrize("status, body", [(503, b"unavailable"), (200, b"<html>not json</html>")])
+async def test_unloadable_key_set_is_not_a_token_error(google, status, body):
+    google.jwks_status, google.jwks_body = status, body
+
+    with pytest.raises(JwksUnavailable):
+        await verify_google_id_token(google.id_token, audience=AUDIENCE)
+
+
+class NoUsers:
+    async def get_userby_email(self, email: str):
+        return None
+
+
+@pytest.fixture
+async def callback_client(google):
+    redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    app = FastAPI()
+    app.include_router(authRoute, prefix="/api/auth")
+    app.dependency_overrides[get_user_service] = NoUsers
+    app.dependency_overrides[get_redis] = lambda: redis_client
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+async def test_callback_skips_userinfo_for_a_verified_token(google, callback_client):
+    response = await callback_client.get("/api/auth/callback", params={"code": "code-1"})
+
+    assert response.headers["location"] == f"{settings.FRONTEND_BASE_URL}/signup"
+    assert google.userinfo_requests == 0
+
+
+async def test_callback_rejects_a_forged_token(google, callback_client):
+    google.id_token = _sign(rsa.generate_private_key(public_exponent=65537, key_size=2048), "key-1")
+
+    response = await callback_client.get("/api/auth/callback", params={"code": "code-1"})
+
+    assert response.headers["location"] == f"{settings.FRONTEND_BASE_URL}/?error=invalid_id_token"
+    assert google.userinfo_requests == 0
+
+
+@pytest.mark.parametrize("status, body", [(503, b"unavailable"), (200, b"<html>not json</html>")])
+async def test_callback_falls_back_to_userinfo_without_keys(google, callback_client, status, body):
+    google.jwks_status, google.jwks_body = status, body
+
+    response = await callback_client.get("/api/auth/callback", params={"code": "code-1"})
+
+    assert response.headers["location"] == f"{settings.FRONTEND_BASE_URL}/signup"
+    assert google.userinfo_requests == 1
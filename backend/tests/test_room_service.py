@@ -0,0 +1,65 @@
+import fakeredis
+import pytest
+from app.db.unit_of_work import commit
+from app.models.model import AcademicYears, Batches, Rooms, RoomTypeEnum, Timetable, TimetableHourFormats, TimetableSlot
+from app.services.room_service import RoomService
+
+MONDAY_FIRST = ("R-101", "monday", 1)
+
+
+@pytest.fixture
+async def year(session_factory):
+    async with session_factory() as db:
+        db.add(AcademicYears(year_id=1, academic_year="2030-2031"))
+        db.add(Rooms(room_id=1, room_name="R-101", room_type=RoomTypeEnum.LECTURE, capacity=60))
+        await db.flush()
+        db.add_all([Batches(batch_id=batch_id, year_id=1, section=section, noOfStudent=60) for batch_id, section in [(1, "A"), (2, "B")]])
+        await db.flush()
+        db.add_all([TimetableHourFormats(format_id=batch_id, format_name="Regular", year_id=1, batch_id=batch_id, format_data={}) for batch_id in (1, 2)])
+        await db.flush()
+        db.add_all([Timetable(timetable_id=batch_id, format_id=batch_id, year_id=1, batch_id=batch_id, timetable_data={}) for batch_id in (1, 2)])
+        await db.flush()
+        db.add(TimetableSlot(timetable_id=1, year_id=1, batch_id=1, day="monday", period=1, abbreviation="DBMS", venue="R-101"))
+        await db.commit()
+    return 1
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.aioredis.FakeRedis(decode_responses=True)
+
+
+async def _monday_first_is_free(session_factory, redis_client) -> bool:
+    async with session_factory() as db:
+        response = await RoomService(db, redis_client).find_free_rooms(1, "monday", 1)
+        return [room.room_id for room in response.rooms] == [1]
+
+
+async def _free_batch_a_slot(db) -> None:
+    slot = await db.get(TimetableSlot, 1)
+    await db.delete(slot)
+    await db.flush()
+
+
+async def test_freed_slot_is_cleared_after_commit(year, session_factory, redis_client):
+    assert not await _monday_first_is_free(session_factory, redis_client)
+
+    async with session_factory() as db:
+        await _free_batch_a_slot(db)
+        await RoomService(db, redis_client).update_occupancy(year, {MONDAY_FIRST}, set())
+        await commit(db)
+
+    assert await _monday_first_is_free(session_factory, redis_client)
+
+
+async def test_freed_slot_booked_again_before_the_clear_stays_set(year, session_factory, redis_client):
+    assert not await _monday_first_is_free(session_factory, redis_client)
+
+    async with session_factory() as db:
+        await _free_batch_a_slot(db)
+        await RoomService(db, redis_client).update_occupancy(year, {MONDAY_FIRST}, set())
+        # Batch B takes the room after the freeing write read the slots but before its bits are applied
+        db.add(TimetableSlot(timetable_id=2, year_id=1, batch_id=2, day="monday", period=1, abbreviation="OS", venue="R-101"))
+        await commit(db)
+
+    assert not await _monday_first_is_free(session_factory, redis_client)
@@ -0,0 +1,67 @@
+import asyncio
+import json
+import pytest
+from app.services import timetable_event_service
+from app.services.timetable_event_service import TimetableEventHub
+
+
+class FakeSocket:
+    def __init__(self, stalled: bool = False):
+        self.stalled = stalled
+        self.sent = []
+        self.closed_with = None
+
+    async def send_text(self, message: str) -> None:
+        if self.stalled:
+            await asyncio.Event().wait()
+        self.sent.append(json.loads(message)["seq"])
+
+    async def close(self, code: int) -> None:
+        self.closed_with = code
+
+
+def event(seq: int) -> str:
+    return json.dumps({"seq": seq, "year_id": 1, "type": "timetable_updated", "data": {}})
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    hub = TimetableEventHub()
+
+    async def subscribed_listener():
+        hub._subscribed.set()
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(hub, "_listen", subscribed_listener)
+    return hub
+
+
+async def test_a_stalled_client_does_not_hold_back_the_others(hub, monkeypatch):
+    monkeypatch.setattr(timetable_event_service, "EVENT_QUEUE_SIZE", 3)
+    stalled, live = FakeSocket(stalled=True), FakeSocket()
+    await hub.connect(1, stalled)
+    await hub.connect(1, live)
+
+    for seq in range(1, 6):
+        hub._broadcast(1, event(seq))
+        await asyncio.sleep(0)
+
+    assert live.sent == [1, 2, 3, 4, 5]
+    assert stalled.closed_with == 1013
+    await hub.disconnect(1, stalled)
+    await hub.disconnect(1, live)
+
+
+async def test_a_replaying_client_goes_live_after_the_replay(hub):
+    socket = FakeSocket()
+    await hub.connect(1, socket, replaying=True)
+    for seq in (3, 4, 5):
+        hub._broadcast(1, event(seq))
+    await asyncio.sleep(0)
+    assert socket.sent == []
+
+    # The replay ended at 4, so only 5 is still to be sent
+    await hub.release(socket, 4)
+    await asyncio.sleep(0)
+    assert socket.sent == [5]
+    await hub.disconnect(1, socket)
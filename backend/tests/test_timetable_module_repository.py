@@ -0,0 +1,51 @@
+from sqlalchemy import select
+from app.models.model import (
+    AcademicYears,
+    ApprovalStatusEnum,
+    Approvals,
+    Batches,
+    RoleEnum,
+    Timetable,
+    TimetableHourFormats,
+    Users,
+    WorkflowStageEnum,
+)
+from app.repositories.timetable_module_repository import TimetableModuleRepository
+
+
+async def test_delete_keeps_the_timetable_approvals_as_history(session_factory):
+    async with session_factory() as db:
+        db.add(Users(user_id=1, uname="HOD", email="hod@college.edu", role=RoleEnum.HOD, oauth_provider="google", oauth_id="hod", joining_year=2015))
+        db.add(AcademicYears(year_id=1, academic_year="2030-2031"))
+        await db.flush()
+        db.add(Batches(batch_id=1, year_id=1, section="A", noOfStudent=60))
+        await db.flush()
+        db.add(TimetableHourFormats(format_id=1, format_name="Regular", year_id=1, batch_id=1, format_data={}))
+        await db.flush()
+        db.add(Timetable(timetable_id=1, format_id=1, year_id=1, batch_id=1, timetable_data={"monday": ["DBMS"]}))
+        await db.flush()
+        db.add(Approvals(
+            approval_id=1,
+            year_id=1,
+            timetable_id=1,
+            approval_status=ApprovalStatusEnum.PENDING,
+            approval_stage=WorkflowStageEnum.STEP_10_AUTOGENERATE_TIMETABLE_AND_SEND_TO_HOD,
+            approved_by=1,
+        ))
+        await db.commit()
+
+    async with session_factory() as db:
+        assert await TimetableModuleRepository(db).delete_timetable_module(1) is True
+        await db.commit()
+
+    async with session_factory() as db:
+        assert await db.get(Timetable, 1) is None
+        approval = (await db.execute(select(Approvals))).scalar_one()
+        assert approval.archived is True
+        assert approval.timetable_id is None
+        assert approval.approval_status == ApprovalStatusEnum.PENDING
+
+
+async def test_delete_of_a_missing_timetable_reports_false(session_factory):
+    async with session_factory() as db:
+        assert await TimetableModuleRepository(db).delete_timetable_module(404) is False
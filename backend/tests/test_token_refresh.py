@@ -0,0 +1,90 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+import fakeredis
+import httpx
+import pytest
+from fastapi import FastAPI, Form
+from app.services import auth_services
+from app.services.auth_services import TokenRefreshCoordinator
+
+SESSION_ID = "session-1"
+
+
+class MockOAuthServer:
+    """Local token endpoint that counts refresh grants"""
+
+    def __init__(self) -> None:
+        self.refresh_requests = 0
+        self.app = FastAPI()
+        self.app.post("/token")(self.token)
+
+    async def token(self, grant_type: str = Form(...), refresh_token: str = Form(...)):
+        assert grant_type == "refresh_token"
+        self.refresh_requests += 1
+        # Slow enough that every concurrent caller arrives while the refresh is running
+        await asyncio.sleep(0.05)
+        return {"access_token": f"access-{self.refresh_requests}", "expires_in": 3600}
+
+
+@pytest.fixture
+async def oauth_server(monkeypatch):
+    server = MockOAuthServer()
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app))
+    monkeypatch.setattr(auth_services, "_oauth_client", client)
+    monkeypatch.setattr(auth_services.settings, "GOOGLE_TOKEN_URL", "http://oauth.test/token")
+    yield server
+    await client.aclose()
+
+
+@pytest.fixture
+async def coordinator():
+    coordinator = TokenRefreshCoordinator(margin=300)
+    coordinator._redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    yield coordinator
+    await coordinator.close()
+
+
+async def _store_session(coordinator: TokenRefreshCoordinator, expires_in: int) -> dict:
+    session = {
+        "user_id": 1,
+        "access_token": "access-0",
+        "refresh_token": "refresh-0",
+        "expires_at": (datetime.now(timezone.utc) + timedelta(seconds=expires_in)).isoformat()
+    }
+    await coordinator._redis.set(f"sessionid:{SESSION_ID}", json.dumps(session), ex=3600)
+    return session
+
+
+async def test_concurrent_expired_requests_share_one_refresh(oauth_server, coordinator):
+    session = await _store_session(coordinator, expires_in=-10)
+
+    results = await asyncio.gather(*(coordinator.ensure_fresh(SESSION_ID, session) for _ in range(10)))
+
+    assert oauth_server.refresh_requests == 1
+    assert {result["access_token"] for result in results} == {"access-1"}
+    stored = json.loads(await coordinator._redis.get(f"sessionid:{SESSION_ID}"))
+    assert stored["access_token"] == "access-1"
+
+
+async def test_near_expiry_refreshes_in_background(oauth_server, coordinator):
+    session = await _store_session(coordinator, expires_in=60)
+
+    result = await coordinator.ensure_fresh(SESSION_ID, session)
+
+    # The request goes on with the current token while the refresh runs
+    assert result["access_token"] == "access-0"
+    assert len(coordinator._background) == 1
+    await asyncio.gather(*coordinator._background)
+    assert oauth_server.refresh_requests == 1
+    stored = json.loads(await coordinator._redis.get(f"sessionid:{SESSION_ID}"))
+    assert stored["access_token"] == "access-1"
+
+
+async def test_fresh_token_is_not_refreshed(oauth_server, coordinator):
+    session = await _store_session(coordinator, expires_in=3600)
+
+    result = await coordinator.ensure_fresh(SESSION_ID, session)
+
+    assert result is session
+    assert oauth_server.refresh_requests == 0
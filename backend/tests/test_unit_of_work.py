@@ -0,0 +1,118 @@
+import pytest
+from fastapi import APIRouter, Depends, FastAPI, HTTPException
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.repository_base import BaseRepository
+from app.db.postgres_client import get_db
+from app.db.radis_client import get_redis
+from app.db.unit_of_work import after_commit
+from app.middlewares.auth_middleware import auth_dependency
+from app.models.model import AcademicYears, RoleEnum, Rooms, Users, WorkflowStage, WorkflowTransition
+from app.repositories.room_repository import RoomRepository
+from app.repositories.snapshot_repository import SnapshotRepository
+from app.routes.room_routes import router as room_router
+from app.routes.workflow_routes import workflow_router
+from app.services.user_access_service import user_access_cache
+
+HOD = {"user_id": 1, "uname": "HOD", "email": "hod@college.edu", "role": "HOD"}
+
+ran_after_commit = []
+failing_router = APIRouter()
+
+
+@failing_router.post("/flush-then-fail")
+async def flush_then_fail(db: AsyncSession = Depends(get_db)):
+    await RoomRepository(db).create_room({"room_name": "R-101", "room_type": "LECTURE", "capacity": 60})
+    await BaseRepository(db, AcademicYears).create(academic_year="2030-2031")
+    after_commit(db, lambda: _record("flush-then-fail"))
+    raise HTTPException(status_code=409, detail="Conflict found after the writes were flushed")
+
+
+async def _record(name: str) -> None:
+    ran_after_commit.append(name)
+
+
+async def _no_redis():
+    yield None
+
+
+async def _hod():
+    return HOD
+
+
+@pytest.fixture
+async def client(session_factory, monkeypatch):
+    monkeypatch.setattr(user_access_cache, "ensure_listener", lambda: None)
+    async with session_factory() as db:
+        db.add(Users(user_id=1, uname="HOD", email="hod@college.edu", role=RoleEnum.HOD, oauth_provider="google", oauth_id="hod", joining_year=2015))
+        await db.commit()
+
+    app = FastAPI()
+    app.include_router(room_router, prefix="/api")
+    app.include_router(workflow_router, prefix="/api/workflow")
+    app.include_router(failing_router)
+    app.dependency_overrides[get_redis] = _no_redis
+    app.dependency_overrides[auth_dependency] = _hod
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+async def _count(session_factory, model) -> int:
+    async with session_factory() as db:
+        return await db.scalar(select(func.count()).select_from(model))
+
+
+async def test_create_room_commits_once(client, commits, session_factory):
+    response = await client.post("/api/rooms/", json={"room_name": "R-101", "room_type": "LECTURE", "capacity": 60})
+
+    assert response.status_code == 201
+    assert len(commits) == 1
+    assert await _count(session_factory, Rooms) == 1
+
+
+async def test_read_endpoint_commits_once(client, commits):
+    response = await client.get("/api/rooms/")
+
+    assert response.status_code == 200
+    assert len(commits) == 1
+
+
+async def test_failed_request_rolls_back_every_flush(client, commits, session_factory):
+    ran_after_commit.clear()
+
+    response = await client.post("/flush-then-fail")
+
+    assert response.status_code == 409
+    assert commits == []
+    assert await _count(session_factory, Rooms) == 0
+    assert await _count(session_factory, AcademicYears) == 0
+    assert ran_after_commit == []
+
+
+async def test_failed_snapshot_savepoint_keeps_the_advance(client, commits, session_factory, monkeypatch):
+    async with session_factory() as db:
+        db.add(AcademicYears(year_id=1, academic_year="2024-2025"))
+        db.add(WorkflowStage(year_id=1, current_step=6, is_completed=False))
+        await db.commit()
+    commits.clear()
+    ran_after_commit.clear()
+
+    async def failing_snapshot(self, year_id, label=None):
+        # Writes inside the savepoint, then fails like a snapshot that cannot be stored
+        await BaseRepository(self.db, AcademicYears).create(academic_year="snapshot-side-effect")
+        after_commit(self.db, lambda: _record("snapshot"))
+        raise RuntimeError("snapshot storage unavailable")
+
+    monkeypatch.setattr(SnapshotRepository, "create_snapshot", failing_snapshot)
+
+    response = await client.put("/api/workflow/workflow/increment/1")
+
+    assert response.status_code == 200
+    assert response.json()["current_step"] == 7
+    assert len(commits) == 1
+    async with session_factory() as db:
+        assert await db.scalar(select(WorkflowStage.current_step).where(WorkflowStage.year_id == 1)) == 7
+        assert await db.scalar(select(func.count()).select_from(WorkflowTransition)) == 1
+        assert await db.scalar(select(func.count()).select_from(AcademicYears)) == 1
+    assert ran_after_commit == []